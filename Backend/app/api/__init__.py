@@ -14,3 +14,4 @@ from .reporting import router as reporting
 from .notification import router as notification
 from .uploads import router as uploads
 from .lease import router as lease
+from .performance import router as performance, metrics_router
@@ -7,6 +7,7 @@ import inspect
 
 from app.config.auth import get_current_user
 from app.config.database import supabase_client
+from app.config.query_executor import run_query
 
 router = APIRouter()
 
@@ -267,7 +268,7 @@ async def debug_auth(current_user: Dict[str, Any] = Depends(get_current_user)):
         from ..config.database import supabase_client
         
         # Test basic database access
-        test_response = supabase_client.table("user_profiles").select("id").limit(1).execute()
+        test_response = await run_query(supabase_client.table("user_profiles").select("id").limit(1))
         
         return {
             "user": current_user,
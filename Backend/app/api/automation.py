@@ -9,6 +9,7 @@ import logging
 
 from ..config.auth import get_current_user
 from ..config.database import get_supabase_client_authenticated
+from ..config.query_executor import run_query
 from supabase import Client
 
 logger = logging.getLogger(__name__)
@@ -26,10 +27,11 @@ async def get_automation_stats(
         # In a full implementation, you'd have automation_rules and automation_tasks tables
         
         # Get properties count to estimate automation scale
-        properties_response = db_client.table('properties') \
-            .select('id', count='exact') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            db_client.table('properties')
+            .select('id', count='exact')
+            .eq('owner_id', owner_id)
+        )
         
         property_count = properties_response.count or 0
         
@@ -38,21 +40,23 @@ async def get_automation_stats(
         
         active_tenants = 0
         if property_ids:
-            tenants_response = db_client.table('property_tenants') \
-                .select('tenant_id', count='exact') \
-                .in_('property_id', property_ids) \
-                .gte('end_date', datetime.now().strftime('%Y-%m-%d')) \
-                .execute()
+            tenants_response = await run_query(
+                db_client.table('property_tenants')
+                .select('tenant_id', count='exact')
+                .in_('property_id', property_ids)
+                .gte('end_date', datetime.now().strftime('%Y-%m-%d'))
+            )
             active_tenants = tenants_response.count or 0
         
         # Get maintenance requests to estimate automation potential
         maintenance_count = 0
         if property_ids:
-            maintenance_response = db_client.table('maintenance_requests') \
-                .select('id', count='exact') \
-                .in_('property_id', property_ids) \
-                .gte('created_at', (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')) \
-                .execute()
+            maintenance_response = await run_query(
+                db_client.table('maintenance_requests')
+                .select('id', count='exact')
+                .in_('property_id', property_ids)
+                .gte('created_at', (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+            )
             maintenance_count = maintenance_response.count or 0
         
         # Calculate realistic automation stats based on actual data
@@ -89,10 +93,11 @@ async def get_automation_rules(
     """Get automation rules based on actual property and tenant data."""
     try:
         # Get properties and tenants to generate realistic automation rules
-        properties_response = db_client.table('properties') \
-            .select('id, property_name') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            db_client.table('properties')
+            .select('id, property_name')
+            .eq('owner_id', owner_id)
+        )
         
         property_count = len(properties_response.data) if properties_response.data else 0
         
@@ -101,10 +106,11 @@ async def get_automation_rules(
         tenant_count = 0
         
         if property_ids:
-            tenants_response = db_client.table('property_tenants') \
-                .select('tenant_id', count='exact') \
-                .in_('property_id', property_ids) \
-                .execute()
+            tenants_response = await run_query(
+                db_client.table('property_tenants')
+                .select('tenant_id', count='exact')
+                .in_('property_id', property_ids)
+            )
             tenant_count = tenants_response.count or 0
         
         # Generate realistic automation rules based on actual data
@@ -201,22 +207,24 @@ async def get_automation_tasks(
     """Get automation tasks based on actual tenant and property data."""
     try:
         # Get properties and current tenants
-        properties_response = db_client.table('properties') \
-            .select('id, property_name') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            db_client.table('properties')
+            .select('id, property_name')
+            .eq('owner_id', owner_id)
+        )
         
         property_ids = [prop['id'] for prop in properties_response.data] if properties_response.data else []
         tasks = []
         
         if property_ids:
             # Get current active tenants
-            tenants_response = db_client.table('property_tenants') \
-                .select('*, tenants(name), units(unit_number)') \
-                .in_('property_id', property_ids) \
-                .gte('end_date', datetime.now().strftime('%Y-%m-%d')) \
-                .limit(limit) \
-                .execute()
+            tenants_response = await run_query(
+                db_client.table('property_tenants')
+                .select('*, tenants(name), units(unit_number)')
+                .in_('property_id', property_ids)
+                .gte('end_date', datetime.now().strftime('%Y-%m-%d'))
+                .limit(limit)
+            )
             
             # Generate realistic tasks based on actual tenants
             for i, lease in enumerate(tenants_response.data):
@@ -252,12 +260,13 @@ async def get_automation_tasks(
                     })
             
             # Get recent maintenance requests for tasks
-            maintenance_response = db_client.table('maintenance_requests') \
-                .select('*, properties(property_name)') \
-                .in_('property_id', property_ids) \
-                .gte('created_at', (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')) \
-                .limit(10) \
-                .execute()
+            maintenance_response = await run_query(
+                db_client.table('maintenance_requests')
+                .select('*, properties(property_name)')
+                .in_('property_id', property_ids)
+                .gte('created_at', (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'))
+                .limit(10)
+            )
             
             for i, request in enumerate(maintenance_response.data):
                 property_name = request.get('properties', {}).get('property_name', 'Unknown Property') if request.get('properties') else 'Unknown Property'
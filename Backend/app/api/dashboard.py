@@ -3,6 +3,7 @@ from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
 import logging
 from app.config.auth import get_current_user
+from app.config.query_trace import query_budget
 
 from app.services import dashboard_service
 
@@ -24,6 +25,7 @@ class DashboardDataResponse(BaseModel):
     message: str = "Success"
 
 @router.get("/summary")
+@query_budget(5)
 async def get_dashboard_summary(current_user: Dict[str, Any] = Depends(get_current_user)):
     """Get dashboard summary data"""
     try:
@@ -74,6 +76,7 @@ async def get_revenue_data(
         raise HTTPException(status_code=500, detail=f"Failed to retrieve revenue data: {str(e)}")
 
 @router.get("/data", response_model=DashboardDataResponse)
+@query_budget(6)
 async def get_dashboard_data(
     months: int = Query(6, ge=1, le=24, description="Number of months of historical data to retrieve"),
     current_user: Dict[str, Any] = Depends(get_current_user)
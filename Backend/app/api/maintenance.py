@@ -15,6 +15,7 @@ from app.models.maintenance import (
 )
 from app.services import maintenance_service
 from app.config.auth import get_current_user
+from app.config.query_trace import query_budget
 from app.services import property_service
 from app.config.database import supabase_client
 from app.services import tenant_service
@@ -633,6 +634,7 @@ async def get_maintenance_summary(
         raise HTTPException(status_code=500, detail=f"Failed to retrieve maintenance summary: {str(e)}")
 
 @router.get("/requests/count", response_model=Dict[str, int])
+@query_budget(4)
 async def get_maintenance_requests_count(
     tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
     status: Optional[str] = Query('new', description="Status to filter by (default: new)"),
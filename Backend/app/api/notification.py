@@ -13,6 +13,7 @@ from app.models.notification import (
 from app.services import notification_service
 from app.config.auth import get_current_user
 from app.config.database import get_supabase_client_authenticated
+from app.config.query_executor import run_query
 from app.models.user import User
 from supabase import Client
 
@@ -103,10 +104,10 @@ async def debug_notifications(
         user_id = current_user.get("id")
         
         # Test notifications table access with authenticated client
-        test_response = db_client.table("notifications").select("id").limit(1).execute()
+        test_response = await run_query(db_client.table("notifications").select("id").limit(1))
         
         # Test user-specific notifications access
-        user_notifications_response = db_client.table("notifications").select("id").eq("user_id", user_id).limit(1).execute()
+        user_notifications_response = await run_query(db_client.table("notifications").select("id").eq("user_id", user_id).limit(1))
         
         return {
             "user": current_user,
@@ -0,0 +1,274 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+from typing import Dict, Any, Optional
+import hmac
+import logging
+import os
+import time
+
+from app.config.settings import settings
+from app.config.cache import cache_service
+from app.config.database import get_pool_stats
+from app.config.query_executor import get_executor_stats
+from app.config.metrics import request_metrics, loop_lag_monitor, collect_metrics
+from app.config.loop_blocking import blocking_detector
+from app.config.token_verifier import token_verifier
+from app.config.query_trace import slow_query_log
+from app.config.profiling import request_profiler, to_call_tree, to_pstats
+from app.config.memory import GROUP_BY, memory_profiler, object_counts, peak_rss_bytes, rss_bytes, rss_watchdog
+
+router = APIRouter(
+    prefix="/api/v1/performance",
+    tags=["Performance"],
+)
+
+# Served at the root as /metrics, where Prometheus scrapes by default
+metrics_router = APIRouter(tags=["Performance"])
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_performance_access(
+    x_performance_token: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Require PERFORMANCE_API_TOKEN in X-Performance-Token (or as a Bearer token,
+    which is what Prometheus sends for /metrics).
+
+    Fails closed: with no token configured the endpoints are disabled.
+    """
+    expected = settings.PERFORMANCE_API_TOKEN
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Performance endpoints are disabled (PERFORMANCE_API_TOKEN is not set)")
+    supplied = x_performance_token
+    if supplied is None and authorization and authorization.lower().startswith("bearer "):
+        supplied = authorization[7:].strip()
+    if not hmac.compare_digest(supplied or "", expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid performance token")
+
+
+def _cache_status() -> str:
+    if not cache_service.enabled:
+        return "disabled"
+    return "redis" if cache_service.redis_client else "memory"
+
+
+@router.get("/summary", dependencies=[Depends(verify_performance_access)])
+async def get_performance_summary(
+    include_l2_sizes: bool = Query(False, description="Scan Redis for per-prefix L2 sizes (bounded)"),
+) -> Dict[str, Any]:
+    """Cache effectiveness, Redis latency, per-route latency percentiles and event-loop lag for this worker"""
+    try:
+        redis_latency_ms = await cache_service.ping_latency()
+        cache_stats = cache_service.get_stats()
+
+        l2: Dict[str, Any] = {"connected": redis_latency_ms is not None}
+        if cache_service.redis_client and redis_latency_ms is not None:
+            l2["keys"] = await cache_service.redis_client.dbsize()
+            if include_l2_sizes:
+                l2["bytes_by_prefix"] = await cache_service.redis_bytes_by_prefix()
+
+        return {
+            "status": "ok",
+            "worker_pid": os.getpid(),
+            "uptime_seconds": round(time.time() - request_metrics.started_at, 1),
+            "redis_connected": redis_latency_ms is not None,
+            "redis_latency_ms": redis_latency_ms,
+            "cache": {
+                "status": _cache_status(),
+                "codec": cache_stats["codec"],
+                "inflight": cache_stats["inflight"],
+                "l1": cache_stats["l1"],
+                "l2": l2,
+                "prefixes": cache_stats["prefixes"],
+            },
+            "requests": request_metrics.snapshot(),
+            "event_loop": {**loop_lag_monitor.snapshot(), "blocking": blocking_detector.snapshot()},
+            "auth": token_verifier.snapshot(),
+            "database": {
+                "executor": get_executor_stats(),
+                "http_pool": get_pool_stats(),
+                "slow_query_ms": slow_query_log.threshold_ms,
+                "slow_queries": slow_query_log.total,
+            },
+        }
+    except Exception as e:
+        logger.error(f"Error building performance summary: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to build performance summary")
+
+
+@router.get("/cache-keys", dependencies=[Depends(verify_performance_access)])
+async def get_cache_keys(
+    limit: int = Query(10000, ge=1, le=100000, description="Maximum Redis keys to scan"),
+) -> Dict[str, Any]:
+    """Cached entry counts and sizes per key prefix"""
+    try:
+        if cache_service.redis_client:
+            prefixes = await cache_service.redis_bytes_by_prefix(max_keys=limit)
+            total_keys = await cache_service.redis_client.dbsize()
+        else:
+            prefixes = _l1_by_prefix()
+            total_keys = len(cache_service.l1)
+
+        return {
+            "status": _cache_status(),
+            "total_keys": total_keys,
+            "scanned_keys": sum(prefix["entries"] for prefix in prefixes.values()),
+            "prefixes": prefixes,
+        }
+    except Exception as e:
+        logger.error(f"Error listing cache keys: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to list cache keys")
+
+
+@router.get("/slow-queries", dependencies=[Depends(verify_performance_access)])
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Maximum entries to return, newest first"),
+) -> Dict[str, Any]:
+    """Recent Supabase queries slower than DB_SLOW_QUERY_MS on this worker"""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "total": slow_query_log.total,
+        "queries": slow_query_log.entries(limit),
+    }
+
+
+@router.get("/blocking-calls", dependencies=[Depends(verify_performance_access)])
+async def get_blocking_calls(
+    limit: int = Query(20, ge=1, le=200, description="Maximum sites to return"),
+    include_stack: bool = Query(True, description="Include the last captured stack per site"),
+) -> Dict[str, Any]:
+    """Code that blocked this worker's event loop longer than LOOP_BLOCK_THRESHOLD_MS, most blocked time first"""
+    return {**blocking_detector.snapshot(), "sites": blocking_detector.sites(limit, include_stack)}
+
+
+@router.get("/profiles", dependencies=[Depends(verify_performance_access)])
+async def list_profiles() -> Dict[str, Any]:
+    """Request profiles kept by this worker (and PROFILE_DIR, when shared), newest first"""
+    return {
+        "enabled": request_profiler.enabled,
+        "max_per_minute": request_profiler.max_per_minute,
+        "rate_limited": request_profiler.rate_limited,
+        "profiles": request_profiler.list(),
+    }
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(verify_performance_access)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|pstats|tree)$", description="speedscope, pstats or tree"),
+    min_ms: float = Query(0.0, ge=0, description="Tree only: omit nodes below this total time"),
+):
+    """One request profile: open speedscope output at https://www.speedscope.app, pstats with ``pstats.Stats``"""
+    document = request_profiler.get(profile_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            to_pstats(document), media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+        )
+    if format == "tree":
+        return {"metadata": document["metadata"], "tree": to_call_tree(document, min_ms)}
+    return document
+
+
+def _l1_by_prefix() -> Dict[str, Dict[str, int]]:
+    prefixes: Dict[str, Dict[str, int]] = {}
+    for key in cache_service.l1.keys():
+        prefix = key.split(':', 1)[0]
+        prefixes.setdefault(prefix, {"entries": 0, "bytes": 0})["entries"] += 1
+    for prefix, size in cache_service.l1.bytes_by_prefix().items():
+        prefixes[prefix]["bytes"] = size
+    return prefixes
+
+
+@router.get("/memory", dependencies=[Depends(verify_performance_access)])
+async def get_memory_summary() -> Dict[str, Any]:
+    """Resident memory, tracemalloc status, RSS watchdog state and cache memory per prefix for this worker"""
+    return {
+        "worker_pid": os.getpid(),
+        "rss_bytes": rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "tracemalloc": memory_profiler.status(),
+        "watchdog": rss_watchdog.snapshot(),
+        "cache": {
+            "l1_bytes": cache_service.l1.current_bytes,
+            "l1_max_bytes": cache_service.l1.max_bytes,
+            "prefixes": _l1_by_prefix(),
+        },
+    }
+
+
+@router.post("/memory/tracemalloc", dependencies=[Depends(verify_performance_access)])
+async def set_tracemalloc(
+    enabled: bool = Query(..., description="Start or stop allocation tracing"),
+    frames: int = Query(1, ge=1, le=50, description="Frames kept per allocation traceback"),
+) -> Dict[str, Any]:
+    """Start or stop tracemalloc on this worker (tracing slows allocation-heavy code)"""
+    if enabled:
+        memory_profiler.start(frames)
+    else:
+        memory_profiler.stop()
+    return memory_profiler.status()
+
+
+def _snapshot_errors(func):
+    """Map tracemalloc state and unknown snapshot ids to HTTP errors"""
+    try:
+        return func()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {e.args[0]} not found")
+
+
+@router.post("/memory/snapshots", dependencies=[Depends(verify_performance_access)])
+async def take_memory_snapshot(
+    label: str = Query("", max_length=100, description="Free-form note, e.g. before-report"),
+) -> Dict[str, Any]:
+    """Take and keep a tracemalloc snapshot for later diffing"""
+    return _snapshot_errors(lambda: memory_profiler.snapshot(label))
+
+
+@router.get("/memory/snapshots", dependencies=[Depends(verify_performance_access)])
+async def list_memory_snapshots() -> Dict[str, Any]:
+    """Kept snapshots, oldest first"""
+    return {"tracemalloc": memory_profiler.status(), "snapshots": memory_profiler.snapshots()}
+
+
+@router.get("/memory/top", dependencies=[Depends(verify_performance_access)])
+async def get_top_allocations(
+    snapshot_id: Optional[str] = Query(None, description="Kept snapshot (default: a fresh one)"),
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$"),
+) -> Dict[str, Any]:
+    """Allocation sites holding the most memory"""
+    return {"sites": _snapshot_errors(lambda: memory_profiler.top(snapshot_id, limit, group_by))}
+
+
+@router.get("/memory/diff", dependencies=[Depends(verify_performance_access)])
+async def diff_memory_snapshots(
+    base: str = Query(..., description="Earlier snapshot"),
+    target: Optional[str] = Query(None, description="Later snapshot (default: a fresh one)"),
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$"),
+) -> Dict[str, Any]:
+    """Allocation sites that grew the most between two snapshots"""
+    return {"sites": _snapshot_errors(lambda: memory_profiler.diff(base, target, limit, group_by))}
+
+
+@router.get("/memory/objects", dependencies=[Depends(verify_performance_access)])
+async def get_object_counts(
+    limit: int = Query(30, ge=1, le=500),
+    types: Optional[str] = Query(None, description="Comma-separated type names to count instead of the top N"),
+) -> Dict[str, Any]:
+    """Live gc-tracked objects by type (walks the whole heap; keep it for diagnostics)"""
+    return object_counts(limit, types.split(',') if types else None)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(verify_performance_access)])
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus text exposition of request and cache metrics, merged across workers"""
+    return PlainTextResponse(collect_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
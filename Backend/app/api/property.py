@@ -33,6 +33,7 @@ from app.models.payment import Payment # Placeholder
 from app.services import property_service
 from app.config.auth import get_current_user
 from app.config.database import get_supabase_client_authenticated
+from app.config.query_trace import query_budget
 from app.utils.common import PaginationParams # Use absolute import from app
 from app.crud.property import CRUDProperty
 
@@ -62,6 +63,7 @@ class PropertyResponse(BaseModel):
     message: str = "Success"
 
 @router.get("/", response_model=PropertiesListResponse)
+@query_budget(3)
 async def get_properties(
     pagination: PaginationParams = Depends(), # Use common pagination dependency
     sort_by: Optional[str] = Query('created_at', description="Field to sort by"),
@@ -111,6 +113,7 @@ async def get_properties(
         raise HTTPException(status_code=500, detail=f"Failed to retrieve properties: {str(e)}")
 
 @router.get("/{property_id}", response_model=PropertyWithUnits)
+@query_budget(4)
 async def get_property(
     property_id: uuid.UUID = Path(..., description="The property ID"),
     include_units: bool = Query(True, description="Include units in response"),
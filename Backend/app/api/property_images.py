@@ -7,6 +7,7 @@ from supabase import Client
 
 from app.config.database import get_supabase_client_authenticated
 from app.config.auth import get_current_user
+from app.config.query_executor import run_query
 from app.services.property_image_service import property_image_service
 from app.services import property_service
 
@@ -105,9 +106,11 @@ async def upload_property_images(
         all_paths = existing_paths + uploaded_paths
         
         # Update property with new paths (store paths, not URLs)
-        update_response = db_client.table("properties").update({
+        update_response = await run_query(
+            db_client.table("properties").update({
             "image_urls": all_paths  # Note: column name is confusing but stores paths
-        }).eq("id", str(property_id)).execute()
+        }).eq("id", str(property_id))
+        )
         
         if hasattr(update_response, 'error') and update_response.error:
             logger.error(f"Failed to update property paths: {update_response.error}")
@@ -265,9 +268,11 @@ async def delete_property_image(
         updated_paths = [path for i, path in enumerate(image_paths) if i != image_index]
         
         # Update property in database
-        update_response = db_client.table("properties").update({
+        update_response = await run_query(
+            db_client.table("properties").update({
             "image_urls": updated_paths
-        }).eq("id", str(property_id)).execute()
+        }).eq("id", str(property_id))
+        )
         
         if hasattr(update_response, 'error') and update_response.error:
             logger.error(f"Failed to update property after image deletion: {update_response.error}")
@@ -3,32 +3,185 @@ Advanced Reports API - Real dynamic data from database
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from bisect import bisect_right
+from collections import Counter
+import asyncio
 import uuid
 import logging
 
 from ..config.auth import get_current_user
-from ..config.database import get_supabase_client_authenticated
+from ..config.cache import cache_service, get_data_version
+from ..config.database import get_supabase_client_authenticated, supabase_service_role_client
+from ..config.query_executor import run_query
+from ..config.query_trace import query_budget
+from ..config.settings import settings
+from ..db.rollups import get_monthly_rollups, month_start, month_totals, shift_months
+from ..utils.occupancy import OccupancyEngine, month_end
 from supabase import Client
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Months in each financial summary period
+PERIOD_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+
+def _period_label(period: str, start: date) -> str:
+    if period == "year":
+        return str(start.year)
+    if period == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return start.strftime("%Y-%m")
+
+
+def summary_periods(period: str, count: int, today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """The last ``count`` calendar months, quarters or years, newest first"""
+    today = today or datetime.utcnow().date()
+    span = PERIOD_MONTHS[period]
+    current = date(today.year, (today.month - 1) // span * span + 1, 1)
+    periods = []
+    for i in range(count):
+        start = shift_months(current, -i * span)
+        periods.append({
+            "period": _period_label(period, start),
+            "start": start,
+            "end": shift_months(start, span) - timedelta(days=1),
+        })
+    return periods
+
+
+def _rent_by_month(links: List[Dict[str, Any]], months: List[date]) -> List[float]:
+    """
+    Rent of the tenancies overlapping each of a run of consecutive months.
+
+    Every tenancy covers a contiguous slice of months, found by bisecting its
+    start and end into the month starts and added through a difference array.
+    """
+    diff = [0.0] * (len(months) + 1)
+    last_day = month_end(months[-1])
+    for link in links:
+        if not link.get('start_date'):
+            continue
+        start = month_start(link['start_date'])
+        if start > last_day:
+            continue
+        first = max(bisect_right(months, start) - 1, 0)
+        last = bisect_right(months, month_start(link['end_date'])) - 1 if link.get('end_date') else len(months) - 1
+        if last < first:
+            continue
+        rent = float(link.get('rent_amount') or 0)
+        diff[first] += rent
+        diff[last + 1] -= rent
+    rent, running = [], 0.0
+    for delta in diff[:-1]:
+        running += delta
+        rent.append(running)
+    return rent
+
+
+async def _compute_periods(db_client: Client, owner_id: str, property_ids: List[str],
+                           periods: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Figures for the given periods from one fetch of each dataset over their window.
+
+    The current period only counts months up to the current one.
+    """
+    current_month = month_start(datetime.utcnow().date())
+    first_month = min(p["start"] for p in periods)
+    last_month = min(month_start(max(p["end"] for p in periods)), current_month)
+    months = [first_month]
+    while months[-1] < last_month:
+        months.append(shift_months(months[-1], 1))
+
+    units_response, links_response, rollups = await asyncio.gather(
+        run_query(
+            db_client.table('units')
+            .select('property_id')
+            .in_('property_id', property_ids)
+        ),
+        run_query(
+            db_client.table('property_tenants')
+            .select('property_id, unit_id, start_date, end_date, rent_amount')
+            .in_('property_id', property_ids)
+            .lte('start_date', month_end(last_month).isoformat())
+            .or_(f"end_date.gte.{first_month.isoformat()},end_date.is.null")
+        ),
+        get_monthly_rollups(owner_id, months),
+    )
+    links = links_response.data or []
+    capacity = Counter(unit['property_id'] for unit in units_response.data or [])
+    occupancy = OccupancyEngine.from_links(links).occupancy(
+        [(p["start"], min(p["end"], month_end(last_month))) for p in periods], capacity
+    )
+
+    # Assign each month to the period starting at or before it
+    ordered = sorted(range(len(periods)), key=lambda i: periods[i]["start"])
+    starts = [periods[i]["start"] for i in ordered]
+    income = [0.0] * len(periods)
+    expenses = [0.0] * len(periods)
+    for month, rent in zip(months, _rent_by_month(links, months)):
+        position = bisect_right(starts, month) - 1
+        if position < 0 or month > periods[ordered[position]]["end"]:
+            continue
+        index = ordered[position]
+        income[index] += rent
+        expenses[index] += month_totals(rollups.get(month, []), property_ids)['maintenance_costs']
+
+    results = []
+    for period_info, period_income, period_expenses, period_occupancy in zip(periods, income, expenses, occupancy):
+        period_income, period_expenses = round(period_income, 2), round(period_expenses, 2)
+        results.append({
+            "period": period_info["period"],
+            "total_income": period_income,
+            "total_expenses": period_expenses,
+            "net_profit": round(period_income - period_expenses, 2),
+            "occupancy_rate": round(period_occupancy['occupancy_rate'], 1),
+            "rent_collected": period_income,
+            "maintenance_costs": period_expenses,
+            "vacancy_loss": 0  # Calculate based on vacant units
+        })
+    return results
+
+
+def _summary_cache_key(owner_id: str, version: str, period: str, label: str) -> str:
+    return f"financial_summary:{owner_id}:{version}:{period}:{label}"
+
+
 @router.get("/financial-summary", response_model=Dict[str, Any])
+@query_budget(5)
 async def get_financial_summary(
     owner_id: str = Query(..., description="Owner ID"),
-    period: str = Query("month", description="Period: month, quarter, year"),
-    months_back: int = Query(12, description="Number of periods to include"),
-    current_user: Dict[str, Any] = Depends(get_current_user),
-    db_client: Client = Depends(get_supabase_client_authenticated)
+    period: str = Query("month", pattern="^(month|quarter|year)$", description="Period: month, quarter, year"),
+    months_back: int = Query(12, ge=1, le=120, description="Number of periods to include"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Get comprehensive financial summary across all properties for an owner."""
+    """
+    Get comprehensive financial summary across all properties for an owner.
+
+    Properties, units, tenancies and monthly rollups are each fetched once for
+    the whole window and bucketed into periods in memory. Each period is
+    cached under the owner's data version; finished periods are kept for
+    ROLLUP_CLOSED_MONTH_TTL, the current one for ROLLUP_OPEN_MONTH_TTL.
+
+    The cache keys hold no principal, so once access is checked everything is
+    read with the service-role client: what is cached does not depend on
+    who asked first.
+    """
+    # Only the owner: the role comes from user-editable metadata, and the reads
+    # below bypass RLS
+    if owner_id != current_user.get("id"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to view this owner's reports"
+        )
     try:
         # Get all properties for the owner
-        properties_response = db_client.table('properties') \
-            .select('id, property_name') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            supabase_service_role_client.table('properties')
+            .select('id, property_name')
+            .eq('owner_id', owner_id)
+        )
         
         if not properties_response.data:
             return {
@@ -44,77 +197,27 @@ async def get_financial_summary(
             }
         
         property_ids = [prop['id'] for prop in properties_response.data]
+        periods = summary_periods(period, months_back)
         
-        # Calculate date range based on period
-        end_date = datetime.now()
-        if period == "month":
-            periods = []
-            for i in range(months_back):
-                period_start = end_date.replace(day=1) - timedelta(days=i * 30)
-                period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                periods.append({
-                    "period": period_start.strftime("%Y-%m"),
-                    "start_date": period_start.strftime("%Y-%m-%d"),
-                    "end_date": period_end.strftime("%Y-%m-%d")
-                })
+        cached: List[Optional[Dict[str, Any]]] = [None] * len(periods)
+        if cache_service.enabled:
+            version = await get_data_version(f"owner:{owner_id}", settings.ROLLUP_CLOSED_MONTH_TTL)
+            keys = [_summary_cache_key(owner_id, version, period, p["period"]) for p in periods]
+            cached = await asyncio.gather(*(cache_service.get(key) for key in keys))
         
-        financial_data = []
-        total_income = 0
-        total_expenses = 0
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+        financial_data = list(cached)
+        if missing:
+            computed = await _compute_periods(supabase_service_role_client, owner_id, property_ids, [periods[i] for i in missing])
+            current_month = month_start(datetime.utcnow().date())
+            for i, period_data in zip(missing, computed):
+                financial_data[i] = period_data
+                if cache_service.enabled:
+                    ttl = settings.ROLLUP_CLOSED_MONTH_TTL if periods[i]["end"] < current_month else settings.ROLLUP_OPEN_MONTH_TTL
+                    await cache_service.set(keys[i], period_data, ttl)
         
-        for period_info in periods:
-            # Get rental income for this period
-            rental_income_response = db_client.table('property_tenants') \
-                .select('rent_amount') \
-                .in_('property_id', property_ids) \
-                .lte('start_date', period_info['end_date']) \
-                .gte('end_date', period_info['start_date']) \
-                .execute()
-            
-            period_income = sum(lease.get('rent_amount', 0) or 0 for lease in rental_income_response.data)
-            
-            # Get maintenance expenses for this period
-            maintenance_response = db_client.table('maintenance_requests') \
-                .select('estimated_cost') \
-                .in_('property_id', property_ids) \
-                .gte('created_at', period_info['start_date']) \
-                .lte('created_at', period_info['end_date']) \
-                .eq('status', 'completed') \
-                .execute()
-            
-            period_expenses = sum(req.get('estimated_cost', 0) or 0 for req in maintenance_response.data)
-            
-            # Calculate occupancy for this period
-            total_units_response = db_client.table('units') \
-                .select('id', count='exact') \
-                .in_('property_id', property_ids) \
-                .execute()
-            
-            occupied_units_response = db_client.table('property_tenants') \
-                .select('unit_id', count='exact') \
-                .in_('property_id', property_ids) \
-                .lte('start_date', period_info['end_date']) \
-                .gte('end_date', period_info['start_date']) \
-                .execute()
-            
-            total_units = total_units_response.count or 1
-            occupied_units = occupied_units_response.count or 0
-            occupancy_rate = (occupied_units / total_units) * 100 if total_units > 0 else 0
-            
-            period_data = {
-                "period": period_info["period"],
-                "total_income": period_income,
-                "total_expenses": period_expenses,
-                "net_profit": period_income - period_expenses,
-                "occupancy_rate": round(occupancy_rate, 1),
-                "rent_collected": period_income,
-                "maintenance_costs": period_expenses,
-                "vacancy_loss": 0  # Calculate based on vacant units
-            }
-            
-            financial_data.append(period_data)
-            total_income += period_income
-            total_expenses += period_expenses
+        total_income = round(sum(p["total_income"] for p in financial_data), 2)
+        total_expenses = round(sum(p["total_expenses"] for p in financial_data), 2)
         
         return {
             "period": period,
@@ -123,7 +226,7 @@ async def get_financial_summary(
             "summary": {
                 "total_income": total_income,
                 "total_expenses": total_expenses,
-                "net_profit": total_income - total_expenses,
+                "net_profit": round(total_income - total_expenses, 2),
                 "average_occupancy": sum(p["occupancy_rate"] for p in financial_data) / len(financial_data) if financial_data else 0
             }
         }
@@ -144,10 +247,11 @@ async def get_property_performance(
     """Get performance metrics for all properties owned by the user."""
     try:
         # Get all properties with their units
-        properties_response = db_client.table('properties') \
-            .select('*, units(*)') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            db_client.table('properties')
+            .select('*, units(*)')
+            .eq('owner_id', owner_id)
+        )
         
         performance_data = []
         
@@ -158,22 +262,24 @@ async def get_property_performance(
             total_units = len(units)
             
             # Get current leases for this property
-            current_leases_response = db_client.table('property_tenants') \
-                .select('*') \
-                .eq('property_id', property_id) \
-                .gte('end_date', datetime.now().strftime('%Y-%m-%d')) \
-                .execute()
+            current_leases_response = await run_query(
+                db_client.table('property_tenants')
+                .select('*')
+                .eq('property_id', property_id)
+                .gte('end_date', datetime.now().strftime('%Y-%m-%d'))
+            )
             
             occupied_units = len(current_leases_response.data)
             monthly_rent = sum(lease.get('rent_amount', 0) or 0 for lease in current_leases_response.data)
             
             # Get maintenance costs for last 30 days
-            maintenance_response = db_client.table('maintenance_requests') \
-                .select('estimated_cost') \
-                .eq('property_id', property_id) \
-                .gte('created_at', (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')) \
-                .eq('status', 'completed') \
-                .execute()
+            maintenance_response = await run_query(
+                db_client.table('maintenance_requests')
+                .select('estimated_cost')
+                .eq('property_id', property_id)
+                .gte('created_at', (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+                .eq('status', 'completed')
+            )
             
             maintenance_costs = sum(req.get('estimated_cost', 0) or 0 for req in maintenance_response.data)
             
@@ -215,20 +321,22 @@ async def get_maintenance_analytics(
     """Get comprehensive maintenance analytics."""
     try:
         # Get all properties for the owner
-        properties_response = db_client.table('properties') \
-            .select('id') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            db_client.table('properties')
+            .select('id')
+            .eq('owner_id', owner_id)
+        )
         
         property_ids = [prop['id'] for prop in properties_response.data]
         start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         
         # Get all maintenance requests in the period
-        maintenance_response = db_client.table('maintenance_requests') \
-            .select('*') \
-            .in_('property_id', property_ids) \
-            .gte('created_at', start_date) \
-            .execute()
+        maintenance_response = await run_query(
+            db_client.table('maintenance_requests')
+            .select('*')
+            .in_('property_id', property_ids)
+            .gte('created_at', start_date)
+        )
         
         requests = maintenance_response.data
         total_requests = len(requests)
@@ -301,18 +409,20 @@ async def get_tenant_retention(
     """Get tenant retention analytics."""
     try:
         # Get all properties for the owner
-        properties_response = db_client.table('properties') \
-            .select('id') \
-            .eq('owner_id', owner_id) \
-            .execute()
+        properties_response = await run_query(
+            db_client.table('properties')
+            .select('id')
+            .eq('owner_id', owner_id)
+        )
         
         property_ids = [prop['id'] for prop in properties_response.data]
         
         # Get all tenant assignments
-        all_leases_response = db_client.table('property_tenants') \
-            .select('*') \
-            .in_('property_id', property_ids) \
-            .execute()
+        all_leases_response = await run_query(
+            db_client.table('property_tenants')
+            .select('*')
+            .in_('property_id', property_ids)
+        )
         
         leases = all_leases_response.data
         total_tenants = len(set(lease['tenant_id'] for lease in leases))
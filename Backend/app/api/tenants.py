@@ -27,6 +27,7 @@ from ..services import tenant_service
 from ..db import tenants as tenants_db
 from ..db import properties as properties_db
 from ..config.auth import get_current_user
+from ..config.query_trace import query_budget
 from app.utils.common import PaginationParams
 
 router = APIRouter(
@@ -111,6 +112,7 @@ async def get_current_user_tenant(
         )
 
 @router.get("/", response_model=TenantsListResponse)
+@query_budget(3)
 async def get_tenants(
     pagination: PaginationParams = Depends(),
     property_id: Optional[UUID4] = Query(None, description="Filter tenants by property ID"),
@@ -152,6 +154,7 @@ async def get_tenants(
         )
 
 @router.get("/{tenant_id}", response_model=TenantWithHistoryResponse)
+@query_budget(4)
 async def get_tenant(
     tenant_id: UUID4 = Path(..., description="The ID of the tenant to retrieve"),
     include_history: bool = Query(True, description="Include tenant history"),
@@ -568,6 +571,7 @@ async def verify_and_link_tenant(
 # --- Relationship endpoints remain unchanged ---
 
 @router.get("/{tenant_id}/properties", response_model=List[Property])
+@query_budget(4)
 async def get_tenant_properties(
     tenant_id: UUID4 = Path(..., description="The ID of the tenant"),
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -32,6 +32,7 @@ from app.services import lease_service
 # Import dependencies (adjust paths as needed)
 from app.config.auth import get_current_user
 from app.config.database import get_supabase_client_authenticated
+from app.config.query_trace import query_budget
 from app.utils.common import PaginationParams # Assuming this exists
 
 logger = logging.getLogger(__name__)
@@ -98,6 +99,7 @@ async def create_unit_endpoint(
                             detail="An unexpected error occurred while creating the unit.")
 
 @router.get("/{unit_id}", response_model=UnitDetails, summary="Get Unit Details")
+@query_budget(5)
 async def get_unit_details_endpoint(
     unit_id: uuid.UUID = Path(..., description="The ID of the unit to retrieve"),
     include_lease: bool = Query(False, description="Include current lease information"),
@@ -727,6 +729,7 @@ async def delete_unit_tax_endpoint(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
 
 @router.get("/{unit_id}/history", response_model=dict, summary="Get Unit History")
+@query_budget(14)
 async def get_unit_history(
     unit_id: uuid.UUID = Path(..., description="The ID of the unit"),
     current_user: Dict[str, Any] = Depends(get_current_user),
@@ -752,7 +755,7 @@ async def get_unit_history(
         tenants = await tenant_service.get_tenants_for_unit(unit_id, user_id)
         leases = await tenant_service.get_leases_for_unit(unit_id)
         payments, _ = await payment_service.get_payments_for_unit(db_client, unit_id, user_id, skip=0, limit=100)  # Get payments with pagination
-        maintenance_requests = await maintenance_service.get_requests_for_unit(db_client, str(unit_id), user_id)
+        maintenance_requests = await maintenance_service.get_requests_for_unit(db_client, str(unit_id), user_id, skip=0, limit=100)
         
         return {
             "unit_id": str(unit_id),
@@ -8,6 +8,7 @@ from supabase import Client
 
 from app.config.database import get_supabase_client_authenticated
 from app.config.auth import get_current_user
+from app.config.query_executor import run_query
 from app.utils.storage import storage_service
 
 router = APIRouter(
@@ -111,9 +112,11 @@ async def upload_files(
                     all_paths = existing_paths + uploaded_paths
                     
                     # Update property with new image paths
-                    update_response = db_client.table("properties").update({
+                    update_response = await run_query(
+                        db_client.table("properties").update({
                         "image_urls": all_paths
-                    }).eq("id", property_id).execute()
+                    }).eq("id", property_id)
+                    )
                     
                     if hasattr(update_response, 'error') and update_response.error:
                         logger.error(f"Failed to update property {property_id} with image paths: {update_response.error}")
@@ -1,11 +1,12 @@
 from typing import Dict, List, Any
 from fastapi import APIRouter, Depends, HTTPException, Path, status, Body
-from app.config.auth import get_current_user
+from app.config.auth import get_current_user, invalidate_principal
 from app.models.user import UserUpdate, User
 from app.services import user_service
 import logging
 from app.config.database import get_supabase_client_authenticated
 from app.config.database import Client
+from app.config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -104,7 +105,7 @@ async def update_current_user_profile(update_data: Dict[str, Any] = Body(...), c
             # Try direct DB access
             from app.config.database import supabase_client
             insert_data = {"id": user_id, **update_dict}
-            upsert_response = supabase_client.table("profiles").upsert(insert_data).execute()
+            upsert_response = await run_query(supabase_client.table("profiles").upsert(insert_data))
             
             if upsert_response and hasattr(upsert_response, 'data') and upsert_response.data:
                 logger.info(f"Direct upsert successful: {upsert_response.data}")
@@ -115,6 +116,9 @@ async def update_current_user_profile(update_data: Dict[str, Any] = Body(...), c
                     detail="Failed to update user profile"
                 )
         
+        # Cached principals of this user carry the old profile fields
+        await invalidate_principal(user_id)
+
         # Clean the response to avoid serialization issues
         clean_response = {
             "id": user_id,
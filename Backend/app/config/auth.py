@@ -1,61 +1,141 @@
 from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
 from .settings import settings
 from ..services import user_service
 from .database import get_supabase_client_authenticated
+from .client_pool import ScopedClient
+from .cache import cache_service, set_cache_principal
+from .token_verifier import token_verifier
+import asyncio
+import hashlib
 import logging
+import time
 import jwt
-import requests
 
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[Dict[str, Any]]:
+
+# --- Verified-principal cache --- #
+# The resolved user + profile dict per bearer token lives in the worker's L1
+# cache (keyed by a token digest, tagged by user id) until the token expires
+# or AUTH_PRINCIPAL_CACHE_TTL passes. invalidate_principal() drops a user's
+# entries in every worker through the cache's invalidation broadcast.
+
+def _principal_key(token: str) -> str:
+    return f"principal:{hashlib.blake2b(token.encode(), digest_size=16).hexdigest()}"
+
+
+def _principal_tag(user_id: str) -> str:
+    return f"principal:{user_id}"
+
+
+def _cached_principal(token: str) -> Optional[Dict[str, Any]]:
+    payload = cache_service.l1.get(_principal_key(token))
+    return cache_service.codec.decode(payload) if payload is not None else None
+
+
+def _cache_principal(token: str, user_dict: Dict[str, Any], expires_at: Optional[float]):
+    ttl = settings.AUTH_PRINCIPAL_CACHE_TTL
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl <= 0:
+        return
+    payload, _ = cache_service.codec.encode(user_dict)
+    cache_service.l1.set(_principal_key(token), payload, ttl, tags=(_principal_tag(user_dict["id"]),))
+
+
+async def invalidate_principal(user_id: str):
+    """Forget the cached principal of every token of ``user_id`` (e.g. after a profile update)"""
+    await cache_service.invalidate_tags([_principal_tag(user_id)])
+
+
+def _token_expiry(token: str) -> Optional[float]:
+    """``exp`` of a token Supabase Auth has already accepted (None for non-JWT tokens)"""
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return None
+
+
+async def _verify_with_supabase(supabase_client: ScopedClient, token: str) -> Dict[str, Any]:
+    """Fallback when the token cannot be verified locally: ask Supabase Auth"""
+    try:
+        user_response = await asyncio.to_thread(supabase_client.auth.get_user, token)
+    except Exception as e:
+        logger.error(f"Failed to validate Supabase token: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+        )
+    if not user_response.user:
+        logger.error("Supabase user not found in token response")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token: User not found",
+        )
+    supabase_user = user_response.user
+    return {
+        "sub": supabase_user.id,
+        "email": supabase_user.email,
+        "user_metadata": supabase_user.user_metadata or {},
+        "exp": _token_expiry(token),
+        "created_at": supabase_user.created_at,
+        "updated_at": supabase_user.updated_at,
+    }
+
+
+def _as_text(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    supabase_client: ScopedClient = Depends(get_supabase_client_authenticated),
+) -> Optional[Dict[str, Any]]:
     """
     Validate Supabase JWT token and return current user object.
     This ensures proper RLS policy enforcement by using actual Supabase tokens.
+
+    The token's signature is checked locally (see token_verifier), falling
+    back to Supabase Auth only when that is not possible, and the resolved
+    user is cached per token (see _cache_principal), so a repeat request
+    costs neither a network call nor a profile query.
+
+    The pooled, request-scoped client is shared with any endpoint that also
+    depends on get_supabase_client_authenticated, so authentication opens no
+    new connections.
     """
     try:
         token = credentials.credentials
-        logger.info(f"Processing authentication for token: {token[:20]}...")
-        
-        # Create authenticated Supabase client with the token
-        supabase_client: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        
-        # Set the auth token for RLS
-        supabase_client.postgrest.auth(token)
-        
-        # Try to get the user from Supabase to validate the token
-        try:
-            # Use the token to get user info from Supabase
-            user_response = supabase_client.auth.get_user(token)
-            
-            if not user_response.user:
-                logger.error("Supabase user not found in token response")
+
+        cached = _cached_principal(token) if settings.AUTH_PRINCIPAL_CACHE_TTL > 0 else None
+        if cached is not None:
+            set_cache_principal(cached["id"])
+            return cached
+
+        claims = None
+        if settings.AUTH_LOCAL_JWT_VERIFY and settings.SUPABASE_BACKEND != "local":
+            try:
+                claims = await token_verifier.verify(token)
+            except jwt.InvalidTokenError as e:
+                logger.warning(f"Rejected access token: {e}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid authentication token: User not found",
+                    detail="Invalid authentication token",
                 )
-            
-            supabase_user = user_response.user
-            user_id = supabase_user.id
-            email = supabase_user.email
-            
-            logger.info(f"Successfully validated Supabase user: {user_id} ({email})")
-            
-        except Exception as e:
-            logger.error(f"Failed to validate Supabase token: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
+        if claims is None:
+            claims = await _verify_with_supabase(supabase_client, token)
+
+        user_id = claims["sub"]
+        email = claims.get("email")
+        metadata = claims.get("user_metadata") or {}
+        logger.debug(f"Authenticated user {user_id}")
+        set_cache_principal(user_id)
         
         # Get additional profile data from our database
-        logger.info(f"Fetching profile data for user {user_id}")
-        profile_data = user_service.get_user_profile(supabase_client, user_id)
-        logger.info(f"Profile data result: {profile_data is not None}")
+        profile_data = await asyncio.to_thread(user_service.get_user_profile, supabase_client, user_id)
         
         # Start with base Supabase user data
         user_dict = {
@@ -69,8 +149,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             "phone": None,
             "user_type": None,
             "role": None, # Frontend expects role
-            "created_at": supabase_user.created_at,
-            "updated_at": supabase_user.updated_at,
+            # Tokens carry no timestamps; the profile's are used when Supabase Auth was not asked
+            "created_at": _as_text(claims.get("created_at") or (profile_data or {}).get("created_at")),
+            "updated_at": _as_text(claims.get("updated_at") or (profile_data or {}).get("updated_at")),
             "address_line1": None,
             "address_line2": None,
             "city": None,
@@ -79,19 +160,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         }
         
         # Add metadata from Supabase user
-        if supabase_user.user_metadata:
+        if metadata:
             user_dict.update({
-                "first_name": supabase_user.user_metadata.get("first_name"),
-                "last_name": supabase_user.user_metadata.get("last_name"),
-                "full_name": supabase_user.user_metadata.get("full_name") or supabase_user.user_metadata.get("name"),
-                "phone": supabase_user.user_metadata.get("phone"),
-                "user_type": supabase_user.user_metadata.get("user_type"),
-                "role": supabase_user.user_metadata.get("role") or supabase_user.user_metadata.get("user_type"),
+                "first_name": metadata.get("first_name"),
+                "last_name": metadata.get("last_name"),
+                "full_name": metadata.get("full_name") or metadata.get("name"),
+                "phone": metadata.get("phone"),
+                "user_type": metadata.get("user_type"),
+                "role": metadata.get("role") or metadata.get("user_type"),
             })
         
         # Populate with profile data if found
         if profile_data:
-            logger.info(f"Profile found for user {user_id}: {profile_data}")
             user_dict.update({
                 "first_name": profile_data.get("first_name") or user_dict["first_name"],
                 "last_name": profile_data.get("last_name") or user_dict["last_name"],
@@ -117,7 +197,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         else:
             logger.warning(f"Profile not found for user {user_id}. Returning Supabase data with null profile fields.")
         
-        logger.info(f"Returning user dict: {user_dict}")
+        _cache_principal(token, user_dict, claims.get("exp"))
         return user_dict
         
     except HTTPException:
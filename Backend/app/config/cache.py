@@ -1,30 +1,215 @@
 """
 Cache configuration and utilities for the Property Management API.
-Provides Redis-based caching with in-memory fallback.
+
+Two-tier cache:
+- L1: bounded, byte-size-aware LRU/TTL cache in each worker process
+- L2: Redis, shared by all workers (optional; L1 alone is used when unavailable)
+
+Writes and deletes are broadcast over Redis pub/sub so every worker evicts its
+own L1 copy of the affected keys.
+
+Entries can be registered under entity tags (``owner:<id>``, ``property:<id>``,
+``tenant:<id>``). Each tag is a Redis set of the keys stored under it, so a
+write invalidates exactly the entries for the entities it touched, in
+O(tagged keys) rather than scanning the keyspace.
+
+Keys are derived from the function's bound data arguments (clients are
+skipped), plus the calling principal for functions that read through an
+RLS-scoped client, hashed with BLAKE2b.
+
+``cache_result`` coalesces concurrent misses for the same key into a single
+computation per worker (optionally per cluster via a short Redis lock) and can
+serve a stale value while one background task refreshes it.
+
+Values are stored as bytes produced by the configured codec (see cache_codec).
 """
 
 import logging
 import json
 import asyncio
+import copy
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from enum import Enum
+from collections import OrderedDict, defaultdict
 from functools import wraps
-from typing import Any, Optional, Dict, Callable
-from datetime import datetime, timedelta
+from typing import Any, Optional, Dict, Callable, Iterable, List, Set, Tuple
 import hashlib
+import fnmatch
+import inspect
+
+from .settings import settings
+from .cache_codec import create_codec
 
 logger = logging.getLogger(__name__)
 
-# Global cache storage (fallback when Redis is unavailable)
-_memory_cache: Dict[str, Dict[str, Any]] = {}
 _cache_initialized = False
 _redis_client = None
 
+
+def _as_str(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _key_prefix(key: str) -> str:
+    """Prefix used for per-prefix statistics (text before the first ':')"""
+    return key.split(':', 1)[0]
+
+
+class CacheStats:
+    """Hit/miss counters kept per key prefix"""
+
+    FIELDS = (
+        'l1_hits', 'l2_hits', 'misses', 'sets', 'evictions', 'invalidations',
+        'coalesced', 'stale_served', 'refreshes', 'lock_waits',
+        'bytes_serialized', 'bytes_stored',
+    )
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, key: str, field: str, amount: int = 1):
+        self._counters[_key_prefix(key)][field] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for prefix, counters in self._counters.items():
+            lookups = counters['l1_hits'] + counters['l2_hits'] + counters['misses']
+            hits = counters['l1_hits'] + counters['l2_hits']
+            result[prefix] = {
+                **counters,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+                'compression_ratio': (
+                    round(counters['bytes_stored'] / counters['bytes_serialized'], 4)
+                    if counters['bytes_serialized'] else None
+                ),
+            }
+        return result
+
+    def reset(self):
+        self._counters.clear()
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with per-entry TTL.
+
+    Entries hold the serialized payload so callers always get an independent
+    copy, and so the byte budget is measured exactly. A tag -> keys index is
+    kept alongside so tagged entries can be dropped without a scan.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: bytes, ttl: float, tags: Iterable[str] = ()) -> int:
+        """Store a payload; returns how many entries were evicted to make room"""
+        size = len(payload)
+        self.pop(key)
+        if size > self.max_bytes:
+            return 0
+        tags = tuple(tags)
+        self._entries[key] = (payload, time.monotonic() + ttl, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self.current_bytes += size
+        evicted = 0
+        while self._entries and (len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+            self.pop(next(iter(self._entries)))
+            evicted += 1
+        return evicted
+
+    def pop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        payload, _, tags = entry
+        self.current_bytes -= len(payload)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry registered under any of the tags"""
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+
+    def delete_pattern(self, pattern: str) -> int:
+        keys = [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [k for k, (_, expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self.pop(key)
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+        self._tags.clear()
+        self.current_bytes = 0
+
+    def bytes_by_prefix(self) -> Dict[str, int]:
+        sizes: Dict[str, int] = defaultdict(int)
+        for key, (payload, _, _) in self._entries.items():
+            sizes[_key_prefix(key)] += len(payload)
+        return dict(sizes)
+
+
 class CacheService:
-    """Cache service with Redis primary and memory fallback"""
+    """Two-tier cache: per-worker L1 in front of Redis (L2)"""
     
     def __init__(self):
         self.redis_client = None
-        self.memory_cache = {}
+        self.l1 = LocalCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_MAX_BYTES)
+        self.l1_ttl = settings.CACHE_L1_TTL
+        self.invalidation_channel = settings.CACHE_INVALIDATION_CHANNEL
+        self.instance_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stats = CacheStats()
+        self.codec = create_codec(settings)
         self.enabled = True
+        self._listener_task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
     
     async def initialize(self):
         """Initialize Redis connection with fallback to memory cache"""
@@ -36,12 +221,10 @@ class CacheService:
         try:
             # Try to import and setup Redis
             import redis.asyncio as redis
-            from .settings import settings
             
             self.redis_client = redis.from_url(
                 settings.REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True,
+                decode_responses=False,  # Values are codec bytes
                 socket_keepalive=True,
                 socket_keepalive_options={},
                 health_check_interval=30
@@ -50,6 +233,7 @@ class CacheService:
             # Test Redis connection
             await self.redis_client.ping()
             _redis_client = self.redis_client
+            self._listener_task = asyncio.create_task(self._listen_for_invalidations())
             logger.info("Redis cache initialized successfully")
             
         except Exception as e:
@@ -58,81 +242,309 @@ class CacheService:
             _redis_client = None
         
         _cache_initialized = True
+
+    async def _listen_for_invalidations(self):
+        """Evict L1 entries invalidated by other workers"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                async for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    self._apply_invalidation(json.loads(message['data']))
+            except asyncio.CancelledError:
+                await pubsub.close()
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                await pubsub.close()
+                # Anything may have changed while disconnected
+                self.l1.clear()
+                await asyncio.sleep(1)
+
+    def _apply_invalidation(self, message: Dict[str, Any]):
+        if message.get('origin') == self.instance_id:
+            return
+        for key in message.get('keys', []):
+            self.l1.pop(key)
+        if message.get('tags'):
+            self.l1.delete_tags(message['tags'])
+        if message.get('pattern'):
+            self.l1.delete_pattern(message['pattern'])
+
+    async def _publish_invalidation(self, keys=None, pattern: Optional[str] = None, tags=None):
+        if not self.redis_client:
+            return
+        message = {'origin': self.instance_id, 'keys': list(keys or []), 'pattern': pattern, 'tags': list(tags or [])}
+        await self.redis_client.publish(self.invalidation_channel, json.dumps(message))
     
     async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+        """Get value from cache (L1 first, then Redis)"""
         try:
+            payload = self.l1.get(key)
+            if payload is not None:
+                self.stats.incr(key, 'l1_hits')
+                return self.codec.decode(payload)
+
             if self.redis_client:
-                value = await self.redis_client.get(key)
-                if value:
-                    return json.loads(value)
-            else:
-                # Memory cache fallback
-                cache_entry = self.memory_cache.get(key)
-                if cache_entry:
-                    if cache_entry['expires_at'] > datetime.utcnow():
-                        return cache_entry['value']
-                    else:
-                        # Expired, remove it
-                        del self.memory_cache[key]
+                payload = await self.redis_client.get(key)
+                if payload:
+                    self.stats.incr(key, 'l2_hits')
+                    self._store_l1(key, payload, self.l1_ttl)
+                    return self.codec.decode(payload)
+
+            self.stats.incr(key, 'misses')
             return None
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {e}")
             return None
+
+    def _store_l1(self, key: str, payload: bytes, ttl: float, tags: Iterable[str] = ()):
+        evicted = self.l1.set(key, payload, min(ttl, self.l1_ttl) if self.redis_client else ttl, tags)
+        if evicted:
+            self.stats.incr(key, 'evictions', evicted)
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"tag:{tag}"
     
-    async def set(self, key: str, value: Any, ttl: int = 300):
-        """Set value in cache with TTL"""
+    async def set(self, key: str, value: Any, ttl: int = 300, tags: Optional[Iterable[str]] = None):
+        """Set value in cache with TTL, registering the key under the given tags"""
         try:
+            tags = list(tags or [])
+            payload, serialized_size = self.codec.encode(value)
+            self._store_l1(key, payload, ttl, tags)
+            self.stats.incr(key, 'sets')
+            self.stats.incr(key, 'bytes_serialized', serialized_size)
+            self.stats.incr(key, 'bytes_stored', len(payload))
             if self.redis_client:
-                await self.redis_client.setex(key, ttl, json.dumps(value, default=str))
-            else:
-                # Memory cache fallback
-                self.memory_cache[key] = {
-                    'value': value,
-                    'expires_at': datetime.utcnow() + timedelta(seconds=ttl)
-                }
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.setex(key, ttl, payload)
+                    for tag in tags:
+                        pipe.sadd(self._tag_key(tag), key)
+                        pipe.ttl(self._tag_key(tag))
+                    results = await pipe.execute()
+                # A tag set must outlive every entry registered in it
+                tag_ttls = results[2::2]
+                stale = [tag for tag, remaining in zip(tags, tag_ttls) if remaining < ttl]
+                if stale:
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        for tag in stale:
+                            pipe.expire(self._tag_key(tag), ttl)
+                        await pipe.execute()
+                await self._publish_invalidation(keys=[key])
         except Exception as e:
             logger.error(f"Cache set error for key {key}: {e}")
     
     async def delete(self, key: str):
         """Delete key from cache"""
         try:
+            self.l1.pop(key)
+            self.stats.incr(key, 'invalidations')
             if self.redis_client:
                 await self.redis_client.delete(key)
-            else:
-                self.memory_cache.pop(key, None)
+                await self._publish_invalidation(keys=[key])
         except Exception as e:
             logger.error(f"Cache delete error for key {key}: {e}")
     
-    async def delete_pattern(self, pattern: str):
-        """Delete keys matching pattern"""
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry registered under any of the tags; returns keys removed"""
+        tags = [tag for tag in dict.fromkeys(tags) if tag]
+        if not tags:
+            return 0
         try:
+            removed = self.l1.delete_tags(tags)
             if self.redis_client:
-                keys = await self.redis_client.keys(pattern)
+                # Read and drop the tag sets atomically so a concurrent set()
+                # lands in a fresh set instead of being lost
+                async with self.redis_client.pipeline(transaction=True) as pipe:
+                    for tag in tags:
+                        pipe.smembers(self._tag_key(tag))
+                    pipe.delete(*(self._tag_key(tag) for tag in tags))
+                    results = await pipe.execute()
+                keys = set()
+                for members in results[:-1]:
+                    keys.update(_as_str(member) for member in members)
+                # L2 hits are promoted into L1 without tags; drop those copies here too,
+                # since this worker skips its own invalidation messages
+                for key in keys:
+                    self.l1.pop(key)
                 if keys:
                     await self.redis_client.delete(*keys)
-            else:
-                # Memory cache pattern deletion
-                keys_to_delete = [k for k in self.memory_cache.keys() if pattern.replace('*', '') in k]
-                for key in keys_to_delete:
-                    self.memory_cache.pop(key, None)
+                removed = len(keys)
+                await self._publish_invalidation(keys=keys, tags=tags)
+            for tag in tags:
+                self.stats.incr(tag, 'invalidations')
+            return removed
+        except Exception as e:
+            logger.error(f"Cache tag invalidation error for {tags}: {e}")
+            return 0
+    
+    async def delete_pattern(self, pattern: str):
+        """Delete keys matching pattern (incremental SCAN; prefer invalidate_tags on hot paths)"""
+        try:
+            self.l1.delete_pattern(pattern)
+            if self.redis_client:
+                batch = []
+                async for key in self.redis_client.scan_iter(match=pattern, count=1000):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        await self.redis_client.delete(*batch)
+                        batch = []
+                if batch:
+                    await self.redis_client.delete(*batch)
+                await self._publish_invalidation(pattern=pattern)
         except Exception as e:
             logger.error(f"Cache delete pattern error for {pattern}: {e}")
     
+    async def single_flight(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Run ``compute()`` once per key in this worker; concurrent callers for the
+        same key wait for that result instead of recomputing it.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.incr(key, 'coalesced')
+            return copy.deepcopy(await asyncio.shield(future))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def refresh_in_background(self, key: str, compute: Callable[[], Any]) -> bool:
+        """Start a stale-while-revalidate refresh unless one is already running"""
+        if key in self._inflight or key in self._refresh_tasks:
+            return False
+        task = asyncio.create_task(self.single_flight(key, compute))
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda done: self._refresh_done(key, done))
+        self.stats.incr(key, 'refreshes')
+        return True
+
+    def _refresh_done(self, key: str, task: asyncio.Task):
+        self._refresh_tasks.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background cache refresh failed: {task.exception()}")
+
+    async def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        """
+        Take the cluster-wide recompute lock for a key. Returns a token, or None
+        when another worker holds it. Without Redis the worker-local
+        single-flight is already exclusive, so the lock is always granted.
+        """
+        token = uuid.uuid4().hex
+        if not self.redis_client:
+            return token
+        try:
+            acquired = await self.redis_client.set(f"lock:{key}", token, nx=True, px=int(timeout * 1000))
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Cache lock error for key {key}: {e}")
+            return token
+
+    async def release_lock(self, key: str, token: str):
+        if not self.redis_client:
+            return
+        try:
+            # Only release our own lock; it may have expired and been retaken
+            if _as_str(await self.redis_client.get(f"lock:{key}")) == token:
+                await self.redis_client.delete(f"lock:{key}")
+        except Exception as e:
+            logger.error(f"Cache lock release error for key {key}: {e}")
+
+    async def wait_for_value(self, key: str, timeout: float, interval: float = 0.05) -> Optional[Any]:
+        """Poll for a value another worker is computing under the lock"""
+        self.stats.incr(key, 'lock_waits')
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            payload = await self.redis_client.get(key) if self.redis_client else None
+            if payload:
+                return self.codec.decode(payload)
+            if self.redis_client and not await self.redis_client.exists(f"lock:{key}"):
+                return None
+        return None
+
     async def cleanup(self):
-        """Cleanup expired entries from memory cache"""
+        """Cleanup expired entries from the local (L1) cache"""
+        self.l1.purge_expired()
+
+    async def ping_latency(self, samples: int = 3) -> Optional[float]:
+        """Median Redis PING round trip in milliseconds (None without Redis)"""
+        if not self.redis_client:
+            return None
+        timings = []
+        try:
+            for _ in range(samples):
+                start = time.perf_counter()
+                await self.redis_client.ping()
+                timings.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            logger.error(f"Redis ping failed: {e}")
+            return None
+        return round(sorted(timings)[len(timings) // 2], 3)
+
+    async def redis_bytes_by_prefix(self, max_keys: int = 10000) -> Dict[str, Dict[str, int]]:
+        """Entries and value bytes currently held in Redis, per prefix (SCAN + STRLEN, bounded)"""
+        totals: Dict[str, Dict[str, int]] = defaultdict(lambda: {'entries': 0, 'bytes': 0})
         if not self.redis_client:
-            now = datetime.utcnow()
-            expired_keys = [
-                key for key, entry in self.memory_cache.items()
-                if entry['expires_at'] <= now
-            ]
-            for key in expired_keys:
-                self.memory_cache.pop(key, None)
+            return {}
+        try:
+            keys = []
+            async for key in self.redis_client.scan_iter(count=1000):
+                key = _as_str(key)
+                if not key.startswith(('tag:', 'lock:')):
+                    keys.append(key)
+                if len(keys) >= max_keys:
+                    break
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.strlen(key)
+                sizes = await pipe.execute()
+            for key, size in zip(keys, sizes):
+                totals[_key_prefix(key)]['entries'] += 1
+                totals[_key_prefix(key)]['bytes'] += size
+        except Exception as e:
+            logger.error(f"Error measuring Redis cache size: {e}")
+        return dict(totals)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-prefix counters plus L1 occupancy"""
+        return {
+            'backend': 'redis' if self.redis_client else 'memory',
+            'codec': self.codec.name,
+            'l1': {
+                'entries': len(self.l1),
+                'bytes': self.l1.current_bytes,
+                'max_entries': self.l1.max_entries,
+                'max_bytes': self.l1.max_bytes,
+                'bytes_by_prefix': self.l1.bytes_by_prefix(),
+            },
+            'inflight': len(self._inflight),
+            'prefixes': self.stats.snapshot(),
+        }
     
     async def close(self):
         """Close Redis connection"""
         try:
+            if self._listener_task:
+                self._listener_task.cancel()
+                self._listener_task = None
+            for task in list(self._refresh_tasks.values()):
+                task.cancel()
             if self.redis_client:
                 await self.redis_client.close()
         except Exception as e:
@@ -141,56 +553,236 @@ class CacheService:
 # Global cache service instance
 cache_service = CacheService()
 
-def _generate_cache_key(func: Callable, args: tuple, kwargs: dict, key_prefix: str = "") -> str:
-    """Generate a cache key from function name and arguments"""
-    # Create a hash of the function arguments
-    arg_str = str(args) + str(sorted(kwargs.items()))
-    arg_hash = hashlib.md5(arg_str.encode()).hexdigest()[:10]
-    
-    # Combine prefix, function name, and argument hash
-    func_name = f"{func.__module__}.{func.__name__}"
+_cache_principal: ContextVar[Optional[str]] = ContextVar('cache_principal', default=None)
+
+
+def set_cache_principal(principal: Optional[str]):
+    """Record the authenticated user for principal-scoped cache keys (called by auth)"""
+    _cache_principal.set(str(principal) if principal else None)
+
+
+def _is_client(value: Any) -> bool:
+    """Supabase clients (and request-scoped views of them) are not cache-key data"""
+    return callable(getattr(value, 'table', None)) and not isinstance(value, (str, bytes, dict))
+
+
+def _key_default(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json')
+    raise TypeError(f"{type(value).__name__} cannot be part of a cache key")
+
+
+def _principal_for(clients: List[Any]) -> Optional[str]:
+    """
+    The verified user set by auth, or failing that a digest of the client's
+    bearer token. Token claims are never trusted unverified: a cache hit skips
+    the RLS check the database would otherwise perform.
+    """
+    principal = _cache_principal.get()
+    if principal:
+        return f"user:{principal}"
+    for client in clients:
+        token = getattr(client, 'token', None)
+        if isinstance(token, str) and token:
+            return f"token:{hashlib.blake2b(token.encode(), digest_size=16).hexdigest()}"
+    return None
+
+
+def _generate_cache_key(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    key_prefix: str = "",
+    vary_on_principal: Optional[bool] = None,
+    ignore_args: Iterable[str] = (),
+) -> Optional[str]:
+    """
+    Generate a cache key from the function name and its data arguments.
+
+    Arguments are bound to the signature (so positional, keyword and default
+    spellings agree), clients and ``ignore_args`` are dropped, and the rest are
+    serialized canonically and hashed with BLAKE2b-128. When a client argument
+    is present (or ``vary_on_principal`` is set) the calling principal is
+    folded in, since RLS makes the result depend on who asked.
+
+    Returns None when the call cannot be keyed safely (no principal for
+    principal-scoped data, or an argument without a stable representation).
+    """
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+    except TypeError:
+        arguments = {**{f"_{i}": arg for i, arg in enumerate(args)}, **kwargs}
+
+    clients = [value for value in arguments.values() if _is_client(value)]
+    data = {
+        name: value for name, value in arguments.items()
+        if name not in ignore_args and not _is_client(value)
+    }
+    if vary_on_principal is None:
+        vary_on_principal = bool(clients)
+    if vary_on_principal:
+        principal = _principal_for(clients)
+        if principal is None:
+            return None
+        data['__principal__'] = principal
+
+    try:
+        canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=_key_default)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Not caching {func.__qualname__}: {e}")
+        return None
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+    # Combine prefix, function name, and argument digest
+    func_name = f"{func.__module__}.{func.__qualname__}"
     if key_prefix:
-        return f"{key_prefix}:{func_name}:{arg_hash}"
-    return f"cache:{func_name}:{arg_hash}"
+        return f"{key_prefix}:{func_name}:{digest}"
+    return f"cache:{func_name}:{digest}"
 
-def cache_result(ttl: int = 300, key_prefix: str = ""):
+def _resolve_tags(func: Callable, templates: Optional[List[str]], args: tuple, kwargs: dict, result: Any = None) -> List[str]:
+    """
+    Format tag templates such as ``"owner:{owner_id}"`` or
+    ``"owner:{result[owner_id]}"`` against the call's arguments and result.
+
+    Templates that cannot be resolved (missing argument, ``None`` result) are
+    skipped.
+    """
+    if not templates:
+        return []
+    try:
+        bound = inspect.signature(func).bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        values = dict(bound.arguments)
+    except TypeError:
+        values = dict(kwargs)
+    values['result'] = result
+
+    tags = []
+    for template in templates:
+        try:
+            tags.append(template.format(**values))
+        except (KeyError, IndexError, TypeError, AttributeError):
+            logger.debug(f"Could not resolve cache tag {template} for {func.__name__}")
+    return tags
+
+_SWR_MARKER = '__swr_fresh_until__'
+
+
+def _unwrap(cached: Any, stale_ttl: int) -> Tuple[Any, bool]:
+    """Return (value, is_fresh) for a stored entry, unwrapping SWR envelopes"""
+    if stale_ttl and isinstance(cached, dict) and _SWR_MARKER in cached:
+        return cached['value'], cached[_SWR_MARKER] > time.time()
+    return cached, True
+
+def cache_result(
+    ttl: int = 300,
+    key_prefix: str = "",
+    tags: Optional[List[str]] = None,
+    single_flight: bool = True,
+    stale_ttl: int = 0,
+    cluster_lock: bool = False,
+    lock_timeout: float = 10.0,
+    vary_on_principal: Optional[bool] = None,
+    ignore_args: Iterable[str] = (),
+):
     """
     Decorator to cache function results
     
     Args:
         ttl: Time to live in seconds (default 5 minutes)
         key_prefix: Optional prefix for cache key
+        tags: Optional tag templates (e.g. ``["owner:{owner_id}"]``) the entry is
+            registered under; may reference ``result``
+        single_flight: Coalesce concurrent misses for a key into one computation
+        stale_ttl: Seconds after ``ttl`` during which the old value is served
+            while a single background task refreshes it (0 disables)
+        cluster_lock: Also take a Redis lock so only one worker in the cluster
+            recomputes; the others wait up to ``lock_timeout`` for its result
+        lock_timeout: Lock expiry and maximum wait, in seconds
+        vary_on_principal: Fold the calling principal into the key; defaults
+            to True when the function takes a client argument
+        ignore_args: Argument names that do not affect the result
+
+    The wrapped function exposes ``cache_key(*args, **kwargs)`` for tests and
+    manual invalidation.
     """
+    ignore_args = tuple(ignore_args)
+
     def decorator(func: Callable):
+        def make_key(*args, **kwargs) -> Optional[str]:
+            return _generate_cache_key(func, args, kwargs, key_prefix, vary_on_principal, ignore_args)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             if not cache_service.enabled:
                 return await func(*args, **kwargs)
             
             # Generate cache key
-            cache_key = _generate_cache_key(func, args, kwargs, key_prefix)
+            cache_key = make_key(*args, **kwargs)
+            if cache_key is None:
+                return await func(*args, **kwargs)
+
+            async def compute(wait_for_lock: bool = True):
+                token = None
+                if cluster_lock:
+                    token = await cache_service.acquire_lock(cache_key, lock_timeout)
+                    if token is None:
+                        if not wait_for_lock:
+                            return None
+                        cached = await cache_service.wait_for_value(cache_key, lock_timeout)
+                        if cached is not None:
+                            return _unwrap(cached, stale_ttl)[0]
+                try:
+                    result = await func(*args, **kwargs)
+                    entry = result
+                    if stale_ttl:
+                        entry = {_SWR_MARKER: time.time() + ttl, 'value': result}
+                    resolved_tags = _resolve_tags(func, tags, args, kwargs, result)
+                    await cache_service.set(cache_key, entry, ttl + stale_ttl, tags=resolved_tags)
+                    logger.debug(f"Cache miss, stored result for {cache_key}")
+                    return result
+                finally:
+                    if token:
+                        await cache_service.release_lock(cache_key, token)
             
             # Try to get from cache first
             cached_result = await cache_service.get(cache_key)
             if cached_result is not None:
+                value, fresh = _unwrap(cached_result, stale_ttl)
+                if not fresh:
+                    cache_service.stats.incr(cache_key, 'stale_served')
+                    cache_service.refresh_in_background(cache_key, lambda: compute(wait_for_lock=False))
                 logger.debug(f"Cache hit for {cache_key}")
-                return cached_result
+                return value
             
             # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache_service.set(cache_key, result, ttl)
-            logger.debug(f"Cache miss, stored result for {cache_key}")
-            
-            return result
+            if single_flight:
+                return await cache_service.single_flight(cache_key, compute)
+            return await compute()
+
+        wrapper.cache_key = make_key
         return wrapper
     return decorator
 
-def invalidate_cache(pattern: str):
+def invalidate_cache(pattern: Optional[str] = None, tags: Optional[List[str]] = None):
     """
-    Decorator to invalidate cache entries matching a pattern after function execution
+    Decorator to invalidate cache entries after function execution
     
     Args:
-        pattern: Pattern to match (e.g., "property_*")
+        pattern: Pattern to match (e.g., "property_*"); scans the keyspace, so
+            prefer tags for regular writes
+        tags: Tag templates resolved against the arguments and ``result``
+            (e.g. ``["property:{property_id}", "owner:{result[owner_id]}"]``)
     """
     def decorator(func: Callable):
         @wraps(func)
@@ -200,8 +792,13 @@ def invalidate_cache(pattern: str):
                 result = await func(*args, **kwargs)
                 
                 # Then invalidate cache if function succeeded
-                await cache_service.delete_pattern(pattern)
-                logger.debug(f"Invalidated cache pattern: {pattern}")
+                if tags:
+                    resolved = _resolve_tags(func, tags, args, kwargs, result)
+                    await cache_service.invalidate_tags(resolved)
+                    logger.debug(f"Invalidated cache tags: {resolved}")
+                if pattern:
+                    await cache_service.delete_pattern(pattern)
+                    logger.debug(f"Invalidated cache pattern: {pattern}")
                 
                 return result
             except Exception as e:
@@ -210,6 +807,19 @@ def invalidate_cache(pattern: str):
         return wrapper
     return decorator
 
+async def invalidate_tags(*tags: str):
+    """
+    Utility function to manually invalidate every cache entry under the given tags
+    
+    Args:
+        tags: Entity tags (e.g., "owner:<id>", "property:<id>")
+    """
+    try:
+        await cache_service.invalidate_tags(tags)
+        logger.debug(f"Invalidated cache tags: {tags}")
+    except Exception as e:
+        logger.error(f"Error invalidating cache tags {tags}: {e}")
+
 async def invalidate_cache_pattern(pattern: str):
     """
     Utility function to manually invalidate cache entries matching a pattern
@@ -223,6 +833,35 @@ async def invalidate_cache_pattern(pattern: str):
     except Exception as e:
         logger.error(f"Error invalidating cache pattern {pattern}: {e}")
 
+def _data_version_key(tag: str) -> str:
+    return f"data_version:{tag}"
+
+async def get_data_version(tag: str, ttl: int = 3600) -> str:
+    """
+    Current data version of an entity tag (e.g., "owner:<id>")
+
+    The version is a random token cached under the tag itself, so any
+    invalidation of the tag replaces it. Results keyed by the version are
+    never read again once the data changes and simply expire.
+
+    Args:
+        tag: Entity tag the versioned data belongs to
+        ttl: How long the token is kept; keep it at least as long as the entries keyed by it
+    """
+    key = _data_version_key(tag)
+    version = await cache_service.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:12]
+        await cache_service.set(key, version, ttl, tags=[tag])
+    return version
+
+async def bump_data_version(tag: str):
+    """Start a new data version for a tag without invalidating its other entries"""
+    try:
+        await cache_service.delete(_data_version_key(tag))
+    except Exception as e:
+        logger.error(f"Error bumping data version for {tag}: {e}")
+
 async def startup_cache():
     """Initialize cache service on application startup"""
     try:
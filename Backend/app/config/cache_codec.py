@@ -0,0 +1,252 @@
+"""
+Serialization codecs for cached values.
+
+Payloads are self-describing: a marker byte and a format byte (serializer +
+compression) precede the body, so workers running different codec settings
+can read each other's entries. Payloads without the marker are legacy JSON.
+
+Serializers (fastest available is picked for "auto"):
+- msgpack: binary, with extension types for datetime/date/time/UUID/Decimal
+- orjson / json: JSON text, with tagged objects for the same types
+
+Compression (zstd or LZ4 when installed, or zlib) is applied only above a size
+threshold and only when it actually shrinks the payload.
+"""
+
+import json
+import logging
+import uuid
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compression
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional compression
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+MARKER = 0xC1  # Never valid as the first byte of UTF-8 text or msgpack
+
+SERIALIZER_IDS = {'json': 1, 'msgpack': 2}
+COMPRESSION_IDS = {'none': 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+
+_TYPE_KEY = '__cache_type__'
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_TIME = 3
+_EXT_UUID = 4
+_EXT_DECIMAL = 5
+
+
+def _tag(value: Any) -> Any:
+    """Replace values JSON cannot represent faithfully with tagged objects"""
+    if isinstance(value, dict):
+        return {key: _tag(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_tag(item) for item in value]
+    if isinstance(value, datetime):
+        return {_TYPE_KEY: 'datetime', 'v': value.isoformat()}
+    if isinstance(value, date):
+        return {_TYPE_KEY: 'date', 'v': value.isoformat()}
+    if isinstance(value, time):
+        return {_TYPE_KEY: 'time', 'v': value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {_TYPE_KEY: 'uuid', 'v': str(value)}
+    if isinstance(value, Decimal):
+        return {_TYPE_KEY: 'decimal', 'v': str(value)}
+    if isinstance(value, (set, frozenset)):
+        return [_tag(item) for item in value]
+    return value
+
+
+_UNTAG = {
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'time': time.fromisoformat,
+    'uuid': uuid.UUID,
+    'decimal': Decimal,
+}
+
+
+def _untag_object(obj: Dict[str, Any]) -> Any:
+    kind = obj.get(_TYPE_KEY)
+    if kind in _UNTAG and len(obj) == 2:
+        return _UNTAG[kind](obj['v'])
+    return obj
+
+
+def _untag(value: Any) -> Any:
+    if isinstance(value, dict):
+        value = {key: _untag(item) for key, item in value.items()}
+        return _untag_object(value)
+    if isinstance(value, list):
+        return [_untag(item) for item in value]
+    return value
+
+
+def _json_dumps(value: Any) -> bytes:
+    tagged = _tag(value)
+    if orjson is not None:
+        return orjson.dumps(tagged, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(tagged, default=str, separators=(',', ':')).encode()
+
+
+def _json_loads(payload: bytes) -> Any:
+    if orjson is not None:
+        value = orjson.loads(payload)
+        # Only walk the structure when it contains tagged objects
+        return _untag(value) if _TYPE_KEY.encode() in payload else value
+    return json.loads(payload, object_hook=_untag_object)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, time):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return time.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+def _msgpack_loads(payload: bytes) -> Any:
+    return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+def _compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    available = {'zlib': (lambda data: zlib.compress(data, 1), zlib.decompress)}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=3)
+        decompressor = zstandard.ZstdDecompressor()
+        available['zstd'] = (compressor.compress, decompressor.decompress)
+    if lz4_frame is not None:
+        available['lz4'] = (lz4_frame.compress, lz4_frame.decompress)
+    return available
+
+
+class CacheCodec:
+    """Encodes cache values to bytes and back"""
+
+    def __init__(self, serializer: str = 'auto', compression: str = 'auto', compress_threshold: int = 1024):
+        self.serializer = self._pick_serializer(serializer)
+        self._compressors = _compressors()
+        self.compression = self._pick_compression(compression)
+        self.compress_threshold = compress_threshold
+
+    @staticmethod
+    def _pick_serializer(requested: str) -> str:
+        if requested == 'auto':
+            return 'msgpack' if msgpack is not None else 'json'
+        if requested == 'orjson':
+            requested = 'json'
+        if requested == 'msgpack' and msgpack is None:
+            logger.warning("msgpack not installed, falling back to JSON cache codec")
+            return 'json'
+        if requested not in SERIALIZER_IDS:
+            raise ValueError(f"Unknown cache serializer: {requested}")
+        return requested
+
+    def _pick_compression(self, requested: str) -> str:
+        if requested == 'auto':
+            for name in ('zstd', 'lz4'):
+                if name in self._compressors:
+                    return name
+            return 'none'
+        if requested not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {requested}")
+        if requested != 'none' and requested not in self._compressors:
+            logger.warning(f"{requested} not installed, cache values will not be compressed")
+            return 'none'
+        return requested
+
+    @property
+    def name(self) -> str:
+        if self.serializer == 'json':
+            serializer = 'orjson' if orjson is not None else 'json'
+        else:
+            serializer = self.serializer
+        return f"{serializer}+{self.compression}"
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """Return (payload, serialized size before compression)"""
+        body = _msgpack_dumps(value) if self.serializer == 'msgpack' else _json_dumps(value)
+        serialized_size = len(body)
+        compression = 'none'
+        if self.compression != 'none' and serialized_size >= self.compress_threshold:
+            compressed = self._compressors[self.compression][0](body)
+            if len(compressed) < serialized_size:
+                body, compression = compressed, self.compression
+        header = bytes((MARKER, SERIALIZER_IDS[self.serializer] << 4 | COMPRESSION_IDS[compression]))
+        return header + body, serialized_size
+
+    def decode(self, payload: bytes) -> Any:
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if not payload or payload[0] != MARKER:
+            return json.loads(payload)  # Written before codecs were introduced
+
+        fmt = payload[1]
+        serializer_id, compression_id = fmt >> 4, fmt & 0x0F
+        body = payload[2:]
+        if compression_id:
+            compression = next(name for name, cid in COMPRESSION_IDS.items() if cid == compression_id)
+            if compression not in self._compressors:
+                raise ValueError(f"Cache entry is {compression}-compressed but {compression} is not installed")
+            body = self._compressors[compression][1](body)
+        if serializer_id == SERIALIZER_IDS['msgpack']:
+            if msgpack is None:
+                raise ValueError("Cache entry is msgpack-encoded but msgpack is not installed")
+            return _msgpack_loads(body)
+        return _json_loads(body)
+
+
+def create_codec(settings) -> CacheCodec:
+    return CacheCodec(
+        settings.CACHE_SERIALIZER,
+        settings.CACHE_COMPRESSION,
+        settings.CACHE_COMPRESS_THRESHOLD,
+    )
@@ -0,0 +1,265 @@
+"""
+Pooled Supabase clients for the Property Management API.
+
+Every Supabase client (global, service role and per-request) shares a single
+keep-alive ``httpx.Client`` so TCP/TLS connections are reused across requests.
+Per-request clients are lightweight views that only carry their own bearer
+token for RLS; they never open connections of their own.
+
+The application pool is a ``LazyClientPool``: importing the app builds
+nothing, and the HTTP client and Supabase clients are created on first use
+(or by ``warm()`` during the startup event).
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from postgrest import SyncPostgrestClient
+from storage3 import SyncStorageClient
+from supabase import Client, ClientOptions, create_client
+
+from .query_trace import record_response_bytes
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Thread-safe counters describing how the shared connection pool is used"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.views_created = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_view(self):
+        with self._lock:
+            self.views_created += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+                "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+                "views_created": self.views_created,
+            }
+
+
+class ScopedClient:
+    """
+    Request-scoped view over the pooled Supabase client.
+
+    Exposes the subset of the ``supabase.Client`` API the app uses (``table``,
+    ``from_``, ``rpc``, ``postgrest``, ``storage`` and ``auth``). Only the
+    Authorization header differs from the base client; the HTTP session is shared.
+    """
+
+    def __init__(self, pool: "SupabaseClientPool", base: Client, token: str):
+        self._pool = pool
+        self._base = base
+        self._token = token
+        self._headers = {**base.options.headers, "Authorization": f"Bearer {token}"}
+        self._postgrest: Optional[SyncPostgrestClient] = None
+        self._storage: Optional[SyncStorageClient] = None
+
+    @property
+    def token(self) -> str:
+        return self._token
+
+    @property
+    def auth(self):
+        # Auth calls take the JWT explicitly, so the shared auth client is safe to reuse
+        return self._base.auth
+
+    @property
+    def postgrest(self) -> SyncPostgrestClient:
+        if self._postgrest is None:
+            self._postgrest = SyncPostgrestClient(
+                str(self._base.rest_url),
+                headers=self._headers,
+                schema=self._base.options.schema,
+                http_client=self._pool.http_client,
+            )
+        return self._postgrest
+
+    @property
+    def storage(self) -> SyncStorageClient:
+        if self._storage is None:
+            self._storage = SyncStorageClient(
+                url=str(self._base.storage_url),
+                headers=self._headers,
+                http_client=self._pool.http_client,
+            )
+        return self._storage
+
+    def table(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: Optional[Dict[Any, Any]] = None, count=None, head: bool = False, get: bool = False):
+        return self.postgrest.rpc(fn, params or {}, count, head, get)
+
+
+class SupabaseClientPool:
+    """Owns the shared HTTP connection pool and the long-lived Supabase clients"""
+
+    def __init__(
+        self,
+        url: str,
+        anon_key: str,
+        service_role_key: str = "",
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+    ):
+        self.url = url
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.stats = PoolStats()
+        self.http_client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            event_hooks={"request": [self._on_request], "response": [record_response_bytes]},
+        )
+        self.client: Client = self._create_client(anon_key)
+        if service_role_key:
+            self.service_role_client: Client = self._create_client(service_role_key)
+        else:
+            self.service_role_client = self.client
+
+    def _create_client(self, key: str) -> Client:
+        return create_client(self.url, key, options=ClientOptions(httpx_client=self.http_client))
+
+    def _on_request(self, request: httpx.Request):
+        self.stats.record_request()
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        # httpcore emits connect_tcp only when a brand new connection is opened
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.record_connection()
+
+    def scoped(self, token: str) -> ScopedClient:
+        """Return a request-scoped view authenticated with the given JWT"""
+        self.stats.record_view()
+        return ScopedClient(self, self.client, token)
+
+    def occupancy(self) -> Dict[str, Any]:
+        """Current state of the underlying connection pool"""
+        core_pool = getattr(self.http_client._transport, "_pool", None)
+        connections = list(core_pool.connections) if core_pool is not None else []
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.occupancy(), **self.stats.snapshot()}
+
+    def close(self):
+        try:
+            self.http_client.close()
+        except Exception as e:
+            logger.error(f"Error closing Supabase connection pool: {e}")
+
+
+def create_pool() -> SupabaseClientPool:
+    """Build the application pool from settings"""
+    return SupabaseClientPool(
+        url=settings.SUPABASE_URL,
+        anon_key=settings.SUPABASE_KEY,
+        service_role_key=settings.SUPABASE_SERVICE_ROLE_KEY,
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+class ClientProxy:
+    """
+    Stands in for a pooled ``supabase.Client`` until it is first used.
+
+    Modules bind ``supabase_client`` at import time; the proxy lets them keep
+    doing so without building the client then.
+    """
+
+    __slots__ = ('_resolve',)
+
+    def __init__(self, resolve: Callable[[], Any]):
+        self._resolve = resolve
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        return f"<ClientProxy for {self._resolve()!r}>"
+
+
+class LazyClientPool:
+    """Builds the real pool with ``factory`` on first use; thread-safe"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._pool: Optional[Any] = None
+        self._lock = threading.Lock()
+        self.client = ClientProxy(lambda: self.pool.client)
+        self.service_role_client = ClientProxy(lambda: self.pool.service_role_client)
+
+    @property
+    def created(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def pool(self) -> Any:
+        pool = self._pool
+        if pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._factory()
+                pool = self._pool
+        return pool
+
+    def warm(self):
+        """Build the pool now (called during startup, off the event loop)"""
+        self.pool
+
+    def scoped(self, token: str) -> Any:
+        return self.pool.scoped(token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.pool.get_stats()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+
+    def __getattr__(self, name: str) -> Any:
+        # http_client, stats, occupancy(), ... of the real pool
+        return getattr(self.pool, name)
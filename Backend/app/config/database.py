@@ -1,8 +1,8 @@
 # Use standard imports (v2 client should handle async)
-from supabase import create_client, Client 
+from supabase import Client
 from .settings import settings
+from .client_pool import LazyClientPool, ScopedClient, create_pool
 import logging
-import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -17,59 +17,52 @@ def validate_supabase_config():
     logger.info(f"Supabase URL configured: {settings.SUPABASE_URL}")
     return True
 
-# --- Globally Initialized Client ---
+# --- Globally Initialized Client Pool ---
+# Built lazily (see LazyClientPool): on first use, or concurrently during the startup event
 try:
-    validate_supabase_config()
-    # Use standard client creation
-    supabase_client: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-    logger.info("Successfully initialized GLOBAL Supabase client (v2)")
-    
-    # Service role client for admin operations (bypasses RLS)
-    if settings.SUPABASE_SERVICE_ROLE_KEY:
-        supabase_service_role_client: Client = create_client(
-            settings.SUPABASE_URL, 
-            settings.SUPABASE_SERVICE_ROLE_KEY
-        )
-        logger.info("Successfully initialized SERVICE ROLE Supabase client (bypasses RLS)")
+    if settings.SUPABASE_BACKEND == "local":
+        # In-process tables: no network, tokens are not verified, RLS is not enforced
+        from .local_supabase import create_local_pool
+        client_pool = LazyClientPool(create_local_pool)
+        logger.warning("SUPABASE_BACKEND=local: using the in-process Supabase stand-in")
     else:
+        validate_supabase_config()
+        # All clients share one keep-alive HTTP connection pool
+        client_pool = LazyClientPool(create_pool)
+    supabase_client: Client = client_pool.client
+
+    # Service role client for admin operations (bypasses RLS)
+    supabase_service_role_client: Client = client_pool.service_role_client
+    if not settings.SUPABASE_SERVICE_ROLE_KEY:
         logger.warning("SUPABASE_SERVICE_ROLE_KEY not set - using regular client as fallback")
-        supabase_service_role_client = supabase_client
-        
+
 except ValueError as ve:
     logger.critical(f"Configuration error: {str(ve)}")
     raise
-except Exception as e:
-    logger.critical(f"Failed to initialize GLOBAL Supabase client (v2): {str(e)}")
-    logger.debug(f"Current environment: SUPABASE_URL={'SUPABASE_URL' in os.environ}, SUPABASE_KEY={'SUPABASE_KEY' in os.environ}")
-    raise 
 
 # --- Dependency for Request-Scoped Authenticated Client --- #
 security_scheme = HTTPBearer()
 
 async def get_supabase_client_authenticated(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme)
-) -> Client:
+) -> ScopedClient:
     """
     FastAPI dependency that provides a Supabase client instance configured
     with the user's JWT token for proper RLS enforcement.
+
+    The returned client is a lightweight view over the shared connection pool,
+    so no new HTTP session or TLS connection is created per request.
     """
     try:
-        token = credentials.credentials
-
-        # Create a Supabase client instance
-        request_client: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_KEY
-        )
-
-        # Set the Authorization header for RLS
-        request_client.postgrest.auth(token)
-
-        return request_client
+        return client_pool.scoped(credentials.credentials)
 
     except Exception as e:
         logger.error(f"Failed to create authenticated Supabase client: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Could not configure authenticated database client: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+def get_pool_stats() -> dict:
+    """Connection pool occupancy and reuse statistics"""
+    return client_pool.get_stats()
@@ -0,0 +1,1102 @@
+"""
+In-process stand-in for Supabase (PostgREST, Storage and Auth).
+
+Implements the subset of the supabase-py client the app uses, backed by
+in-memory tables, so the full FastAPI app can be tested and load-tested with no
+network (SUPABASE_BACKEND=local):
+
+- select with embedded relations (``*, property:properties(*)``, ``units(*)``,
+  ``tenant:tenants!units_tenant_id_fkey(*)``, ``properties!inner(owner_id)``)
+  and filters on them at any depth (``property_tenants.properties.owner_id``)
+- eq/neq/gt/gte/lt/lte/like/ilike/is_/in_/contains/match/or_ and ``not_``
+- order, limit, offset, range, ``count='exact'`` and ``head=True``
+- single/maybe_single, insert/upsert/update/delete and rpc
+- storage buckets: upload/update/download/list/remove/move, public and signed URLs
+- ``auth.get_user`` for ``local:<user_id>`` tokens or a JWT's ``sub`` claim
+
+Embedded relations are resolved by naming convention. A parent column named in a
+``!<parent>_<column>_fkey`` hint, ``<alias>_id`` or ``<singular target>_id``
+embeds one row (many-to-one); otherwise target rows whose
+``<singular parent>_id`` equals the parent's ``id`` are embedded as a list.
+
+Row-level security is not emulated and tokens are NOT verified. Never enable
+this backend in production.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from io import BufferedReader, FileIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from unittest.mock import patch
+
+import httpx
+import jwt
+from postgrest.base_request_builder import APIResponse, SingleAPIResponse
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+from storage3.types import UploadResponse
+from supabase_auth.errors import AuthApiError
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+RpcFunction = Callable[["LocalDatabase", Dict[str, Any]], Any]
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _to_json(value: Any) -> Any:
+    """Stored form of a value, as PostgREST would return it"""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _clone(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+def _key(value: Any) -> Optional[str]:
+    """Canonical equality key: 5 == "5", True == "true", UUID == its string"""
+    value = _to_json(value)
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+    return str(value)
+
+
+def _compare(stored: Any, wanted: Any) -> Optional[int]:
+    """-1/0/1 like SQL comparison, None when either side is NULL"""
+    stored, wanted = _to_json(stored), _to_json(wanted)
+    if stored is None or wanted is None:
+        return None
+    if isinstance(stored, (int, float)) and not isinstance(stored, bool):
+        try:
+            other = float(wanted)
+        except (TypeError, ValueError):
+            return None
+        return (stored > other) - (stored < other)
+    left, right = str(stored), str(wanted)
+    return (left > right) - (left < right)
+
+
+def _like(pattern: str, case_insensitive: bool) -> "re.Pattern[str]":
+    parts = []
+    for char in str(pattern):
+        if char in '%*':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile('^' + ''.join(parts) + '$', re.IGNORECASE | re.DOTALL if case_insensitive else re.DOTALL)
+
+
+def _contains(stored: Any, wanted: Any) -> bool:
+    wanted = _to_json(wanted)
+    if isinstance(stored, list):
+        items = wanted if isinstance(wanted, list) else [wanted]
+        keys = {_key(item) for item in stored}
+        return all(_key(item) in keys for item in items)
+    if isinstance(stored, dict) and isinstance(wanted, dict):
+        return all(key in stored and _key(stored[key]) == _key(value) for key, value in wanted.items())
+    return False
+
+
+def _singular(table: str) -> str:
+    if table.endswith('ies'):
+        return table[:-3] + 'y'
+    if table.endswith('s'):
+        return table[:-1]
+    return table
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+# --- Filters --------------------------------------------------------------------
+
+class Condition:
+    """One filter on a (possibly dotted ``relation.column``) column"""
+
+    __slots__ = ('column', 'op', 'value', 'negate', '_compiled')
+
+    def __init__(self, column: str, op: str, value: Any, negate: bool = False):
+        self.column = column
+        self.op = op
+        self.value = value
+        self.negate = negate
+        # in: set of keys, like/ilike: regex; built once instead of per row
+        self._compiled: Any = None
+
+    def matches(self, row: Row) -> bool:
+        result = self._test(row.get(self.column))
+        return not result if self.negate else result
+
+    def _test(self, stored: Any) -> bool:
+        op, wanted = self.op, self.value
+        if op == 'eq':
+            return stored is not None and _key(stored) == _key(wanted)
+        if op == 'neq':
+            return stored is not None and _key(stored) != _key(wanted)
+        if op in ('gt', 'gte', 'lt', 'lte'):
+            order = _compare(stored, wanted)
+            if order is None:
+                return False
+            return {'gt': order > 0, 'gte': order >= 0, 'lt': order < 0, 'lte': order <= 0}[op]
+        if op in ('like', 'ilike'):
+            if self._compiled is None:
+                self._compiled = _like(wanted, op == 'ilike')
+            return stored is not None and bool(self._compiled.match(str(stored)))
+        if op == 'is':
+            if wanted is None or str(wanted).lower() == 'null':
+                return stored is None
+            return _key(stored) == _key(str(wanted).lower() == 'true')
+        if op == 'in':
+            if self._compiled is None:
+                self._compiled = {_key(value) for value in wanted}
+            return stored is not None and _key(stored) in self._compiled
+        if op in ('cs', 'contains'):
+            return stored is not None and _contains(stored, wanted)
+        raise APIError({'message': f'Operator "{op}" is not supported by the local backend', 'code': 'PGRST100', 'hint': None, 'details': None})
+
+    def to_param(self) -> Tuple[str, str]:
+        value = self.value
+        if self.op == 'in':
+            value = '(' + ','.join(str(_to_json(item)) for item in value) + ')'
+        prefix = 'not.' if self.negate else ''
+        return self.column, f"{prefix}{self.op}.{_to_json(value)}"
+
+
+class AnyOf:
+    """An ``or=(...)`` / ``and=(...)`` group"""
+
+    __slots__ = ('conditions', 'require_all', 'negate', 'text')
+
+    def __init__(self, conditions: List[Any], require_all: bool = False, negate: bool = False, text: str = ''):
+        self.conditions = conditions
+        self.require_all = require_all
+        self.negate = negate
+        self.text = text
+
+    @property
+    def column(self) -> str:
+        return ''
+
+    def matches(self, row: Row) -> bool:
+        results = (condition.matches(row) for condition in self.conditions)
+        result = all(results) if self.require_all else any(results)
+        return not result if self.negate else result
+
+    def to_param(self) -> Tuple[str, str]:
+        return ('and' if self.require_all else 'or'), f"({self.text})"
+
+
+def _parse_logic(text: str) -> List[Any]:
+    """Parse PostgREST logic-tree syntax: ``end_date.gte.2024-01-01,end_date.is.null``"""
+    conditions: List[Any] = []
+    for part in _split_top_level(text):
+        negate = False
+        if part.startswith('not.'):
+            negate, part = True, part[4:]
+        for group in ('and', 'or'):
+            if part.startswith(group + '(') and part.endswith(')'):
+                inner = part[len(group) + 1:-1]
+                conditions.append(AnyOf(_parse_logic(inner), group == 'and', negate, inner))
+                break
+        else:
+            column, rest = part.split('.', 1)
+            if rest.startswith('not.'):
+                negate, rest = not negate, rest[4:]
+            op, _, raw = rest.partition('.')
+            value: Any = raw
+            if op == 'in':
+                value = [item.strip().strip('"') for item in raw.strip('()').split(',') if item.strip()]
+            elif op == 'is':
+                value = None if raw == 'null' else raw
+            conditions.append(Condition(column, op, value, negate))
+    return conditions
+
+
+# --- Select parsing -------------------------------------------------------------
+
+class Embed:
+    """``alias:table!hint(columns)`` inside a select"""
+
+    def __init__(self, alias: str, table: str, hint: Optional[str], inner: bool, nodes: List[Any]):
+        self.alias = alias
+        self.table = table
+        self.hint = hint
+        self.inner = inner
+        self.nodes = nodes
+
+
+def _parse_select(text: str) -> List[Any]:
+    nodes: List[Any] = []
+    for token in _split_top_level(text or '*'):
+        token = token.strip()
+        if not token:
+            continue
+        if token.endswith(')') and '(' in token:
+            head, inner = token[:token.index('(')], token[token.index('(') + 1:-1]
+            alias, _, target = head.rpartition(':') if ':' in head.replace('::', '') else ('', '', head)
+            table, *hints = target.split('!')
+            fk_hint = next((hint for hint in hints if hint not in ('inner', 'left')), None)
+            nodes.append(Embed(alias or table, table, fk_hint, 'inner' in hints, _parse_select(inner)))
+            continue
+        token = token.split('::', 1)[0]
+        if ':' in token:
+            alias, column = token.split(':', 1)
+            nodes.append((alias, column))
+        else:
+            nodes.append((token, token))
+    return nodes
+
+
+def _split_embedded(filters: List[Any]) -> Tuple[List[Any], Dict[str, List[Any]]]:
+    """Split filters into ones on a table and ones on its embedded relations, by relation"""
+    top, embedded = [], {}
+    for condition in filters:
+        if isinstance(condition, Condition) and '.' in condition.column:
+            relation, column = condition.column.split('.', 1)
+            embedded.setdefault(relation, []).append(Condition(column, condition.op, condition.value, condition.negate))
+        else:
+            top.append(condition)
+    return top, embedded
+
+
+# --- Database -------------------------------------------------------------------
+
+class LocalDatabase:
+    """
+    Thread-safe in-memory tables with lazy hash indexes.
+
+    Indexes on filtered columns are built on first use and dropped when the
+    table is written, so read-heavy benchmarks stay O(1) per lookup.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tables: Dict[str, List[Row]] = {}
+        self.rpcs: Dict[str, RpcFunction] = dict(DEFAULT_RPCS)
+        self.queries: Dict[str, int] = {}
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+
+    # Data loading -------------------------------------------------------------
+
+    def insert_rows(self, table: str, rows: Iterable[Row]):
+        """Add rows as-is (no defaults, no conflict checks); for seeding"""
+        with self._lock:
+            self.tables.setdefault(table, []).extend(_to_json(dict(row)) for row in rows)
+            self._indexes.pop(table, None)
+
+    def load(self, data: Dict[str, List[Row]]):
+        for table, rows in data.items():
+            self.insert_rows(table, rows)
+
+    def load_json(self, path: Union[str, Path]):
+        with open(path, 'r', encoding='utf-8') as handle:
+            self.load(json.load(handle))
+
+    def dump(self) -> Dict[str, List[Row]]:
+        with self._lock:
+            return {table: _clone(rows) for table, rows in self.tables.items()}
+
+    def save_json(self, path: Union[str, Path]):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.dump(), handle)
+
+    def register_rpc(self, name: str, function: RpcFunction):
+        """Provide a Python implementation of a Postgres function"""
+        self.rpcs[name] = function
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': 'local',
+                'latency_ms': self.latency_ms,
+                'tables': {table: len(rows) for table, rows in sorted(self.tables.items())},
+                'queries': dict(self.queries),
+            }
+
+    # Internals ----------------------------------------------------------------
+
+    def simulate_latency(self):
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def record(self, operation: str, table: str):
+        name = f"{operation} {table}"
+        self.queries[name] = self.queries.get(name, 0) + 1
+
+    def rows(self, table: str) -> List[Row]:
+        return self.tables.setdefault(table, [])
+
+    def lookup(self, table: str, column: str, value: Any) -> List[Row]:
+        """Rows whose ``column`` equals ``value`` via the column's hash index"""
+        indexes = self._indexes.setdefault(table, {})
+        index = indexes.get(column)
+        if index is None:
+            index = {}
+            for row in self.rows(table):
+                index.setdefault(_key(row.get(column)), []).append(row)
+            indexes[column] = index
+        key = _key(value)
+        return index.get(key, []) if key is not None else []
+
+    def positions(self, table: str) -> Dict[int, int]:
+        """Position of each row (by identity) in its table"""
+        indexes = self._indexes.setdefault(table, {})
+        positions = indexes.get('__position__')
+        if positions is None:
+            positions = {id(row): position for position, row in enumerate(self.rows(table))}
+            indexes['__position__'] = positions
+        return positions
+
+    def changed(self, table: str):
+        self._indexes.pop(table, None)
+
+
+def _owner_for_unit(db: LocalDatabase, params: Dict[str, Any]) -> Optional[str]:
+    for unit in db.lookup('units', 'id', params.get('p_unit_id')):
+        for prop in db.lookup('properties', 'id', unit.get('property_id')):
+            return prop.get('owner_id')
+    return None
+
+
+DEFAULT_RPCS: Dict[str, RpcFunction] = {
+    'get_owner_for_unit': _owner_for_unit,
+}
+
+
+# --- Query builders -------------------------------------------------------------
+
+class LocalQuery:
+    """Chainable builder mirroring postgrest-py's sync request builders"""
+
+    def __init__(self, db: LocalDatabase, table: str, method: str, payload: Any = None,
+                 columns: str = '*', count: Optional[str] = None, head: bool = False,
+                 returning: str = 'representation', on_conflict: str = '', ignore_duplicates: bool = False,
+                 rpc_name: Optional[str] = None):
+        self.db = db
+        self.table = table
+        self.method = method
+        self.payload = payload
+        self.columns = columns
+        self.count_method = count
+        self.head = head
+        self.returning = getattr(returning, 'value', returning)
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        self.rpc_name = rpc_name
+        self.filters: List[Any] = []
+        self.orders: List[Tuple[str, bool, Optional[bool]]] = []
+        self.limit_count: Optional[int] = None
+        self.offset_count = 0
+        self.single_mode: Optional[str] = None
+        self.negate_next = False
+
+    # Request description, for query tracing ------------------------------------
+
+    @property
+    def request(self) -> SimpleNamespace:
+        params: List[Tuple[str, str]] = []
+        if self.method in ('GET', 'HEAD'):
+            params.append(('select', self.columns))
+        params.extend(condition.to_param() for condition in self.filters)
+        if self.orders:
+            params.append(('order', ','.join(f"{column}.{'desc' if desc else 'asc'}" for column, desc, _ in self.orders)))
+        if self.offset_count:
+            params.append(('offset', str(self.offset_count)))
+        if self.limit_count is not None:
+            params.append(('limit', str(self.limit_count)))
+        prefer = 'resolution=merge-duplicates' if self.method == 'UPSERT' else ''
+        path = f"/rest/v1/rpc/{self.rpc_name}" if self.rpc_name else f"/rest/v1/{self.table}"
+        http_method = 'POST' if self.method in ('UPSERT', 'RPC') else self.method
+        return SimpleNamespace(path=path, http_method=http_method, headers={'prefer': prefer}, params=httpx.QueryParams(params))
+
+    # Filters ------------------------------------------------------------------
+
+    def _filter(self, column: str, op: str, value: Any) -> "LocalQuery":
+        self.filters.append(Condition(column, op, value, self.negate_next))
+        self.negate_next = False
+        return self
+
+    @property
+    def not_(self) -> "LocalQuery":
+        self.negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'lte', value)
+
+    def like(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(column, 'ilike', pattern)
+
+    def is_(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'is', value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "LocalQuery":
+        return self._filter(column, 'in', list(values))
+
+    def contains(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, 'cs', value)
+
+    def match(self, query: Dict[str, Any]) -> "LocalQuery":
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def filter(self, column: str, operator: str, criteria: Any) -> "LocalQuery":
+        condition = _parse_logic(f"{column}.{operator}.{criteria}")[0]
+        condition.negate = condition.negate != self.negate_next
+        self.negate_next = False
+        self.filters.append(condition)
+        return self
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "LocalQuery":
+        conditions = _parse_logic(filters)
+        if reference_table:
+            for condition in conditions:
+                condition.column = f"{reference_table}.{condition.column}"
+        self.filters.append(AnyOf(conditions, negate=self.negate_next, text=filters))
+        self.negate_next = False
+        return self
+
+    # Modifiers ----------------------------------------------------------------
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None,
+              foreign_table: Optional[str] = None) -> "LocalQuery":
+        self.orders.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> "LocalQuery":
+        self.limit_count = size
+        return self
+
+    def offset(self, size: int) -> "LocalQuery":
+        self.offset_count = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None) -> "LocalQuery":
+        self.offset_count = start
+        self.limit_count = end - start + 1
+        return self
+
+    def single(self) -> "LocalQuery":
+        self.single_mode = 'single'
+        return self
+
+    def maybe_single(self) -> "LocalQuery":
+        self.single_mode = 'maybe'
+        return self
+
+    # Execution ----------------------------------------------------------------
+
+    def execute(self) -> Any:
+        self.db.simulate_latency()
+        with self.db._lock:
+            self.db.record(self.method.lower(), self.rpc_name or self.table)
+            if self.method == 'RPC':
+                data, count = self._execute_rpc()
+            elif self.method in ('GET', 'HEAD'):
+                data, count = self._execute_select()
+            elif self.method in ('POST', 'UPSERT'):
+                data, count = self._execute_insert()
+            elif self.method == 'PATCH':
+                data, count = self._execute_update()
+            else:
+                data, count = self._execute_delete()
+        return self._respond(data, count)
+
+    def _respond(self, data: Any, count: Optional[int]) -> Any:
+        if self.single_mode is None:
+            # model_construct, as postgrest does: rpc results may be scalars
+            return APIResponse.model_construct(data=data, count=count)
+        rows = data if isinstance(data, list) else [data]
+        if self.single_mode == 'maybe' and not rows:
+            return None
+        if len(rows) != 1:
+            raise APIError({
+                'message': 'JSON object requested, multiple (or no) rows returned',
+                'code': 'PGRST116',
+                'hint': None,
+                'details': f'The result contains {len(rows)} rows',
+            })
+        return SingleAPIResponse(data=rows[0], count=count)
+
+    def _top_filters(self) -> Tuple[List[Any], Dict[str, List[Any]]]:
+        """Split filters into ones on this table and ones on embedded relations"""
+        return _split_embedded(self.filters)
+
+    def _candidates(self, filters: List[Any]) -> List[Row]:
+        """Narrow the scan with an index on the first positive eq/in filter"""
+        for condition in filters:
+            if isinstance(condition, Condition) and not condition.negate:
+                if condition.op == 'eq':
+                    return self.db.lookup(self.table, condition.column, condition.value)
+                if condition.op == 'in':
+                    found = {}
+                    for value in condition.value:
+                        for row in self.db.lookup(self.table, condition.column, value):
+                            found[id(row)] = row
+                    # Keep table order, as a sequential scan would
+                    positions = self.db.positions(self.table)
+                    return sorted(found.values(), key=lambda row: positions[id(row)])
+        return self.db.rows(self.table)
+
+    def _matching(self) -> List[Row]:
+        filters, _ = self._top_filters()
+        return [row for row in self._candidates(filters) if all(condition.matches(row) for condition in filters)]
+
+    def _sort(self, rows: List[Row]) -> List[Row]:
+        for column, desc, nullsfirst in reversed(self.orders):
+            nulls_first = desc if nullsfirst is None else nullsfirst
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def _page(self, rows: List[Row]) -> List[Row]:
+        end = None if self.limit_count is None else self.offset_count + self.limit_count
+        return rows[self.offset_count:end]
+
+    def _execute_select(self) -> Tuple[List[Row], Optional[int]]:
+        nodes = _parse_select(self.columns)
+        _, embedded_filters = self._top_filters()
+        rows = self._matching()
+        inner = [node for node in nodes if isinstance(node, Embed) and (node.inner or node.alias in embedded_filters)]
+        if inner:
+            rows = [row for row in rows if all(self._embed_ok(self.table, row, node, embedded_filters) for node in inner)]
+        rows = self._sort(rows)
+        count = len(rows) if self.count_method else None
+        if self.head:
+            return [], count
+        return [self._project(self.table, row, nodes, embedded_filters) for row in self._page(rows)], count
+
+    def _embed_ok(self, table: str, row: Row, node: Embed, embedded_filters: Dict[str, List[Any]]) -> bool:
+        if not node.inner:
+            return True
+        value = self._resolve(table, row, node, embedded_filters.get(node.alias) or embedded_filters.get(node.table) or [])
+        return bool(value)
+
+    def _project(self, table: str, row: Row, nodes: List[Any], embedded_filters: Dict[str, List[Any]]) -> Row:
+        result: Row = {}
+        for node in nodes:
+            if isinstance(node, Embed):
+                filters = embedded_filters.get(node.alias) or embedded_filters.get(node.table) or []
+                value = self._resolve(table, row, node, filters)
+                _, nested = _split_embedded(filters)
+                if isinstance(value, list):
+                    result[node.alias] = [self._project(node.table, child, node.nodes, nested) for child in value]
+                else:
+                    result[node.alias] = self._project(node.table, value, node.nodes, nested) if value else None
+            elif node[1] == '*':
+                result.update(_clone(row))
+            else:
+                result[node[0]] = _clone(row.get(node[1]))
+        return result
+
+    def _resolve(self, parent: str, row: Row, node: Embed, filters: List[Any]) -> Any:
+        """Embedded row (many-to-one) or rows (one-to-many) for ``node``"""
+        own, nested = _split_embedded(filters)
+        inner = [child for child in node.nodes if isinstance(child, Embed) and child.inner]
+
+        def keep(target: Row) -> bool:
+            return (all(condition.matches(target) for condition in own)
+                    and all(self._embed_ok(node.table, target, child, nested) for child in inner))
+
+        many_to_one, column = _relation(parent, row, node)
+        if many_to_one:
+            target = next(iter(self.db.lookup(node.table, 'id', row.get(column))), None)
+            return target if target is not None and keep(target) else None
+        return [child for child in self.db.lookup(node.table, column, row.get('id')) if keep(child)]
+
+    def _execute_insert(self) -> Tuple[List[Row], Optional[int]]:
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        stored = self.db.rows(self.table)
+        conflict_columns = [column.strip() for column in (self.on_conflict or 'id').split(',')]
+        written = []
+        for payload in rows:
+            row = _to_json(dict(payload))
+            existing = None
+            if all(row.get(column) is not None for column in conflict_columns):
+                existing = next(
+                    (candidate for candidate in self.db.lookup(self.table, conflict_columns[0], row.get(conflict_columns[0]))
+                     if all(_key(candidate.get(column)) == _key(row.get(column)) for column in conflict_columns)),
+                    None,
+                )
+            if existing is not None:
+                if self.method != 'UPSERT':
+                    raise APIError({
+                        'message': f'duplicate key value violates unique constraint "{self.table}_pkey"',
+                        'code': '23505',
+                        'hint': None,
+                        'details': f'Key ({", ".join(conflict_columns)}) already exists.',
+                    })
+                if not self.ignore_duplicates:
+                    existing.update(row)
+                    written.append(existing)
+                continue
+            row.setdefault('id', str(uuid.uuid4()))
+            row.setdefault('created_at', _utcnow())
+            stored.append(row)
+            written.append(row)
+            self.db.changed(self.table)
+        self.db.changed(self.table)
+        return self._written(written)
+
+    def _execute_update(self) -> Tuple[List[Row], Optional[int]]:
+        changes = _to_json(dict(self.payload))
+        rows = self._matching()
+        for row in rows:
+            row.update(changes)
+        self.db.changed(self.table)
+        return self._written(rows)
+
+    def _execute_delete(self) -> Tuple[List[Row], Optional[int]]:
+        rows = self._matching()
+        doomed = {id(row) for row in rows}
+        self.db.tables[self.table] = [row for row in self.db.rows(self.table) if id(row) not in doomed]
+        self.db.changed(self.table)
+        return self._written(rows)
+
+    def _written(self, rows: List[Row]) -> Tuple[List[Row], Optional[int]]:
+        count = len(rows) if self.count_method else None
+        if self.returning == 'minimal':
+            return [], count
+        return [_clone(row) for row in rows], count
+
+    def _execute_rpc(self) -> Tuple[Any, Optional[int]]:
+        function = self.db.rpcs.get(self.rpc_name)
+        if function is None:
+            raise APIError({
+                'message': f'Could not find the function public.{self.rpc_name} in the schema cache',
+                'code': 'PGRST202',
+                'hint': 'Register it with LocalDatabase.register_rpc',
+                'details': None,
+            })
+        data = _to_json(function(self.db, dict(self.payload or {})))
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            data = [row for row in data if all(condition.matches(row) for condition in self.filters)]
+            data = self._page(self._sort(data))
+        count = len(data) if self.count_method and isinstance(data, list) else None
+        return data, count
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    value = _to_json(value)
+    if isinstance(value, bool):
+        return (0, int(value))
+    if isinstance(value, (int, float)):
+        return (1, float(value))
+    return (2, str(value))
+
+
+def _relation(parent: str, row: Row, node: Embed) -> Tuple[bool, str]:
+    """``(many_to_one, column)`` joining ``parent`` to ``node.table``"""
+    if node.hint and node.hint.endswith('_fkey'):
+        constraint = node.hint[:-len('_fkey')]
+        if constraint.startswith(parent + '_'):
+            return True, constraint[len(parent) + 1:]
+        if constraint.startswith(node.table + '_'):
+            return False, constraint[len(node.table) + 1:]
+    singular = _singular(node.table)
+    candidates = []
+    if node.alias != node.table:
+        candidates.append(f"{node.alias}_id")
+    candidates += [f"{singular}_id", f"{singular.rsplit('_', 1)[-1]}_id"]
+    for column in candidates:
+        if column in row:
+            return True, column
+    return False, f"{_singular(parent)}_id"
+
+
+class LocalTable:
+    """``client.table(name)``: entry point for one table"""
+
+    def __init__(self, db: LocalDatabase, table: str):
+        self.db = db
+        self.table = table
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> LocalQuery:
+        return LocalQuery(self.db, self.table, 'HEAD' if head else 'GET', columns=','.join(columns) or '*',
+                          count=getattr(count, 'value', count), head=bool(head))
+
+    def insert(self, json: Any, *, count: Optional[str] = None, returning: str = 'representation',
+               upsert: bool = False, default_to_null: bool = True) -> LocalQuery:
+        return LocalQuery(self.db, self.table, 'UPSERT' if upsert else 'POST', payload=json,
+                          count=getattr(count, 'value', count), returning=returning)
+
+    def upsert(self, json: Any, *, count: Optional[str] = None, returning: str = 'representation',
+               ignore_duplicates: bool = False, on_conflict: str = '', default_to_null: bool = True) -> LocalQuery:
+        return LocalQuery(self.db, self.table, 'UPSERT', payload=json, count=getattr(count, 'value', count),
+                          returning=returning, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+
+    def update(self, json: Any, *, count: Optional[str] = None, returning: str = 'representation') -> LocalQuery:
+        return LocalQuery(self.db, self.table, 'PATCH', payload=json, count=getattr(count, 'value', count), returning=returning)
+
+    def delete(self, *, count: Optional[str] = None, returning: str = 'representation') -> LocalQuery:
+        return LocalQuery(self.db, self.table, 'DELETE', count=getattr(count, 'value', count), returning=returning)
+
+
+# --- Storage --------------------------------------------------------------------
+
+class LocalBucket:
+    """``storage.from_(bucket)``"""
+
+    def __init__(self, storage: "LocalStorage", bucket_id: str):
+        self.storage = storage
+        self.id = bucket_id
+
+    @property
+    def _objects(self) -> Dict[str, Dict[str, Any]]:
+        return self.storage.buckets.setdefault(self.id, {})
+
+    def _get(self, path: str) -> Dict[str, Any]:
+        obj = self._objects.get(path.strip('/'))
+        if obj is None:
+            raise StorageApiError('Object not found', 'not_found', 404)
+        return obj
+
+    def upload(self, path: str, file: Union[BufferedReader, bytes, FileIO, str, Path], file_options: Optional[Dict[str, Any]] = None) -> UploadResponse:
+        options = file_options or {}
+        path = path.strip('/')
+        self.storage.db.simulate_latency()
+        with self.storage.lock:
+            if path in self._objects and str(options.get('upsert', options.get('x-upsert', 'false'))).lower() != 'true':
+                raise StorageApiError('The resource already exists', 'Duplicate', 409)
+            return self._store(path, file, options)
+
+    def update(self, path: str, file: Union[BufferedReader, bytes, FileIO, str, Path], file_options: Optional[Dict[str, Any]] = None) -> UploadResponse:
+        path = path.strip('/')
+        self.storage.db.simulate_latency()
+        with self.storage.lock:
+            self._get(path)
+            return self._store(path, file, file_options or {})
+
+    def _store(self, path: str, file: Any, options: Dict[str, Any]) -> UploadResponse:
+        if isinstance(file, (str, Path)):
+            content = Path(file).read_bytes()
+        elif isinstance(file, (bytes, bytearray)):
+            content = bytes(file)
+        else:
+            content = file.read()
+        now = _utcnow()
+        previous = self._objects.get(path)
+        self._objects[path] = {
+            'id': previous['id'] if previous else str(uuid.uuid4()),
+            'content': content,
+            'content_type': options.get('content-type', options.get('contentType', 'application/octet-stream')),
+            'created_at': previous['created_at'] if previous else now,
+            'updated_at': now,
+        }
+        return UploadResponse(path=path, Key=f"{self.id}/{path}")
+
+    def download(self, path: str, options: Optional[Dict[str, Any]] = None, query_params: Optional[Dict[str, str]] = None) -> bytes:
+        self.storage.db.simulate_latency()
+        with self.storage.lock:
+            return self._get(path)['content']
+
+    def list(self, path: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        options = options or {}
+        prefix = (path or '').strip('/')
+        prefix = prefix + '/' if prefix else ''
+        self.storage.db.simulate_latency()
+        entries: Dict[str, Dict[str, Any]] = {}
+        with self.storage.lock:
+            for name, obj in self._objects.items():
+                if not name.startswith(prefix):
+                    continue
+                rest = name[len(prefix):]
+                if '/' in rest:
+                    folder = rest.split('/', 1)[0]
+                    entries.setdefault(folder, {'name': folder, 'id': None, 'updated_at': None, 'created_at': None,
+                                                'last_accessed_at': None, 'metadata': None})
+                else:
+                    entries[rest] = {
+                        'name': rest, 'id': obj['id'], 'updated_at': obj['updated_at'], 'created_at': obj['created_at'],
+                        'last_accessed_at': obj['updated_at'],
+                        'metadata': {'size': len(obj['content']), 'mimetype': obj['content_type']},
+                    }
+        search = options.get('search')
+        listed = [entry for name, entry in sorted(entries.items()) if not search or search in name]
+        offset = int(options.get('offset', 0))
+        limit = int(options.get('limit', 100))
+        return listed[offset:offset + limit]
+
+    def remove(self, paths: List[str]) -> List[Dict[str, Any]]:
+        self.storage.db.simulate_latency()
+        removed = []
+        with self.storage.lock:
+            for path in paths:
+                obj = self._objects.pop(path.strip('/'), None)
+                if obj is not None:
+                    removed.append({'name': path.strip('/'), 'bucket_id': self.id, 'id': obj['id']})
+        return removed
+
+    def move(self, from_path: str, to_path: str) -> Dict[str, str]:
+        with self.storage.lock:
+            self._objects[to_path.strip('/')] = self._get(from_path)
+            del self._objects[from_path.strip('/')]
+        return {'message': 'Successfully moved'}
+
+    def get_public_url(self, path: str, options: Optional[Dict[str, Any]] = None) -> str:
+        return f"{self.storage.base_url}/storage/v1/object/public/{self.id}/{path.strip('/')}"
+
+    def create_signed_url(self, path: str, expires_in: int, options: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[str]]:
+        with self.storage.lock:
+            self._get(path)
+        url = self._signed(path, expires_in)
+        return {'signedURL': url, 'signedUrl': url}
+
+    def create_signed_urls(self, paths: List[str], expires_in: int, options: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        results = []
+        with self.storage.lock:
+            for path in paths:
+                exists = path.strip('/') in self._objects
+                url = self._signed(path, expires_in) if exists else None
+                results.append({'error': None if exists else 'Either the object does not exist or you do not have access to it',
+                                'path': path, 'signedURL': url, 'signedUrl': url})
+        return results
+
+    def _signed(self, path: str, expires_in: int) -> str:
+        expires = int(time.time()) + int(expires_in)
+        return f"{self.storage.base_url}/storage/v1/object/sign/{self.id}/{path.strip('/')}?token=local-{expires}"
+
+
+class LocalStorage:
+    """``client.storage``; buckets are created on first use"""
+
+    def __init__(self, db: LocalDatabase, base_url: str):
+        self.db = db
+        self.base_url = base_url.rstrip('/')
+        self.buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.lock = threading.RLock()
+
+    def from_(self, bucket_id: str) -> LocalBucket:
+        return LocalBucket(self, bucket_id)
+
+    def create_bucket(self, id: str, name: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        with self.lock:
+            self.buckets.setdefault(id, {})
+        return {'name': name or id}
+
+    def get_bucket(self, id: str) -> SimpleNamespace:
+        with self.lock:
+            if id not in self.buckets:
+                raise StorageApiError('Bucket not found', 'not_found', 404)
+        return SimpleNamespace(id=id, name=id, public=True)
+
+    def list_buckets(self) -> List[SimpleNamespace]:
+        with self.lock:
+            return [SimpleNamespace(id=bucket_id, name=bucket_id, public=True) for bucket_id in sorted(self.buckets)]
+
+
+# --- Auth -----------------------------------------------------------------------
+
+LOCAL_TOKEN_PREFIX = 'local:'
+
+
+def local_token(user_id: Any) -> str:
+    """Bearer token the local backend accepts for ``user_id``"""
+    return f"{LOCAL_TOKEN_PREFIX}{user_id}"
+
+
+class LocalAuth:
+    """``client.auth``: resolves users from tokens without verifying signatures"""
+
+    def __init__(self, db: LocalDatabase):
+        self.db = db
+
+    def get_user(self, jwt_token: Optional[str] = None) -> SimpleNamespace:
+        user_id = self._user_id(jwt_token)
+        if not user_id:
+            raise AuthApiError('invalid JWT: unable to parse or verify signature', 401, 'bad_jwt')
+        with self.db._lock:
+            profile = next(iter(self.db.lookup('user_profiles', 'id', user_id)), {})
+        metadata = {key: profile.get(key) for key in ('first_name', 'last_name', 'full_name', 'phone', 'user_type', 'role') if profile.get(key)}
+        user = SimpleNamespace(
+            id=user_id,
+            email=profile.get('email') or f"{user_id}@local.test",
+            user_metadata=metadata,
+            app_metadata={'provider': 'local'},
+            aud='authenticated',
+            role='authenticated',
+            created_at=profile.get('created_at') or _utcnow(),
+            updated_at=profile.get('updated_at') or _utcnow(),
+        )
+        return SimpleNamespace(user=user)
+
+    @staticmethod
+    def _user_id(token: Optional[str]) -> Optional[str]:
+        if not token:
+            return None
+        if token.startswith(LOCAL_TOKEN_PREFIX):
+            return token[len(LOCAL_TOKEN_PREFIX):] or None
+        try:
+            return jwt.decode(token, options={'verify_signature': False}).get('sub')
+        except jwt.PyJWTError:
+            return None
+
+
+# --- Clients --------------------------------------------------------------------
+
+class LocalSupabaseClient:
+    """Drop-in for ``supabase.Client`` / ``ScopedClient`` over a LocalDatabase"""
+
+    def __init__(self, db: LocalDatabase, storage: LocalStorage, auth: LocalAuth, token: Optional[str] = None):
+        self.db = db
+        self.storage = storage
+        self.auth = auth
+        self._token = token
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token
+
+    @property
+    def postgrest(self) -> "LocalSupabaseClient":
+        return self
+
+    def table(self, table_name: str) -> LocalTable:
+        return LocalTable(self.db, table_name)
+
+    def from_(self, table_name: str) -> LocalTable:
+        return LocalTable(self.db, table_name)
+
+    def rpc(self, fn: str, params: Optional[Dict[Any, Any]] = None, count=None, head: bool = False, get: bool = False) -> LocalQuery:
+        return LocalQuery(self.db, fn, 'RPC', payload=params or {}, count=getattr(count, 'value', count), rpc_name=fn)
+
+
+class LocalClientPool:
+    """Same surface as SupabaseClientPool, backed by one shared LocalDatabase"""
+
+    def __init__(self, db: Optional[LocalDatabase] = None, base_url: str = 'http://localhost:54321'):
+        self.db = db or LocalDatabase()
+        self.storage = LocalStorage(self.db, base_url)
+        self.auth = LocalAuth(self.db)
+        self.client = LocalSupabaseClient(self.db, self.storage, self.auth)
+        self.service_role_client = self.client
+
+    def scoped(self, token: str) -> LocalSupabaseClient:
+        return LocalSupabaseClient(self.db, self.storage, self.auth, token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.db.stats()
+
+    def close(self):
+        pass
+
+
+def create_local_pool() -> LocalClientPool:
+    """Build the local backend from settings, loading LOCAL_DB_PATH when it exists"""
+    db = LocalDatabase(latency_ms=settings.LOCAL_DB_LATENCY_MS, jitter_ms=settings.LOCAL_DB_LATENCY_JITTER_MS)
+    if settings.LOCAL_DB_PATH and os.path.exists(settings.LOCAL_DB_PATH):
+        db.load_json(settings.LOCAL_DB_PATH)
+        logger.info(f"Loaded local database from {settings.LOCAL_DB_PATH}: {db.stats()['tables']}")
+    return LocalClientPool(db, settings.SUPABASE_URL or 'http://localhost:54321')
+
+
+@contextmanager
+def use_local_pool(pool: LocalClientPool) -> Iterator[LocalClientPool]:
+    """
+    Serve the already-imported app from ``pool`` (tests and benchmarks).
+
+    Modules bind ``supabase_client`` / ``supabase_service_role_client`` at
+    import time, so every ``app.*`` global holding the real clients is patched
+    along with the pool behind ``get_supabase_client_authenticated``.
+    """
+    import sys
+    from . import database
+    from .cache import cache_service
+
+    real = {id(database.supabase_client), id(database.supabase_service_role_client)}
+    patches = [patch.object(database, 'client_pool', pool)] + [
+        patch.object(module, name, pool.client)
+        for module_name, module in list(sys.modules.items())
+        if module_name.startswith('app.') and module is not None
+        for name, value in list(vars(module).items())
+        if id(value) in real
+    ]
+    # Principals resolved against the previous database are not valid for this one
+    cache_service.l1.delete_pattern('principal:*')
+    for override in patches:
+        override.start()
+    try:
+        yield pool
+    finally:
+        for override in patches:
+            override.stop()
+        cache_service.l1.delete_pattern('principal:*')
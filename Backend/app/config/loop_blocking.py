@@ -0,0 +1,233 @@
+"""
+Detection of code that blocks the event loop.
+
+A heartbeat callback runs on the loop every ``threshold / 2`` seconds; a
+watcher thread notices when the heartbeat stops. When no heartbeat has run
+for longer than LOOP_BLOCK_THRESHOLD_MS, some callback is holding the loop
+(typically a synchronous supabase, storage or PDF call inside an
+``async def``), so the watcher captures the loop thread's stack right then.
+When the heartbeat resumes, the stall's duration is recorded against the
+deepest application frame on that stack.
+
+Stalls are aggregated per site and ranked by total blocked time at
+``/api/v1/performance/blocking-calls``; counts are exported on ``/metrics``.
+Tests can use ``fail_on_blocking()`` to turn a stall into an error.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.dirname(APP_DIR)
+
+# Frames kept per recorded stack
+STACK_DEPTH = 25
+
+
+class BlockingCallError(AssertionError):
+    """Raised by ``fail_on_blocking`` when the event loop was blocked"""
+
+
+def _relative(filename: str) -> str:
+    return os.path.relpath(filename, BACKEND_DIR) if filename.startswith(BACKEND_DIR) else filename
+
+
+def describe_stack(frame: Optional[FrameType]) -> Tuple[str, str, List[str]]:
+    """
+    ``(site, blocking call, formatted stack)`` of a blocked loop thread.
+
+    The site is the deepest frame in application code (outside this module),
+    so every stall under one handler line is ranked together whichever
+    library call it ended in.
+    """
+    if frame is None:
+        return 'unknown', 'unknown', []
+    stack = traceback.extract_stack(frame)
+    innermost = stack[-1]
+    site = None
+    for entry in reversed(stack):
+        if entry.filename.startswith(APP_DIR) and entry.filename != __file__:
+            site = entry
+            break
+    site = site or innermost
+    return (
+        f"{_relative(site.filename)}:{site.lineno} {site.name}",
+        f"{_relative(innermost.filename)}:{innermost.lineno} {innermost.name}",
+        traceback.format_list(stack[-STACK_DEPTH:]),
+    )
+
+
+class BlockedSite:
+    """Stalls attributed to one application frame"""
+
+    __slots__ = ('site', 'count', 'total_seconds', 'max_seconds', 'last_seen', 'blocking_call', 'stack')
+
+    def __init__(self, site: str):
+        self.site = site
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seen = 0.0
+        self.blocking_call = ''
+        self.stack: List[str] = []
+
+    def to_dict(self, include_stack: bool = True) -> Dict[str, Any]:
+        entry = {
+            'site': self.site,
+            'count': self.count,
+            'total_ms': round(self.total_seconds * 1000, 3),
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'last_seen': self.last_seen,
+            'blocking_call': self.blocking_call,
+        }
+        if include_stack:
+            entry['stack'] = self.stack
+        return entry
+
+
+class BlockingCallDetector:
+    """Heartbeat on the event loop plus a watcher thread that samples it when it stalls"""
+
+    def __init__(self, threshold_ms: float = 100.0, max_sites: int = 200):
+        self.threshold = threshold_ms / 1000
+        self.interval = max(self.threshold / 2, 0.005)
+        self.max_sites = max_sites
+        self.total = 0
+        self.total_seconds = 0.0
+        self._sites: Dict[str, BlockedSite] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = 0.0
+        # Stack captured by the watcher for the stall in progress
+        self._pending: Optional[Tuple[str, str, List[str]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self):
+        """Start watching the running event loop (call from the loop thread)"""
+        if self.threshold <= 0 or self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._handle = self._loop.call_later(self.interval, self._beat)
+        self._watcher = threading.Thread(target=self._watch, name='loop-block-detector', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._watcher is not None:
+            self._watcher.join(timeout=1)
+        self._finish_stall(time.monotonic())
+        self._loop = self._handle = self._watcher = None
+
+    def _beat(self):
+        self._finish_stall(time.monotonic())
+        if not self._stopped.is_set():
+            self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _finish_stall(self, now: float):
+        with self._lock:
+            pending, self._pending = self._pending, None
+            blocked = now - self._last_beat - self.interval
+            self._last_beat = now
+        if pending is not None:
+            self._record(max(blocked, self.threshold), *pending)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            with self._lock:
+                if self._pending is not None or time.monotonic() - self._last_beat - self.interval < self.threshold:
+                    continue
+                self._pending = describe_stack(sys._current_frames().get(self._thread_id))
+
+    def _record(self, seconds: float, site: str, blocking_call: str, stack: List[str]):
+        with self._lock:
+            self.total += 1
+            self.total_seconds += seconds
+            entry = self._sites.get(site)
+            first = entry is None
+            if first:
+                if len(self._sites) >= self.max_sites:
+                    # Make room by dropping the site with the least blocked time
+                    del self._sites[min(self._sites.values(), key=lambda s: s.total_seconds).site]
+                entry = self._sites[site] = BlockedSite(site)
+            entry.count += 1
+            entry.total_seconds += seconds
+            entry.max_seconds = max(entry.max_seconds, seconds)
+            entry.last_seen = time.time()
+            entry.blocking_call = blocking_call
+            entry.stack = stack
+        if first:
+            logger.warning(f"Event loop blocked for {seconds * 1000:.0f}ms at {site} in {blocking_call}\n{''.join(stack)}")
+        else:
+            logger.warning(f"Event loop blocked for {seconds * 1000:.0f}ms at {site} in {blocking_call} ({entry.count} times)")
+
+    def sites(self, limit: Optional[int] = None, include_stack: bool = True) -> List[Dict[str, Any]]:
+        """Blocking sites, most total blocked time first"""
+        with self._lock:
+            ranked = sorted(self._sites.values(), key=lambda s: s.total_seconds, reverse=True)
+            return [entry.to_dict(include_stack) for entry in ranked[:limit]]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'threshold_ms': self.threshold * 1000,
+            'blocked': self.total,
+            'blocked_ms': round(self.total_seconds * 1000, 3),
+            'sites': len(self._sites),
+        }
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.total_seconds = 0.0
+            self._sites.clear()
+
+
+@contextmanager
+def fail_on_blocking(threshold_ms: float = 50.0) -> Iterator[BlockingCallDetector]:
+    """
+    Raise ``BlockingCallError`` if the event loop is blocked inside the block.
+
+    Use from a coroutine (e.g. an ``@pytest.mark.asyncio`` test):
+
+        with fail_on_blocking(50):
+            await handler()
+    """
+    detector = BlockingCallDetector(threshold_ms)
+    detector.start()
+    try:
+        yield detector
+    finally:
+        detector.stop()
+    if detector.total:
+        details = '\n'.join(f"{s['site']} in {s['blocking_call']}: {s['max_ms']:.0f}ms" for s in detector.sites())
+        raise BlockingCallError(f"Event loop blocked {detector.total} time(s) over {threshold_ms:.0f}ms:\n{details}")
+
+
+# Global per-worker instance
+blocking_detector = BlockingCallDetector(settings.LOOP_BLOCK_THRESHOLD_MS)
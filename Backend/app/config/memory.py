@@ -0,0 +1,271 @@
+"""
+Memory diagnostics for the performance endpoints.
+
+- MemoryProfiler: starts/stops tracemalloc on demand, keeps a few named
+  snapshots and reports top allocation sites and diffs between snapshots
+- object_counts: live (gc-tracked) objects by type
+- RssWatchdog: a background task that logs when the worker's resident set
+  size crosses MEMORY_RSS_THRESHOLDS_MB, with the top allocation sites when
+  tracemalloc is running
+
+tracemalloc slows allocation-heavy code noticeably, so it is off unless
+MEMORY_TRACEMALLOC_FRAMES is set or it is started through the API. Snapshot
+a worker before and after the suspect workload (a large report, a bulk
+listing) and diff the two to see which lines kept memory.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - falls back to /proc
+    psutil = None
+
+from .cache import cache_service
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY = ('lineno', 'filename', 'traceback')
+
+# Allocations made by the diagnostics themselves
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    """Highest resident set size so far (0 where the platform does not report it)"""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
+
+def _stat_to_dict(stat: Any, group_by: str) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    entry = {
+        'site': f"{frame.filename}:{frame.lineno}" if group_by != 'filename' else frame.filename,
+        'size_bytes': stat.size,
+        'count': stat.count,
+    }
+    if hasattr(stat, 'size_diff'):
+        entry['size_diff_bytes'] = stat.size_diff
+        entry['count_diff'] = stat.count_diff
+    if group_by == 'traceback':
+        entry['traceback'] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return entry
+
+
+class MemoryProfiler:
+    """tracemalloc control and named snapshots for this worker"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1):
+        """Start tracing allocations, keeping ``frames`` frames per traceback"""
+        if tracemalloc.is_tracing():
+            if tracemalloc.get_traceback_limit() == frames:
+                return
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        logger.info(f"tracemalloc started ({frames} frames)")
+
+    def stop(self):
+        """Stop tracing; stored snapshots are kept"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+    def status(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            return {'tracing': False, 'snapshots': len(self._snapshots)}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'tracing': True,
+            'frames': tracemalloc.get_traceback_limit(),
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+            'snapshots': len(self._snapshots),
+        }
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def snapshot(self, label: str = '') -> Dict[str, Any]:
+        """Take and keep a snapshot; the oldest is dropped beyond ``max_snapshots``"""
+        snapshot = self._take()
+        meta = {
+            'id': uuid.uuid4().hex[:12],
+            'label': label,
+            'taken_at': time.time(),
+            'traced_bytes': sum(trace.size for trace in snapshot.traces),
+            'rss_bytes': rss_bytes(),
+        }
+        self._snapshots[meta['id']] = {'meta': meta, 'snapshot': snapshot}
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return meta
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        """Metadata of kept snapshots, oldest first"""
+        return [entry['meta'] for entry in self._snapshots.values()]
+
+    def _get(self, snapshot_id: Optional[str]) -> tracemalloc.Snapshot:
+        if snapshot_id is None:
+            return self._take()
+        entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(snapshot_id)
+        return entry['snapshot']
+
+    def top(self, snapshot_id: Optional[str] = None, limit: int = 20, group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """Largest allocation sites of a kept snapshot (or of a fresh one)"""
+        stats = self._get(snapshot_id).statistics(group_by)
+        return [_stat_to_dict(stat, group_by) for stat in stats[:limit]]
+
+    def diff(self, base_id: str, target_id: Optional[str] = None, limit: int = 20,
+             group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """Sites whose allocations grew most from ``base_id`` to ``target_id`` (or now)"""
+        base = self._get(base_id)
+        stats = self._get(target_id).compare_to(base, group_by)
+        return [_stat_to_dict(stat, group_by) for stat in stats[:limit]]
+
+    def clear(self):
+        self._snapshots.clear()
+
+
+def object_counts(limit: int = 30, types: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Live gc-tracked objects by type, most numerous first.
+
+    Atomic objects (str, int, float) are not tracked by the gc and are not
+    counted; dicts and lists holding query rows are.
+    """
+    counts: Counter = Counter()
+    for obj in gc.get_objects():
+        kind = type(obj)
+        counts[kind.__name__ if kind.__module__ == 'builtins' else f"{kind.__module__}.{kind.__qualname__}"] += 1
+    selected = counts.most_common(limit) if not types else [(name, counts.get(name, 0)) for name in types]
+    return {
+        'total': sum(counts.values()),
+        'gc_counts': list(gc.get_count()),
+        'types': [{'type': name, 'count': count} for name, count in selected],
+    }
+
+
+def parse_thresholds(value: str) -> List[int]:
+    """``"512,1024"`` -> ``[512, 1024]`` (megabytes, ascending)"""
+    return sorted({int(part) for part in value.split(',') if part.strip()})
+
+
+class RssWatchdog:
+    """Logs when resident memory crosses a threshold (re-armed 10% below it)"""
+
+    def __init__(self, thresholds_mb: Sequence[int] = (512, 1024, 2048), interval: float = 30.0):
+        self.thresholds_mb = sorted(thresholds_mb)
+        self.interval = interval
+        self.crossed: List[int] = []
+        self.last_rss = 0
+        self.max_rss = 0
+        self.alerts = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def check(self) -> List[int]:
+        """Sample RSS once; returns the thresholds newly crossed"""
+        rss = rss_bytes()
+        self.last_rss = rss
+        self.max_rss = max(self.max_rss, rss)
+        newly = []
+        for threshold in self.thresholds_mb:
+            limit = threshold * 1024 * 1024
+            if rss >= limit and threshold not in self.crossed:
+                self.crossed.append(threshold)
+                newly.append(threshold)
+            elif rss < limit * 0.9 and threshold in self.crossed:
+                self.crossed.remove(threshold)
+                logger.info(f"RSS back below {threshold} MB: {rss / 1048576:.0f} MB")
+        if newly:
+            self.alerts += 1
+            self._alert(rss, newly[-1])
+        return newly
+
+    def _alert(self, rss: int, threshold: int):
+        details = f"L1 cache {cache_service.l1.current_bytes / 1048576:.1f} MB in {len(cache_service.l1)} entries"
+        if tracemalloc.is_tracing():
+            sites = memory_profiler.top(limit=5)
+            details += "; top allocation sites: " + ', '.join(
+                f"{site['site']} {site['size_bytes'] / 1048576:.1f} MB" for site in sites
+            )
+        logger.warning(f"RSS {rss / 1048576:.0f} MB crossed {threshold} MB ({details})")
+
+    async def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"RSS watchdog check failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.thresholds_mb and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'interval_seconds': self.interval,
+            'thresholds_mb': self.thresholds_mb,
+            'crossed_mb': sorted(self.crossed),
+            'last_rss_bytes': self.last_rss,
+            'max_rss_bytes': self.max_rss,
+            'alerts': self.alerts,
+        }
+
+
+# Global per-worker instances
+memory_profiler = MemoryProfiler(settings.MEMORY_SNAPSHOT_LIMIT)
+rss_watchdog = RssWatchdog(parse_thresholds(settings.MEMORY_RSS_THRESHOLDS_MB), settings.MEMORY_WATCHDOG_INTERVAL)
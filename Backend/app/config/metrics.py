@@ -0,0 +1,538 @@
+"""
+In-process request and event-loop metrics for the performance endpoints.
+
+- RequestMetrics: per-route latency samples (bounded window) for p50/p95/p99,
+  request/error counts and the number of requests currently in flight
+- LoopLagMonitor: a background task that measures how late the event loop
+  wakes it up, i.e. how long other coroutines held the loop (exported as a
+  histogram; single callbacks that block it are caught by ``loop_blocking``)
+
+- HttpMetrics: Prometheus-style counters and latency histograms per route,
+  exported as text by ``render_prometheus``
+- MetricsMiddleware: pure ASGI middleware feeding both of the above; it also
+  opens the request's query trace and returns its totals as ``Server-Timing``,
+  and starts a profile for requests that ask for one (see ``profiling``)
+
+Routes are keyed by their template (``GET /properties/{property_id}``), never
+the raw path, so cardinality stays bounded.
+
+With several uvicorn workers, set METRICS_MULTIPROC_DIR to a directory shared
+by the workers. Each worker periodically writes its cumulative metrics there
+and ``/metrics`` merges every worker's file, so any worker can answer a scrape.
+Counters from workers that have exited are kept (counters stay monotonic);
+their in-flight gauges are dropped. Clear the directory when deploying.
+"""
+
+import asyncio
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .cache import cache_service
+from ..db.loaders import begin_request_scope
+from .query_trace import begin_request_trace, get_query_budget, new_request_id
+from .profiling import request_profiler
+from .loop_blocking import blocking_detector
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class RouteStats:
+    """Counters plus the most recent latency samples for one route"""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.queries = 0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float, status_code: int, queries: int = 0):
+        self.count += 1
+        self.queries += queries
+        if status_code >= 500:
+            self.errors += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+            'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'avg_queries': round(self.queries / self.count, 2) if self.count else 0.0,
+        }
+
+
+class RequestMetrics:
+    """Per-route latency and in-flight tracking for this worker"""
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self.in_flight = 0
+        self.started_at = time.time()
+        self._routes: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def request_started(self):
+        self.in_flight += 1
+
+    def request_finished(self, route: str, seconds: float, status_code: int, queries: int = 0):
+        self.in_flight -= 1
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats(self.window)
+            stats.observe(seconds, status_code, queries)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {route: stats.summary() for route, stats in self._routes.items()}
+        return {
+            'in_flight': self.in_flight,
+            'total': sum(route['count'] for route in routes.values()),
+            'routes': dict(sorted(routes.items(), key=lambda item: item[1]['p95_ms'], reverse=True)),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def route_path(scope: Dict[str, Any]) -> str:
+    """Path template of the route that handled the request (after routing)"""
+    return getattr(scope.get('route'), 'path', None) or 'unmatched'
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """``METHOD /path/{param}`` for a handled request (after routing)"""
+    return f"{scope.get('method', 'GET')} {route_path(scope)}"
+
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class LoopLagMonitor:
+    """Samples event-loop scheduling delay in the background"""
+
+    def __init__(self, interval: float = 0.5, window: int = 120, buckets: Iterable[float] = LAG_BUCKETS):
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        # Cumulative histogram for /metrics (last bucket is +Inf)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def observe(self, lag: float):
+        self.samples.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        self.counts[bisect.bisect_left(self.buckets, lag)] += 1
+        self.total_lag += lag
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.observe(max(0.0, loop.time() - expected))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'interval_ms': self.interval * 1000,
+            'last_ms': round(self.samples[-1] * 1000, 3) if self.samples else 0.0,
+            'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+            'max_ms': round(self.max_lag * 1000, 3),
+        }
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HttpMetrics:
+    """
+    Cumulative per-route counters and latency histograms for this worker.
+
+    Only touched from the event loop thread, so updates take no lock.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.in_flight = 0
+        # (method, route) -> [per-bucket counts (last is +Inf), sum, count]
+        self.durations: Dict[Tuple[str, str], List[Any]] = {}
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+        self.request_bytes: Dict[Tuple[str, str], int] = {}
+        self.response_bytes: Dict[Tuple[str, str], int] = {}
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, bytes_in: int, bytes_out: int):
+        key = (method, route)
+        histogram = self.durations.get(key)
+        if histogram is None:
+            histogram = self.durations[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+        status_key = (method, route, str(status_code))
+        self.responses[status_key] = self.responses.get(status_key, 0) + 1
+        self.request_bytes[key] = self.request_bytes.get(key, 0) + bytes_in
+        self.response_bytes[key] = self.response_bytes.get(key, 0) + bytes_out
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable copy of the cumulative metrics"""
+        return {
+            'pid': os.getpid(),
+            'buckets': list(self.buckets),
+            'in_flight': self.in_flight,
+            'durations': [[m, r, list(h[0]), h[1], h[2]] for (m, r), h in self.durations.items()],
+            'responses': [[m, r, s, n] for (m, r, s), n in self.responses.items()],
+            'request_bytes': [[m, r, n] for (m, r), n in self.request_bytes.items()],
+            'response_bytes': [[m, r, n] for (m, r), n in self.response_bytes.items()],
+        }
+
+    def reset(self):
+        self.durations.clear()
+        self.responses.clear()
+        self.request_bytes.clear()
+        self.response_bytes.clear()
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessStore:
+    """Per-worker snapshot files in a directory shared by all workers"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def write(self, snapshot: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"metrics-{snapshot['pid']}.json")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.metrics-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)  # Readers never see a partial file
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics file {path}: {e}")
+        return snapshots
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum counters and histograms across workers; in-flight only for live workers"""
+    merged = {
+        'buckets': snapshots[0]['buckets'] if snapshots else list(DEFAULT_BUCKETS),
+        'in_flight': 0,
+        'durations': {},
+        'responses': {},
+        'request_bytes': {},
+        'response_bytes': {},
+        'cache': {},
+        'event_loop': None,
+    }
+    for snap in snapshots:
+        if _pid_alive(snap.get('pid', 0)):
+            merged['in_flight'] += snap.get('in_flight', 0)
+        for method, route, counts, total, count in snap.get('durations', []):
+            histogram = merged['durations'].setdefault((method, route), [[0] * len(counts), 0.0, 0])
+            histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+            histogram[1] += total
+            histogram[2] += count
+        for name in ('responses', 'request_bytes', 'response_bytes'):
+            for *labels, value in snap.get(name, []):
+                merged[name][tuple(labels)] = merged[name].get(tuple(labels), 0) + value
+        for prefix, counters in snap.get('cache', {}).items():
+            target = merged['cache'].setdefault(prefix, {})
+            for field, value in counters.items():
+                target[field] = target.get(field, 0) + value
+        loop = snap.get('event_loop')
+        if loop:
+            target = merged['event_loop']
+            if target is None:
+                merged['event_loop'] = {**loop, 'counts': list(loop['counts'])}
+            else:
+                target['counts'] = [a + b for a, b in zip(target['counts'], loop['counts'])]
+                for field in ('sum', 'count', 'blocked', 'blocked_seconds'):
+                    target[field] += loop[field]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value)) if value != math.inf else '+Inf'
+
+
+def render_prometheus(merged: Dict[str, Any]) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = [
+        '# HELP http_requests_total Completed HTTP requests by route template and status code.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (method, route, status_code), value in sorted(merged['responses'].items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {value}")
+
+    lines += [
+        '# HELP http_request_duration_seconds Request latency by route template.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    bounds = list(merged['buckets']) + [math.inf]
+    for (method, route), (counts, total, count) in sorted(merged['durations'].items()):
+        cumulative = 0
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            labels = _labels(method=method, route=route, le=_format_float(bound))
+            lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+        lines.append(f"http_request_duration_seconds_sum{_labels(method=method, route=route)} {total}")
+        lines.append(f"http_request_duration_seconds_count{_labels(method=method, route=route)} {count}")
+
+    for name, key, help_text in (
+        ('http_request_size_bytes_total', 'request_bytes', 'Request body bytes received by route template.'),
+        ('http_response_size_bytes_total', 'response_bytes', 'Response body bytes sent by route template.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (method, route), value in sorted(merged[key].items()):
+            lines.append(f"{name}{_labels(method=method, route=route)} {value}")
+
+    lines += [
+        '# HELP http_requests_in_flight Requests currently being handled (live workers).',
+        '# TYPE http_requests_in_flight gauge',
+        f"http_requests_in_flight {merged['in_flight']}",
+    ]
+
+    if merged['cache']:
+        lines += [
+            '# HELP cache_lookups_total Cache lookups by key prefix and outcome.',
+            '# TYPE cache_lookups_total counter',
+        ]
+        for prefix, counters in sorted(merged['cache'].items()):
+            for field, result in (('l1_hits', 'l1_hit'), ('l2_hits', 'l2_hit'), ('misses', 'miss')):
+                lines.append(f"cache_lookups_total{_labels(prefix=prefix, result=result)} {counters.get(field, 0)}")
+
+    loop = merged.get('event_loop')
+    if loop:
+        lines += [
+            '# HELP event_loop_lag_seconds How late the event loop ran a periodic timer.',
+            '# TYPE event_loop_lag_seconds histogram',
+        ]
+        cumulative = 0
+        for bound, bucket_count in zip(list(loop['buckets']) + [math.inf], loop['counts']):
+            cumulative += bucket_count
+            lines.append(f"event_loop_lag_seconds_bucket{_labels(le=_format_float(bound))} {cumulative}")
+        lines += [
+            f"event_loop_lag_seconds_sum {loop['sum']}",
+            f"event_loop_lag_seconds_count {loop['count']}",
+            '# HELP event_loop_blocked_total Times one callback held the event loop longer than LOOP_BLOCK_THRESHOLD_MS.',
+            '# TYPE event_loop_blocked_total counter',
+            f"event_loop_blocked_total {loop['blocked']}",
+            '# HELP event_loop_blocked_seconds_total Time the event loop spent blocked by such callbacks.',
+            '# TYPE event_loop_blocked_seconds_total counter',
+            f"event_loop_blocked_seconds_total {loop['blocked_seconds']}",
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _content_length(scope: Dict[str, Any]) -> int:
+    try:
+        return int(_header(scope, b'content-length') or 0)
+    except ValueError:
+        return 0
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI instrumentation: latency, status, body sizes and in-flight count
+    per route template. Also opens the request's entity-loader scope and query
+    trace, and adds ``Server-Timing`` and ``X-Request-ID`` response headers
+    (plus ``X-Profile-Id`` when the request was profiled).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # Fresh batching/memoizing entity loaders for this request
+        loaders = begin_request_scope()
+        request_id = new_request_id(_header(scope, b'x-request-id'))
+        trace = begin_request_trace(request_id, scope.get('method', 'GET'), scope.get('path', ''))
+        profile = request_profiler.begin(scope, request_id) if request_profiler.enabled else None
+        http_metrics.in_flight += 1
+        request_metrics.request_started()
+        status_code = 500
+        bytes_in = 0
+        bytes_out = 0
+
+        async def receive_wrapper():
+            nonlocal bytes_in
+            message = await receive()
+            if message['type'] == 'http.request':
+                bytes_in += len(message.get('body', b''))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code, bytes_out
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', trace.server_timing(time.perf_counter() - start).encode('latin-1')))
+                headers.append((b'x-request-id', request_id.encode('latin-1')))
+                if profile is not None:
+                    headers.append((b'x-profile-id', profile.id.encode('latin-1')))
+                message = {**message, 'headers': headers}
+            elif message['type'] == 'http.response.body':
+                bytes_out += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - start
+            http_metrics.in_flight -= 1
+            method = scope.get('method', 'GET')
+            path = route_path(scope)
+            if profile is not None:
+                request_profiler.finish(profile, f"{method} {path}", status_code, trace.totals())
+            if not bytes_in:
+                # Body not consumed (rejected before reading): use the declared size
+                bytes_in = _content_length(scope)
+            http_metrics.observe(method, path, status_code, seconds, bytes_in, bytes_out)
+            request_metrics.request_finished(f"{method} {path}", seconds, status_code, trace.count)
+            budget = get_query_budget(scope.get('endpoint'))
+            if budget is not None and trace.count > budget:
+                logger.warning(f"{method} {path} issued {trace.count} queries (budget {budget}) [{request_id}]: {trace.by_table()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"{method} {scope.get('path')} - {status_code} - {seconds:.4f}s [{request_id}]")
+                if trace.count:
+                    logger.debug(f"Queries for {method} {scope.get('path')}: {trace.totals()} {trace.by_table()}")
+                loader_stats = loaders.stats()
+                if loader_stats:
+                    logger.debug(f"Entity loader stats for {method} {scope.get('path')}: {loader_stats}")
+
+
+# Global per-worker instances
+request_metrics = RequestMetrics(settings.METRICS_LATENCY_WINDOW)
+loop_lag_monitor = LoopLagMonitor(settings.LOOP_LAG_INTERVAL)
+http_metrics = HttpMetrics()
+multiprocess_store = MultiprocessStore(settings.METRICS_MULTIPROC_DIR)
+
+
+def local_snapshot() -> Dict[str, Any]:
+    """This worker's HTTP metrics plus its cache lookup counters and event-loop health"""
+    snapshot = http_metrics.snapshot()
+    snapshot['cache'] = {
+        prefix: {field: counters[field] for field in ('l1_hits', 'l2_hits', 'misses')}
+        for prefix, counters in cache_service.stats.snapshot().items()
+    }
+    snapshot['event_loop'] = {
+        'buckets': list(loop_lag_monitor.buckets),
+        'counts': list(loop_lag_monitor.counts),
+        'sum': loop_lag_monitor.total_lag,
+        'count': sum(loop_lag_monitor.counts),
+        'blocked': blocking_detector.total,
+        'blocked_seconds': blocking_detector.total_seconds,
+    }
+    return snapshot
+
+
+def flush_metrics():
+    """Write this worker's snapshot for the other workers (multiprocess mode only)"""
+    if multiprocess_store.enabled:
+        try:
+            multiprocess_store.write(local_snapshot())
+        except OSError as e:
+            logger.error(f"Failed to write metrics snapshot: {e}")
+
+
+def collect_metrics() -> str:
+    """Prometheus text for the whole deployment (or this worker in single-process mode)"""
+    if not multiprocess_store.enabled:
+        return render_prometheus(merge_snapshots([local_snapshot()]))
+    flush_metrics()
+    return render_prometheus(merge_snapshots(multiprocess_store.read_all()))
+
+
+async def metrics_flush_loop():
+    """Background task: periodically publish this worker's snapshot"""
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL)
+        flush_metrics()
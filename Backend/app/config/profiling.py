@@ -0,0 +1,449 @@
+"""
+On-demand profiling of single requests.
+
+An operator sends ``X-Profile: 1`` (or ``?_profile=1``) together with the
+``X-Performance-Token`` header; when PROFILING_ENABLED and PERFORMANCE_API_TOKEN
+are set, that one request runs under a sampling profiler and the response carries ``X-Profile-Id``. The
+result is fetched from ``/api/v1/performance/profiles/{id}`` as a speedscope
+document (https://www.speedscope.app), a pstats file or a JSON call tree.
+
+The sampler is async-aware: instead of sampling whatever the event loop thread
+happens to run, it walks the request's tasks. A suspended task contributes its
+coroutine stack ending in an ``<await ...>`` frame (``<await PostgREST select
+units>`` inside ``run_query``), so time spent waiting on the database shows up
+under the code that issued the query. Tasks created while serving the request
+(task groups, ``asyncio.gather``) are followed too; concurrent branches each
+contribute their own samples, so a profile's total can exceed wall time.
+
+Nothing is installed until a profile starts: with profiling disabled the
+middleware checks one attribute. Profiles are capped at PROFILE_MAX_PER_MINUTE
+per worker; requests over the cap are served unprofiled.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from types import FrameType
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from .query_executor import run_query
+from .query_trace import describe_query
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per profile (about a minute at the default interval)
+MAX_SAMPLES = 60000
+
+# (name, file, first line)
+FrameKey = Tuple[str, str, int]
+
+_RUN_QUERY_CODE = run_query.__code__
+_READY = ('<ready, waiting for the event loop>', '', 0)
+
+_active_session: ContextVar[Optional['ProfileSession']] = ContextVar('active_profile', default=None)
+
+
+def _frame_key(frame: FrameType) -> FrameKey:
+    code = frame.f_code
+    return getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno
+
+
+def _coroutine_frames(coro: Any) -> List[FrameType]:
+    """Frames of a coroutine and everything it is awaiting, outermost first"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None) or getattr(coro, 'ag_frame', None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None) or getattr(coro, 'ag_await', None)
+    return frames
+
+
+def _await_key(frames: List[FrameType], waiter: Any) -> FrameKey:
+    """Synthetic leaf frame naming what a suspended task is waiting for"""
+    for frame in reversed(frames):
+        if frame.f_code is _RUN_QUERY_CODE:
+            query = frame.f_locals.get('query')
+            if query is not None:
+                table, operation, _ = describe_query(query)
+                return f'<await PostgREST {operation} {table}>', '', 0
+            break
+    return f'<await {type(waiter).__name__}>', '', 0
+
+
+class ProfileSession:
+    """Samples collected for one request"""
+
+    def __init__(self, profile_id: str, request_id: str, method: str, path: str,
+                 loop: asyncio.AbstractEventLoop, root: asyncio.Task, root_code: Any):
+        self.id = profile_id
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.loop = loop
+        self.root = root
+        self.root_key = (getattr(root_code, 'co_qualname', root_code.co_name), root_code.co_filename, root_code.co_firstlineno)
+        self.thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.last_sample = self.start
+        self.frames: Dict[FrameKey, int] = {}
+        self.samples: List[Tuple[int, ...]] = []
+        self.weights: List[float] = []
+        self.truncated = False
+        self.closed = False
+        # task -> task that created it
+        self._parents: Dict[asyncio.Task, Optional[asyncio.Task]] = {}
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+
+    def adopt(self, task: asyncio.Task, parent: Optional[asyncio.Task]):
+        with self._lock:
+            self._parents[task] = parent
+
+    def sample(self, thread_frames: Dict[int, FrameType], now: float):
+        """Record the stack of every task of this request that is not just waiting on another"""
+        with self._sample_lock:
+            if not self.closed:
+                self._sample(thread_frames, now)
+
+    def _sample(self, thread_frames: Dict[int, FrameType], now: float):
+        weight = (now - self.last_sample) * 1000
+        self.last_sample = now
+        if len(self.samples) >= MAX_SAMPLES:
+            self.truncated = True
+            return
+        with self._lock:
+            parents = {task: parent for task, parent in self._parents.items() if not task.done()}
+        children: Dict[asyncio.Task, List[asyncio.Task]] = {}
+        for task, parent in parents.items():
+            children.setdefault(parent, []).append(task)
+
+        running = asyncio.current_task(self.loop)
+        visited: Set[asyncio.Task] = set()
+        stacks: List[List[FrameKey]] = []
+
+        def walk(task: asyncio.Task, prefix: List[FrameKey]):
+            if task in visited or task.done():
+                return
+            visited.add(task)
+            frames = _coroutine_frames(task.get_coro())
+            if task is running and frames:
+                # Synchronous calls below the innermost coroutine
+                inner = []
+                frame = thread_frames.get(self.thread_id)
+                while frame is not None and frame is not frames[-1]:
+                    inner.append(frame)
+                    frame = frame.f_back
+                if frame is not None:
+                    frames.extend(reversed(inner))
+            stack = prefix + self._trim([_frame_key(frame) for frame in frames])
+            if task is running:
+                stacks.append(stack)
+                return
+            waiter = getattr(task, '_fut_waiter', None)
+            awaited = []
+            if isinstance(waiter, asyncio.Task):
+                awaited = [waiter]
+            elif waiter is not None and hasattr(waiter, '_children'):
+                awaited = [child for child in waiter._children if isinstance(child, asyncio.Task)]  # gather()
+            awaited = [child for child in awaited if child not in visited and not child.done()]
+            if not awaited:
+                # e.g. a task group's children, awaited through a stream or event
+                awaited = [child for child in children.get(task, ()) if child not in visited]
+            if awaited:
+                for child in awaited:
+                    walk(child, stack)
+            elif waiter is None:
+                stacks.append(stack + [_READY])
+            else:
+                stacks.append(stack + [_await_key(frames, waiter)])
+
+        walk(self.root, [])
+        for task in parents:
+            if task not in visited:
+                # Fire-and-forget tasks started by the request
+                walk(task, [(f'<task {task.get_name()}>', '', 0)])
+
+        for stack in stacks:
+            self.samples.append(tuple(self._index(key) for key in stack))
+            self.weights.append(weight)
+
+    def _trim(self, stack: List[FrameKey]) -> List[FrameKey]:
+        """Drop server frames above the middleware that started the profile"""
+        return stack[stack.index(self.root_key):] if self.root_key in stack else stack
+
+    def _index(self, key: FrameKey) -> int:
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def close(self):
+        """Stop taking samples"""
+        with self._sample_lock:
+            self.closed = True
+
+    def to_speedscope(self, route: str, status_code: int, totals: Dict[str, Any]) -> Dict[str, Any]:
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        frames = sorted(self.frames, key=self.frames.get)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': f'{self.method} {self.path}',
+            'exporter': 'app.config.profiling',
+            'activeProfileIndex': 0,
+            'shared': {'frames': [{'name': name, 'file': file, 'line': line} for name, file, line in frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': f'{self.method} {self.path}',
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(sum(self.weights), 3),
+                'samples': [list(sample) for sample in self.samples],
+                'weights': [round(weight, 3) for weight in self.weights],
+            }],
+            'metadata': {
+                'id': self.id,
+                'request_id': self.request_id,
+                'method': self.method,
+                'path': self.path,
+                'route': route,
+                'status': status_code,
+                'started_at': self.started_at,
+                'duration_ms': round(duration_ms, 3),
+                'samples': len(self.samples),
+                'truncated': self.truncated,
+                'interval_ms': settings.PROFILE_SAMPLE_INTERVAL_MS,
+                'queries': totals,
+            },
+        }
+
+
+def to_pstats(document: Dict[str, Any]) -> bytes:
+    """
+    A speedscope profile as a marshalled pstats table (``pstats.Stats(path)``).
+
+    Call counts are sample counts; times are sampled wall time in seconds.
+    """
+    frames = [(frame['file'] or '~', frame['line'], frame['name']) for frame in document['shared']['frames']]
+    profile = document['profiles'][0]
+    stats: Dict[Tuple[str, int, str], List[Any]] = {}
+    for sample, weight in zip(profile['samples'], profile['weights']):
+        seconds = weight / 1000
+        seen = set()
+        for position, index in enumerate(sample):
+            func = frames[index]
+            entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+            if position == len(sample) - 1:
+                entry[2] += seconds
+            if func in seen:
+                continue  # Recursion: cumulative time counts once per sample
+            seen.add(func)
+            entry[0] += 1
+            entry[1] += 1
+            entry[3] += seconds
+            if position:
+                caller = frames[sample[position - 1]]
+                edge = entry[4].setdefault(caller, [0, 0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += 1
+                edge[3] += seconds
+                if position == len(sample) - 1:
+                    edge[2] += seconds
+    return marshal.dumps({
+        func: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+        for func, (cc, nc, tt, ct, callers) in stats.items()
+    })
+
+
+def to_call_tree(document: Dict[str, Any], min_ms: float = 0.0) -> Dict[str, Any]:
+    """A speedscope profile as a nested call tree with total and self time per node"""
+    frames = document['shared']['frames']
+    profile = document['profiles'][0]
+    root: Dict[str, Any] = {'name': document['name'], 'total_ms': 0.0, 'self_ms': 0.0, 'children': {}}
+    for sample, weight in zip(profile['samples'], profile['weights']):
+        node = root
+        node['total_ms'] += weight
+        for index in sample:
+            node = node['children'].setdefault(index, {**frames[index], 'total_ms': 0.0, 'self_ms': 0.0, 'children': {}})
+            node['total_ms'] += weight
+        node['self_ms'] += weight
+
+    def finish(node: Dict[str, Any]) -> Dict[str, Any]:
+        children = sorted(node['children'].values(), key=lambda child: child['total_ms'], reverse=True)
+        node['children'] = [finish(child) for child in children if child['total_ms'] >= min_ms]
+        node['total_ms'] = round(node['total_ms'], 3)
+        node['self_ms'] = round(node['self_ms'], 3)
+        return node
+
+    return finish(root)
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+class RequestProfiler:
+    """Starts profiles for requests that ask for one, samples them and keeps the results"""
+
+    def __init__(self, enabled: bool = False, max_per_minute: int = 6, interval_ms: float = 1.0,
+                 store_size: int = 20, directory: str = ''):
+        self.enabled = enabled
+        self.max_per_minute = max_per_minute
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.rate_limited = 0
+        self._started: Deque[float] = deque()
+        self._store: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._store_size = store_size
+        self._sessions: Set[ProfileSession] = set()
+        self._factories: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def requested(self, scope: Dict[str, Any]) -> bool:
+        """The request asks for a profile and carries the performance token (never without one configured)"""
+        flag = _header(scope, b'x-profile')
+        if flag is None and b'_profile=' in scope.get('query_string', b''):
+            flag = parse_qs(scope['query_string'].decode('latin-1')).get('_profile', [None])[0]
+        if (flag or '').lower() not in ('1', 'true', 'yes'):
+            return False
+        token = settings.PERFORMANCE_API_TOKEN
+        return bool(token) and hmac.compare_digest(_header(scope, b'x-performance-token') or '', token)
+
+    def allow(self) -> bool:
+        """Per-minute cap across this worker"""
+        now = time.monotonic()
+        while self._started and now - self._started[0] >= 60:
+            self._started.popleft()
+        if len(self._started) >= self.max_per_minute:
+            self.rate_limited += 1
+            return False
+        self._started.append(now)
+        return True
+
+    def begin(self, scope: Dict[str, Any], request_id: str) -> Optional[ProfileSession]:
+        """
+        Start profiling the current request if it asked for it.
+
+        Must be called from the task serving the request (the ASGI middleware).
+        """
+        if not self.requested(scope):
+            return None
+        if not self.allow():
+            logger.warning(f"Profile for {scope.get('method')} {scope.get('path')} skipped: over {self.max_per_minute}/min")
+            return None
+        loop = asyncio.get_running_loop()
+        session = ProfileSession(
+            uuid.uuid4().hex[:16], request_id, scope.get('method', 'GET'), scope.get('path', ''),
+            loop, asyncio.current_task(), sys._getframe(1).f_code,
+        )
+        _active_session.set(session)
+        with self._lock:
+            if loop not in self._factories:
+                self._factories[loop] = loop.get_task_factory()
+                loop.set_task_factory(self._task_factory)
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name='request-profiler', daemon=True)
+                self._thread.start()
+        return session
+
+    def finish(self, session: ProfileSession, route: str, status_code: int, totals: Dict[str, Any]):
+        """Stop sampling ``session`` and store its profile"""
+        with self._lock:
+            self._sessions.discard(session)
+            if not any(other.loop is session.loop for other in self._sessions):
+                session.loop.set_task_factory(self._factories.pop(session.loop, None))
+        session.close()
+        _active_session.set(None)
+        document = session.to_speedscope(route, status_code, totals)
+        self.save(document)
+        logger.info(f"Profiled {session.method} {session.path} as {session.id} ({len(session.samples)} samples)")
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Any, **kwargs) -> asyncio.Future:
+        previous = self._factories.get(loop)
+        task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+        session = _active_session.get()
+        if session is not None:
+            session.adopt(task, asyncio.current_task(loop))
+        return task
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            thread_frames = sys._current_frames()
+            now = time.perf_counter()
+            for session in sessions:
+                try:
+                    session.sample(thread_frames, now)
+                except Exception as e:
+                    # Stacks change under the sampler; drop the sample
+                    logger.debug(f"Profile sample failed: {e}")
+            del thread_frames
+
+    def save(self, document: Dict[str, Any]):
+        profile_id = document['metadata']['id']
+        with self._lock:
+            self._store[profile_id] = document
+            while len(self._store) > self._store_size:
+                self._store.popitem(last=False)
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, f'{profile_id}.speedscope.json'), 'w') as f:
+                    json.dump(document, f)
+            except OSError as e:
+                logger.error(f"Failed to write profile {profile_id}: {e}")
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            document = self._store.get(profile_id)
+        if document is None and self.directory and profile_id.isalnum():
+            try:
+                with open(os.path.join(self.directory, f'{profile_id}.speedscope.json')) as f:
+                    document = json.load(f)
+            except (OSError, ValueError):
+                return None
+        return document
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first"""
+        with self._lock:
+            documents = list(self._store.values())
+        return [document['metadata'] for document in reversed(documents)]
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+        self._started.clear()
+        self.rate_limited = 0
+
+
+request_profiler = RequestProfiler(
+    enabled=settings.PROFILING_ENABLED,
+    max_per_minute=settings.PROFILE_MAX_PER_MINUTE,
+    interval_ms=settings.PROFILE_SAMPLE_INTERVAL_MS,
+    store_size=settings.PROFILE_STORE_SIZE,
+    directory=settings.PROFILE_DIR,
+)
@@ -0,0 +1,79 @@
+"""
+Async execution path for Supabase (PostgREST) queries.
+
+supabase-py's query builders are synchronous; calling ``.execute()`` inside an
+``async def`` blocks the event loop for the whole HTTP round trip. ``run_query``
+runs the blocking call on a bounded, dedicated thread pool instead so concurrent
+requests overlap their I/O, and enforces a per-call timeout. Each call is
+traced (see ``query_trace``) against the current request.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .query_trace import execute_traced
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the dedicated query executor, creating it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DB_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="supabase-query",
+        )
+    return _executor
+
+
+async def run_query(query: Any, timeout: Optional[float] = None) -> Any:
+    """
+    Execute a Supabase query builder without blocking the event loop.
+
+    Args:
+        query: Any supabase-py builder exposing a synchronous ``execute()``
+        timeout: Seconds to wait before giving up (defaults to DB_QUERY_TIMEOUT)
+
+    Returns:
+        The builder's response object (``APIResponse`` / ``SingleAPIResponse``)
+
+    Raises:
+        asyncio.TimeoutError: If the query does not finish within the timeout
+    """
+    loop = asyncio.get_running_loop()
+    # Copy the context so request-scoped contextvars are visible in the worker thread
+    ctx = contextvars.copy_context()
+    future = loop.run_in_executor(get_executor(), ctx.run, execute_traced, query, time.perf_counter())
+    timeout = settings.DB_QUERY_TIMEOUT if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(future, timeout=timeout if timeout > 0 else None)
+    except asyncio.TimeoutError:
+        logger.error(f"Supabase query timed out after {timeout}s")
+        raise
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Queue depth and worker usage of the query executor"""
+    if _executor is None:
+        return {"max_workers": settings.DB_EXECUTOR_MAX_WORKERS, "threads": 0, "queued": 0}
+    return {
+        "max_workers": _executor._max_workers,
+        "threads": len(_executor._threads),
+        "queued": _executor._work_queue.qsize(),
+    }
+
+
+def shutdown_executor():
+    """Stop the query executor (called on application shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
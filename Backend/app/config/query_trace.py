@@ -0,0 +1,314 @@
+"""
+Tracing for Supabase (PostgREST) queries.
+
+Every query executed through ``execute_traced`` (and therefore ``run_query``)
+produces a ``QueryRecord``: table, operation, filters, row count, response
+bytes, execution time and time spent queued for an executor thread.
+
+Records are attached to the current request's ``RequestTrace`` (opened by
+MetricsMiddleware), whose totals are returned to the client in a
+``Server-Timing`` header. Queries slower than DB_SLOW_QUERY_MS are logged and
+kept in a bounded in-memory log for ``/api/v1/performance/slow-queries``.
+
+Filter values are deliberately not recorded (only ``column=operator``), so
+traces and logs carry no tenant data.
+
+Routes declare how many queries they may issue with ``@query_budget(n)``.
+The test suite enforces budgets (and that counts do not grow with data size);
+at runtime an over-budget request is logged.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that shape the result rather than filter it; kept verbatim
+_MODIFIER_PARAMS = {'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+_OPERATIONS = {'GET': 'select', 'HEAD': 'count', 'PATCH': 'update', 'DELETE': 'delete'}
+
+# Per-request queries kept in detail; totals keep counting beyond this
+MAX_QUERIES_PER_REQUEST = 500
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declare the most Supabase queries one call of a route may issue,
+    including those of its dependencies (authentication reads the profile).
+
+    The budget must not depend on how many rows are involved: an endpoint
+    whose query count grows with the data has an N+1 loop.
+
+    Usage:
+        @router.get("/{unit_id}/history")
+        @query_budget(14)
+        async def get_unit_history(...):
+    """
+    def decorator(func: F) -> F:
+        func.__query_budget__ = max_queries
+        return func
+    return decorator
+
+
+def get_query_budget(endpoint: Any) -> Optional[int]:
+    """Declared budget of a route endpoint, if any"""
+    return getattr(endpoint, '__query_budget__', None)
+
+
+class QueryRecord:
+    """One executed query"""
+
+    __slots__ = (
+        'table', 'operation', 'filters', 'rows', 'bytes', 'duration_ms', 'wait_ms',
+        'error', 'request_id', 'method', 'path', 'timestamp',
+    )
+
+    def __init__(self, table: str, operation: str, filters: List[str]):
+        self.table = table
+        self.operation = operation
+        self.filters = filters
+        self.rows = 0
+        self.bytes = 0
+        self.duration_ms = 0.0
+        self.wait_ms = 0.0
+        self.error: Optional[str] = None
+        self.request_id: Optional[str] = None
+        self.method: Optional[str] = None
+        self.path: Optional[str] = None
+        self.timestamp = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'table': self.table,
+            'operation': self.operation,
+            'filters': self.filters,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'duration_ms': round(self.duration_ms, 3),
+            'wait_ms': round(self.wait_ms, 3),
+            'error': self.error,
+            'request_id': self.request_id,
+            'request': f"{self.method} {self.path}" if self.method else None,
+            'timestamp': self.timestamp,
+        }
+
+
+class RequestTrace:
+    """Queries issued while serving one HTTP request"""
+
+    def __init__(self, request_id: str, method: str = '', path: str = ''):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.queries: List[QueryRecord] = []
+        self.count = 0
+        self.rows = 0
+        self.bytes = 0
+        self.duration_ms = 0.0
+        self.wait_ms = 0.0
+        # Records are added from executor threads
+        self._lock = threading.Lock()
+
+    def add(self, record: QueryRecord):
+        with self._lock:
+            self.count += 1
+            self.rows += record.rows
+            self.bytes += record.bytes
+            self.duration_ms += record.duration_ms
+            self.wait_ms += record.wait_ms
+            if len(self.queries) < MAX_QUERIES_PER_REQUEST:
+                self.queries.append(record)
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'queries': self.count,
+                'rows': self.rows,
+                'bytes': self.bytes,
+                'duration_ms': round(self.duration_ms, 3),
+                'wait_ms': round(self.wait_ms, 3),
+            }
+
+    def by_table(self) -> Dict[str, Dict[str, Any]]:
+        """Query count and time per ``operation table``"""
+        with self._lock:
+            queries = list(self.queries)
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for record in queries:
+            entry = grouped.setdefault(f"{record.operation} {record.table}", {'queries': 0, 'duration_ms': 0.0})
+            entry['queries'] += 1
+            entry['duration_ms'] = round(entry['duration_ms'] + record.duration_ms, 3)
+        return grouped
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """``Server-Timing`` header value with the database totals"""
+        with self._lock:
+            parts = [f'db;dur={self.duration_ms:.2f};desc="{self.count} queries"']
+            if self.wait_ms >= 0.01:
+                parts.append(f'db-wait;dur={self.wait_ms:.2f}')
+        if total_seconds is not None:
+            parts.append(f'app;dur={total_seconds * 1000:.2f}')
+        return ', '.join(parts)
+
+
+class SlowQueryLog:
+    """Most recent queries slower than the threshold"""
+
+    def __init__(self, threshold_ms: float = 500.0, size: int = 200):
+        self.threshold_ms = threshold_ms
+        self.total = 0
+        self._entries: Deque[QueryRecord] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, record: QueryRecord):
+        if self.threshold_ms <= 0 or record.duration_ms < self.threshold_ms:
+            return
+        with self._lock:
+            self.total += 1
+            self._entries.append(record)
+        logger.warning(
+            f"Slow query: {record.operation} {record.table} took {record.duration_ms:.1f}ms "
+            f"(waited {record.wait_ms:.1f}ms, rows={record.rows}, bytes={record.bytes}, "
+            f"filters={record.filters}, request={record.request_id} {record.method} {record.path})"
+        )
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest first"""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        return [record.to_dict() for record in entries[:limit]]
+
+    def clear(self):
+        with self._lock:
+            self.total = 0
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.DB_SLOW_QUERY_MS, settings.DB_SLOW_QUERY_LOG_SIZE)
+
+_request_trace: ContextVar[Optional[RequestTrace]] = ContextVar('request_trace', default=None)
+# The query currently executing in this thread, so the HTTP response hook can attribute bytes
+_current_query: ContextVar[Optional[QueryRecord]] = ContextVar('current_query', default=None)
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Reuse a caller-supplied request id when it is sane, otherwise generate one"""
+    if incoming and len(incoming) <= 64 and incoming.isprintable():
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+def begin_request_trace(request_id: str, method: str = '', path: str = '') -> RequestTrace:
+    """Start collecting queries for the current request"""
+    trace = RequestTrace(request_id, method, path)
+    _request_trace.set(trace)
+    return trace
+
+
+def current_request_trace() -> Optional[RequestTrace]:
+    return _request_trace.get()
+
+
+def describe_query(query: Any) -> Tuple[str, str, List[str]]:
+    """``(table, operation, filters)`` of a postgrest builder"""
+    request = getattr(query, 'request', None)
+    path = getattr(request, 'path', None)
+    if path is not None and not isinstance(path, str):
+        path = getattr(path, 'path', None)  # yarl/httpx URL
+    if not isinstance(path, str):
+        # Not a postgrest builder (e.g. a test double)
+        table = getattr(query, 'table', None)
+        return table if isinstance(table, str) else 'unknown', 'execute', []
+
+    table = path.rsplit('/rest/v1/', 1)[-1].strip('/') if '/rest/v1/' in path else path.rsplit('/', 1)[-1]
+    method = str(getattr(request, 'http_method', 'GET')).upper()
+    if table.startswith('rpc/'):
+        operation = 'rpc'
+    elif method == 'POST':
+        prefer = str(getattr(request, 'headers', {}).get('prefer', ''))
+        operation = 'upsert' if 'resolution=' in prefer else 'insert'
+    else:
+        operation = _OPERATIONS.get(method, method.lower())
+
+    params = getattr(request, 'params', None) or {}
+    items = params.multi_items() if hasattr(params, 'multi_items') else list(params.items())
+    filters = []
+    for key, value in items:
+        if key == 'select':
+            continue
+        if key in _MODIFIER_PARAMS:
+            filters.append(f"{key}={value}")
+        else:
+            # "eq.<value>" / "not.in.(...)" -> keep the operator only
+            op = value.split('.', 2)
+            filters.append(f"{key}={op[0]}.{op[1]}" if op[0] == 'not' and len(op) > 1 else f"{key}={op[0]}")
+    return table, operation, filters
+
+
+def _row_count(response: Any) -> int:
+    data = getattr(response, 'data', None)
+    if isinstance(data, list):
+        return len(data)
+    return 0 if data is None else 1
+
+
+def execute_traced(query: Any, submitted_at: Optional[float] = None) -> Any:
+    """
+    Run ``query.execute()`` synchronously and record it.
+
+    Args:
+        query: A supabase-py builder
+        submitted_at: ``perf_counter()`` when the query was queued for a thread,
+            used to report executor wait time
+
+    Returns:
+        The builder's response object
+    """
+    table, operation, filters = describe_query(query)
+    record = QueryRecord(table, operation, filters)
+    start = time.perf_counter()
+    if submitted_at is not None:
+        record.wait_ms = (start - submitted_at) * 1000
+    token = _current_query.set(record)
+    try:
+        response = query.execute()
+        record.rows = _row_count(response)
+        return response
+    except Exception as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        _current_query.reset(token)
+        record.duration_ms = (time.perf_counter() - start) * 1000
+        _finish(record)
+
+
+def _finish(record: QueryRecord):
+    trace = _request_trace.get()
+    if trace is not None:
+        record.request_id = trace.request_id
+        record.method = trace.method
+        record.path = trace.path
+        trace.add(record)
+    slow_query_log.observe(record)
+
+
+def record_response_bytes(response: Any):
+    """httpx response hook: attribute the body size to the query being executed"""
+    record = _current_query.get()
+    if record is None:
+        return
+    # postgrest reads the whole body anyway; reading it here only makes the size known
+    response.read()
+    record.bytes += len(response.content)
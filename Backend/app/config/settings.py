@@ -31,11 +31,36 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
     SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
     SUPABASE_STORAGE_BUCKET: str = os.getenv("SUPABASE_STORAGE_BUCKET", "")
+
+    # Supabase HTTP connection pool (shared by all clients)
+    SUPABASE_POOL_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", 100))
+    SUPABASE_POOL_MAX_KEEPALIVE: int = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", 20))
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", 30))
+
+    # Async query execution (bounded thread pool for blocking PostgREST calls)
+    DB_EXECUTOR_MAX_WORKERS: int = int(os.getenv("DB_EXECUTOR_MAX_WORKERS", 32))
+    DB_QUERY_TIMEOUT: float = float(os.getenv("DB_QUERY_TIMEOUT", 30))
+    # Query tracing: log queries slower than this (0 disables) and keep the most recent ones
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", 500))
+    DB_SLOW_QUERY_LOG_SIZE: int = int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", 200))
+
+    # Database backend: "supabase", or "local" for the in-process stand-in (tests and load tests only)
+    SUPABASE_BACKEND: str = os.getenv("SUPABASE_BACKEND", "supabase")
+    LOCAL_DB_PATH: str = os.getenv("LOCAL_DB_PATH", "")
+    LOCAL_DB_LATENCY_MS: float = float(os.getenv("LOCAL_DB_LATENCY_MS", 0))
+    LOCAL_DB_LATENCY_JITTER_MS: float = float(os.getenv("LOCAL_DB_LATENCY_JITTER_MS", 0))
     
     # Security
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60 * 24 * 7))
+    # Supabase access tokens are verified locally (SUPABASE_JWT_SECRET or the project JWKS)
+    AUTH_LOCAL_JWT_VERIFY: bool = os.getenv("AUTH_LOCAL_JWT_VERIFY", "true").lower() in ("1", "true", "yes")
+    SUPABASE_JWKS_URL: str = os.getenv("SUPABASE_JWKS_URL", f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json" if SUPABASE_URL else "")
+    AUTH_JWT_AUDIENCE: str = os.getenv("AUTH_JWT_AUDIENCE", "authenticated")
+    AUTH_JWKS_TTL: float = float(os.getenv("AUTH_JWKS_TTL", 600))
+    # Resolved user + profile per token, kept until token expiry or this many seconds (0 disables)
+    AUTH_PRINCIPAL_CACHE_TTL: float = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", 300))
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -43,6 +68,41 @@ class Settings(BaseSettings):
     # Redis Configuration
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+    # Two-tier cache: per-worker L1 in front of Redis
+    CACHE_L1_MAX_ENTRIES: int = int(os.getenv("CACHE_L1_MAX_ENTRIES", 10000))
+    CACHE_L1_MAX_BYTES: int = int(os.getenv("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))
+    CACHE_L1_TTL: int = int(os.getenv("CACHE_L1_TTL", 60))
+    CACHE_INVALIDATION_CHANNEL: str = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+    # Cache value codec: serializer auto|msgpack|orjson|json, compression auto|zstd|lz4|zlib|none
+    CACHE_SERIALIZER: str = os.getenv("CACHE_SERIALIZER", "auto")
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "auto")
+    CACHE_COMPRESS_THRESHOLD: int = int(os.getenv("CACHE_COMPRESS_THRESHOLD", 1024))
+    # Monthly financial rollups: closed months do not change, the current one does
+    ROLLUP_CLOSED_MONTH_TTL: int = int(os.getenv("ROLLUP_CLOSED_MONTH_TTL", 30 * 24 * 3600))
+    ROLLUP_OPEN_MONTH_TTL: int = int(os.getenv("ROLLUP_OPEN_MONTH_TTL", 300))
+
+    # Performance monitoring
+    METRICS_LATENCY_WINDOW: int = int(os.getenv("METRICS_LATENCY_WINDOW", 2048))  # Samples kept per route
+    LOOP_LAG_INTERVAL: float = float(os.getenv("LOOP_LAG_INTERVAL", 0.5))
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 100))  # 0 disables the blocking-call detector
+    PERFORMANCE_API_TOKEN: str = os.getenv("PERFORMANCE_API_TOKEN", "")  # X-Performance-Token (or Bearer); performance endpoints are disabled when unset
+    # Shared directory for aggregating /metrics across uvicorn workers (empty = single process)
+    METRICS_MULTIPROC_DIR: str = os.getenv("METRICS_MULTIPROC_DIR", os.getenv("PROMETHEUS_MULTIPROC_DIR", ""))
+    METRICS_FLUSH_INTERVAL: float = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+    # On-demand request profiling: X-Profile: 1 (or ?_profile=1) plus X-Performance-Token
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILE_MAX_PER_MINUTE: int = int(os.getenv("PROFILE_MAX_PER_MINUTE", 6))  # Per worker
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 1))
+    PROFILE_STORE_SIZE: int = int(os.getenv("PROFILE_STORE_SIZE", 20))  # Profiles kept in memory per worker
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "")  # Shared directory so any worker can serve a profile
+    # Memory diagnostics: RSS watchdog thresholds and tracemalloc at startup (0 frames = off)
+    MEMORY_RSS_THRESHOLDS_MB: str = os.getenv("MEMORY_RSS_THRESHOLDS_MB", "512,1024,2048")
+    MEMORY_WATCHDOG_INTERVAL: float = float(os.getenv("MEMORY_WATCHDOG_INTERVAL", 30))
+    MEMORY_TRACEMALLOC_FRAMES: int = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", 0))
+    MEMORY_SNAPSHOT_LIMIT: int = int(os.getenv("MEMORY_SNAPSHOT_LIMIT", 10))  # Snapshots kept for diffing
+    # Cold start: build clients and import heavy modules concurrently in the startup event
+    STARTUP_PREWARM: bool = os.getenv("STARTUP_PREWARM", "true").lower() in ("1", "true", "yes")
+
     # Specific Storage Buckets (read from env vars, provide defaults if sensible)
     PROPERTY_IMAGE_BUCKET: str = os.getenv("PROPERTY_IMAGE_BUCKET", "propertyimage")
     TENANT_DOCUMENT_BUCKET: str = os.getenv("TENANT_DOCUMENT_BUCKET", "Tenant Documents")
@@ -0,0 +1,165 @@
+"""
+Local verification of Supabase access tokens.
+
+Supabase signs access tokens either with the project's JWT secret (HS256,
+legacy projects) or with an asymmetric key published at
+``/auth/v1/.well-known/jwks.json``. Checking the signature, expiry and
+audience here replaces the ``auth.get_user`` round trip to Supabase Auth on
+every request.
+
+The JWKS is fetched off the event loop and cached for AUTH_JWKS_TTL seconds;
+an unknown ``kid`` triggers a refresh, at most once per JWKS_MIN_REFRESH
+seconds, so forged key ids or an Auth outage cannot hammer Supabase.
+
+``verify()`` returns None when a token cannot be checked locally (no secret
+configured for an HS256 token, JWKS unavailable, or not a JWT at all, like
+the local backend's tokens); callers then fall back to Supabase Auth.
+Locally verified tokens stay valid until they expire, even after sign-out.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import jwt
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+HMAC_ALGORITHMS = ('HS256', 'HS384', 'HS512')
+
+# Minimum seconds between JWKS fetches (unknown key ids, failed fetches)
+JWKS_MIN_REFRESH = 30.0
+
+
+class TokenVerifier:
+    """Verifies Supabase JWTs with the project secret or a cached JWKS"""
+
+    def __init__(self, secret: str = '', jwks_url: str = '', audience: str = 'authenticated',
+                 jwks_ttl: float = 600.0, leeway: float = 5.0, api_key: str = ''):
+        self.secret = secret
+        self.jwks_url = jwks_url
+        self.audience = audience or None
+        self.jwks_ttl = jwks_ttl
+        self.leeway = leeway
+        self.api_key = api_key
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._retry_after = 0.0
+        self._lock = threading.Lock()
+        self._fetch: Optional[asyncio.Future] = None
+        self.verified = 0
+        self.rejected = 0
+        self.unverifiable = 0
+        self.jwks_fetches = 0
+
+    def _fetch_jwks(self, kid: str):
+        """Download the key set (blocking; run in a thread)"""
+        with self._lock:
+            if not self._needs_refresh(kid):
+                return  # Another request refreshed it meanwhile
+            self._retry_after = time.monotonic() + JWKS_MIN_REFRESH
+            response = httpx.get(self.jwks_url, headers={'apikey': self.api_key} if self.api_key else None, timeout=5.0)
+            response.raise_for_status()
+            keys = {}
+            for data in response.json().get('keys', []):
+                try:
+                    key = jwt.PyJWK.from_dict(data)
+                except jwt.PyJWTError as e:
+                    logger.warning(f"Skipping unusable JWKS key {data.get('kid')}: {e}")
+                    continue
+                keys[data.get('kid') or ''] = key
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self.jwks_fetches += 1
+
+    def _needs_refresh(self, kid: str) -> bool:
+        if not self.jwks_url:
+            return False
+        now = time.monotonic()
+        if now < self._retry_after:
+            return False
+        return now - self._fetched_at > self.jwks_ttl or kid not in self._keys
+
+    def _signing_key(self, header: Dict[str, Any]) -> Optional[Tuple[Any, List[str]]]:
+        """Key and accepted algorithms for a token header, from what is already known"""
+        algorithm = header.get('alg')
+        if algorithm in HMAC_ALGORITHMS:
+            return (self.secret, [algorithm]) if self.secret else None
+        key = self._keys.get(header.get('kid') or '')
+        if key is None or not key.algorithm_name:
+            return None
+        # The algorithm comes from the key, never from the token alone
+        return key.key, [key.algorithm_name]
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Verified claims, using only the secret and the cached keys.
+
+        Returns None when the token cannot be checked locally; raises
+        ``jwt.InvalidTokenError`` when it is checked and fails.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.DecodeError:
+            self.unverifiable += 1
+            return None
+        signing = self._signing_key(header)
+        if signing is None:
+            self.unverifiable += 1
+            return None
+        key, algorithms = signing
+        try:
+            claims = jwt.decode(
+                token, key, algorithms=algorithms, audience=self.audience, leeway=self.leeway,
+                options={'require': ['exp', 'sub'], 'verify_aud': self.audience is not None},
+            )
+        except jwt.InvalidTokenError:
+            self.rejected += 1
+            raise
+        self.verified += 1
+        return claims
+
+    async def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """``decode()``, refreshing the JWKS off the event loop first when needed"""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.DecodeError:
+            header = None
+        if header is not None and header.get('alg') not in HMAC_ALGORITHMS:
+            kid = header.get('kid') or ''
+            # Concurrent requests share one fetch instead of racing past it
+            fetch = self._fetch
+            if (fetch is None or fetch.done()) and self._needs_refresh(kid):
+                fetch = self._fetch = asyncio.ensure_future(asyncio.to_thread(self._fetch_jwks, kid))
+            if fetch is not None and not fetch.done():
+                try:
+                    await fetch
+                except Exception as e:
+                    logger.warning(f"Could not fetch JWKS from {self.jwks_url}: {e}")
+        return self.decode(token)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'hmac_secret': bool(self.secret),
+            'jwks_url': self.jwks_url,
+            'jwks_keys': len(self._keys),
+            'jwks_fetches': self.jwks_fetches,
+            'verified': self.verified,
+            'rejected': self.rejected,
+            'unverifiable': self.unverifiable,
+        }
+
+
+# Global per-worker instance
+token_verifier = TokenVerifier(
+    secret=settings.SUPABASE_JWT_SECRET,
+    jwks_url=settings.SUPABASE_JWKS_URL,
+    audience=settings.AUTH_JWT_AUDIENCE,
+    jwks_ttl=settings.AUTH_JWKS_TTL,
+    api_key=settings.SUPABASE_KEY,
+)
@@ -0,0 +1,64 @@
+"""
+Concurrent pre-warming during the startup event.
+
+Importing ``app.main`` builds no clients and skips the heavy optional
+libraries, so workers boot quickly; benchmarks/import_time.py enforces that
+with a budget. The work that was moved off the import path runs here instead,
+in threads and concurrently with the cache start-up, so the first requests do
+not pay for it either.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from typing import Any, Dict
+
+from .database import client_pool
+
+logger = logging.getLogger(__name__)
+
+# Modules imported on first use by the services that need them
+PREWARM_MODULES = (
+    'reportlab.platypus',  # agreement_service.generate_agreement_document
+    'reportlab.lib.styles',
+    'resend',  # notification_service._resend
+    'numpy',  # utils.occupancy._numpy
+)
+
+
+def _import(name: str) -> float:
+    started = time.perf_counter()
+    importlib.import_module(name)
+    return time.perf_counter() - started
+
+
+def _warm_pool() -> float:
+    started = time.perf_counter()
+    client_pool.warm()
+    return time.perf_counter() - started
+
+
+async def warm_up() -> Dict[str, Any]:
+    """
+    Build the client pool and import PREWARM_MODULES concurrently.
+
+    Failures are logged and otherwise ignored: whatever did not warm up is
+    created on first use as before.
+    """
+    started = time.perf_counter()
+    names = ('client_pool',) + PREWARM_MODULES
+    results = await asyncio.gather(
+        asyncio.to_thread(_warm_pool),
+        *(asyncio.to_thread(_import, name) for name in PREWARM_MODULES),
+        return_exceptions=True,
+    )
+    timings = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Pre-warming {name} failed: {result}")
+        else:
+            timings[name] = round(result * 1000, 1)
+    elapsed = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Pre-warmed in {elapsed}ms: {timings}")
+    return {'elapsed_ms': elapsed, 'timings_ms': timings}
@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 import uuid
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,7 @@ async def get_unit_by_id(unit_id: uuid.UUID) -> Optional[Dict[str, Any]]:
         Unit data or None if not found
     """
     try:
-        response = supabase_client.table('units').select('*').eq('id', str(unit_id)).single().execute()
+        response = await run_query(supabase_client.table('units').select('*').eq('id', str(unit_id)).single())
 
         if response.error:
             logger.error(f"Error fetching unit: {response.error.message}")
@@ -48,12 +49,13 @@ async def get_unit_history(unit_id: uuid.UUID) -> Dict[str, Any]:
             return {"error": "Unit not found"}
 
         # Get all property_tenant links (leases) for this unit
-        leases_response = supabase_client.table('property_tenants') \
-            .select('*') \
-            .eq('property_id', unit_details['property_id']) \
-            .eq('unit_number', unit_details['unit_number']) \
-            .order('start_date', desc=True) \
-            .execute()
+        leases_response = await run_query(
+            supabase_client.table('property_tenants')
+            .select('*')
+            .eq('property_id', unit_details['property_id'])
+            .eq('unit_number', unit_details['unit_number'])
+            .order('start_date', desc=True)
+        )
 
         leases = leases_response.data or []
 
@@ -62,29 +64,32 @@ async def get_unit_history(unit_id: uuid.UUID) -> Dict[str, Any]:
         tenants = []
         
         for tenant_id in tenant_ids:
-            tenant_response = supabase_client.table('tenants') \
-                .select('*') \
-                .eq('id', tenant_id) \
-                .execute()
+            tenant_response = await run_query(
+                supabase_client.table('tenants')
+                .select('*')
+                .eq('id', tenant_id)
+            )
                 
             if tenant_response.data:
                 tenants.append(tenant_response.data[0])
 
         # Get all payments associated with this unit
-        payments_response = supabase_client.table('payments') \
-            .select('*') \
-            .eq('unit_id', str(unit_id)) \
-            .order('due_date', desc=True) \
-            .execute()
+        payments_response = await run_query(
+            supabase_client.table('payments')
+            .select('*')
+            .eq('unit_id', str(unit_id))
+            .order('due_date', desc=True)
+        )
             
         payments = payments_response.data or []
 
         # Get all maintenance requests for this unit
-        maintenance_response = supabase_client.table('maintenance_requests') \
-            .select('*') \
-            .eq('unit_id', str(unit_id)) \
-            .order('created_at', desc=True) \
-            .execute()
+        maintenance_response = await run_query(
+            supabase_client.table('maintenance_requests')
+            .select('*')
+            .eq('unit_id', str(unit_id))
+            .order('created_at', desc=True)
+        )
             
         maintenance_requests = maintenance_response.data or []
 
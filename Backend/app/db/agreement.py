@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +44,7 @@ async def get_agreements(
         if agreement_type:
             query = query.eq('agreement_type', agreement_type)
             
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching agreements: {response['error']}")
@@ -74,7 +75,7 @@ async def get_agreement_by_id(agreement_id: str) -> Optional[Dict[str, Any]]:
         Agreement data or None if not found
     """
     try:
-        response = supabase_client.table('agreements').select('*, property:properties(*), tenant:tenants(*)').eq('id', agreement_id).single().execute()
+        response = await run_query(supabase_client.table('agreements').select('*, property:properties(*), tenant:tenants(*)').eq('id', agreement_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching agreement: {response['error']}")
@@ -112,7 +113,7 @@ async def create_agreement(agreement_data: Dict[str, Any]) -> Optional[Dict[str,
         if 'tenant_details' in insert_data:
             del insert_data['tenant_details']
             
-        response = supabase_client.table('agreements').insert(insert_data).execute()
+        response = await run_query(supabase_client.table('agreements').insert(insert_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating agreement: {response['error']}")
@@ -156,7 +157,7 @@ async def update_agreement(agreement_id: str, agreement_data: Dict[str, Any]) ->
             if 'signed_at' not in update_data:
                 update_data['signed_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('agreements').update(update_data).eq('id', agreement_id).execute()
+        response = await run_query(supabase_client.table('agreements').update(update_data).eq('id', agreement_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating agreement: {response['error']}")
@@ -184,7 +185,7 @@ async def delete_agreement(agreement_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('agreements').delete().eq('id', agreement_id).execute()
+        response = await run_query(supabase_client.table('agreements').delete().eq('id', agreement_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting agreement: {response['error']}")
@@ -215,7 +216,7 @@ async def get_agreement_templates(owner_id: str = None, agreement_type: str = No
         if agreement_type:
             query = query.eq('agreement_type', agreement_type)
             
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching agreement templates: {response['error']}")
@@ -237,7 +238,7 @@ async def get_agreement_template_by_id(template_id: str) -> Optional[Dict[str, A
         Template data or None if not found
     """
     try:
-        response = supabase_client.table('agreement_templates').select('*').eq('id', template_id).single().execute()
+        response = await run_query(supabase_client.table('agreement_templates').select('*').eq('id', template_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching agreement template: {response['error']}")
@@ -259,7 +260,7 @@ async def create_agreement_template(template_data: Dict[str, Any]) -> Optional[D
         Created template data or None if creation failed
     """
     try:
-        response = supabase_client.table('agreement_templates').insert(template_data).execute()
+        response = await run_query(supabase_client.table('agreement_templates').insert(template_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating agreement template: {response['error']}")
@@ -285,7 +286,7 @@ async def update_agreement_template(template_id: str, template_data: Dict[str, A
         # Add updated_at timestamp
         template_data['updated_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('agreement_templates').update(template_data).eq('id', template_id).execute()
+        response = await run_query(supabase_client.table('agreement_templates').update(template_data).eq('id', template_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating agreement template: {response['error']}")
@@ -307,7 +308,7 @@ async def delete_agreement_template(template_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('agreement_templates').delete().eq('id', template_id).execute()
+        response = await run_query(supabase_client.table('agreement_templates').delete().eq('id', template_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting agreement template: {response['error']}")
@@ -341,7 +342,7 @@ async def get_current_agreement(property_id: str, tenant_id: str) -> Optional[Di
         query = query.gte('end_date', today)
         query = query.limit(1)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching current agreement: {response['error']}")
@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 # Import the actual client from config
 from app.config.database import supabase_client 
+from app.config.query_executor import run_query
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -50,7 +51,7 @@ async def get_documents(
             query = query.eq("status", "ACTIVE")
 
         # Execute the query
-        response = query.order("created_at", desc=True).execute()
+        response = await run_query(query.order("created_at", desc=True))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching documents DB: {response.error.message}")
@@ -66,7 +67,7 @@ async def get_document_by_id(document_id: str) -> Optional[Dict[str, Any]]:
     """Fetch a single document by its ID."""
     try:
         supabase = supabase_client
-        response = await supabase.table(TABLE).select("*").eq("id", document_id).maybe_single().execute()
+        response = await run_query(supabase.table(TABLE).select("*").eq("id", document_id).maybe_single())
         logger.debug(f"Supabase get_document_by_id response: {response}")
         return response.data
     except Exception as e:
@@ -77,7 +78,7 @@ async def create_document(document_dict: Dict[str, Any]) -> Optional[Dict[str, A
     """Insert a new document record."""
     try:
         supabase = supabase_client
-        response = await supabase.table(TABLE).insert(document_dict).execute()
+        response = await run_query(supabase.table(TABLE).insert(document_dict))
         logger.debug(f"Supabase create_document response: {response}")
         # Return the first item in the data list upon successful insert
         return response.data[0] if response.data else None
@@ -91,7 +92,7 @@ async def update_document(document_id: str, update_dict: Dict[str, Any]) -> Opti
         supabase = supabase_client
         # Ensure updated_at is set
         update_dict['updated_at'] = datetime.utcnow().isoformat()
-        response = await supabase.table(TABLE).update(update_dict).eq("id", document_id).execute()
+        response = await run_query(supabase.table(TABLE).update(update_dict).eq("id", document_id))
         logger.debug(f"Supabase update_document response: {response}")
         # Return the first item in the data list upon successful update
         return response.data[0] if response.data else None
@@ -103,7 +104,7 @@ async def delete_document(document_id: str) -> bool:
     """Delete a document record by its ID."""
     try:
         supabase = supabase_client
-        response = await supabase.table(TABLE).delete().eq("id", document_id).execute()
+        response = await run_query(supabase.table(TABLE).delete().eq("id", document_id))
         logger.debug(f"Supabase delete_document response: {response}")
         # Check if deletion was successful. A successful delete might return an empty data list.
         # Check for errors or specific success indicators if the client library provides them.
@@ -123,7 +124,7 @@ async def check_document_access(document_id: str, user_id: str) -> bool:
     try:
         supabase = supabase_client
         # 1. Check direct ownership
-        response = await supabase.table(TABLE).select('owner_id').eq('id', document_id).maybe_single().execute()
+        response = await run_query(supabase.table(TABLE).select('owner_id').eq('id', document_id).maybe_single())
         if response.data and response.data.get('owner_id') == user_id:
             logger.debug(f"Access check: User {user_id} owns document {document_id}.")
             return True
@@ -154,7 +155,7 @@ async def create_document_version(version_data: Dict[str, Any]) -> Optional[Dict
     # TODO: Ensure 'document_versions' table exists in Supabase.
     try:
         supabase = supabase_client
-        response = await supabase.table('document_versions').insert(version_data).execute()
+        response = await run_query(supabase.table('document_versions').insert(version_data))
         logger.debug(f"Supabase create_document_version response: {response}")
         # Also update the main document's version number?
         # This might be better handled in the service layer.
@@ -171,11 +172,12 @@ async def get_document_versions(document_id: str) -> List[Dict[str, Any]]:
     # TODO: Ensure 'document_versions' table exists in Supabase.
     try:
         supabase = supabase_client
-        response = await supabase.table('document_versions')\
-                           .select('*')\
-                           .eq('document_id', document_id)\
-                           .order('version', desc=True)\
-                           .execute()
+        response = await run_query(
+            supabase.table('document_versions')
+                           .select('*')
+                           .eq('document_id', document_id)
+                           .order('version', desc=True)
+        )
         logger.debug(f"Supabase get_document_versions response: {response}")
         return response.data or []
     except Exception as e:
@@ -190,7 +192,7 @@ async def create_document_share(share_data: Dict[str, Any]) -> Optional[Dict[str
     # TODO: Ensure 'document_shares' table exists in Supabase.
     try:
         supabase = supabase_client
-        response = await supabase.table('document_shares').insert(share_data).execute()
+        response = await run_query(supabase.table('document_shares').insert(share_data))
         logger.debug(f"Supabase create_document_share response: {response}")
         return response.data[0] if response.data else None
     except Exception as e:
@@ -205,11 +207,12 @@ async def get_document_shares(document_id: str) -> List[Dict[str, Any]]:
     # TODO: Ensure 'document_shares' table exists in Supabase.
     try:
         supabase = supabase_client
-        response = await supabase.table('document_shares')\
-                           .select('*')\
-                           .eq('document_id', document_id)\
-                           .eq('is_active', True)\
-                           .execute()
+        response = await run_query(
+            supabase.table('document_shares')
+                           .select('*')
+                           .eq('document_id', document_id)
+                           .eq('is_active', True)
+        )
         logger.debug(f"Supabase get_document_shares response: {response}")
         return response.data or []
     except Exception as e:
@@ -3,6 +3,7 @@ import uuid
 from typing import Dict, Any, Optional, List
 from supabase import Client
 from ..schemas.lease import LeaseCreate
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +23,7 @@ async def create_lease(db_client: Client, lease_data: LeaseCreate) -> Optional[D
             raise ValueError("start_date is required")
         
         # Step 1: Get unit details and verify it exists and is available
-        unit_response = db_client.table('units').select('id, property_id, status').eq('id', str(lease_data.unit_id)).maybe_single().execute()
+        unit_response = await run_query(db_client.table('units').select('id, property_id, status').eq('id', str(lease_data.unit_id)).maybe_single())
         
         if not unit_response.data:
             raise ValueError(f"Unit {lease_data.unit_id} does not exist")
@@ -53,7 +54,7 @@ async def create_lease(db_client: Client, lease_data: LeaseCreate) -> Optional[D
         
         logger.info(f"Creating lease with data: {lease_insert_data}")
         
-        lease_response = db_client.table('leases').insert(lease_insert_data).execute()
+        lease_response = await run_query(db_client.table('leases').insert(lease_insert_data))
         
         if not lease_response.data:
             logger.error("Failed to create lease record")
@@ -67,12 +68,12 @@ async def create_lease(db_client: Client, lease_data: LeaseCreate) -> Optional[D
         
         logger.info(f"Updating unit {lease_data.unit_id} with data: {unit_update_data}")
         
-        unit_update_response = db_client.table('units').update(unit_update_data).eq('id', str(lease_data.unit_id)).execute()
+        unit_update_response = await run_query(db_client.table('units').update(unit_update_data).eq('id', str(lease_data.unit_id)))
         
         if not unit_update_response.data:
             logger.error("Failed to update unit status")
             # Rollback - delete the lease we just created
-            db_client.table('leases').delete().eq('id', lease_id).execute()
+            await run_query(db_client.table('leases').delete().eq('id', lease_id))
             return None
         
         # Return the created lease
@@ -95,7 +96,7 @@ async def terminate_lease(db_client: Client, lease_id: uuid.UUID) -> bool:
         rpc_params = {'p_lease_id': str(lease_id)}
         
         # This RPC returns VOID, so we don't expect data back, just a success/error
-        response = db_client.rpc('terminate_lease_and_vacate_unit', rpc_params).execute()
+        response = await run_query(db_client.rpc('terminate_lease_and_vacate_unit', rpc_params))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error terminating lease via RPC: {response.error.message}")
@@ -0,0 +1,168 @@
+"""
+Request-scoped batching loaders for "get by id" lookups.
+
+Access checks in the service layer fetch the same properties, units and tenants
+many times within one request. A loader collects every ``load(id)`` issued for a
+table during the current event-loop tick, fetches them with a single ``in_``
+query and memoizes the rows for the rest of the request.
+
+Usage:
+    row = await get_request_loaders().load('properties', db_client, property_id)
+"""
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config.query_executor import run_query
+
+logger = logging.getLogger(__name__)
+
+
+class EntityLoader:
+    """Batches and memoizes primary-key lookups against one table for one client"""
+
+    def __init__(self, client: Any, table: str, columns: str = '*', key: str = 'id'):
+        self.client = client
+        self.table = table
+        self.columns = columns
+        self.key = key
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self.loads = 0
+        self.hits = 0
+        self.batches = 0
+        self.rows_fetched = 0
+
+    async def load(self, entity_id: Any) -> Optional[Dict[str, Any]]:
+        """Return the row for ``entity_id`` (or None), batching with concurrent loads"""
+        key = str(entity_id)
+        self.loads += 1
+        future = self._futures.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._pending.append(key)
+        if len(self._pending) == 1:
+            # Dispatch once every coroutine ready in this tick has queued its key
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return await asyncio.shield(future)
+
+    async def load_many(self, entity_ids: Iterable[Any]) -> List[Optional[Dict[str, Any]]]:
+        return list(await asyncio.gather(*(self.load(entity_id) for entity_id in entity_ids)))
+
+    def prime(self, entity_id: Any, row: Optional[Dict[str, Any]]):
+        """Seed the memo with a row fetched elsewhere"""
+        key = str(entity_id)
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(row)
+            self._futures[key] = future
+
+    def clear(self, entity_id: Any = None):
+        """Forget one memoized row (or all of them) after a write"""
+        if entity_id is None:
+            self._futures = {key: f for key, f in self._futures.items() if not f.done()}
+        else:
+            future = self._futures.get(str(entity_id))
+            if future is not None and future.done():
+                del self._futures[str(entity_id)]
+
+    async def _dispatch(self):
+        keys, self._pending = self._pending, []
+        if not keys:
+            return
+        self.batches += 1
+        try:
+            response = await run_query(
+                self.client.table(self.table).select(self.columns).in_(self.key, keys)
+            )
+            rows = {str(row.get(self.key)): row for row in (response.data or [])}
+            self.rows_fetched += len(rows)
+            for key in keys:
+                future = self._futures.get(key)
+                if future is not None and not future.done():
+                    future.set_result(rows.get(key))
+        except Exception as e:
+            logger.error(f"[loaders] Batch load from {self.table} failed: {str(e)}")
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'loads': self.loads,
+            'hits': self.hits,
+            'batches': self.batches,
+            'rows_fetched': self.rows_fetched,
+        }
+
+
+class LoaderRegistry:
+    """All loaders for one request, keyed by table and client"""
+
+    def __init__(self):
+        self._loaders: Dict[Tuple[str, int], EntityLoader] = {}
+
+    def get(self, table: str, client: Any) -> EntityLoader:
+        loader_key = (table, id(client))
+        loader = self._loaders.get(loader_key)
+        if loader is None:
+            loader = EntityLoader(client, table)
+            self._loaders[loader_key] = loader
+        return loader
+
+    async def load(self, table: str, client: Any, entity_id: Any) -> Optional[Dict[str, Any]]:
+        return await self.get(table, client).load(entity_id)
+
+    async def load_many(self, table: str, client: Any, entity_ids: Iterable[Any]) -> List[Optional[Dict[str, Any]]]:
+        return await self.get(table, client).load_many(entity_ids)
+
+    def clear(self, table: str, entity_id: Any = None):
+        """Drop memoized rows for a table across every client"""
+        for (loader_table, _), loader in self._loaders.items():
+            if loader_table == table:
+                loader.clear(entity_id)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-table totals for this request"""
+        totals: Dict[str, Dict[str, int]] = {}
+        for (table, _), loader in self._loaders.items():
+            table_totals = totals.setdefault(table, {'loads': 0, 'hits': 0, 'batches': 0, 'rows_fetched': 0})
+            for name, value in loader.stats().items():
+                table_totals[name] += value
+        return totals
+
+
+_request_loaders: ContextVar[Optional[LoaderRegistry]] = ContextVar('request_loaders', default=None)
+
+
+def begin_request_scope() -> LoaderRegistry:
+    """Install a fresh registry for the current request (called by middleware)"""
+    registry = LoaderRegistry()
+    _request_loaders.set(registry)
+    return registry
+
+
+def get_request_loaders() -> LoaderRegistry:
+    """
+    Return the current request's registry.
+
+    Outside a request (background jobs, scripts) a throwaway registry is
+    returned, so lookups still work but are not memoized across calls.
+    """
+    registry = _request_loaders.get()
+    if registry is None:
+        return LoaderRegistry()
+    return registry
+
+
+def get_request_loader_stats() -> Dict[str, Dict[str, int]]:
+    registry = _request_loaders.get()
+    return registry.stats() if registry is not None else {}
@@ -2,6 +2,9 @@ from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
+from .loaders import get_request_loaders
+from .rollups import invalidate_rollups_for_rows
 from supabase import create_client
 
 logger = logging.getLogger(__name__)
@@ -11,7 +14,7 @@ logger = logging.getLogger(__name__)
 async def create_request_db(db_client: create_client, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Insert a new maintenance request record."""
     try:
-        response = db_client.table('maintenance_requests').insert(request_data).execute()
+        response = await run_query(db_client.table('maintenance_requests').insert(request_data))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"[db.create_request_db] DB error: {response.error.message}")
@@ -20,6 +23,7 @@ async def create_request_db(db_client: create_client, request_data: Dict[str, An
 
         if response.data:
             logger.info(f"[db.create_request_db] Inserted maintenance request: {response.data[0].get('id')}")
+            await invalidate_rollups_for_rows(row for row in response.data if row.get('status') == 'completed')
             return response.data[0]
         else:
             logger.error(f"[db.create_request_db] Insert returned no data.")
@@ -42,7 +46,7 @@ async def get_requests_for_unit_db(
                        .order('created_at', desc=True)\
                        .range(skip, skip + limit - 1)
                        
-        response = query.execute()
+        response = await run_query(query)
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"[db.get_requests_for_unit_db] DB error: {response.error.message}")
@@ -115,7 +119,7 @@ async def get_maintenance_requests(
         
         query = query.order('created_at', desc=True)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching maintenance requests: {response['error']}")
@@ -147,7 +151,7 @@ async def get_maintenance_request_by_id(request_id: str) -> Optional[Dict[str, A
         Maintenance request data or None if not found
     """
     try:
-        response = supabase_client.table('maintenance_requests').select('*, vendor:maintenance_vendors(*)').eq('id', request_id).single().execute()
+        response = await run_query(supabase_client.table('maintenance_requests').select('*, vendor:maintenance_vendors(*)').eq('id', request_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching maintenance request: {response['error']}")
@@ -181,7 +185,7 @@ async def create_maintenance_request(db_client: create_client, request_data: Dic
         if 'vendor_details' in insert_data:
             del insert_data['vendor_details']
             
-        response = db_client.table('maintenance_requests').insert(insert_data).execute()
+        response = await run_query(db_client.table('maintenance_requests').insert(insert_data))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Failed to create maintenance request: {response.error.message}")
@@ -191,6 +195,8 @@ async def create_maintenance_request(db_client: create_client, request_data: Dic
         
         # If successfully created, retrieve the full request with joins
         if created_request:
+            if created_request.get('status') == 'completed':
+                await invalidate_rollups_for_rows([created_request])
             return await get_maintenance_request_by_id(created_request['id'])
         
         return None
@@ -215,7 +221,7 @@ async def update_maintenance_request(request_id: str, request_data: Dict[str, An
         if 'vendor_details' in update_data:
             del update_data['vendor_details']
             
-        response = supabase_client.table('maintenance_requests').update(update_data).eq('id', request_id).execute()
+        response = await run_query(supabase_client.table('maintenance_requests').update(update_data).eq('id', request_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating maintenance request: {response['error']}")
@@ -225,6 +231,9 @@ async def update_maintenance_request(request_id: str, request_data: Dict[str, An
         
         # If successfully updated, retrieve the full request with joins
         if updated_request:
+            # Costs are booked in the month the request was opened, which may be closed
+            if 'status' in update_data or 'estimated_cost' in update_data:
+                await invalidate_rollups_for_rows([updated_request])
             return await get_maintenance_request_by_id(updated_request['id'])
         
         return None
@@ -243,12 +252,14 @@ async def delete_maintenance_request(request_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('maintenance_requests').delete().eq('id', request_id).execute()
+        response = await run_query(supabase_client.table('maintenance_requests').delete().eq('id', request_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting maintenance request: {response['error']}")
             return False
         
+        # A completed request's cost leaves the month it was booked in
+        await invalidate_rollups_for_rows(row for row in response.data or [] if row.get('status') == 'completed')
         return True
     except Exception as e:
         logger.error(f"Failed to delete maintenance request {request_id}: {str(e)}")
@@ -300,7 +311,7 @@ async def add_maintenance_comment(comment_data: Dict[str, Any]) -> Optional[Dict
         Created comment data or None if creation failed
     """
     try:
-        response = supabase_client.table('maintenance_comments').insert(comment_data).execute()
+        response = await run_query(supabase_client.table('maintenance_comments').insert(comment_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating maintenance comment: {response['error']}")
@@ -322,7 +333,7 @@ async def get_maintenance_comments(request_id: str) -> List[Dict[str, Any]]:
         List of comments
     """
     try:
-        response = supabase_client.table('maintenance_comments').select('*').eq('request_id', request_id).order('created_at', desc=False).execute()
+        response = await run_query(supabase_client.table('maintenance_comments').select('*').eq('request_id', request_id).order('created_at', desc=False))
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching maintenance comments: {response['error']}")
@@ -347,10 +358,10 @@ async def get_tenant_properties(tenant_id: str) -> List[Dict[str, Any]]:
     """
     try:
         # First get property IDs from property_tenants table
-        links_response = supabase_client.table('property_tenants').select('property_id').eq('tenant_id', tenant_id).execute()
+        links_response = await run_query(supabase_client.table('property_tenants').select('property_id').eq('tenant_id', tenant_id))
         
-        if "error" in links_response and links_response["error"]:
-            logger.error(f"Error fetching property links for tenant: {links_response['error']}")
+        if hasattr(links_response, 'error') and links_response.error:
+            logger.error(f"Error fetching property links for tenant: {links_response.error}")
             return []
             
         if not links_response.data:
@@ -358,17 +369,11 @@ async def get_tenant_properties(tenant_id: str) -> List[Dict[str, Any]]:
             return []
             
         # Extract property IDs
-        property_ids = [link['property_id'] for link in links_response.data]
+        property_ids = list(dict.fromkeys(link['property_id'] for link in links_response.data))
         
-        # Get property information (including owner_id)
-        properties = []
-        for property_id in property_ids:
-            property_response = supabase_client.table('properties').select('id, owner_id, property_name').eq('id', property_id).execute()
-            
-            if not property_response.error and property_response.data:
-                properties.append(property_response.data[0])
-                
-        return properties
+        # Get property information (including owner_id) in one batched lookup
+        rows = await get_request_loaders().load_many('properties', supabase_client, property_ids)
+        return [row for row in rows if row]
     except Exception as e:
         logger.error(f"Failed to get properties for tenant {tenant_id}: {str(e)}")
         return [] 
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 from supabase import Client
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,7 @@ async def get_user_notifications(
         # Order by most recent
         query = query.order('created_at', desc=True).limit(limit).offset(offset)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching notifications: {response.error}")
@@ -60,7 +61,7 @@ async def get_notification_by_id(notification_id: str) -> Optional[Dict[str, Any
         Notification data or None if not found
     """
     try:
-        response = supabase_client.table('notifications').select('*').eq('id', notification_id).single().execute()
+        response = await run_query(supabase_client.table('notifications').select('*').eq('id', notification_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching notification: {response['error']}")
@@ -82,7 +83,7 @@ async def create_notification(notification_data: Dict[str, Any]) -> Optional[Dic
         Created notification data or None if creation failed
     """
     try:
-        response = supabase_client.table('notifications').insert(notification_data).execute()
+        response = await run_query(supabase_client.table('notifications').insert(notification_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating notification: {response['error']}")
@@ -108,7 +109,7 @@ async def update_notification(notification_id: str, notification_data: Dict[str,
         # Add updated_at timestamp
         notification_data['updated_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('notifications').update(notification_data).eq('id', notification_id).execute()
+        response = await run_query(supabase_client.table('notifications').update(notification_data).eq('id', notification_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating notification: {response['error']}")
@@ -136,7 +137,7 @@ async def mark_notification_as_read(notification_id: str) -> Optional[Dict[str,
             'updated_at': datetime.utcnow().isoformat(),
         }
         
-        response = supabase_client.table('notifications').update(update_data).eq('id', notification_id).execute()
+        response = await run_query(supabase_client.table('notifications').update(update_data).eq('id', notification_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error marking notification as read: {response['error']}")
@@ -164,7 +165,7 @@ async def mark_all_notifications_as_read(user_id: str) -> bool:
             'updated_at': datetime.utcnow().isoformat(),
         }
         
-        response = supabase_client.table('notifications').update(update_data).eq('user_id', user_id).eq('is_read', False).execute()
+        response = await run_query(supabase_client.table('notifications').update(update_data).eq('user_id', user_id).eq('is_read', False))
         
         if "error" in response and response["error"]:
             logger.error(f"Error marking all notifications as read: {response['error']}")
@@ -186,7 +187,7 @@ async def delete_notification(notification_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('notifications').delete().eq('id', notification_id).execute()
+        response = await run_query(supabase_client.table('notifications').delete().eq('id', notification_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting notification: {response['error']}")
@@ -213,7 +214,7 @@ async def get_notification_templates(notification_type: str = None) -> List[Dict
         if notification_type:
             query = query.eq('notification_type', notification_type)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching notification templates: {response['error']}")
@@ -235,7 +236,7 @@ async def get_notification_settings(user_id: str) -> Optional[Dict[str, Any]]:
         Notification settings or None if not found
     """
     try:
-        response = supabase_client.table('notification_settings').select('*').eq('user_id', user_id).single().execute()
+        response = await run_query(supabase_client.table('notification_settings').select('*').eq('user_id', user_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching notification settings: {response['error']}")
@@ -257,7 +258,7 @@ async def create_notification_settings(settings_data: Dict[str, Any]) -> Optiona
         Created settings data or None if creation failed
     """
     try:
-        response = supabase_client.table('notification_settings').insert(settings_data).execute()
+        response = await run_query(supabase_client.table('notification_settings').insert(settings_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating notification settings: {response['error']}")
@@ -283,7 +284,7 @@ async def update_notification_settings(user_id: str, settings_data: Dict[str, An
         # Add updated_at timestamp
         settings_data['updated_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('notification_settings').update(settings_data).eq('user_id', user_id).execute()
+        response = await run_query(supabase_client.table('notification_settings').update(settings_data).eq('user_id', user_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating notification settings: {response['error']}")
@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime, timedelta, date
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -64,7 +65,7 @@ async def get_payments(
         if end_date:
             count_query = count_query.lte('due_date', end_date)
 
-        count_response = count_query.execute()
+        count_response = await run_query(count_query)
 
         if "error" in count_response and count_response["error"]:
             logger.error(f"Error counting payments: {count_response['error']}")
@@ -106,7 +107,7 @@ async def get_payments(
         # Apply pagination
         query = query.range(skip, skip + limit - 1)
 
-        response = query.execute()
+        response = await run_query(query)
 
         if "error" in response and response["error"]:
             logger.error(f"Error fetching payments: {response['error']}")
@@ -137,7 +138,7 @@ async def get_payment_by_id(payment_id: str) -> Optional[Dict[str, Any]]:
         Payment data or None if not found
     """
     try:
-        response = supabase_client.table('payments').select('*, property:properties(*), tenant:tenants(*)').eq('id', payment_id).single().execute()
+        response = await run_query(supabase_client.table('payments').select('*, property:properties(*), tenant:tenants(*)').eq('id', payment_id).single())
 
         if "error" in response and response["error"]:
             logger.error(f"Error fetching payment: {response['error']}")
@@ -183,7 +184,7 @@ async def create_payment(payment_data: Dict[str, Any]) -> Optional[Dict[str, Any
         if 'tenant_details' in insert_data:
             del insert_data['tenant_details']
 
-        response = supabase_client.table('payments').insert(insert_data).execute()
+        response = await run_query(supabase_client.table('payments').insert(insert_data))
 
         if "error" in response and response["error"]:
             logger.error(f"Error creating payment: {response['error']}")
@@ -228,7 +229,7 @@ async def update_payment(payment_id: str, payment_data: Dict[str, Any]) -> Optio
         # Add updated_at timestamp
         update_data['updated_at'] = datetime.utcnow().isoformat()
 
-        response = supabase_client.table('payments').update(update_data).eq('id', payment_id).execute()
+        response = await run_query(supabase_client.table('payments').update(update_data).eq('id', payment_id))
 
         if "error" in response and response["error"]:
             logger.error(f"Error updating payment: {response['error']}")
@@ -256,7 +257,7 @@ async def delete_payment(payment_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('payments').delete().eq('id', payment_id).execute()
+        response = await run_query(supabase_client.table('payments').delete().eq('id', payment_id))
 
         if "error" in response and response["error"]:
             logger.error(f"Error deleting payment: {response['error']}")
@@ -333,7 +334,7 @@ async def create_payment_receipt(payment_id: str, url: str) -> Optional[Dict[str
             'created_at': datetime.utcnow().isoformat()
         }
 
-        response = supabase_client.table('payment_receipts').insert(receipt_data).execute()
+        response = await run_query(supabase_client.table('payment_receipts').insert(receipt_data))
 
         if "error" in response and response["error"]:
             logger.error(f"Error creating payment receipt: {response['error']}")
@@ -365,7 +366,7 @@ async def create_payment_reminder(payment_id: str, recipient_email: str, message
             'status': 'sent'
         }
 
-        response = supabase_client.table('payment_reminders').insert(reminder_data).execute()
+        response = await run_query(supabase_client.table('payment_reminders').insert(reminder_data))
 
         if "error" in response and response["error"]:
             logger.error(f"Error creating payment reminder: {response['error']}")
@@ -398,7 +399,7 @@ async def get_overdue_payments(owner_id: str = None) -> List[Dict[str, Any]]:
         if owner_id:
             query = query.eq('owner_id', owner_id)
 
-        response = query.execute()
+        response = await run_query(query)
 
         if "error" in response and response["error"]:
             logger.error(f"Error fetching overdue payments: {response['error']}")
@@ -443,7 +444,7 @@ async def get_upcoming_payments(owner_id: str = None, days: int = 7) -> List[Dic
         if owner_id:
             query = query.eq('owner_id', owner_id)
 
-        response = query.execute()
+        response = await run_query(query)
 
         if "error" in response and response["error"]:
             logger.error(f"Error fetching upcoming payments: {response['error']}")
@@ -471,7 +472,7 @@ async def get_potentially_overdue_payments(today_iso: str) -> List[Dict[str, Any
                     .in_('status', ['pending', 'partially_paid'])\
                     .lt('due_date', today_iso)
 
-        response = await query.execute()
+        response = await run_query(query)
 
         if response.error:
             logger.error(f"Error fetching potentially overdue payments: {response.error.message}")
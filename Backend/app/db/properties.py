@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 import logging
 import uuid
 from datetime import datetime, timedelta
@@ -6,8 +6,11 @@ from dateutil.relativedelta import relativedelta
 from supabase import Client
 import json
 from ..models.property import PropertyCreate, PropertyUpdate, Property, PropertyDocument, PropertyDocumentCreate, UnitCreate # Import UnitCreate
-from ..config.database import supabase_client # Import the global client
-from ..config.cache import cache_result, invalidate_cache, cache_service
+from ..config.database import supabase_client, supabase_service_role_client # Import the global clients
+from ..config.cache import cache_result, invalidate_cache, invalidate_tags, cache_service
+from ..config.query_executor import run_query
+from .loaders import get_request_loaders
+from ..utils.occupancy import OccupancyEngine
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +63,7 @@ async def get_properties(
         query = query.range(skip, skip + limit - 1)
         
         logger.info(f"[db.get_properties] Executing query...") # Log before execution
-        response = query.execute()
+        response = await run_query(query)
         logger.info(f"[db.get_properties] Query execution complete.") # Log after execution
 
         # --- Start Enhanced Response Logging --- 
@@ -126,7 +129,7 @@ async def get_properties_count(
 
         # When using count='exact', execute() might return the response directly
         # instead of an awaitable. Removing await based on TypeError.
-        response = query.execute()
+        response = await run_query(query)
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error counting properties: {response.error.message}")
@@ -140,7 +143,7 @@ async def get_properties_count(
         logger.error(f"Failed to count properties: {str(e)}", exc_info=True)
         return 0
 
-@cache_result(ttl=300, key_prefix="property_by_id")  # Cache for 5 minutes
+@cache_result(ttl=300, key_prefix="property_by_id", tags=["property:{property_id}", "owner:{result[owner_id]}"])  # Cache for 5 minutes
 async def get_property_by_id(db_client: Client, property_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a property by ID from Supabase, including its related units.
@@ -148,11 +151,12 @@ async def get_property_by_id(db_client: Client, property_id: str) -> Optional[Di
     """
     try:
         # Select property columns and all columns from the related 'units' table
-        response = db_client.table('properties')\
-            .select('*, units:units(*, tenant:tenants!units_tenant_id_fkey(*))')\
-            .eq('id', property_id)\
-            .single()\
-            .execute()
+        response = await run_query(
+            db_client.table('properties')
+            .select('*, units:units(*, tenant:tenants!units_tenant_id_fkey(*))')
+            .eq('id', property_id)
+            .single()
+        )
         
         if hasattr(response, 'error') and response.error:
              if response.error.code == 'PGRST116':
@@ -183,7 +187,7 @@ async def get_property_details(db_client: Client, property_id: str) -> Optional[
     """
     try:
         rpc_params = {'p_property_id': property_id}
-        response = db_client.rpc('get_property_lease_details', rpc_params).execute()
+        response = await run_query(db_client.rpc('get_property_lease_details', rpc_params))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error calling RPC for property details {property_id}: {response.error.message}")
@@ -204,7 +208,7 @@ async def get_property_owner_for_unit(db_client: Client, unit_id: uuid.UUID) ->
     """
     try:
         # This RPC call is simpler than a multi-level join in Python client code.
-        response = db_client.rpc('get_owner_for_unit', {'p_unit_id': str(unit_id)}).execute()
+        response = await run_query(db_client.rpc('get_owner_for_unit', {'p_unit_id': str(unit_id)}))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error calling RPC for unit owner {unit_id}: {response.error.message}")
@@ -219,7 +223,7 @@ async def get_property_owner_for_unit(db_client: Client, unit_id: uuid.UUID) ->
         logger.error(f"Failed to get property owner for unit {unit_id}: {str(e)}", exc_info=True)
         return None
 
-@invalidate_cache("property_*")  # Invalidate all property caches
+@invalidate_cache(tags=["owner:{result[owner_id]}"])  # Invalidate the owner's cached stats
 async def create_property(db_client: Client, property_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Create a new property in Supabase by calling the 'create_my_property' RPC function.
@@ -239,7 +243,7 @@ async def create_property(db_client: Client, property_data: Dict[str, Any]) -> O
             'create_my_property',
             {'propert_data_arg': rpc_data}
         )
-        response = rpc_query.execute() # Execute the query first (Removed await)
+        response = await run_query(rpc_query) # Execute the query off the event loop
         
         # --- Detailed Response Logging (Now correctly placed) --- 
         logger.info(f"[DEBUG] RPC Call Successful. Response Type: {type(response)}") 
@@ -275,7 +279,7 @@ async def create_property(db_client: Client, property_data: Dict[str, Any]) -> O
         logger.error(f"Exception during/after RPC execute() call: {str(e)}", exc_info=True)
         return None
 
-@invalidate_cache("property_*")  # Invalidate all property caches
+@invalidate_cache(tags=["property:{property_id}", "owner:{result[owner_id]}"])  # Invalidate this property's caches
 async def update_property(db_client: Client, property_id: str, property_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Update a property in Supabase.
@@ -283,7 +287,8 @@ async def update_property(db_client: Client, property_id: str, property_data: Di
     """
     try:
         # NOTE: This still uses direct table access and relies on RLS UPDATE policy
-        response = await db_client.table('properties').update(property_data).eq('id', property_id).execute()
+        response = await run_query(db_client.table('properties').update(property_data).eq('id', property_id))
+        get_request_loaders().clear('properties', property_id)
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error updating property DB: {response.error.message}")
@@ -304,13 +309,15 @@ async def delete_property(db_client: Client, property_id: str) -> bool:
     """
     try:
         # NOTE: This still uses direct table access and relies on RLS DELETE policy
-        response = await db_client.table('properties').delete().eq('id', property_id).execute()
+        response = await run_query(db_client.table('properties').delete().eq('id', property_id))
+        get_request_loaders().clear('properties', property_id)
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting property DB: {response.error.message}")
             return False
             
         if hasattr(response, 'data') and response.data:
+            await invalidate_tags(f"property:{property_id}", *(f"owner:{row['owner_id']}" for row in response.data if row.get('owner_id')))
             return True
         else:
             logger.warning(f"Delete operation for property {property_id} did not return data. May not have existed or RLS prevented.")
@@ -326,10 +333,11 @@ async def get_units_for_property(db_client: Client, property_id: str) -> List[Di
     """Get a list of all units (full details) associated with this property."""
     try:
         # Remove await from execute() based on TypeError
-        response = db_client.table('units')\
-                          .select('*, tenants(*)')\
-                          .eq('property_id', property_id)\
-                          .execute()
+        response = await run_query(
+            db_client.table('units')
+                          .select('*, tenants(*)')
+                          .eq('property_id', property_id)
+        )
         if response.data:
             return response.data # Returns list of dictionaries
         else:
@@ -342,7 +350,7 @@ async def get_units_for_property(db_client: Client, property_id: str) -> List[Di
 async def get_documents_for_property(db_client: Client, property_id: str) -> List[Dict[str, Any]]:
     """Get documents associated with a property."""
     try:
-        response = await db_client.table('property_documents').select('*').eq('property_id', property_id).order('uploaded_at', ascending=False).execute()
+        response = await run_query(db_client.table('property_documents').select('*').eq('property_id', property_id).order('uploaded_at', ascending=False))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching documents for property {property_id}: {response.error.message}")
@@ -359,7 +367,7 @@ async def get_documents_for_property(db_client: Client, property_id: str) -> Lis
 async def add_document_to_property(db_client: Client, document_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Add a document record to the property_documents table."""
     try:
-        response = await db_client.table('property_documents').insert(document_data).execute()
+        response = await run_query(db_client.table('property_documents').insert(document_data))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error adding document DB: {response.error.message}")
@@ -374,71 +382,47 @@ async def add_document_to_property(db_client: Client, document_data: Dict[str, A
         return None 
 
 async def get_property_owner(db_client: Client, property_id: str) -> Optional[str]:
-    """Get the owner_id for a specific property."""
+    """
+    Get the owner_id for a specific property.
+
+    Resolved through the request-scoped entity loader, so repeated and
+    concurrent ownership checks within a request share one batched query.
+    """
     try:
-        # Ensure property_id is a string
-        if isinstance(property_id, uuid.UUID):
-            property_id = str(property_id)
-            
-        logger.info(f"Fetching owner for property ID: {property_id}")
-        
-        # First run a diagnostic query to check if properties table is accessible
-        diag_response = db_client.table('properties').select('id').limit(5).execute()
-        if diag_response and hasattr(diag_response, 'data'):
-            logger.info(f"Diagnostic: Properties table is accessible, found {len(diag_response.data)} properties")
-            if diag_response.data:
-                property_ids = [p.get('id') for p in diag_response.data]
-                logger.info(f"Sample property IDs: {property_ids}")
-        else:
-            logger.warning("Diagnostic: Cannot access properties table")
-        
-        # Try a more direct query approach
-        response = db_client.table('properties').select('owner_id').filter('id', 'eq', property_id).execute()
-        
-        # Guard against None response
-        if response is None:
-            logger.warning(f"Null response when fetching owner for property {property_id}, trying raw SQL...")
-            # Try with raw SQL as fallback
-            sql_response = db_client.rpc(
-                'get_property_owner_by_id', 
-                {'property_id_param': property_id}
-            ).execute()
-            
-            if sql_response is None:
-                logger.error("SQL fallback also returned null response")
-                return None
-            
-            if hasattr(sql_response, 'data') and sql_response.data:
-                logger.info(f"Found owner via SQL: {sql_response.data}")
-                return sql_response.data
-            
-            logger.error("SQL fallback found no data")
-            return None
-            
-        if hasattr(response, 'error') and response.error:
-            logger.error(f"Error fetching owner for property {property_id}: {response.error.message}")
+        property_row = await get_request_loaders().load('properties', db_client, property_id)
+        if not property_row:
+            logger.warning(f"Property {property_id} not found when fetching owner.")
             return None
-        
-        if hasattr(response, 'data') and response.data:
-            if len(response.data) > 0:
-                logger.info(f"Found owner {response.data[0].get('owner_id')} for property {property_id}")
-                return response.data[0].get('owner_id')
-            else:
-                logger.warning(f"Property {property_id} not found when fetching owner (empty data array).")
-                return None
-        else:
-            logger.warning(f"Property {property_id} not found when fetching owner (no data attribute).")
-            return None
-            
+
+        return property_row.get('owner_id')
     except Exception as e:
         logger.error(f"Failed to get owner for property {property_id}: {str(e)}", exc_info=True)
         return None
 
+async def invalidate_property_owners(property_ids: Iterable[Any]):
+    """
+    Invalidate the owner tags of the given properties' owners.
+
+    For writes to rows that carry a property_id but no owner_id (units,
+    property_tenants). The owners are looked up with the service-role client
+    so the caller's RLS scope cannot hide them.
+    """
+    property_ids = sorted({str(property_id) for property_id in property_ids if property_id})
+    if not property_ids:
+        return
+    try:
+        response = await run_query(
+            supabase_service_role_client.table('properties').select('owner_id').in_('id', property_ids)
+        )
+        await invalidate_tags(*(f"owner:{row['owner_id']}" for row in response.data or [] if row.get('owner_id')))
+    except Exception as e:
+        logger.error(f"Failed to invalidate owners of properties {property_ids}: {str(e)}")
+
 async def create_unit(db_client: Client, unit_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Insert a new unit record into the public.units table."""
     try:
         logger.info(f"[db.create_unit] Attempting to insert unit: {unit_data}")
-        response = db_client.table('units').insert(unit_data).execute()
+        response = await run_query(db_client.table('units').insert(unit_data))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"[db.create_unit] Error inserting unit: {response.error.message}")
@@ -448,6 +432,7 @@ async def create_unit(db_client: Client, unit_data: Dict[str, Any]) -> Optional[
             return None
             
         logger.info(f"[db.create_unit] Successfully inserted unit: {response.data[0]}")
+        await invalidate_property_owners([response.data[0].get('property_id')])
         return response.data[0]
     except Exception as e:
         logger.error(f"[db.create_unit] Exception inserting unit: {str(e)}", exc_info=True)
@@ -466,7 +451,7 @@ async def get_property_taxes(db_client: Client, property_id: uuid.UUID) -> List[
         List of tax records
     """
     try:
-        response = db_client.table('property_taxes').select('*').eq('property_id', str(property_id)).order('due_date', desc=True).execute()
+        response = await run_query(db_client.table('property_taxes').select('*').eq('property_id', str(property_id)).order('due_date', desc=True))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting taxes for property {property_id}: {response.error.message}")
@@ -489,7 +474,7 @@ async def get_property_tax(db_client: Client, tax_id: uuid.UUID) -> Optional[Dic
         Tax record or None if not found
     """
     try:
-        response = db_client.table('property_taxes').select('*').eq('id', str(tax_id)).maybe_single().execute()
+        response = await run_query(db_client.table('property_taxes').select('*').eq('id', str(tax_id)).maybe_single())
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting tax record {tax_id}: {response.error.message}")
@@ -515,7 +500,7 @@ async def create_property_tax(db_client: Client, tax_data: Dict[str, Any]) -> Op
         # Convert UUIDs to strings
         data = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in tax_data.items()}
         
-        response = db_client.table('property_taxes').insert(data).execute()
+        response = await run_query(db_client.table('property_taxes').insert(data))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error creating tax record: {response.error.message}")
@@ -542,7 +527,7 @@ async def update_property_tax(db_client: Client, tax_id: uuid.UUID, tax_data: Di
         # Convert UUIDs to strings
         data = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in tax_data.items()}
         
-        response = db_client.table('property_taxes').update(data).eq('id', str(tax_id)).execute()
+        response = await run_query(db_client.table('property_taxes').update(data).eq('id', str(tax_id)))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error updating tax record {tax_id}: {response.error.message}")
@@ -565,7 +550,7 @@ async def delete_property_tax(db_client: Client, tax_id: uuid.UUID) -> bool:
         True if deleted, False otherwise
     """
     try:
-        response = db_client.table('property_taxes').delete().eq('id', str(tax_id)).execute()
+        response = await run_query(db_client.table('property_taxes').delete().eq('id', str(tax_id)))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting tax record {tax_id}: {response.error.message}")
@@ -589,7 +574,7 @@ async def get_unit_images(db_client: Client, unit_id: uuid.UUID) -> List[Dict[st
         List of image records
     """
     try:
-        response = db_client.table('unit_images').select('*').eq('unit_id', str(unit_id)).order('created_at', desc=True).execute()
+        response = await run_query(db_client.table('unit_images').select('*').eq('unit_id', str(unit_id)).order('created_at', desc=True))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting images for unit {unit_id}: {response.error.message}")
@@ -615,7 +600,7 @@ async def add_unit_image(db_client: Client, image_data: Dict[str, Any]) -> bool:
         # Convert UUIDs to strings
         data = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in image_data.items()}
         
-        response = db_client.table('unit_images').insert(data).execute()
+        response = await run_query(db_client.table('unit_images').insert(data))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error adding image to unit {image_data.get('unit_id')}: {response.error.message}")
@@ -639,7 +624,7 @@ async def delete_unit_image(db_client: Client, unit_id: uuid.UUID, image_url: st
         True if deleted, False otherwise
     """
     try:
-        response = db_client.table('unit_images').delete().eq('unit_id', str(unit_id)).eq('url', image_url).execute()
+        response = await run_query(db_client.table('unit_images').delete().eq('unit_id', str(unit_id)).eq('url', image_url))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting image from unit {unit_id}: {response.error.message}")
@@ -665,15 +650,16 @@ async def get_property_income(db_client: Client, property_id: uuid.UUID, start_d
         List of income records
     """
     try:
-        response = db_client.table('payments')\
-            .select('id, amount, payment_date, description')\
-            .eq('property_id', str(property_id))\
-            .gte('payment_date', start_date.isoformat())\
-            .lte('payment_date', end_date.isoformat())\
-            .eq('status', 'completed')\
-            .eq('type', 'income')\
-            .order('payment_date', desc=True)\
-            .execute()
+        response = await run_query(
+            db_client.table('payments')
+            .select('id, amount, payment_date, description')
+            .eq('property_id', str(property_id))
+            .gte('payment_date', start_date.isoformat())
+            .lte('payment_date', end_date.isoformat())
+            .eq('status', 'completed')
+            .eq('type', 'income')
+            .order('payment_date', desc=True)
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting income for property {property_id}: {response.error.message}")
@@ -698,15 +684,16 @@ async def get_property_expenses(db_client: Client, property_id: uuid.UUID, start
         List of expense records
     """
     try:
-        response = db_client.table('payments')\
-            .select('id, amount, payment_date, description')\
-            .eq('property_id', str(property_id))\
-            .gte('payment_date', start_date.isoformat())\
-            .lte('payment_date', end_date.isoformat())\
-            .eq('status', 'completed')\
-            .eq('type', 'expense')\
-            .order('payment_date', desc=True)\
-            .execute()
+        response = await run_query(
+            db_client.table('payments')
+            .select('id, amount, payment_date, description')
+            .eq('property_id', str(property_id))
+            .gte('payment_date', start_date.isoformat())
+            .lte('payment_date', end_date.isoformat())
+            .eq('status', 'completed')
+            .eq('type', 'expense')
+            .order('payment_date', desc=True)
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting expenses for property {property_id}: {response.error.message}")
@@ -732,14 +719,16 @@ async def get_property_income_total(db_client: Client, property_id: uuid.UUID, s
     """
     try:
         # Using SQL function for sum calculation
-        response = db_client.rpc(
-            'get_property_income_total',
-            {
-                'p_property_id': str(property_id),
-                'p_start_date': start_date.isoformat(),
-                'p_end_date': end_date.isoformat()
-            }
-        ).execute()
+        response = await run_query(
+            db_client.rpc(
+                'get_property_income_total',
+                {
+                    'p_property_id': str(property_id),
+                    'p_start_date': start_date.isoformat(),
+                    'p_end_date': end_date.isoformat()
+                }
+            )
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting income total for property {property_id}: {response.error.message}")
@@ -770,14 +759,16 @@ async def get_property_expenses_total(db_client: Client, property_id: uuid.UUID,
     """
     try:
         # Using SQL function for sum calculation
-        response = db_client.rpc(
-            'get_property_expenses_total',
-            {
-                'p_property_id': str(property_id),
-                'p_start_date': start_date.isoformat(),
-                'p_end_date': end_date.isoformat()
-            }
-        ).execute()
+        response = await run_query(
+            db_client.rpc(
+                'get_property_expenses_total',
+                {
+                    'p_property_id': str(property_id),
+                    'p_start_date': start_date.isoformat(),
+                    'p_end_date': end_date.isoformat()
+                }
+            )
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting expense total for property {property_id}: {response.error.message}")
@@ -808,10 +799,11 @@ async def get_property_occupancy_rate(db_client: Client, property_id: uuid.UUID,
     """
     try:
         # Get total units for property
-        total_units_response = db_client.table('units')\
-            .select('id', count='exact')\
-            .eq('property_id', str(property_id))\
-            .execute()
+        total_units_response = await run_query(
+            db_client.table('units')
+            .select('id', count='exact')
+            .eq('property_id', str(property_id))
+        )
         
         if hasattr(total_units_response, 'error') and total_units_response.error:
             logger.error(f"Error getting total units for property {property_id}: {total_units_response.error.message}")
@@ -822,41 +814,23 @@ async def get_property_occupancy_rate(db_client: Client, property_id: uuid.UUID,
         if total_units == 0:
             return 0.0  # No units, so occupancy rate is 0%
         
-        # Get occupied units in the date range - use simpler approach
-        # First, get units with null end_date
-        null_end_date_query = db_client.table('property_tenant_link')\
-            .select('unit_id')\
-            .eq('property_id', str(property_id))\
-            .lte('start_date', end_date.isoformat())\
-            .is_('end_date', 'null')\
-            .execute()
-            
-        # Then get units with end_date >= start_date
-        valid_end_date_query = db_client.table('property_tenant_link')\
-            .select('unit_id')\
-            .eq('property_id', str(property_id))\
-            .lte('start_date', end_date.isoformat())\
-            .gte('end_date', start_date.isoformat())\
-            .execute()
-            
-        # Handle any errors
-        if (hasattr(null_end_date_query, 'error') and null_end_date_query.error) or \
-           (hasattr(valid_end_date_query, 'error') and valid_end_date_query.error):
+        # Tenancies overlapping the range, in one query
+        links_response = await run_query(
+            db_client.table('property_tenants')
+            .select('property_id, unit_id, start_date, end_date')
+            .eq('property_id', str(property_id))
+            .lte('start_date', end_date.isoformat())
+            .or_(f"end_date.gte.{start_date.isoformat()},end_date.is.null")
+        )
+        
+        if hasattr(links_response, 'error') and links_response.error:
             logger.error("Error getting occupied units for property")
             return 0.0
-            
-        # Combine results and count unique unit_ids
-        null_end_units = null_end_date_query.data or []
-        valid_end_units = valid_end_date_query.data or []
-        all_units = null_end_units + valid_end_units
-        
-        # Use set to get unique unit IDs
-        unique_unit_ids = set(unit['unit_id'] for unit in all_units if 'unit_id' in unit)
-        occupied_units = len(unique_unit_ids)
-        
-        # Calculate occupancy rate
-        occupancy_rate = (occupied_units / total_units) * 100
-        return round(occupancy_rate, 2)
+        
+        # Occupied unit-days over available unit-days in the range
+        engine = OccupancyEngine.from_links(links_response.data or [])
+        [period] = engine.occupancy([(start_date, end_date)], {str(property_id): total_units})
+        return period['occupancy_rate']
     except Exception as e:
         logger.error(f"Error calculating occupancy rate for property {property_id}: {str(e)}")
         return 0.0
@@ -888,7 +862,7 @@ async def get_filtered_units_db(
         # Apply pagination
         query = query.range(skip, skip + limit - 1)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if response.data:
             # The join adds the nested properties structure, remove it for clean unit data
@@ -924,7 +898,7 @@ async def get_filtered_units_count_db(
         if status:
             query = query.eq('status', status)
             
-        response = query.execute()
+        response = await run_query(query)
         
         # Check response structure - count is usually directly on response for head=True
         if hasattr(response, 'count') and response.count is not None:
@@ -947,11 +921,12 @@ async def get_unit_by_id_db(
 ) -> Optional[Dict[str, Any]]:
     """Fetch a single unit by its ID."""
     try:
-        response = db_client.table('units')\
-                          .select('*, tenants(*)')\
-                          .eq('id', unit_id)\
-                          .maybe_single()\
-                          .execute()
+        response = await run_query(
+            db_client.table('units')
+                          .select('*, tenants(*)')
+                          .eq('id', unit_id)
+                          .maybe_single()
+        )
                           
         if response.data:
             return response.data
@@ -971,7 +946,7 @@ async def delete_unit_db(
 ) -> bool:
     """Deletes a unit from the database."""
     try:
-        response = await db_client.table('units').delete().eq('id', unit_id).execute()
+        response = await run_query(db_client.table('units').delete().eq('id', unit_id))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"[db.delete_unit_db] Error deleting unit {unit_id}: {response.error.message}")
@@ -981,6 +956,7 @@ async def delete_unit_db(
             logger.warning(f"[db.delete_unit_db] Unit {unit_id} not found or already deleted.")
             return False # Or True depending on desired behavior for not-found cases
             
+        await invalidate_property_owners(row.get('property_id') for row in response.data)
         return True
     except Exception as e:
         logger.error(f"[db.delete_unit_db] Failed to delete unit {unit_id}: {e}", exc_info=True)
@@ -994,10 +970,11 @@ async def update_unit_db(
     """Update a specific unit by its ID. Returns the updated unit data if successful."""
     try:
         logger.info(f"[db.update_unit_db] Updating unit {unit_id} with data: {unit_data}")
-        response = db_client.table('units')\
-                          .update(unit_data)\
-                          .eq('id', unit_id)\
-                          .execute()
+        response = await run_query(
+            db_client.table('units')
+                          .update(unit_data)
+                          .eq('id', unit_id)
+        )
                           
         if hasattr(response, 'error') and response.error:
             logger.error(f"[db.update_unit_db] Error updating unit {unit_id}: {response.error.message}")
@@ -1025,11 +1002,12 @@ async def get_parent_property_id_for_unit(unit_id: uuid.UUID) -> Optional[uuid.U
     """
     try:
         # Use the imported global client (synchronous execute)
-        response = supabase_client.table('units')\
-            .select('property_id')\
-            .eq('id', str(unit_id))\
-            .maybe_single()\
-            .execute()
+        response = await run_query(
+            supabase_client.table('units')
+            .select('property_id')
+            .eq('id', str(unit_id))
+            .maybe_single()
+        )
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching parent property for unit {unit_id}: {response.error.message}")
@@ -1051,11 +1029,12 @@ async def db_get_amenities_for_unit(db_client: Client, unit_id: uuid.UUID) -> Li
     Get all amenities associated with a specific unit.
     """
     try:
-        response = await db_client.table('unit_amenities')\
-            .select('*')\
-            .eq('unit_id', str(unit_id))\
-            .order('created_at', desc=False)\
-            .execute()
+        response = await run_query(
+            db_client.table('unit_amenities')
+            .select('*')
+            .eq('unit_id', str(unit_id))
+            .order('created_at', desc=False)
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting amenities for unit {unit_id}: {response.error.message}")
@@ -1072,7 +1051,7 @@ async def db_create_amenity_for_unit(db_client: Client, amenity_data: Dict[str,
     Assumes amenity_data contains 'unit_id', 'name', etc.
     """
     try:
-        response = await db_client.table('unit_amenities').insert(amenity_data).execute()
+        response = await run_query(db_client.table('unit_amenities').insert(amenity_data))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error creating amenity: {response.error.message}")
@@ -1088,11 +1067,12 @@ async def db_get_amenity_by_id(db_client: Client, amenity_id: uuid.UUID) -> Opti
     Get a specific amenity by its ID.
     """
     try:
-        response = await db_client.table('unit_amenities')\
-            .select('*')\
-            .eq('id', str(amenity_id))\
-            .maybe_single()\
-            .execute()
+        response = await run_query(
+            db_client.table('unit_amenities')
+            .select('*')
+            .eq('id', str(amenity_id))
+            .maybe_single()
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching amenity {amenity_id}: {response.error.message}")
@@ -1108,10 +1088,11 @@ async def db_update_amenity(db_client: Client, amenity_id: uuid.UUID, amenity_da
     Update an existing amenity record.
     """
     try:
-        response = await db_client.table('unit_amenities')\
-            .update(amenity_data)\
-            .eq('id', str(amenity_id))\
-            .execute()
+        response = await run_query(
+            db_client.table('unit_amenities')
+            .update(amenity_data)
+            .eq('id', str(amenity_id))
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error updating amenity {amenity_id}: {response.error.message}")
@@ -1127,10 +1108,11 @@ async def db_delete_amenity(db_client: Client, amenity_id: uuid.UUID) -> bool:
     Delete an amenity record.
     """
     try:
-        response = await db_client.table('unit_amenities')\
-            .delete()\
-            .eq('id', str(amenity_id))\
-            .execute()
+        response = await run_query(
+            db_client.table('unit_amenities')
+            .delete()
+            .eq('id', str(amenity_id))
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting amenity {amenity_id}: {response.error.message}")
@@ -1151,11 +1133,12 @@ async def db_get_taxes_for_unit(db_client: Client, unit_id: uuid.UUID) -> List[D
     Get all tax records associated with a specific unit.
     """
     try:
-        response = await db_client.table('unit_taxes') \
-            .select('*') \
-            .eq('unit_id', str(unit_id)) \
-            .order('year', desc=True).order('created_at', desc=True) \
-            .execute()
+        response = await run_query(
+            db_client.table('unit_taxes')
+            .select('*')
+            .eq('unit_id', str(unit_id))
+            .order('year', desc=True).order('created_at', desc=True)
+        )
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error getting taxes for unit {unit_id}: {response.error.message}")
@@ -1172,7 +1155,7 @@ async def db_create_unit_tax(db_client: Client, tax_data: Dict[str, Any]) -> Opt
     Assumes tax_data contains 'unit_id', 'tax_type', 'amount', 'year' etc.
     """
     try:
-        response = await db_client.table('unit_taxes').insert(tax_data).execute()
+        response = await run_query(db_client.table('unit_taxes').insert(tax_data))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error creating unit tax: {response.error.message}")
@@ -1188,11 +1171,12 @@ async def db_get_unit_tax_by_id(db_client: Client, tax_id: uuid.UUID) -> Optiona
     Get a specific unit tax record by its ID.
     """
     try:
-        response = await db_client.table('unit_taxes') \
-            .select('*') \
-            .eq('id', str(tax_id)) \
-            .maybe_single() \
-            .execute()
+        response = await run_query(
+            db_client.table('unit_taxes')
+            .select('*')
+            .eq('id', str(tax_id))
+            .maybe_single()
+        )
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching unit tax {tax_id}: {response.error.message}")
@@ -1208,10 +1192,11 @@ async def db_update_unit_tax(db_client: Client, tax_id: uuid.UUID, tax_data: Dic
     Update an existing unit tax record.
     """
     try:
-        response = await db_client.table('unit_taxes') \
-            .update(tax_data) \
-            .eq('id', str(tax_id)) \
-            .execute()
+        response = await run_query(
+            db_client.table('unit_taxes')
+            .update(tax_data)
+            .eq('id', str(tax_id))
+        )
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error updating unit tax {tax_id}: {response.error.message}")
@@ -1227,10 +1212,11 @@ async def db_delete_unit_tax(db_client: Client, tax_id: uuid.UUID) -> bool:
     Delete a unit tax record.
     """
     try:
-        response = await db_client.table('unit_taxes') \
-            .delete() \
-            .eq('id', str(tax_id)) \
-            .execute()
+        response = await run_query(
+            db_client.table('unit_taxes')
+            .delete()
+            .eq('id', str(tax_id))
+        )
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting unit tax {tax_id}: {response.error.message}")
@@ -1249,7 +1235,7 @@ async def get_unit(db_client: Client, unit_id: str) -> Optional[Dict[str, Any]]:
     Get a single unit by its ID.
     """
     try:
-        response = db_client.table('units').select('*').eq('id', unit_id).single().execute()
+        response = await run_query(db_client.table('units').select('*').eq('id', unit_id).single())
         
         if hasattr(response, 'error') and response.error:
             if "PGRST116" in str(response.error): # Not found
@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ async def get_reports(owner_id: str = None, report_type: str = None) -> List[Dic
         # Order by most recent
         query = query.order('created_at', desc=True)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching reports: {response['error']}")
@@ -50,7 +51,7 @@ async def get_report_by_id(report_id: str) -> Optional[Dict[str, Any]]:
         Report data or None if not found
     """
     try:
-        response = supabase_client.table('reports').select('*').eq('id', report_id).single().execute()
+        response = await run_query(supabase_client.table('reports').select('*').eq('id', report_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching report: {response['error']}")
@@ -72,7 +73,7 @@ async def create_report(report_data: Dict[str, Any]) -> Optional[Dict[str, Any]]
         Created report data or None if creation failed
     """
     try:
-        response = supabase_client.table('reports').insert(report_data).execute()
+        response = await run_query(supabase_client.table('reports').insert(report_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating report: {response['error']}")
@@ -98,7 +99,7 @@ async def update_report(report_id: str, report_data: Dict[str, Any]) -> Optional
         # Add updated_at timestamp
         report_data['updated_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('reports').update(report_data).eq('id', report_id).execute()
+        response = await run_query(supabase_client.table('reports').update(report_data).eq('id', report_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating report: {response['error']}")
@@ -120,7 +121,7 @@ async def delete_report(report_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('reports').delete().eq('id', report_id).execute()
+        response = await run_query(supabase_client.table('reports').delete().eq('id', report_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting report: {response['error']}")
@@ -153,7 +154,7 @@ async def update_report_status(report_id: str, status: str, file_url: str = None
             update_data['file_url'] = file_url
             update_data['completed_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('reports').update(update_data).eq('id', report_id).execute()
+        response = await run_query(supabase_client.table('reports').update(update_data).eq('id', report_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating report status: {response['error']}")
@@ -184,7 +185,7 @@ async def get_report_templates(owner_id: str = None, report_type: str = None) ->
         if report_type:
             query = query.eq('report_type', report_type)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching report templates: {response['error']}")
@@ -215,7 +216,7 @@ async def get_report_schedules(owner_id: str = None, active_only: bool = False)
         if active_only:
             query = query.eq('active', True)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching report schedules: {response['error']}")
@@ -237,7 +238,7 @@ async def create_report_schedule(schedule_data: Dict[str, Any]) -> Optional[Dict
         Created schedule data or None if creation failed
     """
     try:
-        response = supabase_client.table('report_schedules').insert(schedule_data).execute()
+        response = await run_query(supabase_client.table('report_schedules').insert(schedule_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating report schedule: {response['error']}")
@@ -260,7 +261,7 @@ async def update_report_schedule(schedule_id: str, schedule_data: Dict[str, Any]
         Updated schedule data or None if update failed
     """
     try:
-        response = supabase_client.table('report_schedules').update(schedule_data).eq('id', schedule_id).execute()
+        response = await run_query(supabase_client.table('report_schedules').update(schedule_data).eq('id', schedule_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating report schedule: {response['error']}")
@@ -282,7 +283,7 @@ async def delete_report_schedule(schedule_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('report_schedules').delete().eq('id', schedule_id).execute()
+        response = await run_query(supabase_client.table('report_schedules').delete().eq('id', schedule_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting report schedule: {response['error']}")
@@ -0,0 +1,207 @@
+"""
+Monthly financial rollups.
+
+``monthly_financial_rollups`` holds one row per owner, property and month
+with the revenue collected, the maintenance costs booked and the number of
+payments. Triggers on payment_history, payment_tracking and
+maintenance_requests keep it current as rows are recorded or changed (see
+supabase/migrations/20250614000000_monthly_financial_rollups.sql), so reading
+a series costs one range query over the months asked for, however long the
+owner's history.
+
+Rows are read with the service-role client. The cache keys carry the owner
+but no principal, so a read scoped by row-level security (or the anonymous
+client, which sees nothing) would be cached for everyone; callers check that
+the user may see the owner's figures first.
+
+Each owner-month is cached separately. Months before the current one are
+closed and kept for ROLLUP_CLOSED_MONTH_TTL; owner-wide invalidations do not
+touch them. The current month is tagged with the owner like other dashboard
+reads and kept for ROLLUP_OPEN_MONTH_TTL. Writes to the source rows must call
+``invalidate_rollups`` (or ``invalidate_rollups_for_rows``) for the months
+they change; it also starts a new owner data version, which retires reports
+built from the old months.
+
+The local stand-in has no triggers; benchmarks/generate_portfolio.py
+materializes the table when it generates data.
+
+Usage:
+    months = recent_months(6)
+    rollups = await get_monthly_rollups(owner_id, months)
+    revenue = month_totals(rollups[months[-1]])['revenue']
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ..config.cache import bump_data_version, cache_service
+from ..config.database import supabase_service_role_client
+from ..config.query_executor import run_query
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLUMNS = 'property_id, month, revenue, maintenance_costs, payment_count'
+
+
+def month_start(value: Union[date, datetime, str]) -> date:
+    """First day of the month containing a date, datetime or ISO string"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def shift_months(month: date, count: int) -> date:
+    """The first of the month ``count`` months after (or before) ``month``"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def recent_months(months: int, today: Optional[date] = None) -> List[date]:
+    """The last ``months`` calendar months, oldest first, ending with the current one"""
+    current = month_start(today or datetime.utcnow().date())
+    return [shift_months(current, -offset) for offset in range(months - 1, -1, -1)]
+
+
+def rollup_cache_key(owner_id: str, month: date) -> str:
+    return f"rollup:{owner_id}:{month:%Y-%m}"
+
+
+def _row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'property_id': row.get('property_id'),
+        'revenue': float(row.get('revenue') or 0),
+        'maintenance_costs': float(row.get('maintenance_costs') or 0),
+        'payment_count': int(row.get('payment_count') or 0),
+    }
+
+
+async def _fetch_months(owner_id: str, months: List[date]) -> Dict[date, List[Dict[str, Any]]]:
+    """Rollup rows for the given months, with one range query"""
+    response = await run_query(
+        supabase_service_role_client.table('monthly_financial_rollups')
+        .select(ROLLUP_COLUMNS)
+        .eq('owner_id', owner_id)
+        .gte('month', months[0].isoformat())
+        .lte('month', months[-1].isoformat())
+    )
+    wanted = {month: [] for month in months}
+    for row in response.data or []:
+        rows = wanted.get(month_start(row['month']))
+        if rows is not None:
+            rows.append(_row(row))
+    return wanted
+
+
+async def get_monthly_rollups(owner_id: str, months: Iterable[date]) -> Dict[date, List[Dict[str, Any]]]:
+    """
+    Per-property rollup rows for each requested month.
+
+    Cached months are served from the cache; the rest are fetched with a
+    single query spanning the oldest to the newest missing month. The
+    caller must already have checked access to ``owner_id``.
+
+    Args:
+        owner_id: The owner ID to filter by
+        months: First days of the months wanted
+
+    Returns:
+        ``{month: [{'property_id', 'revenue', 'maintenance_costs', 'payment_count'}, ...]}``
+        with an empty list for months without activity
+    """
+    months = sorted({month_start(month) for month in months})
+    if not months:
+        return {}
+
+    result: Dict[date, List[Dict[str, Any]]] = {}
+    if cache_service.enabled:
+        cached = await asyncio.gather(*(cache_service.get(rollup_cache_key(owner_id, month)) for month in months))
+        result = {month: rows for month, rows in zip(months, cached) if rows is not None}
+    missing = [month for month in months if month not in result]
+    if not missing:
+        return result
+
+    fetched = await _fetch_months(owner_id, missing)
+    result.update(fetched)
+    if cache_service.enabled:
+        current = month_start(datetime.utcnow().date())
+        for month, rows in fetched.items():
+            if month < current:
+                await cache_service.set(rollup_cache_key(owner_id, month), rows, settings.ROLLUP_CLOSED_MONTH_TTL,
+                                        tags=[f"rollup:{owner_id}"])
+            else:
+                await cache_service.set(rollup_cache_key(owner_id, month), rows, settings.ROLLUP_OPEN_MONTH_TTL,
+                                        tags=[f"rollup:{owner_id}", f"owner:{owner_id}"])
+    return result
+
+
+def month_totals(rows: Iterable[Dict[str, Any]], property_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Sum rollup rows, optionally only those of some properties"""
+    if property_ids is not None:
+        property_ids = set(property_ids)
+    totals = {'revenue': 0.0, 'maintenance_costs': 0.0, 'payment_count': 0}
+    for row in rows:
+        if property_ids is not None and row['property_id'] not in property_ids:
+            continue
+        totals['revenue'] += row['revenue']
+        totals['maintenance_costs'] += row['maintenance_costs']
+        totals['payment_count'] += row['payment_count']
+    totals['revenue'] = round(totals['revenue'], 2)
+    totals['maintenance_costs'] = round(totals['maintenance_costs'], 2)
+    return totals
+
+
+async def invalidate_rollups(owner_id: str, months: Iterable[Union[date, datetime, str]] = ()):
+    """
+    Drop cached rollup months for an owner.
+
+    Args:
+        owner_id: The owner whose rollups changed
+        months: The months changed (any date inside them); all months when empty
+    """
+    months = {month_start(month) for month in months if month}
+    try:
+        if months:
+            for month in months:
+                await cache_service.delete(rollup_cache_key(owner_id, month))
+        else:
+            await cache_service.invalidate_tags([f"rollup:{owner_id}"])
+        await bump_data_version(f"owner:{owner_id}")
+    except Exception as e:
+        logger.error(f"Error invalidating rollups for owner {owner_id}: {e}")
+
+
+async def invalidate_rollups_for_rows(rows: Iterable[Dict[str, Any]], date_field: str = 'created_at'):
+    """
+    Drop the cached rollup months of written rows.
+
+    For writes to rows the rollups are built from, which may fall in closed
+    months. Rows without an owner_id are attributed through their property,
+    looked up with the service-role client.
+
+    Args:
+        rows: The rows as written (or as they were, for deletes)
+        date_field: The column that decides the month a row is booked in
+    """
+    rows = [row for row in rows if row and row.get(date_field)]
+    try:
+        property_ids = sorted({str(row['property_id']) for row in rows if not row.get('owner_id') and row.get('property_id')})
+        owners: Dict[str, str] = {}
+        if property_ids:
+            response = await run_query(
+                supabase_service_role_client.table('properties').select('id, owner_id').in_('id', property_ids)
+            )
+            owners = {str(row['id']): row['owner_id'] for row in response.data or []}
+        months: Dict[str, set] = {}
+        for row in rows:
+            owner_id = row.get('owner_id') or owners.get(str(row.get('property_id')))
+            if owner_id:
+                months.setdefault(str(owner_id), set()).add(row[date_field])
+        for owner_id, owner_months in months.items():
+            await invalidate_rollups(owner_id, owner_months)
+    except Exception as e:
+        logger.error(f"Error invalidating rollups for written rows: {e}")
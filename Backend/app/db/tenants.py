@@ -2,10 +2,20 @@ from typing import Dict, List, Any, Optional
 import logging
 import uuid
 from ..config.database import supabase_client, supabase_service_role_client
+from ..config.query_executor import run_query
+from ..config.cache import invalidate_cache, invalidate_tags
+from .loaders import get_request_loaders
+from .properties import invalidate_property_owners
 from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 
+# Tenant columns the owner listing may be sorted by; anything else falls back to created_at
+TENANT_SORT_COLUMNS = frozenset({
+    'created_at', 'updated_at', 'name', 'email', 'phone', 'status', 'verification_status',
+    'occupation_category', 'monthly_income', 'date_of_birth',
+})
+
 # --- Primary Tenant Functions ---
 
 async def get_tenants_for_owner(
@@ -19,10 +29,10 @@ async def get_tenants_for_owner(
 ) -> tuple[List[Dict[str, Any]], int]:
     """
     Get tenants associated with properties owned by a specific user.
-    This is more complex and requires multiple queries:
-    1. Find properties owned by the user (or a specific property if provided)
-    2. Find property_tenant links for those properties
-    3. Fetch the tenant details for those links
+    Uses a single query regardless of portfolio size: tenants are joined to
+    the owner's properties through property_tenants (``!inner`` embeds), so
+    ownership, filtering, ordering, range pagination and the exact total
+    count all happen server-side and no ID lists are sent in the URL.
 
     Args:
         owner_id: The ID of the property owner
@@ -30,71 +40,41 @@ async def get_tenants_for_owner(
         status: Optional tenant status to filter by (active, unassigned, inactive)
         skip: Number of records to skip (pagination)
         limit: Maximum number of records to return (pagination)
-        sort_by: Field to sort by
+        sort_by: Field to sort by (one of TENANT_SORT_COLUMNS, else created_at)
         sort_order: Sort direction ('asc' or 'desc')
 
     Returns:
-        List of tenant dictionaries
+        Tuple of (list of tenant dictionaries for the page, total matching count)
     """
+    if sort_by not in TENANT_SORT_COLUMNS:
+        logger.warning(f"Unsupported tenant sort field '{sort_by}', sorting by created_at")
+        sort_by = 'created_at'
     try:
-        # If specific property_id provided, verify ownership first
+        query = (
+            supabase_client.table('tenants')
+            .select('*, property_tenants!inner(properties!inner(owner_id))', count='exact')
+            .eq('property_tenants.properties.owner_id', str(owner_id))
+        )
         if property_id:
-            # Fetch property to verify ownership
-            property_response = supabase_client.table('properties').select('id').eq('id', str(property_id)).eq('owner_id', str(owner_id)).execute()
-            if not property_response.data:
-                logger.warning(f"User {owner_id} does not own property {property_id} or property doesn't exist")
-                return []
-
-            # Get property_tenant links for this property
-            links_response = supabase_client.table('property_tenants').select('tenant_id').eq('property_id', str(property_id)).execute()
-            if not links_response.data:
-                return []  # No tenants linked to this property
-
-            tenant_ids = [link['tenant_id'] for link in links_response.data]
-        else:
-            # Get all properties owned by this user
-            properties_response = supabase_client.table('properties').select('id').eq('owner_id', str(owner_id)).execute()
-            if not properties_response.data:
-                return []  # User doesn't own any properties
-
-            property_ids = [prop['id'] for prop in properties_response.data]
-
-            # Get all property_tenant links for these properties
-            # Note: Supabase PostgreSQL RLS policies must allow this query
-            # In supabase-py we can't do a direct "in" query easily, so we'll use multiple queries
-            tenant_ids = set()
-            for p_id in property_ids:
-                links_response = supabase_client.table('property_tenants').select('tenant_id').eq('property_id', p_id).execute()
-                if links_response.data:
-                    tenant_ids.update([link['tenant_id'] for link in links_response.data])
-
-            if not tenant_ids:
-                return []  # No tenants linked to any properties
-
-        # Fetch tenant details for these IDs
-        # Note: In production, consider using a stored procedure/RPC for better performance
-        tenants = []
-        for t_id in list(tenant_ids)[skip:skip+limit]:  # Apply simple pagination here
-            query = supabase_client.table('tenants').select('*').eq('id', t_id)
-            
-            # Apply status filter if provided
-            if status:
-                query = query.eq('status', status)
-                
-            tenant_response = query.execute()
-            if tenant_response.data:
-                tenants.append(tenant_response.data[0])
+            # Same embedded link as the owner filter, so the property must be the owner's
+            query = query.eq('property_tenants.property_id', str(property_id))
+        if status:
+            query = query.eq('status', status)
+        query = query.order(sort_by, desc=sort_order.lower() != 'asc')
+        query = query.range(skip, skip + limit - 1)
 
-        # Sort tenants (in-memory sorting for simplicity)
-        # In production, this should be done at the database level
-        ascending = sort_order.lower() == 'asc'
-        try:
-            tenants.sort(key=lambda x: x.get(sort_by, ''), reverse=not ascending)
-        except (KeyError, TypeError):
-            logger.warning(f"Sort by '{sort_by}' failed, falling back to default")
-            tenants.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        response = await run_query(query)
+        if hasattr(response, 'error') and response.error:
+            logger.error(f"Error fetching tenants for owner {owner_id}: {response.error.message}")
+            return [], 0
 
-        return tenants, len(tenants)
+        # The embed only scopes the join; callers get plain tenant rows
+        tenants = [
+            {key: value for key, value in tenant.items() if key != 'property_tenants'}
+            for tenant in response.data or []
+        ]
+        total_count = response.count if getattr(response, 'count', None) is not None else len(tenants)
+        return tenants, total_count
     except Exception as e:
         logger.exception(f"Failed to get tenants for owner {owner_id}: {str(e)}")
         return [], 0
@@ -110,7 +90,7 @@ async def get_tenant_by_email(email: str) -> Optional[Dict[str, Any]]:
         Tenant data or None if not found
     """
     try:
-        response = supabase_client.table('tenants').select('*').eq('email', email).limit(1).execute()
+        response = await run_query(supabase_client.table('tenants').select('*').eq('email', email).limit(1))
 
         # Handle different Supabase client versions
         # Some versions have response.error, others don't
@@ -134,7 +114,7 @@ async def get_tenant_by_id(tenant_id: uuid.UUID) -> Optional[Dict[str, Any]]:
         Tenant data or None if not found
     """
     try:
-        response = supabase_client.table('tenants').select('*').eq('id', str(tenant_id)).single().execute()
+        response = await run_query(supabase_client.table('tenants').select('*').eq('id', str(tenant_id)).single())
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
@@ -146,6 +126,7 @@ async def get_tenant_by_id(tenant_id: uuid.UUID) -> Optional[Dict[str, Any]]:
         logger.error(f"Failed to get tenant {tenant_id}: {str(e)}")
         return None
 
+@invalidate_cache(tags=["owner:{result[owner_id]}"])
 async def create_tenant(tenant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Create a new tenant in Supabase.
@@ -176,7 +157,7 @@ async def create_tenant(tenant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]
 
         # Use service role client to bypass RLS for tenant creation
         # Property owners should be able to create tenants for their properties
-        response = supabase_service_role_client.table('tenants').insert(tenant_data_copy).execute()
+        response = await run_query(supabase_service_role_client.table('tenants').insert(tenant_data_copy))
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
@@ -188,6 +169,7 @@ async def create_tenant(tenant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]
         logger.error(f"Failed to create tenant: {str(e)}")
         return None
 
+@invalidate_cache(tags=["tenant:{tenant_id}", "owner:{result[owner_id]}"])
 async def update_tenant(tenant_id: uuid.UUID, tenant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Update a tenant in Supabase.
@@ -217,7 +199,8 @@ async def update_tenant(tenant_id: uuid.UUID, tenant_data: Dict[str, Any]) -> Op
             elif isinstance(value, date):
                 tenant_data_copy[key] = value.isoformat()
 
-        response = supabase_client.table('tenants').update(tenant_data_copy).eq('id', str(tenant_id)).execute()
+        response = await run_query(supabase_client.table('tenants').update(tenant_data_copy).eq('id', str(tenant_id)))
+        get_request_loaders().clear('tenants', tenant_id)
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
@@ -240,13 +223,15 @@ async def delete_tenant(tenant_id: uuid.UUID) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('tenants').delete().eq('id', str(tenant_id)).execute()
+        response = await run_query(supabase_client.table('tenants').delete().eq('id', str(tenant_id)))
+        get_request_loaders().clear('tenants', tenant_id)
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting tenant: {response.error.message}")
             return False
 
+        await invalidate_tags(f"tenant:{tenant_id}", *(f"owner:{row['owner_id']}" for row in (response.data or []) if row.get('owner_id')))
         return True
     except Exception as e:
         logger.error(f"Failed to delete tenant {tenant_id}: {str(e)}")
@@ -265,11 +250,12 @@ async def get_tenant_by_user_id(user_id: uuid.UUID) -> Optional[Dict[str, Any]]:
     """
     try:
         # Use the service role client to bypass RLS policies
-        response = supabase_service_role_client.table('tenants')\
-                        .select('*')\
-                        .eq('user_id', str(user_id))\
-                        .limit(1)\
-                        .execute()
+        response = await run_query(
+            supabase_service_role_client.table('tenants')
+                        .select('*')
+                        .eq('user_id', str(user_id))
+                        .limit(1)
+        )
 
         # Check for explicit error (Supabase client v1/v2 difference might exist)
         if hasattr(response, 'error') and response.error:
@@ -302,12 +288,11 @@ async def get_tenant_by_property_id(property_id: uuid.UUID) -> Optional[Dict[str
     logger.info(f"Attempting to find tenant linked to property_id: {property_id}")
     try:
         # 1. Find the link in property_tenants table (using parentheses for chaining)
-        link_response = await (
+        link_response = await run_query(
             supabase_client.table('property_tenants')
             .select('tenant_id')
             .eq('property_id', str(property_id))
             .limit(1) # Assuming one tenant link per property for this use case
-            .execute()
         )
 
         if hasattr(link_response, 'error') and link_response.error:
@@ -414,10 +399,11 @@ async def create_property_tenant_link(link_data: Dict[str, Any]) -> Optional[Dic
         
         if unit_id:
             # Check for existing active tenant in this unit
-            existing_tenant_response = supabase_client.table('property_tenants')\
-                .select('*')\
-                .eq('unit_id', unit_id)\
-                .execute()
+            existing_tenant_response = await run_query(
+                supabase_client.table('property_tenants')
+                .select('*')
+                .eq('unit_id', unit_id)
+            )
             
             if hasattr(existing_tenant_response, 'error') and existing_tenant_response.error:
                 logger.error(f"Error checking existing tenant for unit {unit_id}: {existing_tenant_response.error.message}")
@@ -437,11 +423,12 @@ async def create_property_tenant_link(link_data: Dict[str, Any]) -> Optional[Dic
                         
         elif property_id:
             # If no unit_id specified, check for property-level assignment
-            existing_property_response = supabase_client.table('property_tenants')\
-                .select('*')\
-                .eq('property_id', property_id)\
-                .is_('unit_id', 'null')\
-                .execute()
+            existing_property_response = await run_query(
+                supabase_client.table('property_tenants')
+                .select('*')
+                .eq('property_id', property_id)
+                .is_('unit_id', 'null')
+            )
                 
             if hasattr(existing_property_response, 'error') and existing_property_response.error:
                 logger.error(f"Error checking existing tenant for property {property_id}: {existing_property_response.error.message}")
@@ -468,7 +455,7 @@ async def create_property_tenant_link(link_data: Dict[str, Any]) -> Optional[Dic
         else:
             duplicate_check_response = duplicate_check_response.eq('property_id', property_id).is_('unit_id', 'null')
             
-        duplicate_check_response = duplicate_check_response.execute()
+        duplicate_check_response = await run_query(duplicate_check_response)
         
         if hasattr(duplicate_check_response, 'error') and duplicate_check_response.error:
             logger.error(f"Error checking for duplicate assignment: {duplicate_check_response.error.message}")
@@ -485,7 +472,7 @@ async def create_property_tenant_link(link_data: Dict[str, Any]) -> Optional[Dic
                     return None
 
         # If we get here, it's safe to create the new assignment
-        response = supabase_client.table('property_tenants').insert(link_data_copy).execute()
+        response = await run_query(supabase_client.table('property_tenants').insert(link_data_copy))
 
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error creating property-tenant link: {response.error.message}")
@@ -493,6 +480,7 @@ async def create_property_tenant_link(link_data: Dict[str, Any]) -> Optional[Dic
 
         logger.info(f"Successfully created property-tenant link for tenant {link_data_copy['tenant_id']} "
                    f"to {'unit ' + unit_id if unit_id else 'property ' + property_id}")
+        await invalidate_property_owners(link.get('property_id') for link in response.data or [])
         return response.data[0] if response.data else None
             
     except Exception as e:
@@ -510,7 +498,7 @@ async def get_property_links_for_tenant(tenant_id: uuid.UUID) -> List[Dict[str,
         List of property-tenant link data
     """
     try:
-        response = supabase_client.table('property_tenants').select('*').eq('tenant_id', str(tenant_id)).execute()
+        response = await run_query(supabase_client.table('property_tenants').select('*').eq('tenant_id', str(tenant_id)))
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
@@ -533,7 +521,7 @@ async def get_property_tenant_link_by_id(link_id: uuid.UUID) -> Optional[Dict[st
         Property-tenant link data or None if not found
     """
     try:
-        response = supabase_client.table('property_tenants').select('*').eq('id', str(link_id)).single().execute()
+        response = await run_query(supabase_client.table('property_tenants').select('*').eq('id', str(link_id)).single())
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
@@ -576,13 +564,21 @@ async def update_property_tenant_link(link_id: uuid.UUID, link_data: Dict[str, A
             elif isinstance(value, date):
                 link_data_copy[key] = value.isoformat()
 
-        response = supabase_client.table('property_tenants').update(link_data_copy).eq('id', str(link_id)).execute()
+        # A link moved to another property changes the old owner's figures too
+        previous = None
+        if 'property_id' in link_data_copy:
+            previous = await get_property_tenant_link_by_id(link_id)
+
+        response = await run_query(supabase_client.table('property_tenants').update(link_data_copy).eq('id', str(link_id)))
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error updating property-tenant link: {response.error.message}")
             return None
 
+        await invalidate_property_owners(
+            [link.get('property_id') for link in response.data or []] + [(previous or {}).get('property_id')]
+        )
         return response.data[0] if response.data else None
     except Exception as e:
         logger.error(f"Failed to update property-tenant link {link_id}: {str(e)}")
@@ -599,13 +595,14 @@ async def delete_property_tenant_link(link_id: uuid.UUID) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('property_tenants').delete().eq('id', str(link_id)).execute()
+        response = await run_query(supabase_client.table('property_tenants').delete().eq('id', str(link_id)))
 
         # Handle different Supabase client versions
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error deleting property-tenant link: {response.error.message}")
             return False
 
+        await invalidate_property_owners(link.get('property_id') for link in response.data or [])
         return True
     except Exception as e:
         logger.error(f"Failed to delete property-tenant link {link_id}: {str(e)}")
@@ -639,7 +636,7 @@ async def get_leases(
     """
     try:
         # First, get properties owned by this user
-        properties_response = supabase_client.table('properties').select('id').eq('owner_id', str(owner_id)).execute()
+        properties_response = await run_query(supabase_client.table('properties').select('id').eq('owner_id', str(owner_id)))
 
         if not properties_response.data:
             return [], 0  # User doesn't own any properties
@@ -682,7 +679,7 @@ async def get_leases(
         if active_only:
             count_query = count_query.or_(f"end_date.gte.{today},end_date.is.null")
 
-        count_response = count_query.execute()
+        count_response = await run_query(count_query)
         total_count = count_response.count if hasattr(count_response, 'count') else 0
 
         # Apply sorting and pagination
@@ -691,7 +688,7 @@ async def get_leases(
         query = query.range(skip, skip + limit - 1)
 
         # Execute the query
-        response = query.execute()
+        response = await run_query(query)
 
         if response.error:
             logger.error(f"Error fetching leases: {response.error.message}")
@@ -722,12 +719,13 @@ async def delete_property_tenant_links_by_tenant(tenant_id: uuid.UUID) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('property_tenants').delete().eq('tenant_id', str(tenant_id)).execute()
+        response = await run_query(supabase_client.table('property_tenants').delete().eq('tenant_id', str(tenant_id)))
 
         if response.error:
             logger.error(f"Error deleting property-tenant links: {response.error.message}")
             return False
 
+        await invalidate_property_owners(link.get('property_id') for link in response.data or [])
         return True
     except Exception as e:
         logger.error(f"Failed to delete property-tenant links for tenant {tenant_id}: {str(e)}")
@@ -746,7 +744,7 @@ async def get_property_links_for_property(property_id: uuid.UUID) -> List[Dict[s
     """
     try:
         # FIXED: Remove await since supabase_client is synchronous
-        response = supabase_client.table('property_tenants').select('*').eq('property_id', str(property_id)).execute()
+        response = await run_query(supabase_client.table('property_tenants').select('*').eq('property_id', str(property_id)))
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching property links for property {property_id}: {response.error.message}")
@@ -787,7 +785,7 @@ async def get_property_links_for_property_within_dates(
         # Using PostgREST filter syntax directly within .or()
         query = query.or_(f"end_date.gte.{start_date.isoformat()},end_date.is.null")
 
-        response = await query.execute()
+        response = await run_query(query)
 
         if response.error:
             logger.error(f"Error fetching property links within dates for property: {response.error.message}")
@@ -798,6 +796,38 @@ async def get_property_links_for_property_within_dates(
         logger.error(f"Failed to get property links within dates for property {property_id}: {str(e)}")
         return []
 
+async def get_property_links_within_dates(
+    property_ids: List[Any],
+    start_date: date,
+    end_date: date
+) -> List[Dict[str, Any]]:
+    """
+    Get property-tenant links for several properties that overlap with a given date range.
+    Same overlap condition as get_property_links_for_property_within_dates, in one query.
+
+    Args:
+        property_ids: The property IDs
+        start_date: The start date of the report period
+        end_date: The end date of the report period
+
+    Returns:
+        List of overlapping property-tenant link data
+    """
+    if not property_ids:
+        return []
+    try:
+        query = supabase_client.table('property_tenants')\
+                    .select('*')\
+                    .in_('property_id', [str(property_id) for property_id in property_ids])\
+                    .lte('start_date', end_date.isoformat())\
+                    .or_(f"end_date.gte.{start_date.isoformat()},end_date.is.null")
+
+        response = await run_query(query)
+        return response.data or []
+    except Exception as e:
+        logger.error(f"Failed to get property links within dates for {len(property_ids)} properties: {str(e)}")
+        return []
+
 # --- Tenant Invitation Functions ---
 
 async def create_invitation(invitation_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -829,7 +859,7 @@ async def create_invitation(invitation_data: Dict[str, Any]) -> Optional[Dict[st
         if 'updated_at' in invitation_data and hasattr(invitation_data['updated_at'], 'isoformat'):
             invitation_data['updated_at'] = invitation_data['updated_at'].isoformat()
 
-        response = supabase_client.table('tenant_invitations').insert(invitation_data).execute()
+        response = await run_query(supabase_client.table('tenant_invitations').insert(invitation_data))
 
         if response.error:
             logger.error(f"Error creating tenant invitation: {response.error.message}")
@@ -852,13 +882,14 @@ async def get_active_invitation(email: str, property_id: uuid.UUID) -> Optional[
         Invitation data or None if not found
     """
     try:
-        response = supabase_client.table('tenant_invitations').select('*')\
-            .eq('email', email)\
-            .eq('property_id', str(property_id))\
-            .eq('status', 'pending')\
-            .gt('expires_at', 'now()')\
-            .limit(1)\
-            .execute()
+        response = await run_query(
+            supabase_client.table('tenant_invitations').select('*')
+            .eq('email', email)
+            .eq('property_id', str(property_id))
+            .eq('status', 'pending')
+            .gt('expires_at', 'now()')
+            .limit(1)
+        )
 
         if response.error:
             logger.error(f"Error fetching active invitation: {response.error.message}")
@@ -883,32 +914,19 @@ async def get_properties_for_tenant_db(tenant_id: uuid.UUID) -> List[Dict[str, A
     """
     try:
         # 1. Get property IDs from property_tenants
-        links_response = supabase_client.table('property_tenants').select('property_id').eq('tenant_id', str(tenant_id)).execute()
+        links_response = await run_query(supabase_client.table('property_tenants').select('property_id').eq('tenant_id', str(tenant_id)))
 
-        if links_response.error:
+        if hasattr(links_response, 'error') and links_response.error:
             logger.error(f"Error fetching property links: {links_response.error.message}")
             return []
 
         if not links_response.data:
             return []
 
-        # 2. Fetch each property
-        properties = []
-        for link in links_response.data:
-            property_id = link.get('property_id')
-            if not property_id:
-                continue
-
-            property_response = supabase_client.table('properties').select('*').eq('id', property_id).single().execute()
-
-            if property_response.error:
-                logger.error(f"Error fetching property {property_id}: {property_response.error.message}")
-                continue
-
-            if property_response.data:
-                properties.append(property_response.data)
-
-        return properties
+        # 2. Fetch every linked property in one batched lookup
+        property_ids = list(dict.fromkeys(link['property_id'] for link in links_response.data if link.get('property_id')))
+        rows = await get_request_loaders().load_many('properties', supabase_client, property_ids)
+        return [row for row in rows if row]
     except Exception as e:
         logger.error(f"Failed to get properties for tenant {tenant_id}: {str(e)}")
         return []
@@ -945,7 +963,7 @@ async def get_tenant_payments(
         query = query.limit(limit)
 
         # Execute query
-        response = query.execute()
+        response = await run_query(query)
 
         if response.error:
             logger.error(f"Error fetching payment history: {response.error.message}")
@@ -989,7 +1007,7 @@ async def get_tenant_payment_tracking(
         query = query.limit(limit)
 
         # Execute query
-        response = query.execute()
+        response = await run_query(query)
 
         if response.error:
             logger.error(f"Error fetching payment tracking: {response.error.message}")
@@ -1017,15 +1035,16 @@ async def db_get_current_tenant_for_unit(unit_id: uuid.UUID) -> Optional[Dict[st
         today = date.today()
         # Find the currently active lease link for the given unit
         # Assumes 'property_tenants' table links tenants to units and has start/end dates
-        lease_response = supabase_client.table('property_tenants') \
-            .select('tenant_id') \
-            .eq('unit_id', str(unit_id)) \
-            .lte('start_date', today.isoformat()) \
-            .gte('end_date', today.isoformat()) \
-            .order('created_at', desc=True) \
-            .limit(1) \
-            .maybe_single() \
-            .execute()
+        lease_response = await run_query(
+            supabase_client.table('property_tenants')
+            .select('tenant_id')
+            .eq('unit_id', str(unit_id))
+            .lte('start_date', today.isoformat())
+            .gte('end_date', today.isoformat())
+            .order('created_at', desc=True)
+            .limit(1)
+            .maybe_single()
+        )
 
         # Handle potential errors during lease fetch
         if hasattr(lease_response, 'error') and lease_response.error:
@@ -1065,10 +1084,11 @@ async def db_get_tenants_for_unit(unit_id: uuid.UUID) -> List[Dict[str, Any]]:
     tenants = []
     try:
         # Find links for the unit - FIXED: Remove await since supabase_client is synchronous
-        lease_response = supabase_client.table('property_tenants') \
-            .select('tenant_id') \
-            .eq('unit_id', str(unit_id)) \
-            .execute()
+        lease_response = await run_query(
+            supabase_client.table('property_tenants')
+            .select('tenant_id')
+            .eq('unit_id', str(unit_id))
+        )
 
         logger.info(f"Lease response for unit {unit_id}: {lease_response}")
 
@@ -1085,19 +1105,20 @@ async def db_get_tenants_for_unit(unit_id: uuid.UUID) -> List[Dict[str, Any]]:
         if not tenant_ids:
              return []
 
-        # Fetch details for each unique tenant ID found
+        valid_ids = []
         for tenant_id_str in tenant_ids:
             try:
-                 tenant_id_uuid = uuid.UUID(tenant_id_str)
-                 tenant_details = await get_tenant_by_id(tenant_id_uuid) # Reuse existing function
-                 if tenant_details:
-                     tenants.append(tenant_details)
-                 else:
-                     logger.warning(f"Found link for tenant {tenant_id_str} in unit {unit_id}, but failed to fetch tenant details.")
+                 valid_ids.append(str(uuid.UUID(tenant_id_str)))
             except ValueError:
                  logger.warning(f"Invalid UUID format '{tenant_id_str}' found in property_tenants for unit {unit_id}")
-            except Exception as inner_e:
-                logger.error(f"Error fetching details for tenant {tenant_id_str} linked to unit {unit_id}: {inner_e}")
+
+        # Fetch details for every unique tenant ID in one batched lookup
+        rows = await get_request_loaders().load_many('tenants', supabase_client, valid_ids)
+        for tenant_id_str, tenant_details in zip(valid_ids, rows):
+            if tenant_details:
+                tenants.append(tenant_details)
+            else:
+                logger.warning(f"Found link for tenant {tenant_id_str} in unit {unit_id}, but failed to fetch tenant details.")
 
         return tenants
 
@@ -1126,11 +1147,12 @@ async def check_tenant_exists(tenant_id: uuid.UUID) -> bool:
         True if the tenant exists, False otherwise.
     """
     try:
-        response = supabase_client.table('tenants') \
-            .select('id', count='exact') \
-            .eq('id', str(tenant_id)) \
-            .limit(1) \
-            .execute()
+        response = await run_query(
+            supabase_client.table('tenants')
+            .select('id', count='exact')
+            .eq('id', str(tenant_id))
+            .limit(1)
+        )
 
         # Check if the count is greater than 0
         if response.count is not None and response.count > 0:
@@ -1165,7 +1187,7 @@ async def update_tenant_status(tenant_id: uuid.UUID, status: str) -> bool:
             return False
 
         # Update tenant status
-        response = supabase_client.table('tenants').update({"status": status}).eq('id', str(tenant_id)).execute()
+        response = await run_query(supabase_client.table('tenants').update({"status": status}).eq('id', str(tenant_id)))
 
         if response.error:
             logger.error(f"Error updating tenant status: {response.error.message}")
@@ -1216,7 +1238,7 @@ async def get_tenants_by_owner_id(
         query = query.range(skip, skip + limit - 1)
         
         # Execute the query
-        response = query.execute()
+        response = await run_query(query)
         
         # Handle error
         if hasattr(response, 'error') and response.error:
@@ -1311,7 +1333,7 @@ async def terminate_tenant_lease(
                     'created_at': datetime.utcnow().isoformat()
                 }
                 
-                refund_response = supabase_client.table('payment_history').insert(refund_data).execute()
+                refund_response = await run_query(supabase_client.table('payment_history').insert(refund_data))
                 
                 if hasattr(refund_response, 'error') and refund_response.error:
                     logger.error(f"Failed to create refund record: {refund_response.error.message}")
@@ -1331,11 +1353,12 @@ async def terminate_tenant_lease(
         
         # 3. Check if tenant has any other active leases
         try:
-            other_leases_response = supabase_client.table('property_tenants')\
-                .select('*')\
-                .eq('tenant_id', tenant_id)\
-                .neq('id', str(link_id))\
-                .execute()
+            other_leases_response = await run_query(
+                supabase_client.table('property_tenants')
+                .select('*')
+                .eq('tenant_id', tenant_id)
+                .neq('id', str(link_id))
+            )
                 
             if hasattr(other_leases_response, 'error') and other_leases_response.error:
                 logger.warning(f"Could not check other leases for tenant {tenant_id}: {other_leases_response.error.message}")
@@ -1389,13 +1412,14 @@ async def get_active_tenant_for_unit(unit_id: uuid.UUID) -> Optional[Dict[str, A
         today = date.today().isoformat()
         
         # Find active lease for this unit
-        lease_response = supabase_client.table('property_tenants')\
-            .select('*, tenant:tenants(*)')\
-            .eq('unit_id', str(unit_id))\
-            .or_(f"end_date.gte.{today},end_date.is.null")\
-            .order('created_at', desc=True)\
-            .limit(1)\
-            .execute()
+        lease_response = await run_query(
+            supabase_client.table('property_tenants')
+            .select('*, tenant:tenants(*)')
+            .eq('unit_id', str(unit_id))
+            .or_(f"end_date.gte.{today},end_date.is.null")
+            .order('created_at', desc=True)
+            .limit(1)
+        )
             
         if hasattr(lease_response, 'error') and lease_response.error:
             logger.error(f"Error checking active tenant for unit {unit_id}: {lease_response.error.message}")
@@ -1480,10 +1504,11 @@ async def get_upcoming_lease_expirations(
         future_date = today + timedelta(days=days_ahead)
         
         # Get properties owned by this user
-        properties_response = supabase_client.table('properties')\
-            .select('id')\
-            .eq('owner_id', str(owner_id))\
-            .execute()
+        properties_response = await run_query(
+            supabase_client.table('properties')
+            .select('id')
+            .eq('owner_id', str(owner_id))
+        )
             
         if not properties_response.data:
             return []
@@ -1493,13 +1518,14 @@ async def get_upcoming_lease_expirations(
         # Find leases expiring in the date range
         expiring_leases = []
         for property_id in property_ids:
-            lease_response = supabase_client.table('property_tenants')\
-                .select('*, tenant:tenants(*), property:properties(*)')\
-                .eq('property_id', property_id)\
-                .gte('end_date', today.isoformat())\
-                .lte('end_date', future_date.isoformat())\
-                .order('end_date', desc=False)\
-                .execute()
+            lease_response = await run_query(
+                supabase_client.table('property_tenants')
+                .select('*, tenant:tenants(*), property:properties(*)')
+                .eq('property_id', property_id)
+                .gte('end_date', today.isoformat())
+                .lte('end_date', future_date.isoformat())
+                .order('end_date', desc=False)
+            )
                 
             if hasattr(lease_response, 'error') and lease_response.error:
                 logger.warning(f"Error fetching expiring leases for property {property_id}: {lease_response.error.message}")
@@ -1546,12 +1572,13 @@ async def get_current_tenant_assignment(tenant_id: str) -> Optional[Dict[str, An
         today = date.today().isoformat()
         
         # Query for active assignments (where end_date is null or in the future)
-        response = supabase_client.table('property_tenants')\
-            .select('*')\
-            .eq('tenant_id', tenant_id)\
-            .or_(f'end_date.is.null,end_date.gte.{today}')\
-            .limit(1)\
-            .execute()
+        response = await run_query(
+            supabase_client.table('property_tenants')
+            .select('*')
+            .eq('tenant_id', tenant_id)
+            .or_(f'end_date.is.null,end_date.gte.{today}')
+            .limit(1)
+        )
             
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching current assignment for tenant {tenant_id}: {response.error.message}")
@@ -1604,7 +1631,7 @@ async def get_enriched_tenants_by_owner_id(
         # Apply pagination
         query = query.range(skip, skip + limit - 1)
         
-        response = query.execute()
+        response = await run_query(query)
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching enriched tenants: {response.error.message}")
@@ -1620,7 +1647,7 @@ async def get_enriched_tenants_by_owner_id(
         if status:
             count_query = count_query.eq('status', status)
         
-        count_response = count_query.execute()
+        count_response = await run_query(count_query)
         total_count = count_response.count if hasattr(count_response, 'count') else len(tenants)
         
         return tenants, total_count
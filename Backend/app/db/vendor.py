@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,7 @@ async def get_vendors(
             # and uses the contains operator to check if the category exists in the array
             query = query.contains('categories', [category])
             
-        response = query.execute()
+        response = await run_query(query)
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching vendors: {response['error']}")
@@ -58,7 +59,7 @@ async def get_vendor_by_id(vendor_id: str) -> Optional[Dict[str, Any]]:
         Vendor data or None if not found
     """
     try:
-        response = supabase_client.table('vendors').select('*').eq('id', vendor_id).single().execute()
+        response = await run_query(supabase_client.table('vendors').select('*').eq('id', vendor_id).single())
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching vendor: {response['error']}")
@@ -84,7 +85,7 @@ async def create_vendor(vendor_data: Dict[str, Any]) -> Optional[Dict[str, Any]]
         if 'categories' in vendor_data and not isinstance(vendor_data['categories'], list):
             vendor_data['categories'] = [vendor_data['categories']]
             
-        response = supabase_client.table('vendors').insert(vendor_data).execute()
+        response = await run_query(supabase_client.table('vendors').insert(vendor_data))
         
         if "error" in response and response["error"]:
             logger.error(f"Error creating vendor: {response['error']}")
@@ -114,7 +115,7 @@ async def update_vendor(vendor_id: str, vendor_data: Dict[str, Any]) -> Optional
         # Add updated_at timestamp
         vendor_data['updated_at'] = datetime.utcnow().isoformat()
         
-        response = supabase_client.table('vendors').update(vendor_data).eq('id', vendor_id).execute()
+        response = await run_query(supabase_client.table('vendors').update(vendor_data).eq('id', vendor_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error updating vendor: {response['error']}")
@@ -136,7 +137,7 @@ async def delete_vendor(vendor_id: str) -> bool:
         True if deletion succeeded, False otherwise
     """
     try:
-        response = supabase_client.table('vendors').delete().eq('id', vendor_id).execute()
+        response = await run_query(supabase_client.table('vendors').delete().eq('id', vendor_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error deleting vendor: {response['error']}")
@@ -158,7 +159,7 @@ async def get_vendor_jobs(vendor_id: str) -> List[Dict[str, Any]]:
         List of maintenance jobs
     """
     try:
-        response = supabase_client.table('maintenance_requests').select('*').eq('vendor_id', vendor_id).execute()
+        response = await run_query(supabase_client.table('maintenance_requests').select('*').eq('vendor_id', vendor_id))
         
         if "error" in response and response["error"]:
             logger.error(f"Error fetching vendor jobs: {response['error']}")
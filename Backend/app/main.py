@@ -3,8 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
 from typing import Dict
+import asyncio
 import logging
-import time
 import os
 import sys
 from fastapi.exceptions import RequestValidationError
@@ -18,6 +18,12 @@ if BACKEND_DIR not in sys.path:
 from .config.settings import settings
 from .config.auth import get_current_user
 from .config.cache import startup_cache, shutdown_cache
+from .config.database import client_pool
+from .config.query_executor import shutdown_executor
+from .config.metrics import MetricsMiddleware, loop_lag_monitor, metrics_flush_loop, flush_metrics, multiprocess_store
+from .config.memory import memory_profiler, rss_watchdog
+from .config.loop_blocking import blocking_detector
+from .config.warmup import warm_up
 from .api import (
     property,
     tenant,
@@ -35,7 +41,10 @@ from .api import (
     uploads,
     lease,
     units,
-    property_images
+    property_images,
+    reports,
+    performance,
+    metrics_router
 )
 
 # Setup logging
@@ -89,17 +98,8 @@ async def railway_proxy_middleware(request: Request, call_next):
     response = await call_next(request)
     return response
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-
-    response = await call_next(request)
-
-    process_time = time.time() - start_time
-    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.4f}s")
-
-    return response
+# Request instrumentation (latency histograms, status codes, sizes, in-flight); see /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Error handler
 @app.exception_handler(Exception)
@@ -129,13 +129,29 @@ async def health_check():
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting up Property Management API...")
-    await startup_cache()
+    if settings.STARTUP_PREWARM:
+        await asyncio.gather(startup_cache(), warm_up())
+    else:
+        await startup_cache()
+    loop_lag_monitor.start()
+    blocking_detector.start()
+    rss_watchdog.start()
+    if settings.MEMORY_TRACEMALLOC_FRAMES > 0:
+        memory_profiler.start(settings.MEMORY_TRACEMALLOC_FRAMES)
+    if multiprocess_store.enabled:
+        app.state.metrics_flush_task = asyncio.create_task(metrics_flush_loop())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up services on shutdown"""
     logger.info("Shutting down Property Management API...")
+    await loop_lag_monitor.stop()
+    blocking_detector.stop()
+    await rss_watchdog.stop()
+    flush_metrics()
     await shutdown_cache()
+    shutdown_executor()
+    client_pool.close()
 
 # Protected route example
 @app.get("/protected", tags=["Auth"])
@@ -160,6 +176,9 @@ app.include_router(document, prefix="/documents", tags=["Documents"])
 app.include_router(notification, prefix="/notifications", tags=["Notifications"])
 app.include_router(uploads)
 app.include_router(property_images.router, prefix="/api/v1", tags=["Property Images"])
+app.include_router(reports.router, prefix="/reports", tags=["Reports"])
+app.include_router(performance)
+app.include_router(metrics_router)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
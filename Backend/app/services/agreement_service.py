@@ -11,11 +11,6 @@ from ..db import tenants as tenant_db
 from ..config.database import supabase_client
 from ..models.agreement import AgreementCreate, AgreementUpdate, AgreementTemplateCreate
 
-# ReportLab imports
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-
 logger = logging.getLogger(__name__)
 
 async def get_agreements(
@@ -292,6 +287,12 @@ async def generate_agreement_document(agreement_id: str, template_id: str = None
         processed_content = process_template_variables(template_content, variables)
 
         # --- 3. Generate PDF File --- 
+        # ReportLab is imported here rather than at module level: it is slow to
+        # import and only this path needs it (config/warmup.py preloads it at startup)
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
+
         pdf_buffer = io.BytesIO()
         doc = SimpleDocTemplate(pdf_buffer, pagesize=(8.5*inch, 11*inch), topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
         styles = getSampleStyleSheet()
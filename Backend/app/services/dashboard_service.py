@@ -1,4 +1,5 @@
 from typing import Dict, List, Any, Optional
+import asyncio
 import logging
 from datetime import datetime
 
@@ -6,10 +7,39 @@ from ..db import dashboard as dashboard_db
 
 logger = logging.getLogger(__name__)
 
+def _format_summary(dashboard: Dict[str, Any], upcoming_expirations: int = 0) -> Dict[str, Any]:
+    """Summary in the frontend's DashboardSummary shape, from one ``dashboard_summary`` row"""
+    property_stats = dashboard_db.property_stats_from_summary(dashboard)
+    revenue_stats = dashboard_db.revenue_stats_from_summary(dashboard)
+    tenant_stats = dashboard_db.tenant_stats_from_summary(dashboard, upcoming_expirations)
+
+    # Format data according to frontend DashboardSummary interface
+    return {
+        # Owner Dashboard Fields (required by frontend)
+        'total_properties': property_stats.get('total_properties', 0),
+        'total_tenants': tenant_stats.get('total_tenants', 0),
+        'occupied_units': property_stats.get('total_rented', 0),
+        'vacant_units': property_stats.get('total_vacant', 0),
+        'total_revenue': revenue_stats.get('monthly_rental_income', 0),
+        'pending_rent': revenue_stats.get('monthly_rental_income', 0) * 0.1,  # 10% pending (placeholder)
+        'maintenance_requests': 0,  # Placeholder, to be replaced with actual count
+        
+        # Additional fields that might be useful
+        'occupancy_rate': property_stats.get('occupancy_rate', 0),
+        'upcoming_lease_expiries': tenant_stats.get('upcoming_lease_expirations', 0),
+        'average_lease_duration': tenant_stats.get('average_lease_duration', 0),
+        'yearly_revenue': revenue_stats.get('yearly_income', 0),
+        'average_rent': revenue_stats.get('average_rent_per_property', 0)
+    }
+
 async def get_dashboard_summary(owner_id: str) -> Dict[str, Any]:
     """
     Get dashboard summary data for a property owner.
     
+    The ``dashboard_summary`` view row is read once and shared by the
+    property, revenue and tenant stats; the lease expiry lookup runs
+    concurrently with it.
+    
     Args:
         owner_id: The ID of the property owner
         
@@ -17,33 +47,11 @@ async def get_dashboard_summary(owner_id: str) -> Dict[str, Any]:
         Dashboard summary data in the format expected by the frontend
     """
     try:
-        # Get property statistics
-        property_stats = await dashboard_db.get_property_stats(owner_id)
-        
-        # Get revenue statistics
-        revenue_stats = await dashboard_db.get_revenue_stats(owner_id)
-        
-        # Get tenant statistics
-        tenant_stats = await dashboard_db.get_tenant_stats(owner_id)
-        
-        # Format data according to frontend DashboardSummary interface
-        return {
-            # Owner Dashboard Fields (required by frontend)
-            'total_properties': property_stats.get('total_properties', 0),
-            'total_tenants': tenant_stats.get('total_tenants', 0),
-            'occupied_units': property_stats.get('total_rented', 0),
-            'vacant_units': property_stats.get('total_vacant', 0),
-            'total_revenue': revenue_stats.get('monthly_rental_income', 0),
-            'pending_rent': revenue_stats.get('monthly_rental_income', 0) * 0.1,  # 10% pending (placeholder)
-            'maintenance_requests': 0,  # Placeholder, to be replaced with actual count
-            
-            # Additional fields that might be useful
-            'occupancy_rate': property_stats.get('occupancy_rate', 0),
-            'upcoming_lease_expiries': tenant_stats.get('upcoming_lease_expiries', 0),
-            'average_lease_duration': tenant_stats.get('average_lease_duration', 0),
-            'yearly_revenue': revenue_stats.get('yearly_rental_income', 0),
-            'average_rent': revenue_stats.get('average_rent_per_property', 0)
-        }
+        dashboard, upcoming_expirations = await asyncio.gather(
+            dashboard_db.get_dashboard_summary_row(owner_id),
+            dashboard_db.count_upcoming_lease_expirations(owner_id),
+        )
+        return _format_summary(dashboard, upcoming_expirations)
     except Exception as e:
         logger.error(f"Error in get_dashboard_summary service: {str(e)}")
         # Return a minimal valid structure even in case of error
@@ -61,6 +69,11 @@ async def get_dashboard_data(owner_id: str, months: int = 6) -> Dict[str, Any]:
     """
     Get full dashboard data for a property owner.
     
+    Independent reads run concurrently, so the latency is that of the
+    slowest chain rather than the sum: the summary view row and the monthly
+    revenue rollups alongside the owner's properties and leases, then the
+    lease expiries and occupancy built from those leases.
+    
     Args:
         owner_id: The ID of the property owner
         months: Number of months of historical data to retrieve
@@ -69,14 +82,19 @@ async def get_dashboard_data(owner_id: str, months: int = 6) -> Dict[str, Any]:
         Complete dashboard data
     """
     try:
-        # Get dashboard summary
-        summary = await get_dashboard_summary(owner_id)
-        
-        # Get monthly revenue data
-        monthly_revenue = await dashboard_db.get_monthly_revenue(owner_id, months)
-        
-        # Get occupancy history
-        occupancy_history = await dashboard_db.get_occupancy_history(owner_id, months)
+        async def lease_stats():
+            leases = await dashboard_db.get_owner_leases(owner_id, months)
+            return await asyncio.gather(
+                dashboard_db.count_upcoming_lease_expirations(owner_id, leases),
+                dashboard_db.get_occupancy_history(owner_id, months, leases=leases),
+            )
+
+        dashboard, monthly_revenue, (upcoming_expirations, occupancy_history) = await asyncio.gather(
+            dashboard_db.get_dashboard_summary_row(owner_id),
+            dashboard_db.get_monthly_revenue(owner_id, months),
+            lease_stats(),
+        )
+        summary = _format_summary(dashboard, upcoming_expirations)
         
         # Mock some recent payments data for the frontend
         recent_payments = [
@@ -104,7 +122,7 @@ async def get_dashboard_data(owner_id: str, months: int = 6) -> Dict[str, Any]:
         
         # Format revenue_by_month for the frontend
         revenue_by_month = [
-            {'month': item.get('month_label', ''), 'amount': item.get('revenue', 0)}
+            {'month': item['month'], 'amount': item.get('revenue', 0)}
             for item in monthly_revenue
         ]
         
@@ -113,7 +131,8 @@ async def get_dashboard_data(owner_id: str, months: int = 6) -> Dict[str, Any]:
             'summary': summary,
             'recent_payments': recent_payments,
             'maintenance_issues': maintenance_issues,
-            'revenue_by_month': revenue_by_month
+            'revenue_by_month': revenue_by_month,
+            'occupancy_history': occupancy_history
         }
     except Exception as e:
         logger.error(f"Error in get_dashboard_data service: {str(e)}")
@@ -121,7 +140,8 @@ async def get_dashboard_data(owner_id: str, months: int = 6) -> Dict[str, Any]:
             'summary': await get_dashboard_summary(owner_id),
             'recent_payments': [],
             'maintenance_issues': [],
-            'revenue_by_month': []
+            'revenue_by_month': [],
+            'occupancy_history': []
         }
 
 async def get_recent_activities(owner_id: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -167,7 +187,7 @@ async def get_revenue_data(owner_id: str, months: int = 6) -> List[Dict[str, Any
         
         # Format revenue_by_month for the frontend charts
         revenue_by_month = [
-            {'month': item.get('month_label', ''), 'amount': item.get('revenue', 0)}
+            {'month': item['month'], 'amount': item.get('revenue', 0)}
             for item in monthly_revenue
         ]
         
@@ -8,6 +8,8 @@ from fastapi import HTTPException, status
 from app.schemas.lease import Lease, LeaseCreate, LeaseUpdate
 from ..db import leases as lease_db
 from ..db import properties as property_db # To verify ownership
+from ..config.cache import invalidate_tags
+from ..config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +38,7 @@ async def get_leases(
             query = query.eq('property_id', property_id)
         else:
             # Get all properties owned by this user and filter leases
-            properties_response = await db_client.table('properties').select('id').eq('owner_id', owner_id).execute()
+            properties_response = await run_query(db_client.table('properties').select('id').eq('owner_id', owner_id))
             if properties_response.data:
                 property_ids = [p['id'] for p in properties_response.data]
                 query = query.in_('property_id', property_ids)
@@ -50,11 +52,11 @@ async def get_leases(
             query = query.eq('status', 'active')
         
         # Get total count
-        count_response = await query.execute()
+        count_response = await run_query(query)
         total = len(count_response.data) if count_response.data else 0
         
         # Get paginated results
-        response = await query.range(skip, skip + limit - 1).execute()
+        response = await run_query(query.range(skip, skip + limit - 1))
         
         leases = []
         if response.data:
@@ -74,7 +76,7 @@ async def get_lease_by_id(db_client: Client, lease_id: uuid.UUID, owner_id: str)
     Get a specific lease by ID with ownership verification.
     """
     try:
-        response = db_client.table('leases').select('*').eq('id', str(lease_id)).maybe_single().execute()
+        response = await run_query(db_client.table('leases').select('*').eq('id', str(lease_id)).maybe_single())
         
         if not response.data:
             return None
@@ -105,7 +107,7 @@ async def get_lease_by_unit(db_client: Client, unit_id: uuid.UUID, owner_id: str
             raise HTTPException(status_code=403, detail="Not authorized to access this unit")
         
         # Get active lease for the unit
-        response = db_client.table('leases').select('*').eq('unit_id', str(unit_id)).eq('status', 'active').maybe_single().execute()
+        response = await run_query(db_client.table('leases').select('*').eq('unit_id', str(unit_id)).eq('status', 'active').maybe_single())
         
         if not response.data:
             return None
@@ -133,11 +135,13 @@ async def update_lease(db_client: Client, lease_id: uuid.UUID, lease_data: Lease
         if not update_data:
             return existing_lease  # No changes
         
-        response = await db_client.table('leases').update(update_data).eq('id', str(lease_id)).execute()
+        response = await run_query(db_client.table('leases').update(update_data).eq('id', str(lease_id)))
         
         if not response.data:
             return None
             
+        # Lease dates and rent feed the owner's dashboard and report periods
+        await invalidate_tags(f"owner:{owner_id}")
         return Lease.model_validate(response.data[0])
         
     except HTTPException:
@@ -157,9 +161,12 @@ async def delete_lease(db_client: Client, lease_id: uuid.UUID, owner_id: str) ->
             return False
         
         # Delete the lease
-        response = await db_client.table('leases').delete().eq('id', str(lease_id)).execute()
+        response = await run_query(db_client.table('leases').delete().eq('id', str(lease_id)))
         
-        return len(response.data) > 0
+        if not response.data:
+            return False
+        await invalidate_tags(f"owner:{owner_id}")
+        return True
         
     except HTTPException:
         raise
@@ -191,6 +198,7 @@ async def create_lease(db_client: Client, lease_data: LeaseCreate, owner_id: str
                 detail="Failed to create lease in the database."
             )
         
+        await invalidate_tags(f"owner:{owner_id}")
         return Lease.model_validate(new_lease_data)
 
     except ValueError as e:
@@ -217,7 +225,7 @@ async def terminate_lease(db_client: Client, lease_id: uuid.UUID, owner_id: str)
     try:
         # Step 1: Get the unit_id from the lease, then find the property owner.
         # This is a critical authorization step.
-        lease_response = db_client.table('leases').select('unit_id').eq('id', str(lease_id)).maybe_single().execute()
+        lease_response = await run_query(db_client.table('leases').select('unit_id').eq('id', str(lease_id)).maybe_single())
         if not hasattr(lease_response, 'data') or not lease_response.data:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lease not found.")
         
@@ -242,6 +250,7 @@ async def terminate_lease(db_client: Client, lease_id: uuid.UUID, owner_id: str)
             )
         
         # On success, there is nothing to return.
+        await invalidate_tags(f"owner:{owner_id}")
         return
 
     except HTTPException as e:
@@ -8,6 +8,7 @@ from supabase import Client
 from ..db import maintenance as maintenance_db
 from ..db import vendor as vendor_db
 from ..db import properties as property_db
+from ..db.loaders import get_request_loaders
 from ..models.maintenance import (
     MaintenanceRequest, 
     MaintenanceCreate, 
@@ -452,8 +453,9 @@ async def count_maintenance_requests(
 
 async def check_unit_access(db_client: Client, unit_id: str, user_id: str) -> bool:
     """Helper function to check if user owns parent property OR is current tenant."""
+    loaders = get_request_loaders()
     # 1. Get unit details to find parent property and current tenant_id
-    unit_data = await property_db.get_unit_by_id_db(db_client, unit_id)
+    unit_data = await loaders.load('units', db_client, unit_id)
     if not unit_data:
         return False # Unit doesn't exist
     
@@ -466,7 +468,7 @@ async def check_unit_access(db_client: Client, unit_id: str, user_id: str) -> bo
         
     # 2. Check if user owns the parent property
     try:
-        parent_property = await property_db.get_property_by_id(db_client, parent_property_id)
+        parent_property = await loaders.load('properties', db_client, parent_property_id)
         if parent_property and parent_property.get("owner_id") == user_id:
             logger.info(f"[check_unit_access] Access granted: User {user_id} owns parent property {parent_property_id}.")
             return True
@@ -4,9 +4,6 @@ from datetime import datetime
 import uuid
 import os # For getting environment variables
 
-# Resend imports
-import resend
-
 # Twilio imports
 # from twilio.rest import Client # Removed
 
@@ -35,12 +32,17 @@ FROM_EMAIL = os.environ.get("DEFAULT_SENDER_EMAIL", "Propify <noreply@propify.ap
 
 logger = logging.getLogger(__name__)
 
-# Initialize Resend client globally if key exists
-if RESEND_API_KEY:
-    resend.api_key = RESEND_API_KEY
-else:
+if not RESEND_API_KEY:
     logger.warning("RESEND_API_KEY not found in environment. Email notifications will be disabled.")
 
+
+def _resend():
+    """The Resend module, imported on first use (config/warmup.py preloads it at startup)"""
+    import resend
+    if RESEND_API_KEY:
+        resend.api_key = RESEND_API_KEY
+    return resend
+
 # Initialize Twilio client globally if credentials exist - Removed
 # twilio_client = None
 # if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN and TWILIO_PHONE_NUMBER:
@@ -255,7 +257,7 @@ async def send_email_notification(notification: Dict[str, Any], recipient_email:
         # To make this truly async, you'd typically run sync code in an executor
         # For simplicity here, we call it directly. This will block the event loop.
         # Consider using something like anyio.to_thread.run_sync in a real async app
-        email = resend.Emails.send(params)
+        email = _resend().Emails.send(params)
         logger.info(f"Resend email initiated for notification {notification.get('id')}. Email ID: {email.get('id')}")
         # Resend's send doesn't directly confirm delivery, just acceptance.
         # We'll assume success if no exception is thrown.
@@ -9,6 +9,7 @@ from ..db import payment as payment_db
 from ..db import properties as property_db
 from ..db import tenants as tenant_db
 from ..config.database import supabase_client
+from ..config.query_executor import run_query
 from ..models.payment import PaymentCreate, PaymentUpdate, PaymentStatus, PaymentType, Payment
 from ..models.notification import NotificationCreate, NotificationType, NotificationPriority, NotificationMethod
 from . import notification_service # Import notification service
@@ -635,7 +636,7 @@ async def get_lease_for_tenant_and_unit(tenant_id: str, unit_id: str) -> Optiona
         Lease data or None if not found
     """
     try:
-        response = supabase_client.table('leases').select('*').eq('tenant_id', tenant_id).eq('unit_id', unit_id).execute()
+        response = await run_query(supabase_client.table('leases').select('*').eq('tenant_id', tenant_id).eq('unit_id', unit_id))
         
         if response.data and len(response.data) > 0:
             return response.data[0]
@@ -671,7 +672,7 @@ async def create_lease_from_property_tenant(property_tenant: Dict[str, Any]) ->
             'updated_at': datetime.utcnow().isoformat()
         }
         
-        response = supabase_client.table('leases').insert(lease_data).execute()
+        response = await run_query(supabase_client.table('leases').insert(lease_data))
         
         if response.data and len(response.data) > 0:
             return response.data[0]
@@ -693,7 +694,7 @@ async def validate_lease_exists(lease_id: str) -> bool:
         True if lease exists, False otherwise
     """
     try:
-        response = supabase_client.table('leases').select('id').eq('id', lease_id).execute()
+        response = await run_query(supabase_client.table('leases').select('id').eq('id', lease_id))
         return response.data and len(response.data) > 0
     except Exception as e:
         logger.error(f"Error validating lease {lease_id}: {str(e)}")
@@ -30,6 +30,8 @@ from ..db import properties as properties_db
 from ..db import tenants as tenants_db
 from ..db import payment as payment_db
 from ..db import maintenance as maintenance_db
+from ..db.loaders import get_request_loaders
+from ..utils.occupancy import OccupancyEngine
 
 logger = logging.getLogger(__name__)
 
@@ -841,47 +843,33 @@ async def generate_tenant_history_report(report: Dict[str, Any], start_date: dat
         # Alternative: Fetch links first, then tenants.
 
         tenant_history = []
-        links = []
 
-        # Fetch relevant property_tenant links
+        # Fetch relevant property_tenant links in one query
         if property_ids_filter:
-            for prop_id in property_ids_filter:
-                # Check ownership implicitly by fetching links via owner properties
-                prop_links = await tenants_db.get_property_links_for_property_within_dates(
-                     property_id=prop_id, 
-                     start_date=start_date,
-                     end_date=end_date
-                )
-                # TODO: Ensure owner owns this property before adding links?
-                # The get_tenants_for_owner does this implicitly. Maybe adapt that?
-                # For now, assuming get_property_links_for_property_within_dates is sufficient if RLS is set.
-                links.extend(prop_links)
+            # TODO: Ensure owner owns these properties before adding links?
+            # For now, assuming the property filter is sufficient if RLS is set.
+            report_property_ids = property_ids_filter
         else:
              # Get all properties owned by the user first
              properties = await properties_db.get_properties(db_client=supabase_client, user_id=owner_id)
-             for prop in properties:
-                  prop_links = await tenants_db.get_property_links_for_property_within_dates(
-                       property_id=prop['id'], 
-                       start_date=start_date,
-                       end_date=end_date
-                  )
-                  links.extend(prop_links)
+             report_property_ids = [prop['id'] for prop in properties]
+        links = await tenants_db.get_property_links_within_dates(
+             property_ids=report_property_ids,
+             start_date=start_date,
+             end_date=end_date
+        )
+
+        loaders = get_request_loaders()
 
         # Fetch tenant details for unique tenant IDs in the links
         tenant_ids = list(set(link['tenant_id'] for link in links))
-        tenants_map = {}
-        for t_id in tenant_ids:
-             tenant_data = await tenants_db.get_tenant_by_id(tenant_id=t_id)
-             if tenant_data:
-                  tenants_map[t_id] = tenant_data
+        tenant_rows = await loaders.load_many('tenants', supabase_client, tenant_ids)
+        tenants_map = {t_id: tenant_data for t_id, tenant_data in zip(tenant_ids, tenant_rows) if tenant_data}
         
         # Fetch property details for unique property IDs
         property_ids = list(set(link['property_id'] for link in links))
-        properties_map = {}
-        for p_id in property_ids:
-             prop_data = await properties_db.get_property_by_id(db_client=supabase_client, property_id=p_id)
-             if prop_data:
-                 properties_map[p_id] = prop_data
+        property_rows = await loaders.load_many('properties', supabase_client, property_ids)
+        properties_map = {p_id: prop_data for p_id, prop_data in zip(property_ids, property_rows) if prop_data}
 
         # --- Structure Report Data --- 
         for link in links:
@@ -975,49 +963,30 @@ async def generate_occupancy_rate_report(report: Dict[str, Any], start_date: dat
             properties = []
 
         # --- Calculate Occupancy per Property --- 
-        occupancy_data = []
-        total_property_days_in_period = 0
-        total_occupied_days = 0
-        total_days_in_period = (end_date - start_date).days + 1
+        # One query for every property's tenancies, then one sweep over them
+        links = await tenants_db.get_property_links_within_dates(
+            property_ids=[prop.get('id') for prop in properties],
+            start_date=start_date,
+            end_date=end_date
+        )
+        capacity = {prop.get('id'): prop.get('number_of_units') or 1 for prop in properties}
+        [period] = OccupancyEngine.from_links(links).occupancy([(start_date, end_date)], capacity, by_property=True)
 
+        occupancy_data = []
         for prop in properties:
-            prop_id = prop.get('id')
-            prop_name = prop.get('property_name', 'N/A')
-            # Assuming single unit per property for simplicity, adjust if properties have multiple units
-            property_days_in_period = total_days_in_period 
-
-            # Fetch relevant links for this property within the date range
-            prop_links = await tenants_db.get_property_links_for_property_within_dates(
-                property_id=prop_id, 
-                start_date=start_date, 
-                end_date=end_date
-            )
-            
-            prop_occupied_days = 0
-            for link in prop_links:
-                 link_start = datetime.fromisoformat(link['start_date']).date()
-                 link_end = datetime.fromisoformat(link['end_date']).date() if link.get('end_date') else end_date
-                 overlap_start = max(link_start, start_date)
-                 overlap_end = min(link_end, end_date)
-                 if overlap_end >= overlap_start:
-                     prop_occupied_days += (overlap_end - overlap_start).days + 1
-            
-            # Ensure occupied days don't exceed total days in period for this property/unit
-            prop_occupied_days = min(prop_occupied_days, property_days_in_period)
-            prop_occupancy_rate = (prop_occupied_days / property_days_in_period) * 100 if property_days_in_period > 0 else 0
-
+            prop_stats = period['properties'][str(prop.get('id'))]
             occupancy_data.append({
-                "property_id": prop_id,
-                "property_name": prop_name,
-                "occupied_days": prop_occupied_days,
-                "total_days_in_period": property_days_in_period,
-                "occupancy_rate_percent": round(prop_occupancy_rate, 2)
+                "property_id": prop.get('id'),
+                "property_name": prop.get('property_name', 'N/A'),
+                "occupied_days": prop_stats['occupied_days'],
+                "total_days_in_period": prop_stats['unit_days'],
+                "occupancy_rate_percent": prop_stats['occupancy_rate']
             })
 
-            total_property_days_in_period += property_days_in_period
-            total_occupied_days += prop_occupied_days
-
-        overall_occupancy_rate = (total_occupied_days / total_property_days_in_period) * 100 if total_property_days_in_period > 0 else 0
+        # Days are unit-days: a property with several units has several days per calendar day
+        total_occupied_days = period['occupied_days']
+        total_property_days_in_period = period['unit_days']
+        overall_occupancy_rate = period['occupancy_rate']
 
         # --- Generate CSV Content --- 
         output = io.StringIO()
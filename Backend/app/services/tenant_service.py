@@ -13,6 +13,8 @@ from ..models.tenant import (
 )
 from ..db import tenants as tenants_db
 from ..db import properties as properties_db
+from ..db.loaders import get_request_loaders
+from ..config.query_executor import run_query
 # Import other DB layers or services as needed
 # from ..services import notification_service # Example for sending invites
 
@@ -21,11 +23,13 @@ logger = logging.getLogger(__name__)
 # --- Helper for Access Control ---
 # This logic might need refinement based on specific roles (owner, manager, tenant)
 async def _can_access_tenant(tenant_id: uuid.UUID, requesting_user_id: uuid.UUID) -> bool:
+    from ..config.database import supabase_client as db_client
     # Convert requesting user ID to string for comparison
     user_id_str = str(requesting_user_id)
+    loaders = get_request_loaders()
 
     # Option 1: Tenant accessing their own profile (assuming tenant.user_id links to auth.users.id)
-    tenant_profile = await tenants_db.get_tenant_by_id(tenant_id)
+    tenant_profile = await loaders.load('tenants', db_client, tenant_id)
     if tenant_profile and tenant_profile.get("user_id") == user_id_str:
         return True
 
@@ -35,11 +39,10 @@ async def _can_access_tenant(tenant_id: uuid.UUID, requesting_user_id: uuid.UUID
 
     # Option 3: Property owner/manager accessing a tenant linked to their property
     linked_properties = await tenants_db.get_property_links_for_tenant(tenant_id)
-    for link in linked_properties:
-        from ..config.database import supabase_client as db_client
-        property_owner = await properties_db.get_property_owner(db_client, link["property_id"])
-        if property_owner == user_id_str:
-            return True # User owns a property this tenant is linked to
+    # All linked properties are resolved with one batched query
+    properties = await loaders.load_many('properties', db_client, [link["property_id"] for link in linked_properties])
+    if any(prop and prop.get("owner_id") == user_id_str for prop in properties):
+        return True # User owns a property this tenant is linked to
 
     logger.warning(f"User {requesting_user_id} denied access to tenant {tenant_id}")
     return False
@@ -97,10 +100,12 @@ async def get_tenant_by_id(tenant_id: uuid.UUID, requesting_user_id: uuid.UUID)
         if not await _can_access_tenant(tenant_id, requesting_user_id):
             return None # Access denied
 
-        # Get basic tenant data
-        tenant_dict = await tenants_db.get_tenant_by_id(tenant_id)
-        if not tenant_dict:
+        # Get basic tenant data (memoized by the access check above)
+        from ..config.database import supabase_client as db_client
+        tenant_row = await get_request_loaders().load('tenants', db_client, tenant_id)
+        if not tenant_row:
             return None
+        tenant_dict = dict(tenant_row)
             
         # Enrich with property information
         tenant_dict = await _enrich_tenant_with_property_info(tenant_dict)
@@ -123,11 +128,12 @@ async def _enrich_tenant_with_property_info(tenant_dict: Dict[str, Any]) -> Dict
         # Use the new single source of truth view
         from ..config.database import supabase_client as db_client
         
-        response = db_client.from_('enriched_tenants_view')\
-            .select('*')\
-            .eq('id', str(tenant_id))\
-            .single()\
-            .execute()
+        response = await run_query(
+            db_client.from_('enriched_tenants_view')
+            .select('*')
+            .eq('id', str(tenant_id))
+            .single()
+        )
         
         if response.data:
             # The view already includes all the enriched data
@@ -326,19 +332,17 @@ async def _validate_tenant_status_change_business_logic(
     
     try:
         # Check current unit assignment
-        current_assignment = supabase_client.rpc(
-            'get_current_unit_assignment',
-            {'tenant_uuid': str(tenant_id)}
-        ).execute()
+        current_assignment = await run_query(
+            supabase_client.rpc('get_current_unit_assignment', {'tenant_uuid': str(tenant_id)})
+        )
         
         has_active_lease = bool(current_assignment.data)
         
         # Check recent lease history for inactive status
         if new_status == 'inactive':
-            recent_lease_check = supabase_client.rpc(
-                'has_recent_active_lease',
-                {'tenant_uuid': str(tenant_id), 'months_back': 3}
-            ).execute()
+            recent_lease_check = await run_query(
+                supabase_client.rpc('has_recent_active_lease', {'tenant_uuid': str(tenant_id), 'months_back': 3})
+            )
             
             if recent_lease_check.data:
                 raise ValueError("Cannot set tenant to inactive: tenant has had active lease in last 3 months")
@@ -469,13 +473,15 @@ async def get_tenant_history(
         from ..config.database import supabase_client
         
         # Get history records
-        history_response = supabase_client.rpc(
-            'get_tenant_history',
-            {
-                'tenant_uuid': str(tenant_id),
-                'limit_records': limit + skip  # Get more records for pagination
-            }
-        ).execute()
+        history_response = await run_query(
+            supabase_client.rpc(
+                'get_tenant_history',
+                {
+                    'tenant_uuid': str(tenant_id),
+                    'limit_records': limit + skip  # Get more records for pagination
+                }
+            )
+        )
         
         if not history_response.data:
             return [], 0
@@ -541,10 +547,9 @@ async def get_tenant_lease_history(
         # Get lease history using database function
         from ..config.database import supabase_client
         
-        lease_history_response = supabase_client.rpc(
-            'get_tenant_lease_history',
-            {'tenant_uuid': str(tenant_id)}
-        ).execute()
+        lease_history_response = await run_query(
+            supabase_client.rpc('get_tenant_lease_history', {'tenant_uuid': str(tenant_id)})
+        )
         
         if not lease_history_response.data:
             logger.info(f"No lease history found for tenant {tenant_id}")
@@ -991,11 +996,12 @@ async def create_lease(lease_data: PropertyTenantLinkCreate) -> Optional[Dict[st
         else:
             # Check for property-level active assignments
             from ..config.database import supabase_client
-            existing_response = supabase_client.table('property_tenants')\
-                .select('*')\
-                .eq('property_id', str(property_id))\
-                .is_('unit_id', 'null')\
-                .execute()
+            existing_response = await run_query(
+                supabase_client.table('property_tenants')
+                .select('*')
+                .eq('property_id', str(property_id))
+                .is_('unit_id', 'null')
+            )
                 
             if hasattr(existing_response, 'error') and existing_response.error:
                 logger.error(f"Error checking existing tenant for property {property_id}: {existing_response.error.message}")
@@ -1424,11 +1430,12 @@ async def link_tenant_to_property(
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error_msg)
         else:
             # Check for property-level active assignments
-            existing_response = supabase_client.table('property_tenants')\
-                .select('*')\
-                .eq('property_id', str(property_id))\
-                .is_('unit_id', 'null')\
-                .execute()
+            existing_response = await run_query(
+                supabase_client.table('property_tenants')
+                .select('*')
+                .eq('property_id', str(property_id))
+                .is_('unit_id', 'null')
+            )
                 
             if hasattr(existing_response, 'error') and existing_response.error:
                 logger.error(f"Error checking existing tenant for property {property_id}: {existing_response.error.message}")
@@ -1552,11 +1559,12 @@ async def get_leases_for_unit(unit_id: uuid.UUID) -> List[Dict[str, Any]]:
         from ..config.database import supabase_client
         
         # Get all leases for the unit with tenant information
-        response = supabase_client.table('property_tenants') \
-            .select('*, tenants(*)') \
-            .eq('unit_id', str(unit_id)) \
-            .order('start_date', desc=True) \
-            .execute()
+        response = await run_query(
+            supabase_client.table('property_tenants')
+            .select('*, tenants(*)')
+            .eq('unit_id', str(unit_id))
+            .order('start_date', desc=True)
+        )
             
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error fetching leases for unit {unit_id}: {response.error.message}")
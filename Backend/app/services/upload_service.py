@@ -1,12 +1,14 @@
 import logging
 import uuid
 from fastapi import UploadFile, HTTPException, status
-from supabase import create_client, Client
+from supabase import Client
 from typing import List, Optional, Dict, Any
 from postgrest import APIError
 
 # Assuming settings are correctly configured with necessary Supabase details
 from app.config.settings import settings
+from app.config.database import client_pool
+from app.config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +20,9 @@ def get_supabase_service_client() -> Client:
         logger.error("SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY is not configured.")
         raise ValueError("Supabase service client configuration missing.")
     try:
-        # Create a new client instance specifically with the service role key
-        service_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-        logger.debug("Successfully created Supabase client with service role key.")
+        # Reuse the pooled service role client instead of opening a new session per upload
+        service_client = client_pool.service_role_client
+        logger.debug("Using pooled Supabase client with service role key.")
         return service_client
     except Exception as e:
         logger.exception("Failed to create Supabase client with service role key.")
@@ -99,7 +101,7 @@ async def handle_upload(
                 # Fetch the object ID first using the path (more reliable than assuming upload_response structure)
                 # Note: This uses the service client which bypasses RLS select policies
                 logger.info(f"[OwnerUpdate] Selecting object ID for bucket={bucket_name}, path={storage_path}")
-                object_select_response = storage_client.table('objects', schema="storage").select('id').eq('bucket_id', bucket_name).eq('name', storage_path).single().execute()
+                object_select_response = await run_query(storage_client.table('objects', schema="storage").select('id').eq('bucket_id', bucket_name).eq('name', storage_path).single())
                 logger.info(f"[OwnerUpdate] Select response: {object_select_response}") # Log raw select response
 
                 if hasattr(object_select_response, 'data') and object_select_response.data and 'id' in object_select_response.data:
@@ -110,10 +112,12 @@ async def handle_upload(
                     try:
                         rpc_params = {'p_object_id': str(object_id), 'p_new_owner_id': str(user_id)}
                         # Use the same service client (storage_client)
-                        rpc_response = storage_client.rpc(
-                            'update_storage_object_owner', # Function name in public schema
-                            params=rpc_params
-                        ).execute()
+                        rpc_response = await run_query(
+                            storage_client.rpc(
+                                'update_storage_object_owner', # Function name in public schema
+                                params=rpc_params
+                            )
+                        )
 
                         # Check for errors in the RPC response
                         if hasattr(rpc_response, 'error') and rpc_response.error:
@@ -2,6 +2,7 @@
 from typing import Dict, Optional
 # Import the actual client from config
 from app.config.database import supabase_client 
+from app.config.query_trace import execute_traced
 from app.models.user import UserUpdate
 import logging
 from supabase import create_client, Client # Import Client
@@ -46,7 +47,7 @@ def update_user_profile(user_id: str, update_data: UserUpdate, email: Optional[s
 
         
         # Simple upsert operation (service role bypasses RLS)
-        response = supabase.table("user_profiles").upsert(insert_data).execute()
+        response = execute_traced(supabase.table("user_profiles").upsert(insert_data))
         
         if response and hasattr(response, 'data') and response.data:
             logger.info(f"Successfully processed profile for user {user_id}.")
@@ -68,7 +69,7 @@ def get_user_profile(db_client: Client, user_id: str) -> Optional[Dict]:
         logger.debug(f"Using supabase client: {type(db_client)}")
         
         # Execute the query against the correct table using the provided client
-        response = db_client.table("user_profiles").select("*", count='exact').eq("id", user_id).execute()
+        response = execute_traced(db_client.table("user_profiles").select("*", count='exact').eq("id", user_id))
         
         # Log the raw response
         logger.info(f"Raw Supabase response for user {user_id}: {response}")
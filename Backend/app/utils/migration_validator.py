@@ -10,6 +10,7 @@ from datetime import datetime
 import json
 from supabase import Client
 from app.config.database import get_supabase_client_authenticated, supabase_service_role_client
+from app.config.query_executor import run_query
 
 logger = logging.getLogger(__name__)
 
@@ -110,7 +111,7 @@ class MigrationValidator:
     async def _check_database_connectivity(self):
         """Check database connectivity and basic functionality."""
         try:
-            result = self.db_client.table('tenants').select('count', count='exact').execute()
+            result = await run_query(self.db_client.table('tenants').select('count', count='exact'))
             tenant_count = result.count if result.count is not None else 0
             
             self.validation_results["pre_migration"]["tenant_count"] = tenant_count
@@ -123,7 +124,7 @@ class MigrationValidator:
         """Validate existing tenant data structure and consistency."""
         try:
             # Get all tenants
-            result = self.db_client.table('tenants').select('*').execute()
+            result = await run_query(self.db_client.table('tenants').select('*'))
             tenants = result.data or []
             
             issues = []
@@ -167,12 +168,12 @@ class MigrationValidator:
             conflicts = []
             
             # Check for duplicate emails
-            result = self.db_client.rpc('check_duplicate_emails').execute()
+            result = await run_query(self.db_client.rpc('check_duplicate_emails'))
             if result.data:
                 conflicts.extend(result.data)
             
             # Check for invalid property-tenant links
-            result = self.db_client.table('property_tenants').select('*').execute()
+            result = await run_query(self.db_client.table('property_tenants').select('*'))
             links = result.data or []
             
             for link in links:
@@ -216,12 +217,12 @@ class MigrationValidator:
             orphaned_records = []
             
             # Check for property-tenant links with missing tenants
-            result = self.db_client.table('property_tenants').select('*').execute()
+            result = await run_query(self.db_client.table('property_tenants').select('*'))
             links = result.data or []
             
             for link in links:
                 if link.get('tenant_id'):
-                    tenant_result = self.db_client.table('tenants').select('id').eq('id', link['tenant_id']).execute()
+                    tenant_result = await run_query(self.db_client.table('tenants').select('id').eq('id', link['tenant_id']))
                     if not tenant_result.data:
                         orphaned_records.append(f"Property-tenant link {link['id']} references missing tenant {link['tenant_id']}")
             
@@ -240,7 +241,7 @@ class MigrationValidator:
         """Validate existing enum values and consistency."""
         try:
             # Check tenant status enum values
-            result = self.db_client.table('tenants').select('status').execute()
+            result = await run_query(self.db_client.table('tenants').select('status'))
             tenants = result.data or []
             
             valid_statuses = {'active', 'inactive', 'unassigned'}
@@ -273,7 +274,7 @@ class MigrationValidator:
             
             for table in required_tables:
                 try:
-                    result = self.db_client.table(table).select('count', count='exact').execute()
+                    result = await run_query(self.db_client.table(table).select('count', count='exact'))
                     existing_tables.append(table)
                 except Exception:
                     pass
@@ -285,7 +286,7 @@ class MigrationValidator:
             }
             
             # Check if new columns exist in tenants table
-            result = self.db_client.table('tenants').select('*').limit(1).execute()
+            result = await run_query(self.db_client.table('tenants').select('*').limit(1))
             if result.data:
                 tenant_columns = list(result.data[0].keys())
                 
@@ -316,21 +317,21 @@ class MigrationValidator:
             
             # Validate tenant_history table
             try:
-                result = self.db_client.table('tenant_history').select('*').limit(1).execute()
+                result = await run_query(self.db_client.table('tenant_history').select('*').limit(1))
                 table_validations['tenant_history'] = {'exists': True, 'accessible': True}
             except Exception as e:
                 table_validations['tenant_history'] = {'exists': False, 'error': str(e)}
             
             # Validate unit_history table
             try:
-                result = self.db_client.table('unit_history').select('*').limit(1).execute()
+                result = await run_query(self.db_client.table('unit_history').select('*').limit(1))
                 table_validations['unit_history'] = {'exists': True, 'accessible': True}
             except Exception as e:
                 table_validations['unit_history'] = {'exists': False, 'error': str(e)}
             
             # Validate tenant_documents table
             try:
-                result = self.db_client.table('tenant_documents').select('*').limit(1).execute()
+                result = await run_query(self.db_client.table('tenant_documents').select('*').limit(1))
                 table_validations['tenant_documents'] = {'exists': True, 'accessible': True}
             except Exception as e:
                 table_validations['tenant_documents'] = {'exists': False, 'error': str(e)}
@@ -351,14 +352,14 @@ class MigrationValidator:
             
             try:
                 # Test occupation_category enum
-                test_result = self.db_client.table('tenants').select('occupation_category').limit(1).execute()
+                test_result = await run_query(self.db_client.table('tenants').select('occupation_category').limit(1))
                 enum_validations['occupation_category'] = {'accessible': True}
             except Exception as e:
                 enum_validations['occupation_category'] = {'accessible': False, 'error': str(e)}
             
             try:
                 # Test verification_status enum
-                test_result = self.db_client.table('tenants').select('verification_status').limit(1).execute()
+                test_result = await run_query(self.db_client.table('tenants').select('verification_status').limit(1))
                 enum_validations['verification_status'] = {'accessible': True}
             except Exception as e:
                 enum_validations['verification_status'] = {'accessible': False, 'error': str(e)}
@@ -416,7 +417,7 @@ class MigrationValidator:
         """Validate data integrity after migration."""
         try:
             # Check that existing data is preserved
-            result = self.db_client.table('tenants').select('count', count='exact').execute()
+            result = await run_query(self.db_client.table('tenants').select('count', count='exact'))
             post_migration_count = result.count if result.count is not None else 0
             
             pre_migration_count = self.validation_results["pre_migration"].get("tenant_count", 0)
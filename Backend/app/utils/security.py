@@ -1,18 +1,22 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+import jwt
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import logging
 
 from ..config.settings import settings
+from ..config.token_verifier import token_verifier
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 def decode_jwt_token(token: str) -> Dict[str, Any]:
     """
-    Decode and validate a JWT token.
+    Decode and validate a Supabase JWT token.
+    
+    The signature is checked with SUPABASE_JWT_SECRET or the cached project
+    JWKS (see config/token_verifier), along with expiry and audience.
     
     Args:
         token: The JWT token to decode
@@ -24,38 +28,28 @@ def decode_jwt_token(token: str) -> Dict[str, Any]:
         HTTPException: If token is invalid or expired
     """
     try:
-        # For Supabase JWT tokens, we'll use their JWT secret for validation
-        # In a real scenario, you would need to get this from your Supabase instance
-        payload = jwt.decode(
-            token, 
-            settings.SUPABASE_JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM]
+        payload = token_verifier.decode(token)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        
-        # Check if token has expired
-        if payload.get('exp') and datetime.utcnow() > datetime.utcfromtimestamp(payload['exp']):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-            
-        return payload
-        
-    except JWTError as e:
+    except jwt.InvalidTokenError as e:
         logger.error(f"JWT decode error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}")
+    if payload is None:
+        logger.error("JWT cannot be verified: no matching secret or signing key")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication error",
+            detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """
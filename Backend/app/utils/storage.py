@@ -10,8 +10,9 @@ from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 import logging
 
-from supabase import create_client, Client
+from supabase import Client
 from app.config.settings import settings
+from app.config.database import client_pool
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,8 @@ if not supabase_key:
     logger.error("Neither SUPABASE_SERVICE_ROLE_KEY nor SUPABASE_KEY is available")
     raise ValueError("Supabase key required for storage service")
 
-supabase: Client = create_client(settings.SUPABASE_URL, supabase_key)
+# Reuse the pooled service role client (falls back to the anon client when unset)
+supabase: Client = client_pool.service_role_client
 
 # Storage configuration for different contexts
 STORAGE_CONFIG = {
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: blocking ``.execute()`` vs ``await run_query()`` under concurrency.
+
+Starts a local PostgREST stand-in that answers every request after a fixed
+latency, then drives two FastAPI endpoints through an ASGI client with N
+concurrent clients. One endpoint calls the synchronous ``.execute()`` on the
+event loop (the old pattern), the other goes through ``run_query``.
+
+Usage:
+    python benchmarks/bench_async_queries.py --concurrency 50 --requests 500 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'bench-key')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+from app.config.client_pool import SupabaseClientPool
+from app.config.query_executor import run_query
+
+
+def start_stub_server(latency_s: float) -> ThreadingHTTPServer:
+    """Serve a fixed JSON row after ``latency_s`` seconds on every GET"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency_s)
+            body = json.dumps([{"id": "1", "owner_id": "owner"}]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_app(pool: SupabaseClientPool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        response = pool.scoped("bench").table("properties").select("*").execute()
+        return response.data
+
+    @app.get("/async")
+    async def non_blocking():
+        response = await run_query(pool.scoped("bench").table("properties").select("*"))
+        return response.data
+
+    return app
+
+
+async def drive(app: FastAPI, path: str, concurrency: int, total: int) -> float:
+    """Return requests/sec for ``total`` requests spread over ``concurrency`` clients"""
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency_ms / 1000)
+    pool = SupabaseClientPool(f"http://127.0.0.1:{server.server_address[1]}", "bench-key")
+    app = build_app(pool)
+
+    results = {}
+    for label, path in (("before (blocking execute)", "/blocking"), ("after (run_query)", "/async")):
+        results[label] = asyncio.run(drive(app, path, args.concurrency, args.requests))
+
+    print(f"{args.concurrency} concurrent clients, {args.requests} requests, {args.latency_ms:.0f}ms PostgREST latency")
+    for label, rps in results.items():
+        print(f"  {label:<28} {rps:8.1f} req/s")
+
+    pool.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hot API endpoints against a synthetic portfolio, with regression checks.
+
+Loads a generated portfolio (see generate_portfolio.py) into the in-process
+Supabase stand-in, optionally with injected per-query latency, and drives the
+real FastAPI app through an ASGI client. For each endpoint and concurrency
+level it reports throughput, p50/p95 latency and PostgREST calls per request.
+
+Results are written as JSON. With ``--baseline`` the run is compared against
+a previous result and the script exits with status 1 when any endpoint's
+throughput drops, or its p95 latency rises, by more than
+``--max-regression`` percent. Absolute numbers depend on the machine, so
+keep the baseline from the machine that runs the comparison. Comparisons
+reuse the baseline's ``--as-of`` date, so both runs see the same data.
+
+Usage:
+    python benchmarks/bench_endpoints.py --units 2000 --concurrency 1,10,50 --output /tmp/bench.json
+    python benchmarks/bench_endpoints.py --as-of 2026-10-01 --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_endpoints.py --baseline benchmarks/baseline.json --max-regression 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import re
+import sys
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'bench-key')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+import httpx
+from unittest.mock import patch
+
+from generate_portfolio import generate_portfolio
+
+from app.main import app
+from app.config.cache import cache_service
+from app.config.local_supabase import LocalClientPool, LocalDatabase, local_token, use_local_pool
+
+# name -> path; {owner_id} and {unit_id} are filled from the portfolio
+ENDPOINTS = {
+    'properties': '/properties/?limit=100',
+    'tenants': '/tenants/?limit=100',
+    'dashboard_summary': '/dashboard/summary',
+    'dashboard_data': '/dashboard/data',
+    'financial_summary': '/reports/financial-summary?owner_id={owner_id}&months_back=12',
+    'unit_history': '/units/{unit_id}/history',
+    'payments': '/payments/?limit=100',
+    'notifications': '/notifications/?limit=50',
+}
+
+
+# ``db;dur=12.3;desc="4 queries"`` in the Server-Timing header set by MetricsMiddleware
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)] if ordered else 0.0
+
+
+def pick_targets(portfolio: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+    """The largest owner, and that owner's unit with the longest tenancy history"""
+    owner = max(portfolio['dashboard_summary'], key=lambda row: row['total_units'])
+    owned = {prop['id'] for prop in portfolio['properties'] if prop['owner_id'] == owner['owner_id']}
+    links: Dict[str, int] = {}
+    for link in portfolio['property_tenants']:
+        if link['property_id'] in owned:
+            links[link['unit_id']] = links.get(link['unit_id'], 0) + 1
+    return {'owner_id': owner['owner_id'], 'unit_id': max(links, key=links.get) if links else ''}
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers: Dict[str, str],
+                  concurrency: int, requests: int) -> Dict[str, Any]:
+    """Issue ``requests`` GETs from ``concurrency`` concurrent workers"""
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors: Dict[int, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            match = SERVER_TIMING_QUERIES.search(response.headers.get('server-timing', ''))
+            if match:
+                queries.append(int(match.group(1)))
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors.values()),
+        'error_statuses': {str(code): count for code, count in sorted(errors.items())},
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        # PostgREST calls per request, from the Server-Timing header
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+async def run_suite(units: int = 1000, owners: Optional[int] = None, months: int = 12, seed: int = 0,
+                    latency_ms: float = 0.0, concurrency: Sequence[int] = (1, 10, 50), requests: int = 200,
+                    endpoints: Optional[Sequence[str]] = None, cache: bool = False,
+                    as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Run every endpoint at every concurrency level.
+
+    Returns:
+        ``{"meta": {...}, "results": {endpoint: {concurrency: stats}}}``
+    """
+    portfolio = generate_portfolio(units, owners, months, seed, as_of)
+    targets = pick_targets(portfolio)
+    db = LocalDatabase(latency_ms=latency_ms, seed=seed)
+    db.load(portfolio)
+    pool = LocalClientPool(db)
+    headers = {'Authorization': f"Bearer {local_token(targets['owner_id'])}"}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    transport = httpx.ASGITransport(app=app)
+    with use_local_pool(pool), patch.object(cache_service, 'enabled', cache and cache_service.enabled):
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=120) as client:
+            for name in endpoints or ENDPOINTS:
+                path = ENDPOINTS[name].format(**targets)
+                await measure(client, path, headers, 1, 3)  # Warm up
+                results[name] = {
+                    str(level): await measure(client, path, headers, level, max(requests, level))
+                    for level in concurrency
+                }
+    return {
+        'meta': {
+            'units': units, 'owners': owners, 'months': months, 'seed': seed, 'latency_ms': latency_ms,
+            'as_of': (as_of or date.today()).isoformat(),
+            'requests': requests, 'concurrency': list(concurrency), 'cache': cache,
+            'python': platform.python_version(), 'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float = 20.0,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``.
+
+    Args:
+        max_regression: Allowed throughput drop / p95 increase, in percent
+        min_delta_ms: p95 increases smaller than this are treated as noise
+
+    Returns:
+        One message per regressed endpoint and concurrency level
+    """
+    regressions = []
+    for name, levels in current['results'].items():
+        for level, stats in levels.items():
+            before = baseline.get('results', {}).get(name, {}).get(level)
+            if not before:
+                continue
+            if stats['errors'] > before.get('errors', 0):
+                regressions.append(f"{name} @ {level}: {stats['errors']} errors (baseline {before.get('errors', 0)})")
+            if before['throughput_rps'] > 0:
+                drop = (before['throughput_rps'] - stats['throughput_rps']) / before['throughput_rps'] * 100
+                if drop > max_regression:
+                    regressions.append(
+                        f"{name} @ {level}: throughput {stats['throughput_rps']:.1f} rps is {drop:.1f}% below "
+                        f"baseline {before['throughput_rps']:.1f} rps"
+                    )
+            delta = stats['p95_ms'] - before['p95_ms']
+            if before['p95_ms'] > 0 and delta > min_delta_ms and delta / before['p95_ms'] * 100 > max_regression:
+                regressions.append(
+                    f"{name} @ {level}: p95 {stats['p95_ms']:.1f} ms is {delta / before['p95_ms'] * 100:.1f}% above "
+                    f"baseline {before['p95_ms']:.1f} ms"
+                )
+    return regressions
+
+
+def print_table(result: Dict[str, Any]):
+    print(f"{'endpoint':<20} {'conc':>5} {'rps':>10} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7} {'queries':>8}")
+    for name, levels in result['results'].items():
+        for level, stats in levels.items():
+            print(f"{name:<20} {level:>5} {stats['throughput_rps']:>10.1f} {stats['p50_ms']:>9.2f} "
+                  f"{stats['p95_ms']:>9.2f} {stats['errors']:>7} {stats.get('queries_per_request') or 0:>8.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--units', type=int, default=1000)
+    parser.add_argument('--owners', type=int, default=None)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None, help="Portfolio reference date (default: today)")
+    parser.add_argument('--latency-ms', type=float, default=2.0, help="Injected latency per query")
+    parser.add_argument('--concurrency', default='1,10,50', help="Comma-separated concurrency levels")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint and level")
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help="Comma-separated subset of endpoints")
+    parser.add_argument('--cache', action='store_true', help="Keep the response cache enabled")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--baseline', help="Compare against this results JSON")
+    parser.add_argument('--save-baseline', help="Write results JSON here as the new baseline")
+    parser.add_argument('--max-regression', type=float, default=20.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        # Compare like with like: same generated data unless told otherwise
+        args.as_of = args.as_of or date.fromisoformat(baseline['meta']['as_of'])
+        for key in ('units', 'owners', 'months', 'seed', 'latency_ms'):
+            if baseline['meta'].get(key) != getattr(args, key):
+                print(f"WARNING: --{key.replace('_', '-')} {getattr(args, key)} differs from the baseline's {baseline['meta'].get(key)}")
+
+    # Per-request INFO logs would dominate the measurements
+    logging.disable(logging.INFO)
+    result = asyncio.run(run_suite(
+        units=args.units, owners=args.owners, months=args.months, seed=args.seed,
+        latency_ms=args.latency_ms, concurrency=[int(level) for level in args.concurrency.split(',')],
+        requests=args.requests, endpoints=args.endpoints.split(','), cache=args.cache, as_of=args.as_of,
+    ))
+    print_table(result)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as out:
+            json.dump(result, out, indent=2)
+        print(f"Wrote {path}")
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.max_regression)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.max_regression:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request overhead of MetricsMiddleware.
+
+Drives a trivial ASGI app directly (no server, no HTTP parsing) with and
+without the middleware and reports the mean added time per request. The
+routed variant sets ``scope['route']`` like FastAPI does, so the histogram
+path with route templates is exercised.
+
+Usage:
+    python benchmarks/bench_metrics_middleware.py --requests 200000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'bench-key')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.metrics import MetricsMiddleware
+
+ROUTES = [SimpleNamespace(path=f"/properties/{{property_id}}/units/{i}") for i in range(20)]
+BODY = b'{"status":"ok"}'
+
+
+async def endpoint(scope, receive, send):
+    scope['route'] = ROUTES[scope['i'] % len(ROUTES)]
+    await receive()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': BODY})
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        await app({'type': 'http', 'method': 'GET', 'path': f'/properties/{i}', 'i': i}, receive, send)
+    return time.perf_counter() - start
+
+
+async def main(requests: int):
+    await drive(endpoint, 1000)  # Warm up
+    await drive(MetricsMiddleware(endpoint), 1000)
+    bare = await drive(endpoint, requests)
+    instrumented = await drive(MetricsMiddleware(endpoint), requests)
+
+    overhead_us = (instrumented - bare) / requests * 1e6
+    print(f"requests:            {requests}")
+    print(f"bare:                {bare / requests * 1e6:8.2f} us/request")
+    print(f"with middleware:     {instrumented / requests * 1e6:8.2f} us/request")
+    print(f"middleware overhead: {overhead_us:8.2f} us/request (budget: 50 us)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
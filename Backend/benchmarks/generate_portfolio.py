@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic portfolio generator for scale testing.
+
+Produces owners (user_profiles), vendors, properties, units, tenants, leases,
+property_tenants links, payments, payment_history, maintenance requests and
+notifications for a configurable number of units (10 to 100k+). Unit counts
+per owner are skewed, so a run with a few owners includes one with thousands
+of units.
+
+Each unit gets a tenancy history over the last ``--months`` months: tenancies
+of 6-36 months with gaps between them, and some where the next tenant moves
+in before the previous one leaves (overlapping ``property_tenants`` ranges).
+Enum-like values are restricted to those accepted by both the API models and
+the CHECK constraints in supabase/migrations.
+
+Output is either a JSON snapshot for the in-process stand-in
+(SUPABASE_BACKEND=local, LOCAL_DB_PATH=...) or SQL inserts for a Supabase
+database built from supabase/migrations. The same seed always yields the same
+data. SQL is streamed owner by owner; JSON is built in memory, so prefer SQL
+or fewer months for very large portfolios.
+
+Usage:
+    python benchmarks/generate_portfolio.py --units 5000 --owners 3 --json /tmp/portfolio.json
+    python benchmarks/generate_portfolio.py --units 100000 --sql /tmp/portfolio.sql
+"""
+import argparse
+import json
+import random
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+# Tables in foreign-key order (each owner's rows are emitted in this order)
+TABLES = [
+    'user_profiles', 'vendors', 'properties', 'units', 'tenants', 'leases', 'property_tenants',
+    'payments', 'payment_history', 'maintenance_requests', 'notifications', 'dashboard_summary',
+    'monthly_financial_rollups',
+]
+
+# Computed by the database (a view, trigger-maintained rollups); only materialized for the local stand-in
+VIEWS = {'dashboard_summary', 'monthly_financial_rollups'}
+
+FIRST_NAMES = ['Aarav', 'Asha', 'Divya', 'Farhan', 'Ishaan', 'Kavya', 'Meera', 'Neha', 'Omar', 'Priya',
+               'Rahul', 'Ravi', 'Sara', 'Tanvi', 'Vikram', 'Zoya', 'Arjun', 'Nisha', 'Karan', 'Leela']
+LAST_NAMES = ['Sharma', 'Iyer', 'Patel', 'Khan', 'Reddy', 'Nair', 'Gupta', 'Das', 'Joshi', 'Menon',
+              'Rao', 'Singh', 'Bose', 'Pillai', 'Kulkarni']
+CITIES = [('Pune', 'MH', '4110'), ('Mumbai', 'MH', '4000'), ('Bengaluru', 'KA', '5600'),
+          ('Chennai', 'TN', '6000'), ('Hyderabad', 'TS', '5000'), ('Kochi', 'KL', '6820')]
+STREETS = ['MG Road', 'Station Road', 'Lake View Road', 'Park Street', 'Hill Road', 'Temple Street', 'Ring Road']
+PROPERTY_NAMES = ['Residency', 'Heights', 'Enclave', 'Towers', 'Gardens', 'Court', 'Villas', 'Apartments']
+
+# Values valid for both app/models and the migrations' CHECK constraints
+MAINTENANCE_CATEGORIES = ['plumbing', 'electrical', 'appliance', 'other']
+MAINTENANCE_PRIORITIES = ['low', 'normal', 'urgent', 'emergency']
+MAINTENANCE_STATUSES = ['new', 'in_progress', 'completed']
+MAINTENANCE_TITLES = {
+    'plumbing': 'Leaking tap in kitchen', 'electrical': 'Power socket not working',
+    'appliance': 'Geyser not heating', 'other': 'Front door lock jammed',
+}
+PAYMENT_METHODS = ['bank_transfer', 'upi', 'cash', 'check']
+
+
+class PortfolioGenerator:
+    """Deterministic row generator; iterate ``rows()`` for ``(table, row)`` pairs"""
+
+    def __init__(self, units: int = 1000, owners: Optional[int] = None, months: int = 12,
+                 seed: int = 0, as_of: Optional[date] = None):
+        self.units = max(1, units)
+        self.owners = max(1, min(owners or max(1, self.units // 500), self.units))
+        self.months = max(1, months)
+        self.as_of = as_of or date.today()
+        self.history_start = _add_months(self.as_of.replace(day=1), -self.months)
+        self.random = random.Random(seed)
+
+    # Helpers ------------------------------------------------------------------
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def timestamp(self, day: date) -> str:
+        moment = datetime.combine(day, time(self.random.randint(7, 21), self.random.randint(0, 59)), timezone.utc)
+        return moment.isoformat()
+
+    def person(self) -> Tuple[str, str]:
+        return self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+
+    def phone(self) -> str:
+        return f"+91{self.random.randint(7000000000, 9999999999)}"
+
+    def units_per_owner(self) -> List[int]:
+        """Split the units over owners with a heavy tail, at least one each"""
+        weights = [self.random.paretovariate(1.2) for _ in range(self.owners)]
+        total = sum(weights)
+        counts = [1 + int((self.units - self.owners) * weight / total) for weight in weights]
+        counts[counts.index(max(counts))] += self.units - sum(counts)
+        return counts
+
+    def units_per_property(self, units: int) -> List[int]:
+        sizes = []
+        while units > 0:
+            size = min(units, self.random.choice([1, 1, 2, 4, 6, 8, 12, 20, 40]))
+            sizes.append(size)
+            units -= size
+        return sizes
+
+    # Rows ---------------------------------------------------------------------
+
+    def rows(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for number, unit_count in enumerate(self.units_per_owner()):
+            yield from self.owner_rows(number, unit_count)
+
+    def owner_rows(self, number: int, unit_count: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        owner_id = self.uuid()
+        first, last = self.person()
+        joined = self.timestamp(self.history_start - timedelta(days=self.random.randint(30, 400)))
+        yield 'user_profiles', {
+            'id': owner_id, 'email': f"owner{number}@example.com", 'first_name': first, 'last_name': last,
+            'full_name': f"{first} {last}", 'phone': self.phone(), 'user_type': 'owner', 'role': 'owner',
+            'created_at': joined, 'updated_at': joined,
+        }
+
+        vendors = [self.vendor(owner_id, joined) for _ in range(self.random.randint(3, 10))]
+        for vendor in vendors:
+            yield 'vendors', vendor
+
+        tables: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+        for size in self.units_per_property(unit_count):
+            self.add_property(owner_id, size, joined, vendors, tables)
+        tables['notifications'] = self.notifications(owner_id, tables)
+        tables['dashboard_summary'] = [self.dashboard_summary(owner_id, tables)]
+        tables['monthly_financial_rollups'] = self.monthly_financial_rollups(owner_id, tables)
+        for table in TABLES[2:]:
+            for row in tables[table]:
+                yield table, row
+
+    def vendor(self, owner_id: str, created_at: str) -> Dict[str, Any]:
+        first, last = self.person()
+        categories = self.random.sample(MAINTENANCE_CATEGORIES, self.random.randint(1, 2))
+        return {
+            'id': self.uuid(), 'owner_id': owner_id, 'name': f"{first} {last}",
+            'company': f"{last} {categories[0].title()} Services", 'categories': categories,
+            'phone': self.phone(), 'email': f"{first.lower()}.{last.lower()}@example.net",
+            'hourly_rate': float(self.random.choice([300, 400, 500, 750, 1000])),
+            'rating': round(self.random.uniform(3.0, 5.0), 1), 'status': 'active',
+            'completed_jobs': self.random.randint(0, 200), 'created_at': created_at, 'updated_at': created_at,
+        }
+
+    def add_property(self, owner_id: str, size: int, joined: str, vendors: List[Dict[str, Any]],
+                     tables: Dict[str, List[Dict[str, Any]]]):
+        city, state, pin_prefix = self.random.choice(CITIES)
+        property_id = self.uuid()
+        name = f"{self.random.choice(LAST_NAMES)} {self.random.choice(PROPERTY_NAMES)}"
+        tables['properties'].append({
+            'id': property_id, 'owner_id': owner_id, 'property_name': name,
+            'address_line1': f"{self.random.randint(1, 400)} {self.random.choice(STREETS)}", 'address_line2': None,
+            'city': city, 'state': state, 'pincode': f"{pin_prefix}{self.random.randint(10, 99)}", 'country': 'India',
+            'property_type': 'residential' if size < 20 or self.random.random() < 0.7 else 'commercial',
+            'number_of_units': size, 'survey_number': f"S-{self.random.randint(100, 9999)}",
+            'door_number': str(self.random.randint(1, 400)), 'year_built': self.random.randint(1985, 2023),
+            'floors': max(1, size // 4), 'amenities': self.random.sample(['parking', 'lift', 'gym', 'security', 'power_backup'], 2),
+            'image_urls': [], 'status': 'active', 'created_at': joined, 'updated_at': joined,
+        })
+        for index in range(size):
+            unit_number = f"{index // 4 + 1}{index % 4 + 1:02d}"
+            self.add_unit(owner_id, property_id, unit_number, joined, vendors, tables)
+
+    def add_unit(self, owner_id: str, property_id: str, unit_number: str, joined: str,
+                 vendors: List[Dict[str, Any]], tables: Dict[str, List[Dict[str, Any]]]):
+        unit_id = self.uuid()
+        bedrooms = self.random.choice([1, 1, 2, 2, 2, 3, 4])
+        base_rent = float(bedrooms * self.random.choice([6000, 8000, 10000, 12000]))
+        unit = {
+            'id': unit_id, 'property_id': property_id, 'unit_number': unit_number, 'status': 'Vacant',
+            'tenant_id': None, 'bedrooms': bedrooms, 'bathrooms': float(max(1, bedrooms - 1)),
+            'area_sqft': bedrooms * self.random.randint(350, 550), 'created_at': joined, 'updated_at': joined,
+        }
+        tables['units'].append(unit)
+
+        current = None
+        for start, end in self.tenancies():
+            rent = base_rent * (1 + 0.05 * ((start - self.history_start).days // 365))
+            tenancy = self.add_tenancy(owner_id, property_id, unit_id, start, end, rent, tables)
+            if start <= self.as_of and (end is None or end >= self.as_of):
+                current = tenancy
+        if current is not None:
+            unit['status'] = 'Occupied'
+            unit['tenant_id'] = current['id']
+
+        # About one maintenance request per unit every two years
+        for _ in range(self.random.randint(0, max(1, self.months // 12))):
+            self.add_maintenance(owner_id, property_id, unit_id, unit_number, current, vendors, tables)
+
+    def tenancies(self) -> List[Tuple[date, Optional[date]]]:
+        """Tenancy ranges for one unit; some overlap, the last may be open-ended"""
+        ranges: List[Tuple[date, Optional[date]]] = []
+        start = self.history_start - timedelta(days=self.random.randint(0, 365))
+        while start <= self.as_of:
+            end = _add_months(start, self.random.choice([6, 11, 12, 12, 24, 36])) - timedelta(days=1)
+            if end >= self.as_of and self.random.random() < 0.3:
+                ranges.append((start, None))
+                break
+            ranges.append((start, end))
+            if self.random.random() < 0.1:
+                # Next tenant moves in before the previous one has left
+                start = end - timedelta(days=self.random.randint(1, 20))
+            elif self.random.random() < 0.85:
+                start = end + timedelta(days=self.random.randint(1, 45))
+            else:
+                start = end + timedelta(days=self.random.randint(60, 180))
+        return ranges
+
+    def add_tenancy(self, owner_id: str, property_id: str, unit_id: str, start: date, end: Optional[date],
+                    rent: float, tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        first, last = self.person()
+        tenant_id = self.uuid()
+        active = start <= self.as_of and (end is None or end >= self.as_of)
+        rental_type = self.random.choice(['rent', 'rent', 'lease'])
+        deposit = rent * self.random.choice([2, 3, 6])
+        maintenance_fee = float(self.random.choice([0, 500, 1000, 1500]))
+        created_at = self.timestamp(start - timedelta(days=self.random.randint(1, 20)))
+        end_text = end.isoformat() if end else None
+        tenant = {
+            'id': tenant_id, 'owner_id': owner_id, 'user_id': None, 'name': f"{first} {last}",
+            'email': f"{first.lower()}.{last.lower()}.{tenant_id[:8]}@example.org", 'phone': self.phone(),
+            'gender': self.random.choice(['male', 'female']), 'family_size': self.random.randint(1, 5),
+            'occupation_category': self.random.choice(['employed', 'employed', 'self_employed', 'student']),
+            'monthly_income': float(round(rent * self.random.uniform(2.5, 6), -2)),
+            'status': 'active' if active else 'inactive', 'rental_type': rental_type, 'rental_frequency': 'monthly',
+            'rental_start_date': start.isoformat(), 'rental_end_date': end_text if rental_type == 'rent' else None,
+            'lease_end_date': end_text if rental_type == 'lease' else None, 'rent': rent,
+            'maintenance_fee': maintenance_fee, 'move_in_date': start.isoformat(), 'move_out_date': end_text,
+            'created_at': created_at, 'updated_at': created_at,
+        }
+        lease_id = self.uuid()
+        lease_end = end or _add_months(start, 12) - timedelta(days=1)
+        tables['tenants'].append(tenant)
+        tables['leases'].append({
+            'id': lease_id, 'property_id': property_id, 'unit_id': unit_id, 'tenant_id': tenant_id,
+            'start_date': start.isoformat(), 'end_date': lease_end.isoformat(), 'rent_amount': rent,
+            'deposit_amount': deposit, 'rental_type': rental_type, 'rental_frequency': 'monthly',
+            'maintenance_fee': maintenance_fee, 'advance_amount': rent,
+            'status': 'active' if active else ('expired' if lease_end < self.as_of else 'pending'),
+            'notes': None, 'created_at': created_at, 'updated_at': created_at,
+        })
+        tables['property_tenants'].append({
+            'id': self.uuid(), 'property_id': property_id, 'unit_id': unit_id, 'tenant_id': tenant_id,
+            'start_date': start.isoformat(), 'end_date': end_text, 'rent_amount': rent, 'rent_frequency': 'monthly',
+            'deposit_amount': deposit, 'maintenance_fee': maintenance_fee, 'status': 'active' if active else 'inactive',
+            'created_at': created_at, 'updated_at': created_at,
+        })
+        self.add_payments(owner_id, property_id, unit_id, tenant_id, lease_id, start, end, rent, maintenance_fee, tables)
+        return tenant
+
+    def add_payments(self, owner_id: str, property_id: str, unit_id: str, tenant_id: str, lease_id: str,
+                     start: date, end: Optional[date], rent: float, maintenance_fee: float,
+                     tables: Dict[str, List[Dict[str, Any]]]):
+        """One rent payment and payment_history row per month of the tenancy inside the window"""
+        period = max(start, self.history_start)
+        last_day = min(end or self.as_of, self.as_of)
+        while period <= last_day:
+            period_end = _add_months(period, 1) - timedelta(days=1)
+            due_date = period + timedelta(days=4)
+            roll = self.random.random()
+            if due_date > self.as_of:
+                status, paid = 'pending', 0.0
+            elif roll < 0.85:
+                status, paid = 'paid', rent
+            elif roll < 0.92:
+                status, paid = 'partially_paid', round(rent * self.random.uniform(0.3, 0.9), 2)
+            else:
+                status, paid = 'overdue', 0.0
+            payment_date = due_date + timedelta(days=self.random.randint(-3, 10)) if paid else None
+            if payment_date is not None and payment_date > self.as_of:
+                payment_date = self.as_of
+            created_at = self.timestamp(period)
+            tables['payments'].append({
+                'id': self.uuid(), 'owner_id': owner_id, 'property_id': property_id, 'unit_id': unit_id,
+                'tenant_id': tenant_id, 'lease_id': lease_id, 'amount': rent, 'amount_paid': paid,
+                'due_date': due_date.isoformat(), 'payment_date': payment_date.isoformat() if payment_date else None,
+                'payment_type': 'rent', 'status': status,
+                'payment_method': self.random.choice(PAYMENT_METHODS) if paid else None,
+                'description': f"Rent for {period:%B %Y}", 'period_start_date': period.isoformat(),
+                'period_end_date': period_end.isoformat(), 'created_at': created_at, 'updated_at': created_at,
+            })
+            tables['payment_history'].append({
+                'id': self.uuid(), 'tenant_id': tenant_id, 'period_start': period.isoformat(),
+                'period_end': period_end.isoformat(), 'rent_amount': rent, 'maintenance_amount': maintenance_fee,
+                'payment_status': 'paid' if status == 'paid' else 'pending',
+                'payment_date': payment_date.isoformat() if status == 'paid' else None,
+                'receipt_url': None, 'created_at': created_at, 'updated_at': created_at,
+            })
+            period = _add_months(period, 1)
+
+    def add_maintenance(self, owner_id: str, property_id: str, unit_id: str, unit_number: str,
+                        tenant: Optional[Dict[str, Any]], vendors: List[Dict[str, Any]],
+                        tables: Dict[str, List[Dict[str, Any]]]):
+        category = self.random.choice(MAINTENANCE_CATEGORIES)
+        opened = self.history_start + timedelta(days=self.random.randint(0, (self.as_of - self.history_start).days))
+        status = self.random.choice(MAINTENANCE_STATUSES) if (self.as_of - opened).days < 30 else 'completed'
+        vendor = self.random.choice(vendors) if status != 'new' else None
+        estimated = float(self.random.choice([500, 1200, 2500, 5000, 12000]))
+        created_at = self.timestamp(opened)
+        tables['maintenance_requests'].append({
+            'id': self.uuid(), 'owner_id': owner_id, 'property_id': property_id, 'unit_id': unit_id,
+            'unit_number': unit_number, 'tenant_id': tenant['id'] if tenant else None, 'created_by': owner_id,
+            'title': MAINTENANCE_TITLES[category], 'description': f"{MAINTENANCE_TITLES[category]} in unit {unit_number}",
+            'category': category, 'priority': self.random.choice(MAINTENANCE_PRIORITIES), 'status': status,
+            'vendor_id': vendor['id'] if vendor else None, 'assigned_vendor_id': vendor['id'] if vendor else None,
+            'estimated_cost': estimated,
+            'actual_cost': round(estimated * self.random.uniform(0.7, 1.4), 2) if status == 'completed' else None,
+            'completed_date': self.timestamp(opened + timedelta(days=self.random.randint(1, 20))) if status == 'completed' else None,
+            'created_at': created_at, 'updated_at': created_at,
+        })
+
+    def notifications(self, owner_id: str, tables: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """A sample of owner notifications about overdue payments, maintenance and expiring leases"""
+        sources = (
+            [('payment_overdue', 'payment', row) for row in tables['payments'] if row['status'] == 'overdue']
+            + [('maintenance_request', 'maintenance_request', row) for row in tables['maintenance_requests']]
+            + [('lease_expiry', 'lease', row) for row in tables['leases'] if row['status'] == 'active']
+        )
+        rows = []
+        for kind, entity_type, entity in self.random.sample(sources, min(len(sources), 20 + len(tables['units']) // 5)):
+            created_at = entity['created_at']
+            read = self.random.random() < 0.6
+            rows.append({
+                'id': self.uuid(), 'user_id': owner_id, 'notification_type': kind,
+                'title': kind.replace('_', ' ').capitalize(), 'message': f"{entity_type.replace('_', ' ').capitalize()} {entity['id'][:8]} needs attention",
+                'priority': 'high' if kind == 'payment_overdue' else 'medium', 'entity_type': entity_type,
+                'entity_id': entity['id'], 'status': 'read' if read else 'sent', 'is_read': read,
+                'read_at': created_at if read else None, 'sent_at': created_at,
+                'created_at': created_at, 'updated_at': created_at,
+            })
+        return rows
+
+    def dashboard_summary(self, owner_id: str, tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """The ``dashboard_summary`` view's row for one owner"""
+        units = tables['units']
+        rented = [unit for unit in units if unit['status'] == 'Occupied']
+        active_rent = {lease['unit_id']: lease for lease in tables['leases'] if lease['status'] == 'active'}
+        monthly = sum(active_rent[unit['id']]['rent_amount'] for unit in rented if unit['id'] in active_rent)
+        return {
+            'owner_id': owner_id, 'total_properties': len(tables['properties']), 'total_units': len(units),
+            'total_tenants': len(rented), 'total_rented_units': len(rented),
+            'total_vacant_units': len(units) - len(rented),
+            'occupancy_rate': round(len(rented) * 100.0 / len(units), 2) if units else None,
+            'monthly_rental_income': monthly, 'yearly_rental_income': monthly * 12,
+            'total_security_deposits': sum(lease['deposit_amount'] for lease in active_rent.values()),
+        }
+
+
+    def monthly_financial_rollups(self, owner_id: str, tables: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """What the rollup triggers would hold for one owner's paid rents and completed maintenance"""
+        property_of = {link['tenant_id']: link['property_id'] for link in tables['property_tenants']}
+        cells: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        def cell(property_id: str, day: str) -> Dict[str, Any]:
+            month = day[:7] + '-01'
+            if (property_id, month) not in cells:
+                cells[property_id, month] = {
+                    'owner_id': owner_id, 'property_id': property_id, 'month': month,
+                    'revenue': 0.0, 'maintenance_costs': 0.0, 'payment_count': 0,
+                }
+            return cells[property_id, month]
+
+        for row in tables['payment_history']:
+            if row['payment_status'] == 'paid' and row['payment_date'] and row['tenant_id'] in property_of:
+                entry = cell(property_of[row['tenant_id']], row['payment_date'])
+                entry['revenue'] = round(entry['revenue'] + row['rent_amount'] + row['maintenance_amount'], 2)
+                entry['payment_count'] += 1
+        for row in tables['maintenance_requests']:
+            if row['status'] == 'completed':
+                entry = cell(row['property_id'], row['created_at'])
+                entry['maintenance_costs'] = round(entry['maintenance_costs'] + (row['estimated_cost'] or 0), 2)
+        return sorted(cells.values(), key=lambda row: (row['month'], row['property_id']))
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    days = [31, 29 if leap else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1]
+    return date(year, month, min(day.day, days))
+
+
+def generate_portfolio(units: int = 1000, owners: Optional[int] = None, months: int = 12,
+                       seed: int = 0, as_of: Optional[date] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """All generated rows by table, e.g. for ``LocalDatabase.load``"""
+    data: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+    for table, row in PortfolioGenerator(units, owners, months, seed, as_of).rows():
+        data[table].append(row)
+    return data
+
+
+def sql_literal(value: Any) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, list):
+        # Postgres array literal (text[] columns such as amenities and categories)
+        items = ','.join('"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"' for item in value)
+        return sql_literal('{' + items + '}')
+    if isinstance(value, dict):
+        return sql_literal(json.dumps(value)) + '::jsonb'
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_sql(rows: Iterator[Tuple[str, Dict[str, Any]]], out: IO[str], batch_size: int = 500) -> Dict[str, int]:
+    """
+    Write rows as batched multi-row INSERTs in one transaction.
+
+    Owners are also inserted into auth.users, which user_profiles and
+    maintenance_requests.created_by reference. Views and trigger-maintained rollups are skipped.
+
+    Returns:
+        Rows written per table
+    """
+    counts: Dict[str, int] = {}
+    batch: List[Dict[str, Any]] = []
+    batch_table: Optional[str] = None
+
+    def flush():
+        if not batch:
+            return
+        columns = list(batch[0])
+        values = ',\n  '.join('(' + ', '.join(sql_literal(row.get(column)) for column in columns) + ')' for row in batch)
+        out.write(f"INSERT INTO public.{batch_table} ({', '.join(columns)}) VALUES\n  {values}\nON CONFLICT (id) DO NOTHING;\n")
+        batch.clear()
+
+    out.write("-- Synthetic portfolio generated by benchmarks/generate_portfolio.py\nBEGIN;\n")
+    for table, row in rows:
+        if table in VIEWS:
+            continue
+        if table == 'user_profiles':
+            out.write(
+                "INSERT INTO auth.users (id, email, aud, role, created_at, updated_at) VALUES "
+                f"({sql_literal(row['id'])}, {sql_literal(row['email'])}, 'authenticated', 'authenticated', "
+                f"{sql_literal(row['created_at'])}, {sql_literal(row['created_at'])}) ON CONFLICT (id) DO NOTHING;\n"
+            )
+        if table != batch_table or len(batch) >= batch_size:
+            flush()
+            batch_table = table
+        batch.append(row)
+        counts[table] = counts.get(table, 0) + 1
+    flush()
+    out.write("COMMIT;\n")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--units', type=int, default=1000)
+    parser.add_argument('--owners', type=int, default=None, help="Default: one per 500 units")
+    parser.add_argument('--months', type=int, default=12, help="Months of tenancy and payment history")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None, help="Reference date (default: today)")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--json', help="Snapshot for the local stand-in (LOCAL_DB_PATH)")
+    output.add_argument('--sql', help="SQL inserts for a database built from supabase/migrations")
+    args = parser.parse_args()
+
+    generator = PortfolioGenerator(args.units, args.owners, args.months, args.seed, args.as_of)
+    if args.sql:
+        with open(args.sql, 'w', encoding='utf-8') as out:
+            counts = write_sql(generator.rows(), out)
+    else:
+        data: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+        for table, row in generator.rows():
+            data[table].append(row)
+        with open(args.json, 'w', encoding='utf-8') as out:
+            json.dump(data, out)
+        counts = {table: len(rows) for table, rows in data.items()}
+
+    for table, count in counts.items():
+        print(f"{table:>22}: {count}")
+    print(f"Wrote {args.sql or args.json}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold import time of ``app.main``, with a budget for CI.
+
+Each run imports the app in a fresh interpreter under ``-X importtime``, so
+nothing is shared between runs. The median wall time is compared with the
+budget, and the slowest modules (by cumulative and by self time) of the
+median run are listed to show where a regression came from.
+
+Importing the app must stay cheap: no clients are built (database.py uses a
+LazyClientPool) and the modules in ``DEFERRED_MODULES`` are imported on
+first use or by the startup pre-warm (app/config/warmup.py). The check fails
+when either of those no longer holds.
+
+The script exits with status 1 when the budget is exceeded or a deferred
+module was imported. tests/test_import_budget.py runs the same check in the
+test suite.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 7 --budget-ms 2000 --top 30 --output /tmp/import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous for a cold import on a CI runner; override with IMPORT_TIME_BUDGET_MS
+DEFAULT_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', 2500))
+
+# Must not be imported by ``import app.main``
+DEFERRED_MODULES = ('reportlab', 'resend', 'numpy')
+
+_CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'elapsed_ms': elapsed * 1000,
+    'deferred_imported': [name for name in %r if name in sys.modules],
+    'pool_created': app.main.client_pool.created,
+}))
+''' % (DEFERRED_MODULES,)
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of ``-X importtime`` output as dicts (microseconds)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({'module': name.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return rows
+
+
+def measure_once(env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Import ``app.main`` in a fresh interpreter"""
+    child_env = {**os.environ, 'SUPABASE_URL': 'https://example.supabase.co', 'SUPABASE_KEY': 'bench-key', **(env or {})}
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD],
+        cwd=BACKEND_DIR, env=child_env, capture_output=True, text=True, check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{completed.stderr[-4000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['modules'] = parse_importtime(completed.stderr)
+    return result
+
+
+def measure(runs: int = 5, top: int = 20) -> Dict[str, Any]:
+    """Median of ``runs`` cold imports (after one run to fill the bytecode cache)"""
+    measure_once()
+    samples = sorted((measure_once() for _ in range(runs)), key=lambda run: run['elapsed_ms'])
+    median = samples[len(samples) // 2]
+    modules = median['modules']
+    return {
+        'runs': runs,
+        'median_ms': round(median['elapsed_ms'], 1),
+        'min_ms': round(samples[0]['elapsed_ms'], 1),
+        'max_ms': round(samples[-1]['elapsed_ms'], 1),
+        'modules_imported': len(modules),
+        'deferred_imported': median['deferred_imported'],
+        'pool_created': median['pool_created'],
+        'top_cumulative': sorted(modules, key=lambda row: row['cumulative_us'], reverse=True)[:top],
+        'top_self': sorted(modules, key=lambda row: row['self_us'], reverse=True)[:top],
+    }
+
+
+def check(result: Dict[str, Any], budget_ms: float) -> List[str]:
+    """Budget violations (empty when within budget)"""
+    failures = []
+    if result['median_ms'] > budget_ms:
+        failures.append(f"import app.main took {result['median_ms']:.0f}ms (median), budget {budget_ms:.0f}ms")
+    for name in result['deferred_imported']:
+        failures.append(f"{name} is imported by import app.main; import it on first use instead")
+    if result['pool_created']:
+        failures.append("the Supabase client pool was built at import time")
+    return failures
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"import app.main: median {result['median_ms']:.0f}ms over {result['runs']} runs "
+          f"(min {result['min_ms']:.0f}ms, max {result['max_ms']:.0f}ms), {result['modules_imported']} modules")
+    for title, key in (('cumulative', 'cumulative_us'), ('self', 'self_us')):
+        print(f"\nSlowest modules by {title} time:")
+        for row in result[f'top_{title}']:
+            print(f"  {row[key] / 1000:>8.1f}ms  {row['module']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20, help="Modules listed per ranking")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--output', help="Write results JSON here")
+    args = parser.parse_args()
+
+    result = measure(args.runs, args.top)
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            json.dump(result, out, indent=2)
+        print(f"Wrote {args.output}")
+
+    failures = check(result, args.budget_ms)
+    for message in failures:
+        print(f"OVER BUDGET {message}")
+    if failures:
+        return 1
+    print(f"\nWithin budget ({args.budget_ms:.0f}ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
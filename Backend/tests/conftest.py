@@ -0,0 +1,25 @@
+"""
+Shared test setup.
+
+Tests never reach a real Supabase project: settings point at a dummy
+project, and the default clients come from the in-process stand-in
+(SUPABASE_BACKEND=local). Tests that need data install their own pool with
+``use_local_pool`` or patch the module clients.
+
+This runs before any test module is imported, so it is in place when
+app.config.settings is first built.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ['SUPABASE_URL'] = 'https://test-project.supabase.co'
+os.environ['SUPABASE_KEY'] = 'test-key'
+os.environ['SUPABASE_SERVICE_ROLE_KEY'] = 'test-service-key'
+os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+os.environ['SUPABASE_BACKEND'] = 'local'
+
+# The app package and the benchmark helpers (generate_portfolio, run_benchmarks)
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, 'benchmarks'))
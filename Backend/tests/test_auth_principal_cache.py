@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for local JWT verification and the verified-principal cache in get_current_user
+"""
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import auth, token_verifier as token_verifier_module
+from app.config.local_supabase import LocalClientPool, LocalDatabase, local_token, use_local_pool
+from app.config.settings import settings
+from app.config.token_verifier import TokenVerifier
+from app.services import user_service
+from app.utils.security import decode_jwt_token
+
+SECRET = 'super-secret-jwt-token-with-at-least-32-characters'
+USER_ID = str(uuid.UUID(int=7))
+
+
+def make_token(secret=SECRET, sub=USER_ID, expires_in=3600, audience='authenticated', **claims):
+    payload = {'sub': sub, 'aud': audience, 'exp': int(time.time()) + expires_in, 'email': 'owner@example.com',
+               'role': 'authenticated', 'user_metadata': {'first_name': 'Asha'}, **claims}
+    return jwt.encode(payload, secret, algorithm='HS256')
+
+
+@pytest.fixture
+def local_app():
+    db = LocalDatabase()
+    db.load({'user_profiles': [
+        {'id': USER_ID, 'email': 'owner@example.com', 'first_name': 'Asha', 'last_name': 'Rao',
+         'user_type': 'owner', 'created_at': '2024-01-01T00:00:00'},
+    ]})
+    pool = LocalClientPool(db)
+    verifier = TokenVerifier(secret=SECRET)
+    # Local data, but tokens are verified as they would be against Supabase
+    with use_local_pool(pool), patch.object(settings, 'SUPABASE_BACKEND', 'supabase'), \
+            patch.object(auth, 'token_verifier', verifier), \
+            patch.object(user_service, 'get_user_profile', wraps=user_service.get_user_profile) as profile_lookup, \
+            patch.object(pool.client.auth, 'get_user', wraps=pool.client.auth.get_user) as auth_lookup:
+        yield TestClient(app), verifier, profile_lookup, auth_lookup
+
+
+class TestLocalVerification:
+    """Supabase tokens are checked without calling Supabase Auth"""
+
+    def test_valid_token_is_resolved_once_then_cached(self, local_app):
+        client, verifier, profile_lookup, auth_lookup = local_app
+        headers = {'Authorization': f'Bearer {make_token()}'}
+
+        first = client.get('/users/me', headers=headers).json()
+        second = client.get('/users/me', headers=headers).json()
+
+        assert first == second
+        assert first['id'] == USER_ID and first['full_name'] == 'Asha Rao' and first['role'] == 'owner'
+        assert first['created_at'] == '2024-01-01T00:00:00'
+        assert verifier.verified == 1
+        assert profile_lookup.call_count == 1
+        assert auth_lookup.call_count == 0
+
+    @pytest.mark.parametrize('token', [
+        make_token(expires_in=-60),
+        make_token(secret='another-secret-that-is-also-long-enough'),
+        make_token(audience='anon'),
+    ])
+    def test_bad_tokens_are_rejected_locally(self, local_app, token):
+        client, verifier, profile_lookup, auth_lookup = local_app
+        assert client.get('/users/me', headers={'Authorization': f'Bearer {token}'}).status_code == 401
+        assert verifier.rejected == 1
+        assert auth_lookup.call_count == 0 and profile_lookup.call_count == 0
+
+    def test_unverifiable_tokens_fall_back_to_supabase_auth(self, local_app):
+        client, verifier, profile_lookup, auth_lookup = local_app
+        headers = {'Authorization': f'Bearer {local_token(USER_ID)}'}
+        assert client.get('/users/me', headers=headers).json()['id'] == USER_ID
+        assert client.get('/users/me', headers=headers).status_code == 200
+        assert verifier.unverifiable == 1
+        assert auth_lookup.call_count == 1
+
+    def test_decode_jwt_token(self):
+        with patch.object(token_verifier_module.token_verifier, 'secret', SECRET):
+            assert decode_jwt_token(make_token())['sub'] == USER_ID
+            with pytest.raises(HTTPException, match='expired'):
+                decode_jwt_token(make_token(expires_in=-60))
+            # PyJWT's errors are what the verifier raises, so a bad token is a 401, not a 500
+            for token in (make_token(secret='x' * 40), make_token(audience='anon'), 'not-a-jwt'):
+                with pytest.raises(HTTPException) as error:
+                    decode_jwt_token(token)
+                assert error.value.status_code == 401
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class TestJwks:
+    """Asymmetric tokens are verified with the project's cached JWKS"""
+
+    def setup_method(self):
+        self.private_key = ec.generate_private_key(ec.SECP256R1())
+        jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(self.private_key.public_key()))
+        self.jwks = {'keys': [{**jwk, 'kid': 'key-1', 'alg': 'ES256', 'use': 'sig'}]}
+
+    def sign(self, kid='key-1', **claims):
+        payload = {'sub': USER_ID, 'aud': 'authenticated', 'exp': int(time.time()) + 3600, **claims}
+        return jwt.encode(payload, self.private_key, algorithm='ES256', headers={'kid': kid})
+
+    @pytest.mark.asyncio
+    async def test_keys_are_fetched_once(self):
+        verifier = TokenVerifier(jwks_url='https://example.supabase.co/auth/v1/.well-known/jwks.json')
+        with patch.object(token_verifier_module.httpx, 'get', return_value=FakeResponse(self.jwks)) as fetch:
+            results = await asyncio.gather(*(verifier.verify(self.sign()) for _ in range(5)))
+            assert all(claims['sub'] == USER_ID for claims in results)
+            # Unknown key ids do not refetch within JWKS_MIN_REFRESH
+            assert await verifier.verify(self.sign(kid='forged')) is None
+        assert fetch.call_count == 1
+        assert verifier.snapshot()['jwks_keys'] == 1
+
+    @pytest.mark.asyncio
+    async def test_hmac_header_does_not_use_jwks_keys(self):
+        verifier = TokenVerifier(jwks_url='https://example.supabase.co/auth/v1/.well-known/jwks.json')
+        with patch.object(token_verifier_module.httpx, 'get', return_value=FakeResponse(self.jwks)):
+            await verifier.verify(self.sign())
+        # An HS256 token signed with anything is not checkable without the secret
+        assert await verifier.verify(make_token(secret='x' * 32)) is None
+
+    @pytest.mark.asyncio
+    async def test_unreachable_jwks_falls_back(self):
+        verifier = TokenVerifier(jwks_url='https://example.supabase.co/auth/v1/.well-known/jwks.json')
+        with patch.object(token_verifier_module.httpx, 'get', side_effect=OSError('down')) as fetch:
+            assert await verifier.verify(self.sign()) is None
+            assert await verifier.verify(self.sign()) is None
+        assert fetch.call_count == 1
+
+
+class TestPrincipalCache:
+    """Cached principals are cheap, expire with the token and are dropped on profile updates"""
+
+    def test_profile_update_invalidates(self, local_app):
+        client, verifier, profile_lookup, auth_lookup = local_app
+        headers = {'Authorization': f'Bearer {make_token()}'}
+        assert client.get('/users/me', headers=headers).json()['phone'] is None
+
+        response = client.put('/users/me', headers=headers, json={'phone': '+91 98765 43210'})
+        assert response.status_code == 200, response.text
+
+        assert client.get('/users/me', headers=headers).json()['phone'] == '+91 98765 43210'
+        assert profile_lookup.call_count == 2
+
+    def test_entries_do_not_outlive_the_token(self, local_app):
+        client, verifier, profile_lookup, auth_lookup = local_app
+        headers = {'Authorization': f'Bearer {make_token(expires_in=1)}'}
+        assert client.get('/users/me', headers=headers).status_code == 200
+        time.sleep(1.1)
+        with patch.object(verifier, 'leeway', 0):
+            assert client.get('/users/me', headers=headers).status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_cached_resolution_is_sub_millisecond(self, local_app):
+        token = make_token()
+        credentials = HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
+        db_client = MagicMock()
+        db_client.table.side_effect = AssertionError('profile queried on a cache hit')
+        auth._cache_principal(token, {'id': USER_ID, 'email': 'owner@example.com'}, time.time() + 3600)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            user = await auth.get_current_user(credentials, db_client)
+        assert user['id'] == USER_ID
+        assert (time.perf_counter() - started) / 1000 < 0.001
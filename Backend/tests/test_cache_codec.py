@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the cache value codecs
+"""
+import json
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.config import cache_codec
+from app.config.cache import CacheService
+from app.config.cache_codec import CacheCodec
+
+RICH_VALUE = {
+    "owner_id": uuid.UUID("123e4567-e89b-12d3-a456-426614174000"),
+    "generated_at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    "period": {"start": date(2024, 1, 1), "cutoff": time(23, 59)},
+    "revenue": [Decimal("1250.50"), Decimal("0.10")],
+    "months": [{"month": "Jan", "amount": 100.5, "paid": True, "note": None}],
+    3: "non-string key",
+}
+
+SERIALIZERS = ["json", pytest.param("msgpack", marks=pytest.mark.skipif(
+    cache_codec.msgpack is None, reason="msgpack not installed"))]
+
+
+class TestRoundTrip:
+    """Values come back with their original types"""
+
+    @pytest.mark.parametrize("serializer", SERIALIZERS)
+    @pytest.mark.parametrize("compression", ["none", "zlib"])
+    def test_rich_types_round_trip(self, serializer, compression):
+        codec = CacheCodec(serializer, compression, compress_threshold=0)
+        decoded = codec.decode(codec.encode(RICH_VALUE)[0])
+
+        assert decoded["owner_id"] == RICH_VALUE["owner_id"]
+        assert decoded["generated_at"] == RICH_VALUE["generated_at"]
+        assert decoded["period"] == RICH_VALUE["period"]
+        assert decoded["revenue"] == RICH_VALUE["revenue"]
+        assert isinstance(decoded["revenue"][0], Decimal)
+        assert decoded["months"] == RICH_VALUE["months"]
+
+    def test_plain_json_values_are_unchanged(self):
+        codec = CacheCodec("json", "none")
+        value = {"total": 3, "items": [1, "a", None, {"nested": True}]}
+        assert codec.decode(codec.encode(value)[0]) == value
+
+    def test_legacy_json_payloads_still_decode(self):
+        codec = CacheCodec("json", "none")
+        assert codec.decode(json.dumps({"total": 1}).encode()) == {"total": 1}
+        assert codec.decode(json.dumps([1, 2])) == [1, 2]
+
+    def test_any_codec_reads_any_other_codecs_payloads(self):
+        writer = CacheCodec("json", "zlib", compress_threshold=0)
+        reader = CacheCodec("json", "none")
+        assert reader.decode(writer.encode(RICH_VALUE)[0])["revenue"] == RICH_VALUE["revenue"]
+
+
+class TestCompression:
+    """Compression applies above the threshold, and only when it helps"""
+
+    def test_below_threshold_is_not_compressed(self):
+        codec = CacheCodec("json", "zlib", compress_threshold=1024)
+        payload, serialized = codec.encode({"a": 1})
+        assert payload[1] & 0x0F == 0
+        assert len(payload) == serialized + 2
+
+    def test_large_values_are_compressed(self):
+        codec = CacheCodec("json", "zlib", compress_threshold=1024)
+        series = [{"month": f"2024-{m:02d}", "revenue": 1000.0, "expenses": 250.0} for m in range(1, 13)] * 20
+        payload, serialized = codec.encode(series)
+        assert payload[1] & 0x0F == cache_codec.COMPRESSION_IDS["zlib"]
+        assert len(payload) < serialized / 4
+        assert codec.decode(payload) == series
+
+    def test_unavailable_compression_falls_back_to_none(self):
+        if cache_codec.zstandard is not None:
+            pytest.skip("zstandard installed")
+        assert CacheCodec("json", "zstd").compression == "none"
+
+
+class TestServiceIntegration:
+    """CacheService stores codec bytes and reports sizes per prefix"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_and_byte_counters(self):
+        service = CacheService()
+        service.codec = CacheCodec("json", "zlib", compress_threshold=256)
+        series = [{"month": m, "revenue": Decimal("100.00"), "as_of": date(2024, m, 1)} for m in range(1, 13)] * 10
+
+        await service.set("monthly_revenue:o1", series, ttl=60)
+        assert await service.get("monthly_revenue:o1") == series
+
+        counters = service.get_stats()["prefixes"]["monthly_revenue"]
+        assert 0 < counters["bytes_stored"] < counters["bytes_serialized"]
+        assert counters["compression_ratio"] < 0.5
+        assert service.get_stats()["codec"] == ("orjson+zlib" if cache_codec.orjson else "json+zlib")
+
+    @pytest.mark.asyncio
+    async def test_redis_bytes_by_prefix(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        service = CacheService()
+        service.redis_client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+        await service.set("property_stats:a", {"total": 1}, ttl=60, tags=["owner:o1"])
+        await service.set("property_stats:b", {"total": 2}, ttl=60)
+        await service.set("tenant_stats:a", {"total": 3}, ttl=60)
+
+        sizes = await service.redis_bytes_by_prefix()
+        assert set(sizes) == {"property_stats", "tenant_stats"}
+        assert sizes["property_stats"]["entries"] == 2
+        assert sizes["property_stats"]["bytes"] == service.get_stats()["prefixes"]["property_stats"]["bytes_stored"]
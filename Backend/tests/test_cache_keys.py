@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for cache key derivation and for cache hits on every @cache_result function
+"""
+import asyncio
+import inspect
+import uuid
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.config import cache as cache_module
+from app.config.cache import CacheService, cache_result, set_cache_principal
+from app.db import dashboard as dashboard_db
+from app.db import properties as properties_db
+from app.db import rollups
+
+OWNER_ID = "123e4567-e89b-12d3-a456-426614174000"
+CACHED_MODULES = [dashboard_db, properties_db]
+
+
+class AnyQuery:
+    """Chainable fake builder; ``single()`` answers a row, anything else an empty list"""
+
+    def __init__(self, client):
+        self.client = client
+        self.single_row = False
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            if name in ("single", "maybe_single"):
+                self.single_row = True
+            return self
+        return method
+
+    def execute(self):
+        self.client.executed += 1
+        if self.single_row:
+            return SimpleNamespace(data={"id": "p1", "owner_id": OWNER_ID, "units": []}, count=1, error=None)
+        return SimpleNamespace(data=[], count=0, error=None)
+
+
+class FakeClient:
+    """A fresh instance per 'request', like the pooled ScopedClient"""
+
+    def __init__(self, token="token-a"):
+        self.token = token
+        self.executed = 0
+
+    def table(self, name):
+        return AnyQuery(self)
+
+    def rpc(self, name, params=None):
+        return AnyQuery(self)
+
+
+def cached_functions():
+    found = []
+    for module in CACHED_MODULES:
+        for name, func in vars(module).items():
+            if callable(getattr(func, "cache_key", None)) and func.__module__ == module.__name__:
+                found.append(pytest.param(module, func, id=f"{module.__name__.rsplit('.', 1)[-1]}.{name}"))
+    return found
+
+
+def sample_args(func, client):
+    args = {}
+    for name, param in inspect.signature(func).parameters.items():
+        if name == "db_client":
+            args[name] = client
+        elif name.endswith("_id"):
+            args[name] = OWNER_ID if name == "owner_id" else "p1"
+        elif param.default is inspect.Parameter.empty:
+            raise AssertionError(f"No sample value for {func.__name__}({name})")
+    return args
+
+
+class TestKeyDerivation:
+    """Keys depend on data arguments only, and on the principal where RLS applies"""
+
+    def test_client_instances_do_not_change_the_key(self):
+        key = properties_db.get_property_by_id.cache_key
+        set_cache_principal("user-1")
+        assert key(FakeClient(), "p1") == key(FakeClient(), property_id="p1")
+        assert key(FakeClient(), "p1") != key(FakeClient(), "p2")
+
+    def test_principal_is_folded_in_for_client_scoped_reads(self):
+        key = properties_db.get_property_by_id.cache_key
+        set_cache_principal("user-1")
+        first = key(FakeClient(), "p1")
+        set_cache_principal("user-2")
+        assert key(FakeClient(), "p1") != first
+
+    def test_token_digest_is_used_without_a_verified_principal(self):
+        key = properties_db.get_property_by_id.cache_key
+        set_cache_principal(None)
+        assert key(FakeClient("a"), "p1") == key(FakeClient("a"), "p1")
+        assert key(FakeClient("a"), "p1") != key(FakeClient("b"), "p1")
+        assert key(object(), "p1") is None
+
+    def test_owner_keyed_reads_ignore_the_principal(self):
+        key = dashboard_db.get_monthly_revenue.cache_key
+        set_cache_principal("user-1")
+        first = key(OWNER_ID)
+        set_cache_principal("user-2")
+        assert key(OWNER_ID) == key(OWNER_ID, 6) == first
+        assert key(OWNER_ID, months=12) != first
+
+    def test_rich_arguments_have_stable_keys(self):
+        @cache_result(key_prefix="report")
+        async def report(owner_id, since, tags):
+            return None
+
+        assert report.cache_key(uuid.UUID(OWNER_ID), date(2024, 1, 1), {"b", "a"}) == \
+            report.cache_key(uuid.UUID(OWNER_ID), date(2024, 1, 1), {"a", "b"})
+        assert report.cache_key(OWNER_ID, object(), []) is None
+
+    def test_digest_is_not_truncated_md5(self):
+        key = dashboard_db.get_dashboard_summary_row.cache_key(OWNER_ID)
+        assert key.startswith("dashboard_summary_row:app.db.dashboard.get_dashboard_summary_row:")
+        assert len(key.rsplit(":", 1)[1]) == 32
+
+
+class TestDecoratedFunctionsHit:
+    """A second call with a fresh client must be served from cache"""
+
+    def test_discovers_decorated_functions(self):
+        assert len(cached_functions()) >= 5
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("module,func", cached_functions())
+    async def test_second_call_is_a_cache_hit(self, module, func):
+        service = CacheService()
+        global_client = FakeClient()
+
+        async def handle_request():
+            set_cache_principal("user-1")
+            client = FakeClient()
+            with patch.object(module, "supabase_client", global_client), \
+                    patch.object(rollups, "supabase_service_role_client", global_client):
+                result = await func(**sample_args(func, client))
+            return result, client.executed + global_client.executed
+
+        with patch.object(cache_module, "cache_service", service):
+            first, first_queries = await asyncio.create_task(handle_request())
+            global_client.executed = 0
+            second, second_queries = await asyncio.create_task(handle_request())
+
+        assert first is not None
+        assert first_queries > 0
+        assert second_queries == 0
+        assert second == first
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight coalescing, stale-while-revalidate and the cluster lock in cache_result
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.config import cache as cache_module
+from app.config.cache import CacheService, cache_result
+
+
+def make_worker(server=None) -> CacheService:
+    """A CacheService wired to a shared fake Redis server (or memory only)"""
+    service = CacheService()
+    if server is not None:
+        service.redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+    return service
+
+
+def slow_stats(calls, delay=0.05, **options):
+    """A cached 'expensive dashboard query' that counts its executions"""
+    @cache_result(key_prefix="property_stats", **options)
+    async def get_property_stats(owner_id):
+        calls.append(owner_id)
+        await asyncio.sleep(delay)
+        return {"owner": owner_id, "run": len(calls)}
+    return get_property_stats
+
+
+class TestSingleFlight:
+    """Concurrent misses for one key should compute once"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        service = make_worker()
+        calls = []
+        get_stats = slow_stats(calls, ttl=60)
+
+        with patch.object(cache_module, "cache_service", service):
+            results = await asyncio.gather(*(get_stats("o1") for _ in range(50)))
+
+        assert len(calls) == 1
+        assert all(result == {"owner": "o1", "run": 1} for result in results)
+        assert service.get_stats()["prefixes"]["property_stats"]["coalesced"] == 49
+        assert service.get_stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiters_get_independent_copies(self):
+        service = make_worker()
+        get_stats = slow_stats([], ttl=60)
+
+        with patch.object(cache_module, "cache_service", service):
+            first, second = await asyncio.gather(get_stats("o1"), get_stats("o1"))
+        first["owner"] = "mutated"
+        assert second["owner"] == "o1"
+
+    @pytest.mark.asyncio
+    async def test_disabled_single_flight_recomputes(self):
+        service = make_worker()
+        calls = []
+        get_stats = slow_stats(calls, ttl=60, single_flight=False)
+
+        with patch.object(cache_module, "cache_service", service):
+            await asyncio.gather(*(get_stats("o1") for _ in range(5)))
+        assert len(calls) == 5
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_every_waiter(self):
+        service = make_worker()
+
+        @cache_result(ttl=60, key_prefix="revenue_stats")
+        async def broken(owner_id):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        with patch.object(cache_module, "cache_service", service):
+            results = await asyncio.gather(*(broken("o1") for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert service.get_stats()["inflight"] == 0
+
+
+class TestStaleWhileRevalidate:
+    """Expired entries inside the stale window are served while one refresh runs"""
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_during_refresh(self):
+        service = make_worker()
+        calls = []
+        get_stats = slow_stats(calls, ttl=1, stale_ttl=60)
+
+        with patch.object(cache_module, "cache_service", service):
+            assert (await get_stats("o1"))["run"] == 1
+            with patch.object(cache_module.time, "time", return_value=cache_module.time.time() + 5):
+                stale = await asyncio.gather(*(get_stats("o1") for _ in range(10)))
+            assert all(result["run"] == 1 for result in stale)
+            await asyncio.sleep(0.1)
+            assert (await get_stats("o1"))["run"] == 2
+
+        assert len(calls) == 2
+        counters = service.get_stats()["prefixes"]["property_stats"]
+        assert counters["stale_served"] == 10
+        assert counters["refreshes"] == 1
+
+
+class TestClusterLock:
+    """Only one worker in the cluster recomputes a missing key"""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_the_worker_holding_the_lock(self):
+        server = fakeredis.FakeServer()
+        service, other_worker = make_worker(server), make_worker(server)
+        calls = []
+
+        @cache_result(ttl=60, key_prefix="monthly_revenue", cluster_lock=True, lock_timeout=2)
+        async def get_monthly_revenue(owner_id):
+            calls.append(owner_id)
+            return [0]
+
+        cache_key = get_monthly_revenue.cache_key("o1")
+        token = await other_worker.acquire_lock(cache_key, 2)
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.1)
+            await other_worker.set(cache_key, [1, 2, 3], ttl=60)
+            await other_worker.release_lock(cache_key, token)
+
+        with patch.object(cache_module, "cache_service", service):
+            finisher = asyncio.create_task(other_worker_finishes())
+            assert await get_monthly_revenue("o1") == [1, 2, 3]
+            await finisher
+
+        assert calls == []
+        assert service.get_stats()["prefixes"]["monthly_revenue"]["lock_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_is_released_after_compute(self):
+        service = make_worker(fakeredis.FakeServer())
+        get_stats = slow_stats([], ttl=60, cluster_lock=True)
+
+        with patch.object(cache_module, "cache_service", service):
+            await get_stats("o1")
+        assert await service.redis_client.keys("lock:*") == []
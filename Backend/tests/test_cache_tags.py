@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for tag-based cache invalidation
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.config import cache as cache_module
+from app.config.cache import CacheService, LocalCache, cache_result, invalidate_cache
+
+
+def make_worker(server=None) -> CacheService:
+    """A CacheService wired to a shared fake Redis server (or memory only)"""
+    service = CacheService()
+    if server is not None:
+        service.redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+    return service
+
+
+class TestLocalTagIndex:
+    """Test the L1 tag -> keys index"""
+
+    def test_delete_tags_drops_only_tagged_entries(self):
+        cache = LocalCache()
+        cache.set("property_stats:a", "1", 60, tags=["owner:o1"])
+        cache.set("property_by_id:p1", "1", 60, tags=["property:p1", "owner:o1"])
+        cache.set("property_by_id:p2", "1", 60, tags=["property:p2", "owner:o2"])
+
+        assert cache.delete_tags(["owner:o1"]) == 2
+        assert cache.keys() == ["property_by_id:p2"]
+
+    def test_evicted_entries_leave_the_index(self):
+        cache = LocalCache(max_entries=1)
+        cache.set("a", "1", 60, tags=["owner:o1"])
+        cache.set("b", "1", 60, tags=["owner:o2"])
+
+        assert "owner:o1" not in cache._tags
+        assert cache.delete_tags(["owner:o1"]) == 0
+        assert cache.keys() == ["b"]
+
+
+class TestRedisTags:
+    """Test tag sets in Redis and cross-worker invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_invalidation_removes_exactly_the_tagged_keys(self):
+        server = fakeredis.FakeServer()
+        service = make_worker(server)
+        for i in range(200):
+            await service.set(f"property_by_id:p{i}", {"id": i}, ttl=60, tags=[f"property:p{i}", f"owner:o{i % 4}"])
+
+        # Invalidation must not walk the keyspace
+        with patch.object(service.redis_client, "keys", side_effect=AssertionError("KEYS used")), \
+             patch.object(service.redis_client, "scan_iter", side_effect=AssertionError("SCAN used")):
+            removed = await service.invalidate_tags(["owner:o1"])
+
+        assert removed == 50
+        remaining = await service.redis_client.keys("property_by_id:*")
+        assert len(remaining) == 150
+        assert not await service.redis_client.exists("tag:owner:o1")
+        assert await service.redis_client.exists("tag:owner:o2")
+
+    @pytest.mark.asyncio
+    async def test_tag_set_outlives_its_longest_entry(self):
+        service = make_worker(fakeredis.FakeServer())
+        await service.set("monthly_revenue:k", [1], ttl=1800, tags=["owner:o1"])
+        await service.set("tenant_stats:k", {}, ttl=300, tags=["owner:o1"])
+
+        assert await service.redis_client.ttl("tag:owner:o1") >= 1799
+
+    @pytest.mark.asyncio
+    async def test_other_workers_drop_their_l1_copies(self):
+        server = fakeredis.FakeServer()
+        writer, reader = make_worker(server), make_worker(server)
+        reader._listener_task = asyncio.create_task(reader._listen_for_invalidations())
+        await asyncio.sleep(0.05)
+
+        await writer.set("property_stats:o1", {"total": 1}, ttl=60, tags=["owner:o1"])
+        assert await reader.get("property_stats:o1") == {"total": 1}
+        assert len(reader.l1) == 1
+
+        await writer.invalidate_tags(["owner:o1"])
+        await asyncio.sleep(0.05)
+        assert len(reader.l1) == 0
+        assert await reader.get("property_stats:o1") is None
+        await reader.close()
+
+    @pytest.mark.asyncio
+    async def test_the_writing_worker_drops_its_promoted_copies(self):
+        server = fakeredis.FakeServer()
+        writer, other = make_worker(server), make_worker(server)
+        await other.set("property_stats:o1", {"total": 1}, ttl=60, tags=["owner:o1"])
+        assert await writer.get("property_stats:o1") == {"total": 1}  # L2 hit, promoted into L1
+
+        await writer.invalidate_tags(["owner:o1"])
+        assert await writer.get("property_stats:o1") is None
+
+
+class TestTagDecorators:
+    """Test tag templates on cache_result / invalidate_cache"""
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_cached_read_for_same_entity(self):
+        service = make_worker()
+        calls = []
+
+        @cache_result(ttl=60, key_prefix="property_by_id", tags=["property:{property_id}", "owner:{result[owner_id]}"])
+        async def get_property(db_client, property_id):
+            calls.append(property_id)
+            return {"id": property_id, "owner_id": "o1", "version": len(calls)}
+
+        @invalidate_cache(tags=["property:{property_id}", "owner:{result[owner_id]}"])
+        async def update_property(db_client, property_id, data):
+            return {"id": property_id, "owner_id": "o1"}
+
+        with patch.object(cache_module, "cache_service", service):
+            await get_property(None, "p1")
+            await get_property(None, "p2")
+            assert (await get_property(None, "p1"))["version"] == 1
+
+            await update_property(None, "p1", {})
+            assert (await get_property(None, "p1"))["version"] == 3
+            # p2 shares the owner tag, so the owner-level invalidation drops it too
+            assert (await get_property(None, "p2"))["version"] == 4
+
+    @pytest.mark.asyncio
+    async def test_unresolvable_templates_are_skipped(self):
+        service = make_worker()
+
+        @invalidate_cache(tags=["property:{property_id}", "owner:{result[owner_id]}"])
+        async def failed_update(property_id):
+            return None
+
+        with patch.object(cache_module, "cache_service", service), \
+             patch.object(service, "invalidate_tags", wraps=service.invalidate_tags) as spy:
+            await failed_update("p1")
+
+        spy.assert_awaited_once_with(["property:p1"])
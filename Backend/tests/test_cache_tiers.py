@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier (L1 in-process + Redis L2) cache service
+"""
+import asyncio
+import time
+
+import pytest
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.config.cache import CacheService, LocalCache
+
+
+def make_worker(server=None) -> CacheService:
+    """A CacheService wired to a shared fake Redis server (or memory only)"""
+    service = CacheService()
+    if server is not None:
+        service.redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+    return service
+
+
+async def start_listener(service: CacheService):
+    service._listener_task = asyncio.create_task(service._listen_for_invalidations())
+    # Give the subscription a moment to register
+    await asyncio.sleep(0.05)
+
+
+class TestLocalCache:
+    """Test the bounded L1 cache"""
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = LocalCache(max_entries=2, max_bytes=1024)
+        cache.set("a", "1", 60)
+        cache.set("b", "2", 60)
+        cache.get("a")  # "b" is now least recently used
+        evicted = cache.set("c", "3", 60)
+
+        assert evicted == 1
+        assert cache.keys() == ["a", "c"]
+
+    def test_eviction_by_byte_budget(self):
+        cache = LocalCache(max_entries=100, max_bytes=10)
+        cache.set("a", "x" * 6, 60)
+        cache.set("b", "y" * 6, 60)
+
+        assert cache.keys() == ["b"]
+        assert cache.current_bytes == 6
+
+    def test_oversized_entries_are_not_stored(self):
+        cache = LocalCache(max_entries=100, max_bytes=4)
+        cache.set("big", "x" * 5, 60)
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self):
+        cache = LocalCache()
+        cache.set("a", "1", 0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.current_bytes == 0
+
+    def test_pattern_delete(self):
+        cache = LocalCache()
+        cache.set("property_stats:x", "1", 60)
+        cache.set("property_by_id:y", "1", 60)
+        cache.set("tenant_stats:z", "1", 60)
+        assert cache.delete_pattern("property_*") == 2
+        assert cache.keys() == ["tenant_stats:z"]
+
+
+class TestCacheService:
+    """Test tiering, statistics and cross-worker invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_memory_only_round_trip(self):
+        service = make_worker()
+        await service.set("property_stats:abc", {"total": 3}, ttl=60)
+        assert await service.get("property_stats:abc") == {"total": 3}
+
+        stats = service.get_stats()
+        assert stats["backend"] == "memory"
+        assert stats["prefixes"]["property_stats"]["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_l1_returns_independent_copies(self):
+        service = make_worker()
+        await service.set("property_by_id:1", {"units": []}, ttl=60)
+        first = await service.get("property_by_id:1")
+        first["units"].append("mutated")
+        assert await service.get("property_by_id:1") == {"units": []}
+
+    @pytest.mark.asyncio
+    async def test_l2_hit_populates_l1(self):
+        server = fakeredis.FakeServer()
+        writer, reader = make_worker(server), make_worker(server)
+        await writer.set("monthly_revenue:k", [1, 2, 3], ttl=60)
+
+        assert await reader.get("monthly_revenue:k") == [1, 2, 3]
+        assert await reader.get("monthly_revenue:k") == [1, 2, 3]
+        counters = reader.get_stats()["prefixes"]["monthly_revenue"]
+        assert counters["l2_hits"] == 1
+        assert counters["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_miss_counters_and_hit_ratio(self):
+        service = make_worker()
+        await service.get("tenant_stats:none")
+        await service.set("tenant_stats:k", 1, ttl=60)
+        await service.get("tenant_stats:k")
+        counters = service.get_stats()["prefixes"]["tenant_stats"]
+        assert counters["misses"] == 1
+        assert counters["hit_ratio"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_cross_worker_l1_invalidation(self):
+        server = fakeredis.FakeServer()
+        worker_a, worker_b = make_worker(server), make_worker(server)
+        await start_listener(worker_b)
+
+        await worker_a.set("property_by_id:p1", {"name": "old"}, ttl=60)
+        assert await worker_b.get("property_by_id:p1") == {"name": "old"}  # now in B's L1
+
+        await worker_a.set("property_by_id:p1", {"name": "new"}, ttl=60)
+        await asyncio.sleep(0.05)
+        assert await worker_b.get("property_by_id:p1") == {"name": "new"}
+
+        await worker_a.delete_pattern("property_*")
+        await asyncio.sleep(0.05)
+        assert len(worker_b.l1) == 0
+        await worker_b.close()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled Supabase client and request-scoped client views
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config.client_pool import SupabaseClientPool
+
+
+class _PostgrestHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive PostgREST stand-in that records auth headers"""
+    protocol_version = "HTTP/1.1"
+    seen_auth = []
+
+    def do_GET(self):
+        type(self).seen_auth.append(self.headers.get("Authorization"))
+        body = json.dumps([{"id": "1"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    _PostgrestHandler.seen_auth = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PostgrestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestSupabaseClientPool:
+    """Test connection reuse and token isolation of pooled clients"""
+
+    def test_scoped_views_share_http_client(self, local_server):
+        """Scoped views must reuse the pool's HTTP session"""
+        pool = SupabaseClientPool(local_server, "anon-key", "service-key")
+        view_a = pool.scoped("token-a")
+        view_b = pool.scoped("token-b")
+
+        assert view_a.postgrest.session is pool.http_client
+        assert view_b.postgrest.session is pool.http_client
+        assert pool.client.postgrest.session is pool.http_client
+        assert pool.service_role_client.postgrest.session is pool.http_client
+        pool.close()
+
+    def test_views_only_swap_bearer_token(self, local_server):
+        """Each view sends its own bearer token over the shared connection"""
+        pool = SupabaseClientPool(local_server, "anon-key")
+        pool.scoped("token-a").table("properties").select("id").execute()
+        pool.scoped("token-b").table("properties").select("id").execute()
+
+        assert _PostgrestHandler.seen_auth == ["Bearer token-a", "Bearer token-b"]
+        pool.close()
+
+    def test_connections_are_reused(self, local_server):
+        """Sequential requests from different views must not open new connections"""
+        pool = SupabaseClientPool(local_server, "anon-key")
+        for i in range(5):
+            pool.scoped(f"token-{i}").table("units").select("*").execute()
+
+        stats = pool.get_stats()
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+        assert stats["views_created"] == 5
+        assert stats["open_connections"] == 1
+        assert stats["idle_connections"] == 1
+        pool.close()
+
+    def test_service_role_falls_back_to_anon_client(self, local_server):
+        """Without a service role key the anon client is used"""
+        pool = SupabaseClientPool(local_server, "anon-key")
+        assert pool.service_role_client is pool.client
+        pool.close()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the dashboard fan-out: one summary view read and concurrent history queries
+"""
+import time
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from generate_portfolio import generate_portfolio
+
+from app.main import app
+from app.config.cache import cache_service
+from app.config.local_supabase import LocalClientPool, LocalDatabase, local_token, use_local_pool
+from app.config.query_trace import begin_request_trace
+from app.db import dashboard as dashboard_db
+from app.db.rollups import recent_months
+from app.services import dashboard_service
+
+LATENCY_MS = 40
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return generate_portfolio(units=30, owners=1, seed=5, as_of=date.today())
+
+
+@pytest.fixture
+def owner(portfolio):
+    db = LocalDatabase(latency_ms=LATENCY_MS)
+    db.load(portfolio)
+    with use_local_pool(LocalClientPool(db)), patch.object(cache_service, 'enabled', False):
+        yield portfolio['dashboard_summary'][0]
+
+
+class TestSummary:
+    """The view row is read once and shared by every stat"""
+
+    @pytest.mark.asyncio
+    async def test_summary_reads_the_view_once(self, owner):
+        trace = begin_request_trace('dashboard-summary')
+        summary = await dashboard_service.get_dashboard_summary(owner['owner_id'])
+
+        tables = [record.table for record in trace.queries]
+        assert tables.count('dashboard_summary') == 1
+        assert trace.count == 4
+        assert summary['total_properties'] == owner['total_properties']
+        assert summary['total_tenants'] == owner['total_tenants']
+        assert summary['total_revenue'] == float(owner['monthly_rental_income'])
+        assert summary['yearly_revenue'] == float(owner['yearly_rental_income'])
+
+
+class TestDashboardData:
+    """Independent queries overlap: latency is the longest chain, not the sum"""
+
+    @pytest.mark.asyncio
+    async def test_queries_run_concurrently(self, owner):
+        trace = begin_request_trace('dashboard-data')
+        started = time.perf_counter()
+        data = await dashboard_service.get_dashboard_data(owner['owner_id'], months=6)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        assert trace.count == 5
+        assert sorted(record.table for record in trace.queries) == [
+            'dashboard_summary', 'monthly_financial_rollups', 'properties', 'property_tenants', 'tenants',
+        ]
+        # Three round trips on the longest chain (properties -> links -> tenants), five if serial
+        assert elapsed_ms < 4.5 * LATENCY_MS, elapsed_ms
+        assert len(data['revenue_by_month']) == 6
+        assert [item['month'] for item in data['revenue_by_month']] == [m.isoformat() for m in recent_months(6)]
+        assert len(data['occupancy_history']) == 6
+        assert any(month['units_occupied'] for month in data['occupancy_history'])
+
+    @pytest.mark.asyncio
+    async def test_leases_are_limited_to_the_window(self, portfolio, owner):
+        leases = await dashboard_db.get_owner_leases(owner['owner_id'], 6)
+        window_start = recent_months(6)[0].isoformat()
+        running = [link for link in portfolio['property_tenants'] if not link['end_date'] or link['end_date'] >= window_start]
+        assert len(leases['property_tenants']) == len(running) < len(portfolio['property_tenants'])
+
+    def test_query_count_is_reported(self, owner):
+        client = TestClient(app)
+        headers = {'Authorization': f"Bearer {local_token(owner['owner_id'])}"}
+        client.get('/dashboard/data', headers=headers)  # Resolves and caches the principal
+        response = client.get('/dashboard/data', headers=headers)
+        assert response.status_code == 200
+        assert 'desc="5 queries"' in response.headers['server-timing']
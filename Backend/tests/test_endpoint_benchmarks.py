@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the endpoint benchmark suite (benchmarks/bench_endpoints.py)
+"""
+import json
+import logging
+from datetime import date
+
+import pytest
+
+from bench_endpoints import ENDPOINTS, compare, percentile, run_suite
+
+
+def result(rps, p95, errors=0):
+    return {'results': {'properties': {'10': {'throughput_rps': rps, 'p95_ms': p95, 'errors': errors}}}}
+
+
+class TestSuite:
+    """Every hot endpoint is served by the app against the local stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_small_run_covers_all_endpoints(self, caplog):
+        caplog.set_level(logging.WARNING)
+        outcome = await run_suite(units=20, owners=1, concurrency=(1, 3), requests=3, as_of=date(2025, 6, 15))
+
+        assert set(outcome['results']) == set(ENDPOINTS)
+        for name, levels in outcome['results'].items():
+            assert set(levels) == {'1', '3'}
+            for stats in levels.values():
+                assert stats['errors'] == 0, f"{name}: {stats['error_statuses']}"
+                assert stats['requests'] >= 3
+                assert stats['throughput_rps'] > 0 and stats['p95_ms'] >= stats['p50_ms'] > 0
+        # Budgets hold with realistic data (including the authentication lookup)
+        assert "queries (budget" not in caplog.text
+        json.dumps(outcome)
+
+
+class TestCompare:
+    """Regression detection against a stored baseline"""
+
+    def test_within_threshold_passes(self):
+        assert compare(result(90, 11), result(100, 10), max_regression=20) == []
+
+    def test_throughput_drop_is_reported(self):
+        regressions = compare(result(70, 10), result(100, 10), max_regression=20)
+        assert len(regressions) == 1 and 'throughput' in regressions[0]
+
+    def test_p95_increase_is_reported_above_noise(self):
+        assert 'p95' in compare(result(100, 20), result(100, 10), max_regression=20)[0]
+        # 0.5 ms on a 1 ms baseline is noise, not a regression
+        assert compare(result(100, 1.5), result(100, 1.0), max_regression=20) == []
+
+    def test_new_errors_are_reported(self):
+        assert 'errors' in compare(result(100, 10, errors=2), result(100, 10), max_regression=20)[0]
+
+    def test_unknown_endpoints_are_skipped(self):
+        assert compare(result(1, 1000), {'results': {}}) == []
+
+    def test_percentile(self):
+        assert percentile(list(range(1, 101)), 0.95) == 95
+        assert percentile([], 0.95) == 0.0
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass period bucketing behind /reports/financial-summary
+"""
+from collections import defaultdict
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from generate_portfolio import generate_portfolio
+
+from app.api import reports
+from app.api.reports import get_financial_summary, summary_periods
+from app.config import cache as cache_module
+from app.config import database
+from app.config.cache import CacheService
+from app.config.local_supabase import LocalClientPool, LocalDatabase, use_local_pool
+from app.config.query_trace import begin_request_trace
+from app.db import properties as properties_db
+from app.db import rollups
+from app.db import tenants as tenants_db
+from app.db.rollups import invalidate_rollups
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return generate_portfolio(units=40, owners=1, months=36, seed=5, as_of=date.today())
+
+
+@pytest.fixture
+def owner_id(portfolio):
+    db = LocalDatabase()
+    db.load(portfolio)
+    with use_local_pool(LocalClientPool(db)):
+        yield portfolio['dashboard_summary'][0]['owner_id']
+
+
+@pytest.fixture
+def cache():
+    service = CacheService()
+    with patch.object(reports, 'cache_service', service), patch.object(rollups, 'cache_service', service), \
+            patch.object(cache_module, 'cache_service', service):
+        yield service
+
+
+@pytest.fixture
+def no_cache():
+    service = CacheService()
+    with patch.object(service, 'enabled', False), patch.object(reports, 'cache_service', service), \
+            patch.object(rollups, 'cache_service', service), patch.object(cache_module, 'cache_service', service):
+        yield service
+
+
+async def summary(owner_id, period='month', months_back=12, role='owner'):
+    return await get_financial_summary(owner_id=owner_id, period=period, months_back=months_back,
+                                       current_user={'id': owner_id if role == 'owner' else 'an-admin', 'role': role})
+
+
+def expected_by_month(portfolio, owner_id):
+    """Scheduled rent and completed maintenance per YYYY-MM, straight from the rows"""
+    property_ids = {p['id'] for p in portfolio['properties'] if p['owner_id'] == owner_id}
+    months = [p['period'] for p in summary_periods('month', 36)]
+    rent, costs = defaultdict(float), defaultdict(float)
+    for link in portfolio['property_tenants']:
+        if link['property_id'] not in property_ids:
+            continue
+        for month in months:
+            if link['start_date'][:7] <= month and (not link['end_date'] or link['end_date'][:7] >= month):
+                rent[month] += link['rent_amount'] or 0
+    for request in portfolio['maintenance_requests']:
+        if request['property_id'] in property_ids and request['status'] == 'completed':
+            costs[request['created_at'][:7]] += request['estimated_cost'] or 0
+    return rent, costs
+
+
+class TestPeriods:
+    """Periods are calendar months, quarters and years, newest first"""
+
+    def test_quarters_and_years(self):
+        quarters = summary_periods('quarter', 3, today=date(2025, 5, 15))
+        assert [q['period'] for q in quarters] == ['2025-Q2', '2025-Q1', '2024-Q4']
+        assert (quarters[2]['start'], quarters[2]['end']) == (date(2024, 10, 1), date(2024, 12, 31))
+
+        years = summary_periods('year', 2, today=date(2025, 5, 15))
+        assert [(y['period'], y['start'], y['end']) for y in years] == [
+            ('2025', date(2025, 1, 1), date(2025, 12, 31)), ('2024', date(2024, 1, 1), date(2024, 12, 31))]
+
+    def test_months_do_not_drift(self):
+        months = summary_periods('month', 14, today=date(2025, 3, 31))
+        assert [m['period'] for m in months[:3]] == ['2025-03', '2025-02', '2025-01']
+        assert months[-1]['period'] == '2024-02' and months[-1]['end'] == date(2024, 2, 29)
+
+
+class TestSinglePass:
+    """Every dataset is read once, however many periods are asked for"""
+
+    @pytest.mark.asyncio
+    async def test_query_count_is_constant(self, owner_id, no_cache):
+        counts = []
+        for months_back in (1, 6, 24):
+            trace = begin_request_trace('financial-summary')
+            result = await summary(owner_id, months_back=months_back)
+            assert len(result['financial_data']) == months_back
+            counts.append(trace.count)
+        assert counts == [4, 4, 4]
+
+    @pytest.mark.asyncio
+    async def test_matches_the_rows(self, portfolio, owner_id, no_cache):
+        rent, costs = expected_by_month(portfolio, owner_id)
+        months = (await summary(owner_id, months_back=24))['financial_data']
+        assert any(month['total_expenses'] for month in months)
+        for month in months:
+            assert month['total_income'] == pytest.approx(rent[month['period']], abs=0.01)
+            assert month['total_expenses'] == pytest.approx(costs[month['period']], abs=0.01)
+
+        quarters = (await summary(owner_id, period='quarter', months_back=4))['financial_data']
+        by_month = {month['period']: month for month in months}
+        for quarter, period in zip(quarters, summary_periods('quarter', 4)):
+            inside = [m for label, m in by_month.items() if period['start'].isoformat()[:7] <= label <= period['end'].isoformat()[:7]]
+            assert quarter['period'] == period['period']
+            assert quarter['total_income'] == pytest.approx(sum(m['total_income'] for m in inside), abs=0.01)
+            assert quarter['total_expenses'] == pytest.approx(sum(m['total_expenses'] for m in inside), abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_other_owners_are_refused(self, owner_id, no_cache):
+        with pytest.raises(HTTPException) as error:
+            await get_financial_summary(owner_id=owner_id, period='month', months_back=3,
+                                        current_user={'id': 'someone-else', 'role': 'owner'})
+        assert error.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_a_self_assigned_admin_role_is_refused(self, owner_id, no_cache):
+        # role comes from user_metadata, which users can edit
+        with pytest.raises(HTTPException) as error:
+            await summary(owner_id, months_back=3, role='admin')
+        assert error.value.status_code == 403
+
+
+class TestPeriodCache:
+    """Periods are cached per owner data version"""
+
+    @pytest.mark.asyncio
+    async def test_cached_until_the_owner_data_changes(self, owner_id, cache):
+        first = await summary(owner_id, months_back=6)
+
+        trace = begin_request_trace('financial-summary')
+        assert await summary(owner_id, months_back=6) == first
+        assert [record.table for record in trace.queries] == ['properties']
+
+        await cache.invalidate_tags([f"owner:{owner_id}"])
+        trace = begin_request_trace('financial-summary')
+        assert await summary(owner_id, months_back=6) == first
+        assert 'property_tenants' in [record.table for record in trace.queries]
+
+    @pytest.mark.asyncio
+    async def test_backdated_rollup_changes_start_a_new_version(self, owner_id, cache):
+        version = await cache_module.get_data_version(f"owner:{owner_id}")
+        await invalidate_rollups(owner_id, [date.today().replace(day=1)])
+        assert await cache_module.get_data_version(f"owner:{owner_id}") != version
+
+    @pytest.mark.asyncio
+    async def test_lease_link_writes_refresh_the_periods(self, portfolio, owner_id, cache):
+        today = date.today().isoformat()
+        link = next(link for link in portfolio['property_tenants']
+                    if link['start_date'] <= today and (not link['end_date'] or link['end_date'] >= today))
+        before = (await summary(owner_id, months_back=3))['financial_data'][0]['total_income']
+
+        assert await tenants_db.update_property_tenant_link(link['id'], {'rent_amount': link['rent_amount'] + 100})
+        assert (await summary(owner_id, months_back=3))['financial_data'][0]['total_income'] == pytest.approx(before + 100)
+
+        assert await tenants_db.delete_property_tenant_link(link['id'])
+        assert (await summary(owner_id, months_back=3))['financial_data'][0]['total_income'] == pytest.approx(before - link['rent_amount'])
+
+    @pytest.mark.asyncio
+    async def test_unit_writes_start_a_new_version(self, portfolio, owner_id, cache):
+        property_id = next(p['id'] for p in portfolio['properties'] if p['owner_id'] == owner_id)
+        version = await cache_module.get_data_version(f"owner:{owner_id}")
+        unit = await properties_db.create_unit(database.supabase_client, {'property_id': property_id, 'unit_number': 'X-1'})
+        assert unit and await cache_module.get_data_version(f"owner:{owner_id}") != version
+
+        version = await cache_module.get_data_version(f"owner:{owner_id}")
+        assert await properties_db.delete_unit_db(database.supabase_client, unit['id'])
+        assert await cache_module.get_data_version(f"owner:{owner_id}") != version
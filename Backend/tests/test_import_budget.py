@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the cold-start budget: lazy clients, deferred imports and startup pre-warm
+"""
+from unittest.mock import patch
+
+import pytest
+
+import import_time
+
+from app.config import database
+from app.config.client_pool import LazyClientPool
+from app.config.local_supabase import LocalClientPool, LocalDatabase, use_local_pool
+from app.config import warmup
+
+
+class TestImportBudget:
+    """``import app.main`` builds nothing and stays within the budget"""
+
+    def test_cold_import(self):
+        result = import_time.measure(runs=1, top=5)
+        assert import_time.check(result, import_time.DEFAULT_BUDGET_MS) == []
+        assert result['top_cumulative'][0]['module'] == 'app.main'
+
+    def test_check_reports_violations(self):
+        result = {'median_ms': 3000.0, 'deferred_imported': ['reportlab'], 'pool_created': True}
+        failures = import_time.check(result, budget_ms=2500)
+        assert len(failures) == 3 and 'reportlab' in failures[1]
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      3000 |      45000 | app.main\n"
+        )
+        assert import_time.parse_importtime(stderr)[1] == {'module': 'app.main', 'self_us': 3000, 'cumulative_us': 45000}
+
+
+class TestLazyClientPool:
+    """Clients are built on first use and the proxies keep working in tests"""
+
+    def test_pool_is_built_on_first_use(self):
+        built = []
+        pool = LazyClientPool(lambda: built.append(1) or LocalClientPool(LocalDatabase()))
+        client = pool.client
+        assert not pool.created and built == []
+
+        assert client.table('properties').select('*').execute().data == []
+        assert pool.created and built == [1]
+        pool.warm()
+        assert built == [1]
+        assert pool.get_stats() == pool.pool.get_stats()
+
+    def test_close_before_use_builds_nothing(self):
+        pool = LazyClientPool(lambda: pytest.fail("pool built on close"))
+        pool.close()
+        assert not pool.created
+
+    def test_use_local_pool_replaces_the_proxies(self):
+        from app.db import properties as properties_db
+        assert properties_db.supabase_client is database.supabase_client
+        local = LocalClientPool(LocalDatabase())
+        with use_local_pool(local):
+            assert properties_db.supabase_client is local.client
+        assert properties_db.supabase_client is database.supabase_client
+
+
+class TestWarmUp:
+    """Startup builds the pool and imports the deferred modules concurrently"""
+
+    @pytest.mark.asyncio
+    async def test_warm_up(self):
+        pool = LazyClientPool(lambda: LocalClientPool(LocalDatabase()))
+        with patch.object(warmup, 'client_pool', pool), \
+                patch.object(warmup, 'PREWARM_MODULES', ('json', 'no_such_module_for_warmup')):
+            result = await warmup.warm_up()
+        assert pool.created
+        assert set(result['timings_ms']) == {'client_pool', 'json'}
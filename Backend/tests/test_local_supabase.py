@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process Supabase stand-in (SUPABASE_BACKEND=local)
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+
+from app.main import app
+from app.config.cache import cache_service
+from app.config.local_supabase import LocalClientPool, LocalDatabase, local_token, use_local_pool
+from app.config.query_executor import run_query
+from app.config.query_trace import begin_request_trace
+
+OWNER_ID = str(uuid.UUID(int=1))
+OTHER_OWNER_ID = str(uuid.UUID(int=2))
+
+
+def make_db(**kwargs):
+    db = LocalDatabase(**kwargs)
+    db.load({
+        'user_profiles': [
+            {'id': OWNER_ID, 'email': 'owner@example.com', 'first_name': 'Asha', 'user_type': 'owner', 'role': 'owner'},
+        ],
+        'properties': [
+            {'id': 'p1', 'owner_id': OWNER_ID, 'property_name': 'Lake View', 'city': 'Pune', 'created_at': '2024-01-01'},
+            {'id': 'p2', 'owner_id': OWNER_ID, 'property_name': 'Hill Top', 'city': 'pune', 'created_at': '2024-02-01'},
+            {'id': 'p3', 'owner_id': OTHER_OWNER_ID, 'property_name': 'Sea Side', 'city': 'Goa', 'created_at': '2024-03-01'},
+        ],
+        'units': [
+            {'id': 'u1', 'property_id': 'p1', 'unit_number': '101', 'rent': 1000, 'tenant_id': 't1'},
+            {'id': 'u2', 'property_id': 'p1', 'unit_number': '102', 'rent': 1500, 'tenant_id': None},
+            {'id': 'u3', 'property_id': 'p3', 'unit_number': '201', 'rent': 900, 'tenant_id': None},
+        ],
+        'tenants': [
+            {'id': 't1', 'name': 'Ravi', 'email': 'ravi@example.com'},
+        ],
+        'property_tenants': [
+            {'id': 'pt1', 'property_id': 'p1', 'unit_id': 'u1', 'tenant_id': 't1', 'start_date': '2024-01-01', 'end_date': None},
+        ],
+    })
+    return db
+
+
+class TestFilters:
+    """Filters, ordering and pagination follow PostgREST semantics"""
+
+    def setup_method(self):
+        self.client = LocalClientPool(make_db()).client
+
+    def test_eq_in_and_comparisons(self):
+        units = self.client.table('units')
+        assert [r['id'] for r in units.select('id').eq('property_id', 'p1').execute().data] == ['u1', 'u2']
+        assert [r['id'] for r in units.select('id').in_('id', ['u3', 'u1']).execute().data] == ['u1', 'u3']
+        assert [r['id'] for r in units.select('id').gte('rent', '1000').lt('rent', 1500).execute().data] == ['u1']
+        assert [r['id'] for r in units.select('id').is_('tenant_id', 'null').execute().data] == ['u2', 'u3']
+        assert [r['id'] for r in units.select('id').not_.is_('tenant_id', 'null').execute().data] == ['u1']
+
+    def test_ilike_and_or(self):
+        props = self.client.table('properties')
+        assert len(props.select('id').ilike('city', '%PUNE%').execute().data) == 2
+        assert len(props.select('id').like('city', 'Pune').execute().data) == 1
+        data = props.select('id').or_('city.eq.Goa,property_name.ilike.*lake*').execute().data
+        assert [r['id'] for r in data] == ['p1', 'p3']
+
+    def test_order_range_and_exact_count(self):
+        response = (
+            self.client.table('properties').select('*', count='exact')
+            .order('created_at', desc=True).range(0, 1).execute()
+        )
+        assert [r['id'] for r in response.data] == ['p3', 'p2']
+        assert response.count == 3
+        head = self.client.table('units').select('id', count='exact', head=True).eq('property_id', 'p1').execute()
+        assert (head.data, head.count) == ([], 2)
+
+    def test_single_and_maybe_single(self):
+        assert self.client.table('units').select('*').eq('id', 'u1').single().execute().data['unit_number'] == '101'
+        assert self.client.table('units').select('*').eq('id', 'missing').maybe_single().execute() is None
+        with pytest.raises(APIError) as error:
+            self.client.table('units').select('*').eq('property_id', 'p1').single().execute()
+        assert error.value.code == 'PGRST116'
+
+
+class TestEmbeds:
+    """Embedded relations are joined by naming convention"""
+
+    def setup_method(self):
+        self.client = LocalClientPool(make_db()).client
+
+    def test_many_to_one_and_one_to_many(self):
+        unit = self.client.table('units').select('id, property:properties(property_name), tenants(name)').eq('id', 'u1').single().execute().data
+        assert unit == {'id': 'u1', 'property': {'property_name': 'Lake View'}, 'tenants': {'name': 'Ravi'}}
+        prop = self.client.table('properties').select('id, units(id)').eq('id', 'p1').single().execute().data
+        assert prop['units'] == [{'id': 'u1'}, {'id': 'u2'}]
+
+    def test_fkey_hint_and_nested_embeds(self):
+        prop = (
+            self.client.table('properties')
+            .select('id, units(unit_number, tenant:tenants!units_tenant_id_fkey(name))')
+            .eq('id', 'p1').single().execute().data
+        )
+        assert [u['tenant'] for u in prop['units']] == [{'name': 'Ravi'}, None]
+
+    def test_inner_join_filters_parents(self):
+        data = (
+            self.client.table('units').select('id, properties!inner(owner_id)')
+            .eq('properties.owner_id', OWNER_ID).execute().data
+        )
+        assert [r['id'] for r in data] == ['u1', 'u2']
+
+    def test_nested_inner_join_filters(self):
+        query = lambda owner_id: (
+            self.client.table('tenants').select('id, property_tenants!inner(property_id, properties!inner(owner_id))')
+            .eq('property_tenants.properties.owner_id', owner_id).execute().data
+        )
+        assert query(OWNER_ID) == [{'id': 't1', 'property_tenants': [{'property_id': 'p1', 'properties': {'owner_id': OWNER_ID}}]}]
+        assert query(OTHER_OWNER_ID) == []
+
+
+class TestWrites:
+    """Inserts, upserts, updates, deletes and rpc"""
+
+    def setup_method(self):
+        self.db = make_db()
+        self.client = LocalClientPool(self.db).client
+
+    def test_insert_fills_defaults_and_rejects_duplicates(self):
+        row = self.client.table('tenants').insert({'name': 'Meera', 'created_by': uuid.UUID(int=1)}).execute().data[0]
+        assert row['id'] and row['created_at'] and row['created_by'] == OWNER_ID
+        assert self.client.table('tenants').select('id').eq('name', 'Meera').execute().data == [{'id': row['id']}]
+        with pytest.raises(APIError) as error:
+            self.client.table('tenants').insert({'id': 't1', 'name': 'Again'}).execute()
+        assert error.value.code == '23505'
+
+    def test_upsert_update_delete(self):
+        self.client.table('user_profiles').upsert({'id': OWNER_ID, 'phone': '555'}, on_conflict='id').execute()
+        profile = self.client.table('user_profiles').select('*').eq('id', OWNER_ID).single().execute().data
+        assert (profile['phone'], profile['first_name']) == ('555', 'Asha')
+
+        updated = self.client.table('units').update({'rent': 1100}).eq('id', 'u1').execute()
+        assert updated.data[0]['rent'] == 1100
+        assert self.client.table('units').select('id').eq('rent', 1100).execute().data == [{'id': 'u1'}]
+
+        deleted = self.client.table('units').delete().eq('property_id', 'p3').execute()
+        assert [r['id'] for r in deleted.data] == ['u3']
+        assert len(self.db.tables['units']) == 2
+
+    def test_rpc(self):
+        assert self.client.rpc('get_owner_for_unit', {'p_unit_id': 'u3'}).execute().data == OTHER_OWNER_ID
+        self.db.register_rpc('unit_ids', lambda db, params: [{'id': row['id']} for row in db.rows('units')])
+        assert self.client.rpc('unit_ids').eq('id', 'u2').execute().data == [{'id': 'u2'}]
+        with pytest.raises(APIError):
+            self.client.rpc('missing_function').execute()
+
+
+class TestStorageAndAuth:
+    """Storage buckets and token resolution"""
+
+    def setup_method(self):
+        self.pool = LocalClientPool(make_db(), 'https://storage.test')
+
+    def test_upload_list_sign_download(self):
+        bucket = self.pool.client.storage.from_('propertyimage')
+        result = bucket.upload('p1/front.jpg', b'jpeg-bytes', {'content-type': 'image/jpeg'})
+        assert result.path == 'p1/front.jpg'
+        with pytest.raises(StorageApiError):
+            bucket.upload('p1/front.jpg', b'again')
+        bucket.upload('p1/front.jpg', b'new', {'upsert': 'true'})
+
+        assert [entry['name'] for entry in bucket.list()] == ['p1']
+        assert bucket.list('p1')[0]['metadata'] == {'size': 3, 'mimetype': 'application/octet-stream'}
+        assert bucket.create_signed_url('p1/front.jpg', 60)['signedURL'].startswith('https://storage.test/storage/v1/object/sign/propertyimage/p1/front.jpg')
+        assert bucket.get_public_url('p1/front.jpg') == 'https://storage.test/storage/v1/object/public/propertyimage/p1/front.jpg'
+        assert bucket.download('p1/front.jpg') == b'new'
+        with pytest.raises(StorageApiError):
+            bucket.create_signed_url('p1/missing.jpg', 60)
+
+    def test_auth_resolves_local_tokens(self):
+        user = self.pool.scoped(local_token(OWNER_ID)).auth.get_user(local_token(OWNER_ID)).user
+        assert (user.id, user.email) == (OWNER_ID, 'owner@example.com')
+        with pytest.raises(Exception):
+            self.pool.client.auth.get_user('not-a-token')
+
+
+class TestLatencyAndTracing:
+    """Injected latency and query tracing work as against the real backend"""
+
+    @pytest.mark.asyncio
+    async def test_latency_is_applied_and_queries_are_traced(self):
+        client = LocalClientPool(make_db(latency_ms=20)).client
+        trace = begin_request_trace('local-1')
+        start = time.perf_counter()
+        await run_query(client.table('units').select('*').eq('property_id', 'p1'))
+        assert time.perf_counter() - start >= 0.02
+        record = trace.queries[0]
+        assert (record.table, record.operation, record.filters, record.rows) == ('units', 'select', ['property_id=eq'], 2)
+
+
+@contextmanager
+def local_app(pool):
+    """Point the app's clients at ``pool``, with caching off"""
+    with use_local_pool(pool), patch.object(cache_service, 'enabled', False):
+        yield TestClient(app)
+
+
+class TestAppIntegration:
+    """The full app runs against the stand-in with no network"""
+
+    def make_pool(self):
+        db = make_db()
+        address = {'address_line1': '1 Main St', 'state': 'MH', 'pincode': '411001', 'property_type': 'residential', 'survey_number': 'S-1'}
+        # Valid ids for the response models
+        for row in db.tables['properties']:
+            row.update(address, id=str(uuid.uuid4()))
+        db.changed('properties')
+        return LocalClientPool(db)
+
+    def test_properties_list_is_scoped_to_the_owner(self):
+        with local_app(self.make_pool()) as client:
+            response = client.get('/properties/', headers={'Authorization': f'Bearer {local_token(OWNER_ID)}'})
+        assert response.status_code == 200, response.text
+        names = sorted(item['property_name'] for item in response.json()['items'])
+        assert names == ['Hill Top', 'Lake View']
+
+    def test_unknown_tokens_are_rejected(self):
+        with local_app(LocalClientPool(make_db())) as client:
+            response = client.get('/properties/', headers={'Authorization': 'Bearer garbage'})
+        assert response.status_code == 401
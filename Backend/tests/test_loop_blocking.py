@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the event-loop blocking-call detector and the loop lag metrics
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config.settings import settings
+from app.config.loop_blocking import BlockingCallDetector, BlockingCallError, fail_on_blocking
+from app.config.metrics import LoopLagMonitor, loop_lag_monitor, merge_snapshots, render_prometheus, local_snapshot
+
+TOKEN = 'perf-secret'
+
+client = TestClient(app, headers={'X-Performance-Token': TOKEN})
+
+
+@pytest.fixture(autouse=True)
+def performance_token():
+    """Performance endpoints are disabled unless a token is configured"""
+    with patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+        yield
+
+
+def render_pdf():
+    """Stands in for a synchronous library call made from a handler"""
+    time.sleep(0.15)
+
+
+async def generate_document():
+    render_pdf()
+
+
+async def upload_file():
+    time.sleep(0.08)
+
+
+class TestDetector:
+    """Stalls are caught with the stack of the code holding the loop"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_attributed_to_the_handler(self):
+        detector = BlockingCallDetector(threshold_ms=40)
+        detector.start()
+        try:
+            await asyncio.sleep(0.05)
+            await generate_document()
+            await asyncio.sleep(0.05)
+        finally:
+            detector.stop()
+
+        [site] = detector.sites()
+        assert site['site'].endswith('render_pdf')
+        assert 'tests/test_loop_blocking.py' in site['site']
+        assert site['count'] == 1 and 100 <= site['max_ms'] <= 400
+        assert any('generate_document' in line for line in site['stack'])
+
+    @pytest.mark.asyncio
+    async def test_sites_are_ranked_by_total_blocked_time(self):
+        detector = BlockingCallDetector(threshold_ms=40)
+        detector.start()
+        try:
+            for _ in range(3):
+                await upload_file()
+                await asyncio.sleep(0.03)
+            await generate_document()
+            await asyncio.sleep(0.03)
+        finally:
+            detector.stop()
+
+        sites = detector.sites(include_stack=False)
+        assert [site['site'].rsplit(' ', 1)[1] for site in sites] == ['upload_file', 'render_pdf']
+        assert sites[0]['count'] == 3
+        assert detector.snapshot()['blocked'] == 4
+
+    @pytest.mark.asyncio
+    async def test_awaiting_does_not_count(self):
+        with fail_on_blocking(threshold_ms=40) as detector:
+            await asyncio.sleep(0.2)
+            await asyncio.to_thread(time.sleep, 0.1)
+        assert detector.total == 0
+
+    @pytest.mark.asyncio
+    async def test_fail_on_blocking_raises(self):
+        with pytest.raises(BlockingCallError, match='render_pdf'):
+            with fail_on_blocking(threshold_ms=40):
+                await generate_document()
+
+
+class TestLagMetrics:
+    """Loop lag is exported as a histogram next to the blocked counters"""
+
+    def test_lag_histogram(self):
+        monitor = LoopLagMonitor()
+        for lag in (0.0005, 0.003, 0.2, 5.0):
+            monitor.observe(lag)
+        assert monitor.counts[0] == 1 and monitor.counts[-1] == 1
+        assert monitor.snapshot()['max_ms'] == 5000
+
+    def test_prometheus_exposition(self):
+        with patch.object(loop_lag_monitor, 'counts', [2] + [0] * len(loop_lag_monitor.buckets)):
+            worker = local_snapshot()
+        text = render_prometheus(merge_snapshots([worker, worker]))
+        assert 'event_loop_lag_seconds_bucket{le="0.001"} 4' in text
+        assert 'event_loop_lag_seconds_count 4' in text
+        assert 'event_loop_blocked_total' in text
+
+    def test_endpoints(self):
+        assert 'event_loop_lag_seconds_bucket' in client.get('/metrics').text
+        data = client.get('/api/v1/performance/blocking-calls').json()
+        assert {'threshold_ms', 'blocked', 'sites'} <= set(data)
+        assert 'blocking' in client.get('/api/v1/performance/summary').json()['event_loop']
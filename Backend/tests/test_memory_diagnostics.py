@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for memory diagnostics: tracemalloc snapshots, object counts and the RSS watchdog
+"""
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config.settings import settings
+from app.config import memory as memory_module
+from app.config.cache import cache_service
+from app.config.memory import MemoryProfiler, RssWatchdog, object_counts, parse_thresholds, rss_bytes
+
+TOKEN = 'perf-secret'
+
+client = TestClient(app, headers={'X-Performance-Token': TOKEN})
+
+
+@pytest.fixture(autouse=True)
+def performance_token():
+    """Performance endpoints are disabled unless a token is configured"""
+    with patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+        yield
+
+
+retained = []
+
+
+def build_rows(count):
+    """Allocation site the snapshot diff should point at"""
+    return [{'id': str(i), 'rent': i, 'notes': 'x' * 64} for i in range(count)]
+
+
+@pytest.fixture
+def profiler():
+    profiler = MemoryProfiler(max_snapshots=3)
+    with patch.object(memory_module, 'memory_profiler', profiler), \
+            patch('app.api.performance.memory_profiler', profiler):
+        yield profiler
+    profiler.stop()
+    retained.clear()
+
+
+class TestSnapshots:
+    """tracemalloc snapshots, top sites and diffs"""
+
+    def test_snapshots_require_tracing(self, profiler):
+        with pytest.raises(RuntimeError):
+            profiler.snapshot()
+        assert client.post('/api/v1/performance/memory/snapshots').status_code == 409
+
+    def test_diff_points_at_the_growing_site(self, profiler):
+        profiler.start()
+        before = profiler.snapshot('before')
+        retained.append(build_rows(20000))
+        after = profiler.snapshot('after')
+
+        sites = profiler.diff(before['id'], after['id'], limit=5)
+        assert sites[0]['size_diff_bytes'] > 1_000_000
+        assert any('test_memory_diagnostics.py' in site['site'] for site in sites[:3])
+        assert profiler.top(after['id'], limit=3)
+        assert [meta['label'] for meta in profiler.snapshots()] == ['before', 'after']
+
+    def test_oldest_snapshots_are_dropped(self, profiler):
+        profiler.start()
+        ids = [profiler.snapshot(str(i))['id'] for i in range(5)]
+        assert [meta['id'] for meta in profiler.snapshots()] == ids[2:]
+        with pytest.raises(KeyError):
+            profiler.top(ids[0])
+
+    def test_endpoints(self, profiler):
+        assert client.post('/api/v1/performance/memory/tracemalloc?enabled=true&frames=3').json()['frames'] == 3
+        base = client.post('/api/v1/performance/memory/snapshots?label=before').json()['id']
+        retained.append(build_rows(5000))
+
+        diff = client.get(f'/api/v1/performance/memory/diff?base={base}&group_by=traceback&limit=5')
+        assert diff.status_code == 200
+        assert diff.json()['sites'][0]['traceback']
+        assert client.get('/api/v1/performance/memory/top?limit=2').json()['sites']
+        assert client.get('/api/v1/performance/memory/diff?base=missing').status_code == 404
+        assert client.post('/api/v1/performance/memory/tracemalloc?enabled=false').json()['tracing'] is False
+
+
+class TestAccess:
+    """Memory diagnostics are admin-only: nothing runs without a configured token"""
+
+    @pytest.mark.parametrize('method, path', [
+        ('get', '/api/v1/performance/memory'),
+        ('post', '/api/v1/performance/memory/tracemalloc?enabled=true'),
+        ('post', '/api/v1/performance/memory/snapshots'),
+        ('get', '/api/v1/performance/memory/snapshots'),
+        ('get', '/api/v1/performance/memory/top'),
+        ('get', '/api/v1/performance/memory/diff?base=any'),
+        ('get', '/api/v1/performance/memory/objects'),
+    ])
+    def test_denied_without_a_configured_token(self, profiler, method, path):
+        with patch.object(settings, 'PERFORMANCE_API_TOKEN', ''):
+            assert getattr(client, method)(path).status_code == 403
+        assert not profiler.tracing
+        assert profiler.snapshots() == []
+
+    def test_wrong_token_is_denied(self, profiler):
+        anonymous = TestClient(app)
+        assert anonymous.post('/api/v1/performance/memory/tracemalloc?enabled=true').status_code == 403
+        response = anonymous.get('/api/v1/performance/memory/objects', headers={'X-Performance-Token': 'wrong'})
+        assert response.status_code == 403
+        assert not profiler.tracing
+
+
+class TestSummaryAndObjects:
+    """Process memory, cache usage per prefix and object counts"""
+
+    def test_summary_reports_rss_and_cache_prefixes(self):
+        cache_service.l1.set('dashboard:owner-1', b'x' * 100, ttl=60)
+        try:
+            data = client.get('/api/v1/performance/memory').json()
+        finally:
+            cache_service.l1.pop('dashboard:owner-1')
+        assert data['rss_bytes'] > 0
+        assert data['peak_rss_bytes'] >= data['rss_bytes'] // 2
+        assert data['cache']['prefixes']['dashboard']['bytes'] >= 100
+        assert 'thresholds_mb' in data['watchdog']
+
+    def test_object_counts(self):
+        rows = build_rows(1000)
+        counts = object_counts(limit=5)
+        assert counts['types'][0]['count'] >= 1000
+        [dicts] = object_counts(types=['dict'])['types']
+        assert dicts['type'] == 'dict' and dicts['count'] >= 1000
+        assert client.get('/api/v1/performance/memory/objects?types=dict,list').json()['types'][1]['type'] == 'list'
+        del rows
+
+
+class TestRssWatchdog:
+    """Threshold crossings are logged once and re-armed below the threshold"""
+
+    def test_crossing_is_logged_once(self, caplog):
+        watchdog = RssWatchdog(thresholds_mb=[1, 10 ** 6])
+        with caplog.at_level(logging.WARNING, logger='app.config.memory'):
+            assert watchdog.check() == [1]
+            assert watchdog.check() == []
+        assert caplog.text.count('crossed 1 MB') == 1
+        assert watchdog.snapshot()['crossed_mb'] == [1]
+
+        with patch.object(memory_module, 'rss_bytes', return_value=0):
+            watchdog.check()
+        assert watchdog.crossed == []
+
+    def test_parse_thresholds_and_rss(self):
+        assert parse_thresholds('1024, 512,') == [512, 1024]
+        assert rss_bytes() > 0
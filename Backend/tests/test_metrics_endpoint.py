@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the instrumentation middleware and the Prometheus /metrics endpoint
+"""
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config.settings import settings
+from app.config import metrics as metrics_module
+from app.config.metrics import HttpMetrics, MetricsMiddleware, MultiprocessStore, merge_snapshots, render_prometheus
+
+TOKEN = 'perf-secret'
+
+client = TestClient(app, headers={'X-Performance-Token': TOKEN})
+
+
+@pytest.fixture(autouse=True)
+def performance_token():
+    """Performance endpoints are disabled unless a token is configured"""
+    with patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+        yield
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of the first sample of ``name`` whose labels include ``labels``"""
+    for line in text.splitlines():
+        if not line.startswith(name + "{") and not line.startswith(name + " "):
+            continue
+        if all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample {name} {labels}")
+
+
+class TestMiddleware:
+    """The middleware is pure ASGI and records per route template"""
+
+    def test_registered_as_pure_asgi_middleware(self):
+        classes = [middleware.cls for middleware in app.user_middleware]
+        assert MetricsMiddleware in classes
+
+    def test_metrics_by_route_template_and_status(self):
+        metrics_module.http_metrics.reset()
+        client.get("/health")
+        client.get("/properties/abc")
+        client.get("/properties/def")
+
+        text = client.get("/metrics").text
+        assert sample(text, "http_requests_total", route="/health", status="200") == 1
+        assert sample(text, "http_requests_total", route="/properties/{property_id}", status="401") == 2
+        assert "/properties/abc" not in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics_module.http_metrics.reset()
+        for _ in range(3):
+            client.get("/health")
+
+        text = client.get("/metrics").text
+        buckets = [
+            float(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+            if line.startswith("http_request_duration_seconds_bucket") and 'route="/health"' in line
+        ]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == 3
+        assert sample(text, "http_request_duration_seconds_count", route="/health") == 3
+        assert 'le="+Inf"' in text
+
+    def test_body_sizes_are_counted(self):
+        metrics_module.http_metrics.reset()
+        response = client.get("/health")
+        client.post("/health", content=b"x" * 100)
+
+        text = client.get("/metrics").text
+        assert sample(text, "http_response_size_bytes_total", method="GET", route="/health") == len(response.content)
+        assert sample(text, "http_request_size_bytes_total", method="POST", route="/health") == 100
+
+    def test_content_type_and_in_flight(self):
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert sample(response.text, "http_requests_in_flight") == 1  # The scrape itself
+
+
+class TestMultiprocess:
+    """Snapshots from several workers merge into one exposition"""
+
+    def make_worker_snapshot(self, pid, in_flight, requests):
+        worker = HttpMetrics()
+        for _ in range(requests):
+            worker.observe("GET", "/dashboard/summary", 200, 0.02, 0, 512)
+        worker.in_flight = in_flight
+        return {**worker.snapshot(), "pid": pid, "cache": {"property_stats": {"l1_hits": 2, "l2_hits": 1, "misses": 1}}}
+
+    def test_counters_sum_and_dead_workers_drop_in_flight(self, tmp_path):
+        store = MultiprocessStore(str(tmp_path))
+        store.write(self.make_worker_snapshot(os.getpid(), in_flight=2, requests=3))
+        store.write(self.make_worker_snapshot(2 ** 22 + 12345, in_flight=5, requests=4))  # No such process
+
+        text = render_prometheus(merge_snapshots(store.read_all()))
+        assert sample(text, "http_requests_total", route="/dashboard/summary") == 7
+        assert sample(text, "http_request_duration_seconds_bucket", route="/dashboard/summary", le="0.025") == 7
+        assert sample(text, "http_response_size_bytes_total", route="/dashboard/summary") == 7 * 512
+        assert sample(text, "http_requests_in_flight") == 2
+        assert sample(text, "cache_lookups_total", prefix="property_stats", result="l1_hit") == 4
+
+    def test_metrics_endpoint_reads_shared_directory(self, tmp_path):
+        store = MultiprocessStore(str(tmp_path))
+        store.write(self.make_worker_snapshot(2 ** 22 + 54321, in_flight=0, requests=10))
+
+        with patch.object(metrics_module, "multiprocess_store", store):
+            text = client.get("/metrics").text
+
+        assert sample(text, "http_requests_total", route="/dashboard/summary") == 10
+        # This worker published its own snapshot while answering
+        assert len(list(tmp_path.glob("metrics-*.json"))) == 2
+
+    def test_label_values_are_escaped(self):
+        worker = HttpMetrics()
+        worker.observe("GET", 'we"ird\\route', 200, 0.001, 0, 0)
+        text = render_prometheus(merge_snapshots([worker.snapshot()]))
+        assert re.search(r'route="we\\"ird\\\\route"', text)
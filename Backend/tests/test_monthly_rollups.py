@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the monthly financial rollups behind the dashboard revenue series
+
+These cover the read path only, against the in-process stand-in with the
+table materialized by generate_portfolio. The triggers that maintain it are
+tested against Postgres in test_rollup_migration.py.
+"""
+from collections import defaultdict
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from generate_portfolio import generate_portfolio
+
+from app.config import cache as cache_module
+from app.config.cache import CacheService
+from app.config.local_supabase import LocalClientPool, LocalDatabase, use_local_pool
+from app.config.query_trace import begin_request_trace
+from app.db import dashboard as dashboard_db
+from app.db import maintenance as maintenance_db
+from app.db import rollups
+from app.db.rollups import get_monthly_rollups, invalidate_rollups, month_totals, recent_months
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return generate_portfolio(units=40, owners=1, months=36, seed=11, as_of=date.today())
+
+
+@pytest.fixture
+def owner_id(portfolio):
+    db = LocalDatabase()
+    db.load(portfolio)
+    service = CacheService()
+    with use_local_pool(LocalClientPool(db)), patch.object(rollups, 'cache_service', service), \
+            patch.object(cache_module, 'cache_service', service):
+        yield portfolio['dashboard_summary'][0]['owner_id']
+
+
+def paid_by_month(portfolio):
+    """Revenue bucketed straight from payment_history, as the dashboard used to"""
+    revenue = defaultdict(float)
+    for row in portfolio['payment_history']:
+        if row['payment_status'] == 'paid':
+            revenue[row['payment_date'][:7]] += row['rent_amount'] + row['maintenance_amount']
+    return revenue
+
+
+class TestMonths:
+    """Series use calendar months, whatever the day of the month"""
+
+    def test_recent_months(self):
+        assert recent_months(3, today=date(2025, 1, 31)) == [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)]
+        assert recent_months(2, today=date(2025, 3, 31)) == [date(2025, 2, 1), date(2025, 3, 1)]
+
+
+class TestRevenueSeries:
+    """The dashboard reads the rollups instead of every payment row"""
+
+    @pytest.mark.asyncio
+    async def test_matches_the_payment_rows(self, portfolio, owner_id):
+        trace = begin_request_trace('monthly-revenue')
+        series = await dashboard_db.get_monthly_revenue(owner_id, 12)
+
+        assert [record.table for record in trace.queries] == ['monthly_financial_rollups']
+        expected = paid_by_month(portfolio)
+        assert len(series) == 12
+        assert any(month['revenue'] for month in series)
+        for month in series:
+            assert month['revenue'] == pytest.approx(expected.get(month['month'][:7], 0), abs=0.01)
+            assert month['net_income'] == pytest.approx(month['revenue'] - month['expenses'], abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_rows_do_not_depend_on_the_callers_client(self, portfolio, owner_id):
+        # The anonymous client sees no rows under RLS; the cached months must not be empty
+        anonymous = LocalClientPool(LocalDatabase()).client
+        with patch.object(dashboard_db, 'supabase_client', anonymous):
+            series = await dashboard_db.get_monthly_revenue(owner_id, 12)
+        expected = paid_by_month(portfolio)
+        assert any(month['revenue'] for month in series)
+        assert [month['revenue'] for month in series] == pytest.approx(
+            [expected.get(month['month'][:7], 0) for month in series], abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_reads_only_the_requested_months(self, portfolio, owner_id):
+        trace = begin_request_trace('monthly-revenue')
+        months = recent_months(3)
+        result = await get_monthly_rollups(owner_id, months)
+
+        assert sorted(result) == months
+        [query] = trace.queries
+        assert query.rows == sum(len(rows) for rows in result.values())
+        assert query.rows < len(portfolio['monthly_financial_rollups']) / 4
+
+
+class TestMonthCache:
+    """Closed months stay cached; the open month follows owner invalidations"""
+
+    @pytest.mark.asyncio
+    async def test_only_the_open_month_is_refetched(self, owner_id):
+        months = recent_months(12)
+        first = await get_monthly_rollups(owner_id, months)
+        await rollups.cache_service.invalidate_tags([f"owner:{owner_id}"])
+
+        with patch.object(rollups, '_fetch_months', wraps=rollups._fetch_months) as fetch:
+            second = await get_monthly_rollups(owner_id, months)
+        assert second == first
+        assert fetch.call_count == 1 and fetch.call_args.args[1] == [months[-1]]
+
+        trace = begin_request_trace('monthly-revenue')
+        assert await get_monthly_rollups(owner_id, months) == first
+        assert trace.count == 0
+
+    @pytest.mark.asyncio
+    async def test_backdated_changes_invalidate_their_month(self, owner_id):
+        months = recent_months(6)
+        await get_monthly_rollups(owner_id, months)
+        await invalidate_rollups(owner_id, [months[1].replace(day=15)])
+
+        with patch.object(rollups, '_fetch_months', wraps=rollups._fetch_months) as fetch:
+            await get_monthly_rollups(owner_id, months)
+        assert fetch.call_args.args[1] == [months[1]]
+
+    @pytest.mark.asyncio
+    async def test_deleting_a_completed_request_invalidates_its_month(self, portfolio, owner_id):
+        months = recent_months(6)
+        request = next(row for row in portfolio['maintenance_requests']
+                       if row['status'] == 'completed' and months[0].isoformat() <= row['created_at'] < months[-1].isoformat())
+        booked = rollups.month_start(request['created_at'])
+        await get_monthly_rollups(owner_id, months)
+
+        # Attributed through the property: the real table has no owner_id
+        client = maintenance_db.supabase_client
+        client.table('maintenance_requests').update({'owner_id': None}).eq('id', request['id']).execute()
+        assert await maintenance_db.delete_maintenance_request(request['id'])
+        with patch.object(rollups, '_fetch_months', wraps=rollups._fetch_months) as fetch:
+            await get_monthly_rollups(owner_id, months)
+        assert fetch.call_args.args[1] == [booked]
+
+    def test_month_totals_by_property(self):
+        rows = [
+            {'property_id': 'a', 'revenue': 100.25, 'maintenance_costs': 20.0, 'payment_count': 1},
+            {'property_id': 'b', 'revenue': 50.0, 'maintenance_costs': 0.0, 'payment_count': 2},
+        ]
+        assert month_totals(rows) == {'revenue': 150.25, 'maintenance_costs': 20.0, 'payment_count': 3}
+        assert month_totals(rows, property_ids=['b'])['payment_count'] == 2
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the interval-sweep occupancy engine and the dashboards and reports built on it
+"""
+import random
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from generate_portfolio import generate_portfolio
+
+from app.config.cache import cache_service
+from app.config import database
+from app.config.local_supabase import LocalClientPool, LocalDatabase, use_local_pool
+from app.config.query_trace import begin_request_trace
+from app.db import dashboard as dashboard_db
+from app.db import properties as properties_db
+from app.db.rollups import recent_months
+from app.utils import occupancy as occupancy_module
+from app.utils.occupancy import OccupancyEngine, month_periods
+
+TODAY = date(2025, 6, 15)
+
+
+@pytest.fixture(params=['bisect', 'numpy'])
+def backend(request):
+    """Run with the pure-Python sweep and, when installed, the NumPy one"""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        with patch.object(occupancy_module, 'NUMPY_MIN_INTERVALS', 0):
+            yield request.param
+    else:
+        with patch.object(occupancy_module, '_numpy', return_value=None):
+            yield request.param
+
+
+def random_links(seed, properties=6, units=4, tenancies=5):
+    rng = random.Random(seed)
+    links = []
+    for p in range(properties):
+        for u in range(units):
+            for _ in range(rng.randint(0, tenancies)):
+                start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 600))
+                end = None if rng.random() < 0.2 else start + timedelta(days=rng.randint(0, 200))
+                links.append({'property_id': f"p{p}", 'unit_id': f"p{p}-u{u}",
+                              'start_date': start.isoformat(), 'end_date': end.isoformat() if end else None})
+    return links
+
+
+def brute_force(links, start, end, capacity):
+    """Occupied unit-days counted day by day, a unit at most once per day"""
+    occupied = {}
+    for property_id, units in capacity.items():
+        days = 0
+        for offset in range((end - start).days + 1):
+            day = (start + timedelta(days=offset)).isoformat()
+            days += len({
+                link['unit_id'] for link in links
+                if link['property_id'] == property_id and link['start_date'] <= day
+                and (link['end_date'] is None or link['end_date'] >= day)
+            })
+        occupied[property_id] = min(days, units * ((end - start).days + 1))
+    return occupied
+
+
+class TestSweep:
+    """The sweep agrees with counting every day"""
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_matches_brute_force(self, backend, seed):
+        links = random_links(seed)
+        capacity = {f"p{p}": 4 for p in range(6)}
+        engine = OccupancyEngine.from_links(links)
+        assert engine.backend == backend
+
+        periods = month_periods(recent_months(12, today=TODAY)) + [(date(2024, 2, 10), date(2025, 3, 3))]
+        results = engine.occupancy(periods, capacity, as_of=TODAY, by_property=True)
+        for (start, end), result in zip(periods, results):
+            expected = brute_force(links, start, end, capacity)
+            assert {p: stats['occupied_days'] for p, stats in result['properties'].items()} == expected
+            assert result['occupied_days'] == sum(expected.values())
+            assert result['unit_days'] == 24 * ((end - start).days + 1)
+
+    def test_overlapping_tenancies_of_a_unit_count_once(self, backend):
+        links = [
+            {'property_id': 'p', 'unit_id': 'u1', 'start_date': '2025-01-01', 'end_date': '2025-01-20'},
+            {'property_id': 'p', 'unit_id': 'u1', 'start_date': '2025-01-15', 'end_date': None},
+            {'property_id': 'p', 'unit_id': 'u2', 'start_date': '2025-01-11', 'end_date': '2025-01-20'},
+        ]
+        [january] = OccupancyEngine.from_links(links).occupancy(
+            [(date(2025, 1, 1), date(2025, 1, 31))], {'p': 2}, as_of=date(2025, 1, 18))
+        assert january['occupied_days'] == 31 + 10
+        assert january['occupancy_rate'] == round(41 * 100 / 62, 2)
+        assert january['units_occupied'] == 2
+
+    def test_unit_days(self, backend):
+        links = random_links(4)
+        engine = OccupancyEngine.from_links(links)
+        start, end = date(2024, 6, 1), date(2024, 8, 31)
+        per_unit = engine.unit_days(start, end, property_id='p2')
+        assert sum(per_unit.values()) == brute_force(links, start, end, {'p2': 4})['p2']
+
+    def test_large_portfolio_in_milliseconds(self, backend):
+        rng = random.Random(7)
+        links = []
+        for unit in range(5000):
+            start = date(2023, 1, 1) + timedelta(days=rng.randint(0, 200))
+            while start < TODAY:
+                end = start + timedelta(days=rng.randint(180, 720))
+                links.append({'property_id': f"p{unit // 20}", 'unit_id': f"u{unit}",
+                              'start_date': start.isoformat(), 'end_date': end.isoformat()})
+                start = end + timedelta(days=rng.randint(1, 60))
+        capacity = {f"p{p}": 20 for p in range(250)}
+
+        started = time.perf_counter()
+        series = OccupancyEngine.from_links(links).occupancy(month_periods(recent_months(24, today=TODAY)), capacity)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        assert len(series) == 24 and all(0 < month['occupancy_rate'] <= 100 for month in series)
+        assert elapsed_ms < 250, elapsed_ms
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return generate_portfolio(units=30, owners=1, seed=8, as_of=date.today())
+
+
+@pytest.fixture
+def local_db(portfolio):
+    db = LocalDatabase()
+    db.load(portfolio)
+    with use_local_pool(LocalClientPool(db)), patch.object(cache_service, 'enabled', False):
+        yield db
+
+
+class TestCallSites:
+    """Dashboards and reports share the engine and fetch tenancies once"""
+
+    @pytest.mark.asyncio
+    async def test_dashboard_history(self, portfolio, local_db):
+        owner_id = portfolio['dashboard_summary'][0]['owner_id']
+        history = await dashboard_db.get_occupancy_history(owner_id, 3)
+
+        capacity = {p['id']: p['number_of_units'] for p in portfolio['properties']}
+        months = recent_months(3)
+        assert [month['month'] for month in history] == [month.isoformat() for month in months]
+        for (start, end), month in zip(month_periods(months), history):
+            occupied = sum(brute_force(portfolio['property_tenants'], start, end, capacity).values())
+            assert month['occupancy_rate'] == round(occupied * 100 / (sum(capacity.values()) * ((end - start).days + 1)), 2)
+            assert month['total_units'] == sum(capacity.values())
+
+    @pytest.mark.asyncio
+    async def test_property_occupancy_rate(self, portfolio, local_db):
+        prop = max(portfolio['properties'], key=lambda p: p['number_of_units'])
+        start, end = date.today() - timedelta(days=90), date.today()
+        units = sum(1 for unit in portfolio['units'] if unit['property_id'] == prop['id'])
+
+        trace = begin_request_trace('occupancy-rate')
+        rate = await properties_db.get_property_occupancy_rate(database.supabase_client, prop['id'], start, end)
+
+        assert trace.count == 2
+        occupied = brute_force(portfolio['property_tenants'], start, end, {prop['id']: units})[prop['id']]
+        assert rate == round(occupied * 100 / (units * 91), 2)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the /api/v1/performance endpoints and the metrics behind them
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config.settings import settings
+from app.config.cache import cache_service
+from app.config.metrics import LoopLagMonitor, RequestMetrics, percentile, request_metrics
+
+TOKEN = 'perf-secret'
+
+client = TestClient(app, headers={'X-Performance-Token': TOKEN})
+
+
+@pytest.fixture(autouse=True)
+def performance_token():
+    """Performance endpoints are disabled unless a token is configured"""
+    with patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+        yield
+
+
+class TestMetricsPrimitives:
+    """Test percentile maths and the loop lag monitor"""
+
+    def test_nearest_rank_percentiles(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 99) == 0.0
+
+    def test_route_window_is_bounded(self):
+        metrics = RequestMetrics(window=10)
+        for i in range(100):
+            metrics.request_started()
+            metrics.request_finished("GET /x", i / 1000, 200)
+        route = metrics.snapshot()["routes"]["GET /x"]
+        assert route["count"] == 100
+        assert route["p50_ms"] >= 90  # Only the most recent samples are kept
+        assert metrics.snapshot()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_monitor_sees_blocking_code(self):
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # Hold the loop
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        assert monitor.snapshot()["max_ms"] >= 50
+
+
+class TestPerformanceSummary:
+    """Test the summary endpoint"""
+
+    def test_summary_reports_route_templates(self):
+        request_metrics.reset()
+        client.get("/health")
+        client.get("/health")
+        client.get("/properties/abc")
+        client.get("/properties/def")
+
+        response = client.get("/api/v1/performance/summary")
+        assert response.status_code == 200
+        data = response.json()
+
+        routes = data["requests"]["routes"]
+        assert routes["GET /health"]["count"] == 2
+        assert routes["GET /properties/{property_id}"]["count"] == 2
+        assert not any("/properties/abc" in route for route in routes)
+        assert {"p50_ms", "p95_ms", "p99_ms"} <= set(routes["GET /health"])
+        assert data["requests"]["in_flight"] >= 1  # The summary request itself
+
+    def test_summary_without_redis(self):
+        data = client.get("/api/v1/performance/summary").json()
+        assert data["redis_connected"] is False
+        assert data["cache"]["status"] == "memory"
+        assert {"l1", "l2", "prefixes"} <= set(data["cache"])
+        assert "event_loop" in data
+
+    def test_summary_with_redis(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        fake = fakeredis.aioredis.FakeRedis()
+        with patch.object(cache_service, "redis_client", fake):
+            data = client.get("/api/v1/performance/summary").json()
+        assert data["redis_connected"] is True
+        assert data["redis_latency_ms"] >= 0
+        assert data["cache"]["status"] == "redis"
+        assert data["cache"]["l2"]["keys"] == 0
+
+    def test_cache_keys_counts_entries_per_prefix(self):
+        asyncio.run(cache_service.set("property_stats:perf-test", {"total": 1}, ttl=60))
+        try:
+            data = client.get("/api/v1/performance/cache-keys").json()
+            assert data["total_keys"] >= 1
+            assert data["prefixes"]["property_stats"]["entries"] >= 1
+        finally:
+            cache_service.l1.pop("property_stats:perf-test")
+
+    def test_token_is_required(self):
+        anonymous = TestClient(app)
+        assert anonymous.get("/api/v1/performance/summary").status_code == 403
+        assert anonymous.get("/api/v1/performance/summary", headers={"X-Performance-Token": "wrong"}).status_code == 403
+        assert anonymous.get("/api/v1/performance/summary", headers={"Authorization": f"Bearer {TOKEN}"}).status_code == 200
+
+    @pytest.mark.parametrize("path", ["/api/v1/performance/summary", "/api/v1/performance/cache-keys",
+                                      "/api/v1/performance/slow-queries", "/api/v1/performance/blocking-calls",
+                                      "/metrics"])
+    def test_disabled_without_a_configured_token(self, path):
+        with patch.object(settings, "PERFORMANCE_API_TOKEN", ""):
+            assert client.get(path).status_code == 403
+            assert client.get(path, headers={"X-Performance-Token": ""}).status_code == 403
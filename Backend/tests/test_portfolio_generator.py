@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic portfolio generator (benchmarks/generate_portfolio.py)
+"""
+import io
+from collections import defaultdict
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from generate_portfolio import PortfolioGenerator, generate_portfolio, write_sql
+
+from app.main import app
+from app.config.cache import cache_service
+from app.config.local_supabase import LocalClientPool, LocalDatabase, local_token, use_local_pool
+from app.models.maintenance import MaintenanceRequest
+from app.models.notification import Notification
+from app.models.payment import Payment
+from app.models.property import Property
+from app.models.tenant import Tenant
+from app.models.vendor import Vendor
+
+AS_OF = date(2025, 6, 15)
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return generate_portfolio(units=120, owners=3, months=24, seed=7, as_of=AS_OF)
+
+
+class TestShape:
+    """Sizes, references and date ranges"""
+
+    def test_unit_and_owner_counts(self, portfolio):
+        assert len(portfolio['units']) == 120
+        assert len(portfolio['user_profiles']) == 3
+        assert sum(prop['number_of_units'] for prop in portfolio['properties']) == 120
+
+    def test_same_seed_same_data(self, portfolio):
+        assert generate_portfolio(units=120, owners=3, months=24, seed=7, as_of=AS_OF) == portfolio
+        assert generate_portfolio(units=120, owners=3, months=24, seed=8, as_of=AS_OF) != portfolio
+
+    def test_references_resolve(self, portfolio):
+        ids = {table: {row['id'] for row in rows if 'id' in row} for table, rows in portfolio.items()}
+        assert all(unit['property_id'] in ids['properties'] for unit in portfolio['units'])
+        for link in portfolio['property_tenants']:
+            assert link['tenant_id'] in ids['tenants'] and link['unit_id'] in ids['units']
+        for payment in portfolio['payments']:
+            assert payment['lease_id'] in ids['leases'] and payment['tenant_id'] in ids['tenants']
+        vendor_ids = ids['vendors'] | {None}
+        assert all(request['vendor_id'] in vendor_ids for request in portfolio['maintenance_requests'])
+
+    def test_tenancy_history_overlaps_and_occupancy(self, portfolio):
+        links = defaultdict(list)
+        for link in portfolio['property_tenants']:
+            links[link['unit_id']].append(link)
+        overlapping = 0
+        for unit_links in links.values():
+            unit_links.sort(key=lambda link: link['start_date'])
+            for previous, following in zip(unit_links, unit_links[1:]):
+                if previous['end_date'] and following['start_date'] <= previous['end_date']:
+                    overlapping += 1
+        assert overlapping > 0
+        assert len(portfolio['property_tenants']) > len(portfolio['units'])
+
+        occupied = [unit for unit in portfolio['units'] if unit['status'] == 'Occupied']
+        assert 0 < len(occupied) < len(portfolio['units'])
+        active = {link['tenant_id'] for link in portfolio['property_tenants'] if link['status'] == 'active'}
+        assert all(unit['tenant_id'] in active for unit in occupied)
+
+    def test_rows_validate_against_api_models(self, portfolio):
+        for prop in portfolio['properties']:
+            Property(**prop)
+        for tenant in portfolio['tenants']:
+            Tenant(**tenant)
+        for payment in portfolio['payments'][:200]:
+            Payment(**payment)
+        for request in portfolio['maintenance_requests']:
+            MaintenanceRequest(**request)
+        for vendor in portfolio['vendors']:
+            Vendor(**vendor)
+        for notification in portfolio['notifications']:
+            Notification(**notification)
+
+    def test_owner_sizes_are_skewed(self):
+        counts = PortfolioGenerator(units=5000, owners=5, seed=1).units_per_owner()
+        assert sum(counts) == 5000
+        assert max(counts) >= 2 * min(counts)
+
+
+class TestSql:
+    """SQL output for a database built from supabase/migrations"""
+
+    def test_batched_inserts_in_one_transaction(self):
+        out = io.StringIO()
+        counts = write_sql(PortfolioGenerator(units=30, owners=1, seed=3, as_of=AS_OF).rows(), out, batch_size=50)
+        sql = out.getvalue()
+        assert sql.count('BEGIN;') == 1 and sql.rstrip().endswith('COMMIT;')
+        assert 'dashboard_summary' not in sql
+        assert sql.count('INSERT INTO auth.users') == 1
+        assert counts['units'] == 30
+        assert sql.count('INSERT INTO public.payments') == -(-counts['payments'] // 50)
+
+
+class TestLocalBackend:
+    """Generated data serves the API through the in-process stand-in"""
+
+    def test_owner_listings_at_scale(self, portfolio):
+        db = LocalDatabase()
+        db.load(portfolio)
+        pool = LocalClientPool(db)
+        owner = max(portfolio['dashboard_summary'], key=lambda row: row['total_units'])
+        owned = [prop for prop in portfolio['properties'] if prop['owner_id'] == owner['owner_id']]
+
+        with use_local_pool(pool), patch.object(cache_service, 'enabled', False):
+            response = TestClient(app).get(
+                '/properties/', params={'limit': 100},
+                headers={'Authorization': f"Bearer {local_token(owner['owner_id'])}"},
+            )
+
+        assert response.status_code == 200, response.text
+        assert response.json()['total'] == len(owned)
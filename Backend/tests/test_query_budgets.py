@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Query budgets: count Supabase calls per endpoint invocation against a fake client
+
+Every route decorated with ``@query_budget(n)`` in app/api is called with
+fixtures of increasing size. The test fails when a call issues more than ``n``
+queries, or when the count grows with the number of rows (an N+1 loop).
+"""
+import re
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+import fastapi.routing
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from postgrest.base_request_builder import APIResponse, SingleAPIResponse
+
+from app.main import app
+from app.config import auth, database
+from app.config.cache import cache_service
+from app.config.metrics import MetricsMiddleware
+from app.config.query_executor import run_query
+from app.config.query_trace import get_query_budget, query_budget
+from app.services import reporting_service
+
+USER_ID = str(uuid.UUID(int=1))
+SIZES = (1, 6)
+
+# Columns whose generic fixture value would fail a model's validation
+TABLE_COLUMNS = {
+    "payments": {"status": "paid"},
+    "properties": {
+        "address_line1": "1 Main St", "city": "Pune", "state": "MH", "pincode": "411001",
+        "property_type": "residential", "survey_number": "S-1",
+    },
+    "monthly_financial_rollups": {"month": "2024-01-01", "revenue": 1000.0, "maintenance_costs": 100.0, "payment_count": 1},
+}
+
+# Query strings that steer a route into its data-dependent branch
+ROUTE_PARAMS = {
+    "/maintenance/requests/count": {"tenant_id": str(uuid.UUID(int=7))},
+    "/reports/financial-summary": {"owner_id": USER_ID, "period": "quarter", "months_back": 4},
+}
+
+
+class FakeQuery:
+    """
+    Chainable stand-in for a postgrest builder.
+
+    Every filter matches: ``eq`` columns are copied into the returned rows, an
+    ``in_`` returns one row per value and a primary-key lookup returns one row.
+    Anything else returns ``size`` rows.
+    """
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.single_row = False
+        self.matches = {}
+        self.in_values = None
+
+    def eq(self, column, value):
+        self.matches[column] = str(value)
+        return self
+
+    def in_(self, column, values):
+        self.in_values = (column, [str(value) for value in values])
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    maybe_single = single
+
+    def __getattr__(self, name):
+        # select/order/range/insert/update/... and the ``not_`` property
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name == 'not_':
+            return self
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.db.calls.append(self.table)
+        if self.in_values:
+            column, values = self.in_values
+            rows = [{**self.db.row(self.table, i), column: value} for i, value in enumerate(values)]
+        else:
+            count = 1 if 'id' in self.matches else self.db.size
+            rows = [self.db.row(self.table, i) for i in range(count)]
+        rows = [{**row, **self.matches} for row in rows]
+        if self.single_row:
+            return SingleAPIResponse(data=rows[0] if rows else None, count=None)
+        return APIResponse(data=rows, count=len(rows))
+
+
+class FakeStorageBucket:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: f"https://storage.test/{name}"
+
+
+class FakeDatabase:
+    """Records the table of every executed query; rows are owned by the test user"""
+
+    def __init__(self, size):
+        self.size = size
+        self.calls = []
+        self.token = "budget-token"
+
+    def row(self, table, i):
+        entity_id = str(uuid.UUID(int=(hash(table) & 0xFFFF) << 32 | i + 1))
+        linked = str(uuid.UUID(int=i + 1000))
+        return {
+            "id": entity_id, "owner_id": USER_ID, "user_id": USER_ID, "created_by": USER_ID,
+            "tenant_id": linked, "property_id": linked, "unit_id": linked, "lease_id": linked,
+            "name": f"{table} {i}", "email": f"{table}{i}@example.com", "phone": "555-0100",
+            "property_name": f"Property {i}", "unit_number": str(100 + i), "title": f"{table} {i}",
+            "status": "active", "payment_status": "paid", "priority": "medium", "category": "other",
+            "amount": 1000.0, "amount_paid": 1000.0, "rent": 1000.0, "rent_amount": 1000.0,
+            "start_date": "2024-01-01", "end_date": "2030-12-31", "due_date": "2024-02-01",
+            "payment_date": "2024-02-01", "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00", "is_active": True, "role": "owner",
+            **TABLE_COLUMNS.get(table, {}),
+        }
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name, params=None, *args, **kwargs):
+        return FakeQuery(self, f"rpc/{name}")
+
+    @property
+    def storage(self):
+        return type("Storage", (), {"from_": lambda _self, bucket: FakeStorageBucket()})()
+
+
+@contextmanager
+def fake_supabase(db):
+    """Route every Supabase client in the app (globals and dependencies) to ``db``"""
+    real = {id(database.supabase_client), id(database.supabase_service_role_client)}
+    patches = [
+        patch.object(module, name, db)
+        for module_name, module in list(sys.modules.items())
+        if module_name.startswith('app.') and module is not None
+        for name, value in list(vars(module).items())
+        if id(value) in real
+    ]
+    overrides = {
+        database.get_supabase_client_authenticated: lambda: db,
+        auth.get_current_user: lambda: {"id": USER_ID, "email": "owner@example.com", "role": "owner"},
+    }
+    for override in patches:
+        override.start()
+    app.dependency_overrides.update(overrides)
+    try:
+        # Caches would hide the queries of every call but the first
+        with patch.object(cache_service, "enabled", False):
+            yield db
+    finally:
+        for override in patches:
+            override.stop()
+        for dependency in overrides:
+            app.dependency_overrides.pop(dependency, None)
+
+
+def iter_routes(application):
+    """Routes of the app, including those of included routers"""
+    iterate = getattr(fastapi.routing, "iter_route_contexts", None)
+    if iterate is not None:
+        return list(iterate(application.routes))
+    return [route for route in application.routes if isinstance(route, fastapi.routing.APIRoute)]
+
+
+def concrete_path(route):
+    """Fill path parameters with ids"""
+    return re.sub(r"\{[^}]+\}", str(uuid.UUID(int=42)), route.path_format)
+
+
+def count_queries(route, size, application=app):
+    """Queries issued by one GET of ``route`` with ``size`` rows per table"""
+    with fake_supabase(FakeDatabase(size)) as db:
+        client = TestClient(application, raise_server_exceptions=False)
+        response = client.get(
+            concrete_path(route),
+            params=ROUTE_PARAMS.get(route.path),
+            headers={"Authorization": "Bearer budget-token"},
+        )
+    return response, db.calls
+
+
+def budgeted_routes(application=app):
+    return [
+        pytest.param(route, id=f"GET {route.path}")
+        for route in iter_routes(application)
+        if get_query_budget(route.endpoint) is not None and "GET" in route.methods
+    ]
+
+
+class TestQueryBudgets:
+    """Routes stay within their declared query budget at every fixture size"""
+
+    def test_budgets_are_declared(self):
+        assert len(budgeted_routes()) >= 5
+
+    @pytest.mark.parametrize("route", budgeted_routes())
+    def test_route_within_budget_and_constant(self, route):
+        budget = get_query_budget(route.endpoint)
+        counts = {}
+        for size in SIZES:
+            response, calls = count_queries(route, size)
+            assert response.status_code < 500, f"{route.path} failed with {size} rows: {response.text}"
+            assert len(calls) <= budget, f"{route.path} issued {len(calls)} queries (budget {budget}): {calls}"
+            counts[size] = calls
+        assert len(counts[SIZES[0]]) == len(counts[SIZES[-1]]), f"Query count grows with data (N+1): {counts}"
+
+
+class TestBackgroundJobs:
+    """Report generation runs outside a route but must not loop over rows either"""
+
+    @pytest.mark.asyncio
+    async def test_tenant_history_report_is_constant(self):
+        counts = {}
+        for size in SIZES:
+            with fake_supabase(FakeDatabase(size)) as db:
+                await reporting_service.generate_tenant_history_report(
+                    {"id": "report-1", "owner_id": USER_ID, "parameters": {}}, date(2024, 1, 1), date(2024, 12, 31)
+                )
+            counts[size] = db.calls
+        assert counts[SIZES[0]] == counts[SIZES[-1]] == ["properties", "property_tenants", "tenants", "properties"]
+
+
+class TestDetector:
+    """The harness itself catches regressions"""
+
+    def make_app(self):
+        router = APIRouter()
+
+        @router.get("/things/{thing_id}")
+        @query_budget(2)
+        async def n_plus_one(thing_id: str):
+            links = await run_query(database.supabase_client.table("links").select("*"))
+            for link in links.data:
+                await run_query(database.supabase_client.table("things").select("*").eq("id", link["id"]))
+            return {"links": len(links.data)}
+
+        mini = FastAPI()
+        mini.include_router(router)
+        mini.add_middleware(MetricsMiddleware)
+        return mini
+
+    def test_growth_is_detected(self):
+        mini = self.make_app()
+        route = budgeted_routes(mini)[0].values[0]
+        small = count_queries(route, 1, mini)[1]
+        large = count_queries(route, 6, mini)[1]
+        assert len(small) == 2
+        assert len(large) == 7 > get_query_budget(route.endpoint)
+
+    def test_over_budget_requests_are_logged(self, caplog):
+        mini = self.make_app()
+        route = budgeted_routes(mini)[0].values[0]
+        count_queries(route, 3, mini)
+        assert "issued 4 queries (budget 2)" in caplog.text
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the async Supabase query execution path
+"""
+import asyncio
+import contextvars
+import time
+
+import pytest
+
+from app.config.query_executor import run_query, get_executor_stats
+
+request_tag = contextvars.ContextVar("request_tag", default=None)
+
+
+class SlowQuery:
+    """Stand-in for a supabase-py builder whose execute() blocks"""
+
+    def __init__(self, delay: float, result="ok"):
+        self.delay = delay
+        self.result = result
+
+    def execute(self):
+        time.sleep(self.delay)
+        return self.result
+
+
+class TestRunQuery:
+    """Test that blocking queries run off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_returns_execute_result(self):
+        assert await run_query(SlowQuery(0, result={"data": [1]})) == {"data": [1]}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_overlap(self):
+        """Ten 100ms queries should finish in far less than one second"""
+        start = time.perf_counter()
+        await asyncio.gather(*(run_query(SlowQuery(0.1)) for _ in range(10)))
+        assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """The loop must keep ticking while a query is in flight"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await run_query(SlowQuery(0.2))
+        task.cancel()
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        with pytest.raises(asyncio.TimeoutError):
+            await run_query(SlowQuery(0.5), timeout=0.05)
+
+    @pytest.mark.asyncio
+    async def test_context_propagates_to_worker(self):
+        """Request-scoped contextvars must be visible inside execute()"""
+
+        class ContextQuery:
+            def execute(self):
+                return request_tag.get()
+
+        request_tag.set("req-42")
+        assert await run_query(ContextQuery()) == "req-42"
+
+    def test_executor_stats(self):
+        stats = get_executor_stats()
+        assert {"max_workers", "threads", "queued"} <= set(stats)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for Supabase query tracing, the slow-query log and Server-Timing headers
+"""
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config.settings import settings
+from app.config.client_pool import SupabaseClientPool
+from app.config.metrics import MetricsMiddleware
+from app.config.query_executor import run_query
+from app.config.query_trace import begin_request_trace, describe_query, slow_query_log
+
+TOKEN = 'perf-secret'
+
+client = TestClient(app, headers={'X-Performance-Token': TOKEN})
+
+
+@pytest.fixture(autouse=True)
+def performance_token():
+    """Performance endpoints are disabled unless a token is configured"""
+    with patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+        yield
+
+
+class FakeQuery:
+    """Stands in for a postgrest builder"""
+
+    def __init__(self, table, rows, delay=0.0, error=None):
+        self.table = table
+        self.rows = rows
+        self.delay = delay
+        self.error = error
+
+    def execute(self):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=[{"id": i} for i in range(self.rows)])
+
+
+def make_pool(body):
+    """Pool whose HTTP transport answers every request with ``body``"""
+    pool = SupabaseClientPool('https://test-project.supabase.co', 'test-key')
+    payload = json.dumps(body).encode()
+    pool.http_client._transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=payload, headers={"content-type": "application/json"})
+    )
+    return pool, payload
+
+
+class TestDescribeQuery:
+    """Table, operation and filters are read from the builder"""
+
+    def setup_method(self):
+        self.pool, _ = make_pool([])
+        self.db = self.pool.scoped("token")
+
+    def teardown_method(self):
+        self.pool.close()
+
+    def test_select_filters_keep_operators_not_values(self):
+        query = self.db.table("units").select("*").eq("property_id", "secret-id").in_("status", ["a", "b"]).order("unit_number").limit(5)
+        table, operation, filters = describe_query(query)
+        assert (table, operation) == ("units", "select")
+        assert filters == ["property_id=eq", "status=in", "order=unit_number.asc", "limit=5"]
+        assert "secret-id" not in str(filters)
+
+    def test_write_operations(self):
+        assert describe_query(self.db.table("units").insert({"a": 1}))[:2] == ("units", "insert")
+        assert describe_query(self.db.table("units").upsert({"a": 1}))[:2] == ("units", "upsert")
+        assert describe_query(self.db.table("units").update({"a": 1}).eq("id", "1"))[:2] == ("units", "update")
+        assert describe_query(self.db.table("units").delete().eq("id", "1"))[:2] == ("units", "delete")
+        assert describe_query(self.db.rpc("get_unit_history", {"unit_id": "1"}))[:2] == ("rpc/get_unit_history", "rpc")
+
+    def test_unknown_builders_do_not_break_tracing(self):
+        assert describe_query(FakeQuery("tenants", 1)) == ("tenants", "execute", [])
+        assert describe_query(object()) == ("unknown", "execute", [])
+
+
+class TestRunQueryTracing:
+    """run_query records every query against the current request"""
+
+    @pytest.mark.asyncio
+    async def test_records_are_attached_to_the_request(self):
+        trace = begin_request_trace("req-1", "GET", "/units/1/history")
+        await run_query(FakeQuery("units", 3))
+        await run_query(FakeQuery("leases", 2))
+
+        totals = trace.totals()
+        assert totals["queries"] == 2
+        assert totals["rows"] == 5
+        assert [record.table for record in trace.queries] == ["units", "leases"]
+        assert all(record.request_id == "req-1" for record in trace.queries)
+        assert set(trace.by_table()) == {"execute units", "execute leases"}
+
+    @pytest.mark.asyncio
+    async def test_failed_queries_are_recorded(self):
+        trace = begin_request_trace("req-2")
+        with pytest.raises(ValueError):
+            await run_query(FakeQuery("units", 0, error=ValueError("boom")))
+        assert trace.queries[0].error == "ValueError"
+
+    @pytest.mark.asyncio
+    async def test_response_bytes_come_from_the_http_body(self):
+        pool, payload = make_pool([{"id": "u1", "unit_number": "101"}, {"id": "u2", "unit_number": "102"}])
+        try:
+            trace = begin_request_trace("req-3")
+            response = await run_query(pool.scoped("token").table("units").select("*").eq("property_id", "p1"))
+        finally:
+            pool.close()
+
+        assert len(response.data) == 2
+        record = trace.queries[0]
+        assert (record.table, record.operation, record.rows) == ("units", "select", 2)
+        assert record.bytes == len(payload)
+
+    @pytest.mark.asyncio
+    async def test_slow_queries_are_logged(self, caplog):
+        slow_query_log.clear()
+        begin_request_trace("req-slow", "GET", "/units/1/history")
+        with patch.object(slow_query_log, "threshold_ms", 20):
+            await run_query(FakeQuery("units", 1))
+            await run_query(FakeQuery("payments", 1, delay=0.05))
+
+        entries = slow_query_log.entries()
+        assert [entry["table"] for entry in entries] == ["payments"]
+        assert entries[0]["request_id"] == "req-slow"
+        assert entries[0]["duration_ms"] >= 20
+        assert "Slow query: execute payments" in caplog.text
+
+
+class TestServerTiming:
+    """Per-request totals are returned to the client"""
+
+    def test_header_reports_queries_of_the_request(self):
+        mini = FastAPI()
+
+        @mini.get("/units/{unit_id}/history")
+        async def history(unit_id: str):
+            await run_query(FakeQuery("units", 1))
+            await run_query(FakeQuery("leases", 4, delay=0.01))
+            return {"unit_id": unit_id}
+
+        mini.add_middleware(MetricsMiddleware)
+        response = TestClient(mini).get("/units/u1/history", headers={"X-Request-ID": "abc123"})
+
+        timing = response.headers["server-timing"]
+        assert timing.startswith("db;dur=")
+        assert 'desc="2 queries"' in timing
+        assert "app;dur=" in timing
+        assert response.headers["x-request-id"] == "abc123"
+
+    def test_request_ids_are_generated(self):
+        response = client.get("/health")
+        assert 'desc="0 queries"' in response.headers["server-timing"]
+        assert len(response.headers["x-request-id"]) == 16
+
+    def test_slow_queries_endpoint(self):
+        slow_query_log.clear()
+        response = client.get("/api/v1/performance/slow-queries")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["threshold_ms"] == slow_query_log.threshold_ms
+        assert data["queries"] == []
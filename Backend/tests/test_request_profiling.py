@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for on-demand request profiling and the /api/v1/performance/profiles endpoints
+"""
+import asyncio
+import pstats
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from generate_portfolio import generate_portfolio
+
+from app.main import app
+from app.config.cache import cache_service
+from app.config.local_supabase import LocalClientPool, LocalDatabase, local_token, use_local_pool
+from app.config.profiling import RequestProfiler, to_call_tree, to_pstats
+from app.config.settings import settings
+import app.config.metrics as metrics_module
+
+TOKEN = 'perf-secret'
+
+
+def frame_names(document):
+    return {frame['name'] for frame in document['shared']['frames']}
+
+
+@pytest.fixture
+def profiler():
+    profiler = RequestProfiler(enabled=True, max_per_minute=2, interval_ms=1)
+    with patch.object(metrics_module, 'request_profiler', profiler), \
+            patch('app.api.performance.request_profiler', profiler), \
+            patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+        yield profiler
+
+
+@pytest.fixture(scope='module')
+def local_pool():
+    portfolio = generate_portfolio(units=40, owners=1, seed=3)
+    db = LocalDatabase(latency_ms=5)
+    db.load(portfolio)
+    owner_id = portfolio['user_profiles'][0]['id']
+    return LocalClientPool(db), {'Authorization': f'Bearer {local_token(owner_id)}'}
+
+
+class TestTrigger:
+    """Only requests that ask, with the performance token, are profiled"""
+
+    def test_disabled_profiler_does_nothing(self):
+        profiler = RequestProfiler(enabled=False)
+        with patch.object(metrics_module, 'request_profiler', profiler):
+            response = TestClient(app).get('/health', headers={'X-Profile': '1'})
+        assert 'x-profile-id' not in response.headers
+        assert profiler.list() == []
+
+    def test_token_is_required(self, profiler):
+        client = TestClient(app)
+        assert 'x-profile-id' not in client.get('/health', headers={'X-Profile': '1'}).headers
+        assert 'x-profile-id' not in client.get('/health', headers={'X-Performance-Token': TOKEN}).headers
+        assert 'x-profile-id' in client.get('/health?_profile=1', headers={'X-Performance-Token': TOKEN}).headers
+
+    def test_nothing_is_profiled_without_a_configured_token(self, profiler):
+        client = TestClient(app)
+        with patch.object(settings, 'PERFORMANCE_API_TOKEN', ''):
+            for headers in ({'X-Profile': '1'}, {'X-Profile': '1', 'X-Performance-Token': ''}):
+                assert 'x-profile-id' not in client.get('/health', headers=headers).headers
+        assert profiler.list() == []
+
+    def test_per_minute_cap(self, profiler):
+        client = TestClient(app)
+        headers = {'X-Profile': '1', 'X-Performance-Token': TOKEN}
+        ids = [client.get('/health', headers=headers).headers.get('x-profile-id') for _ in range(3)]
+        assert ids[0] and ids[1] and ids[2] is None
+        assert profiler.rate_limited == 1
+        # The request itself is still served
+        assert client.get('/health', headers=headers).status_code == 200
+
+
+async def fetch_units():
+    await asyncio.sleep(0.05)
+
+
+async def busy():
+    deadline = time.perf_counter() + 0.03
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def handler(profiler):
+    headers = [(b'x-profile', b'1'), (b'x-performance-token', TOKEN.encode())]
+    session = profiler.begin({'type': 'http', 'method': 'GET', 'path': '/x', 'headers': headers}, 'r1')
+    await asyncio.gather(fetch_units(), busy())
+    profiler.finish(session, 'GET /x', 200, {})
+    return session.id
+
+
+class TestAsyncCallTree:
+    """Awaits are attributed to the coroutine (and task) that issued them"""
+
+    @pytest.mark.asyncio
+    async def test_awaits_in_child_tasks_are_sampled(self):
+        profiler = RequestProfiler(enabled=True, interval_ms=1)
+        with patch.object(settings, 'PERFORMANCE_API_TOKEN', TOKEN):
+            document = profiler.get(await handler(profiler))
+
+        names = frame_names(document)
+        assert {'handler', 'fetch_units', 'busy', '<await Future>'} <= names
+        tree = to_call_tree(document)
+        [root] = tree['children']
+        assert root['name'] == 'handler'
+        children = {child['name']: child for child in root['children']}
+        assert children['fetch_units']['total_ms'] >= 20
+        assert children['busy']['total_ms'] >= 10
+        # Loop is handed back after the request: the task factory is restored
+        assert asyncio.get_running_loop().get_task_factory() is None
+
+    def test_dashboard_profile_shows_postgrest_awaits(self, profiler, local_pool):
+        pool, headers = local_pool
+        with use_local_pool(pool), patch.object(cache_service, 'enabled', False):
+            client = TestClient(app)
+            response = client.get('/dashboard/summary', headers={**headers, 'X-Profile': '1', 'X-Performance-Token': TOKEN})
+            assert response.status_code == 200, response.text
+            profile_id = response.headers['x-profile-id']
+
+            listing = client.get('/api/v1/performance/profiles', headers={'X-Performance-Token': TOKEN}).json()
+            document = client.get(f'/api/v1/performance/profiles/{profile_id}', headers={'X-Performance-Token': TOKEN}).json()
+
+        assert listing['profiles'][0]['id'] == profile_id
+        assert document['metadata']['route'] == 'GET /dashboard/summary'
+        assert document['metadata']['queries']['queries'] > 0
+        awaits = [name for name in frame_names(document) if name.startswith('<await PostgREST')]
+        assert any('properties' in name for name in awaits), awaits
+        tree = to_call_tree(document)
+        assert tree['children'][0]['name'] == 'MetricsMiddleware.__call__'
+
+
+class TestArtifacts:
+    """Profiles are served as speedscope, pstats and call trees"""
+
+    def make_document(self):
+        frames = [{'name': name, 'file': 'app.py', 'line': line} for line, name in enumerate(['root', 'query', 'render'], 1)]
+        return {
+            'name': 'GET /x',
+            'shared': {'frames': frames},
+            'profiles': [{'samples': [[0, 1], [0, 1], [0, 2], [0]], 'weights': [10.0, 10.0, 5.0, 1.0]}],
+            'metadata': {'id': 'abc'},
+        }
+
+    def test_pstats_loads(self, tmp_path):
+        path = tmp_path / 'profile.pstats'
+        path.write_bytes(to_pstats(self.make_document()))
+        stats = pstats.Stats(str(path)).stats
+        cc, nc, tt, ct, callers = stats[('app.py', 2, 'query')]
+        assert (nc, round(tt, 3), round(ct, 3)) == (2, 0.02, 0.02)
+        assert ('app.py', 1, 'root') in callers
+        assert round(stats[('app.py', 1, 'root')][3], 3) == 0.026
+
+    def test_call_tree_totals_and_pruning(self):
+        tree = to_call_tree(self.make_document(), min_ms=6)
+        [root] = tree['children']
+        assert (root['total_ms'], root['self_ms']) == (26.0, 1.0)
+        assert [child['name'] for child in root['children']] == ['query']
+
+    def test_endpoints(self, profiler):
+        profiler.save(self.make_document())
+        client = TestClient(app)
+        headers = {'X-Performance-Token': TOKEN}
+        assert client.get('/api/v1/performance/profiles/abc', headers={}).status_code == 403
+        assert client.get('/api/v1/performance/profiles/abc?format=tree', headers=headers).json()['tree']['total_ms'] == 26.0
+        response = client.get('/api/v1/performance/profiles/abc?format=pstats', headers=headers)
+        assert response.headers['content-type'] == 'application/octet-stream'
+        assert client.get('/api/v1/performance/profiles/missing', headers=headers).status_code == 404
+        with patch.object(settings, 'PERFORMANCE_API_TOKEN', ''):
+            assert client.get('/api/v1/performance/profiles', headers=headers).status_code == 403
+            assert client.get('/api/v1/performance/profiles/abc', headers=headers).status_code == 403
+
+    def test_shared_directory(self, tmp_path):
+        writer = RequestProfiler(directory=str(tmp_path))
+        writer.save(self.make_document())
+        assert RequestProfiler(directory=str(tmp_path)).get('abc')['metadata'] == {'id': 'abc'}
+        assert RequestProfiler(directory=str(tmp_path)).get('../abc') is None
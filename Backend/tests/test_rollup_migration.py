@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tests for the monthly_financial_rollups migration, run against a real Postgres
+
+The migration is applied to a throwaway server (pgserver) on top of a minimal
+stand-in for the tables it reads, then payments and maintenance requests are
+inserted, changed and deleted to check that the triggers keep the rollups
+equal to a fresh backfill. Skipped when pgserver is not installed.
+"""
+import os
+
+import pytest
+
+pgserver = pytest.importorskip('pgserver')
+
+MIGRATION = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         'supabase', 'migrations', '20250614000000_monthly_financial_rollups.sql')
+
+OWNER = '00000000-0000-0000-0000-000000000001'
+OTHER_OWNER = '00000000-0000-0000-0000-000000000002'
+LAKE = '00000000-0000-0000-0000-00000000000a'
+HILL = '00000000-0000-0000-0000-00000000000b'
+TENANT = '00000000-0000-0000-0000-0000000000f1'
+PAYMENT = '00000000-0000-0000-0000-0000000000e1'
+REQUEST = '00000000-0000-0000-0000-0000000000d1'
+
+# Only the columns the migration reads, plus what Supabase provides
+SCHEMA = """
+CREATE ROLE authenticated;
+CREATE SCHEMA auth;
+CREATE FUNCTION auth.uid() RETURNS UUID LANGUAGE sql AS 'SELECT NULL::UUID';
+
+CREATE TABLE public.properties (id UUID PRIMARY KEY, owner_id UUID NOT NULL);
+CREATE TABLE public.property_tenants (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    property_id UUID REFERENCES public.properties(id),
+    tenant_id UUID, start_date DATE, end_date DATE
+);
+CREATE TABLE public.payment_history (
+    id UUID PRIMARY KEY, tenant_id UUID, payment_date DATE, payment_status TEXT,
+    rent_amount NUMERIC, maintenance_amount NUMERIC
+);
+CREATE TABLE public.payment_tracking (
+    id UUID PRIMARY KEY, tenant_id UUID, payment_date DATE, payment_status TEXT, total_amount NUMERIC
+);
+CREATE TABLE public.maintenance_requests (
+    id UUID PRIMARY KEY, property_id UUID, created_at TIMESTAMPTZ, status TEXT, estimated_cost NUMERIC
+);
+"""
+
+
+def run_sql(server, statements: str) -> str:
+    # psql carries on after errors unless told otherwise
+    return server.psql('\\set ON_ERROR_STOP on\n' + statements)
+
+
+def query(server, statement: str):
+    output = run_sql(server, f"\\pset format unaligned\n\\pset tuples_only on\n{statement};")
+    return [line.split('|') for line in output.splitlines() if line and not line.startswith(('Output format', 'Tuples only'))]
+
+
+def rollups(server):
+    """``{(property_id, 'YYYY-MM'): (revenue, maintenance_costs, payment_count)}``, zero rows left out"""
+    rows = query(server, """
+        SELECT property_id, to_char(month, 'YYYY-MM'), revenue, maintenance_costs, payment_count
+        FROM public.monthly_financial_rollups
+        WHERE revenue <> 0 OR maintenance_costs <> 0 OR payment_count <> 0
+    """)
+    return {(row[0], row[1]): (float(row[2]), float(row[3]), int(row[4])) for row in rows}
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    try:
+        instance = pgserver.get_server(str(tmp_path_factory.mktemp('pgdata')), cleanup_mode='delete')
+    except Exception as e:
+        pytest.skip(f"Postgres could not be started: {e}")
+    with open(MIGRATION) as migration:
+        run_sql(instance, SCHEMA + migration.read())
+    yield instance
+    instance.cleanup()
+
+
+@pytest.fixture
+def db(server):
+    """Two properties of one owner; the tenant moves from Lake to Hill in July 2025"""
+    run_sql(server, f"""
+        TRUNCATE public.payment_history, public.payment_tracking, public.maintenance_requests,
+                 public.property_tenants, public.monthly_financial_rollups;
+        DELETE FROM public.properties;
+        INSERT INTO public.properties VALUES ('{LAKE}', '{OWNER}'), ('{HILL}', '{OWNER}');
+        INSERT INTO public.property_tenants (property_id, tenant_id, start_date, end_date) VALUES
+            ('{LAKE}', '{TENANT}', '2025-01-01', '2025-06-30'),
+            ('{HILL}', '{TENANT}', '2025-07-01', NULL);
+    """)
+    return server
+
+
+def backfill(server):
+    """What re-running the migration's backfill gives for the current rows"""
+    with open(MIGRATION) as migration:
+        run_sql(server, migration.read())
+    return rollups(server)
+
+
+class TestPaymentHistory:
+    """Paid payment_history rows count toward the tenant's property in the payment month"""
+
+    def test_insert_counts_only_paid_rows(self, db):
+        run_sql(db, f"""
+            INSERT INTO public.payment_history VALUES
+                ('{PAYMENT}', '{TENANT}', '2025-03-05', 'paid', 1000, 50),
+                (gen_random_uuid(), '{TENANT}', '2025-03-20', 'pending', 999, 0);
+        """)
+        assert rollups(db) == {(LAKE, '2025-03'): (1050.0, 0.0, 1)}
+
+    def test_status_changes_add_and_remove(self, db):
+        run_sql(db, f"INSERT INTO public.payment_history VALUES ('{PAYMENT}', '{TENANT}', '2025-03-05', 'pending', 1000, 0)")
+        assert rollups(db) == {}
+        run_sql(db, f"UPDATE public.payment_history SET payment_status = 'paid' WHERE id = '{PAYMENT}'")
+        assert rollups(db) == {(LAKE, '2025-03'): (1000.0, 0.0, 1)}
+        run_sql(db, f"UPDATE public.payment_history SET payment_status = 'refunded' WHERE id = '{PAYMENT}'")
+        assert rollups(db) == {}
+
+    def test_amount_changes_apply_the_difference(self, db):
+        run_sql(db, f"""
+            INSERT INTO public.payment_history VALUES ('{PAYMENT}', '{TENANT}', '2025-03-05', 'paid', 1000, 50);
+            UPDATE public.payment_history SET rent_amount = 1200, maintenance_amount = NULL WHERE id = '{PAYMENT}';
+        """)
+        assert rollups(db) == {(LAKE, '2025-03'): (1200.0, 0.0, 1)}
+
+    def test_date_changes_move_the_month_and_property(self, db):
+        run_sql(db, f"""
+            INSERT INTO public.payment_history VALUES ('{PAYMENT}', '{TENANT}', '2025-06-28', 'paid', 1000, 0);
+            UPDATE public.payment_history SET payment_date = '2025-07-02' WHERE id = '{PAYMENT}';
+        """)
+        assert rollups(db) == {(HILL, '2025-07'): (1000.0, 0.0, 1)}
+
+    def test_delete_removes_the_payment(self, db):
+        run_sql(db, f"""
+            INSERT INTO public.payment_history VALUES
+                ('{PAYMENT}', '{TENANT}', '2025-03-05', 'paid', 1000, 0),
+                (gen_random_uuid(), '{TENANT}', '2025-03-25', 'paid', 300, 0);
+            DELETE FROM public.payment_history WHERE id = '{PAYMENT}';
+        """)
+        assert rollups(db) == {(LAKE, '2025-03'): (300.0, 0.0, 1)}
+
+
+class TestPaymentTracking:
+    """payment_tracking rows count their total_amount"""
+
+    def test_insert_update_delete(self, db):
+        run_sql(db, f"INSERT INTO public.payment_tracking VALUES ('{PAYMENT}', '{TENANT}', '2025-08-01', 'paid', 700)")
+        assert rollups(db) == {(HILL, '2025-08'): (700.0, 0.0, 1)}
+        run_sql(db, f"UPDATE public.payment_tracking SET total_amount = 750, payment_date = '2025-09-01' WHERE id = '{PAYMENT}'")
+        assert rollups(db) == {(HILL, '2025-09'): (750.0, 0.0, 1)}
+        run_sql(db, f"DELETE FROM public.payment_tracking WHERE id = '{PAYMENT}'")
+        assert rollups(db) == {}
+
+
+class TestMaintenanceRequests:
+    """Completed requests book their estimated cost in the month they were created"""
+
+    def test_status_cost_and_month_changes(self, db):
+        run_sql(db, f"INSERT INTO public.maintenance_requests VALUES ('{REQUEST}', '{LAKE}', '2025-02-10', 'open', 400)")
+        assert rollups(db) == {}
+        run_sql(db, f"UPDATE public.maintenance_requests SET status = 'completed' WHERE id = '{REQUEST}'")
+        assert rollups(db) == {(LAKE, '2025-02'): (0.0, 400.0, 0)}
+        run_sql(db, f"UPDATE public.maintenance_requests SET estimated_cost = 450, created_at = '2025-04-01' WHERE id = '{REQUEST}'")
+        assert rollups(db) == {(LAKE, '2025-04'): (0.0, 450.0, 0)}
+        run_sql(db, f"DELETE FROM public.maintenance_requests WHERE id = '{REQUEST}'")
+        assert rollups(db) == {}
+
+    def test_rows_carry_the_property_owner(self, db):
+        run_sql(db, f"""
+            INSERT INTO public.properties VALUES ('{REQUEST}', '{OTHER_OWNER}');
+            INSERT INTO public.maintenance_requests VALUES (gen_random_uuid(), '{REQUEST}', '2025-02-10', 'completed', 90);
+        """)
+        assert query(db, "SELECT owner_id FROM public.monthly_financial_rollups") == [[OTHER_OWNER]]
+
+
+class TestBackfill:
+    """After any sequence of writes the triggers agree with a full rebuild"""
+
+    def test_triggers_match_the_backfill(self, db):
+        run_sql(db, f"""
+            INSERT INTO public.payment_history VALUES
+                ('{PAYMENT}', '{TENANT}', '2025-05-05', 'paid', 1000, 25),
+                (gen_random_uuid(), '{TENANT}', '2025-07-05', 'paid', 1100, 25),
+                (gen_random_uuid(), '{TENANT}', '2025-08-05', 'pending', 1100, 0);
+            INSERT INTO public.payment_tracking VALUES (gen_random_uuid(), '{TENANT}', '2025-07-15', 'paid', 60);
+            INSERT INTO public.maintenance_requests VALUES
+                ('{REQUEST}', '{HILL}', '2025-07-20', 'completed', 300),
+                (gen_random_uuid(), '{LAKE}', '2025-05-02', 'completed', 80);
+            UPDATE public.payment_history SET payment_date = '2025-06-05', rent_amount = 900 WHERE id = '{PAYMENT}';
+            UPDATE public.maintenance_requests SET status = 'cancelled' WHERE id = '{REQUEST}';
+        """)
+        maintained = rollups(db)
+        assert maintained == {
+            (LAKE, '2025-05'): (0.0, 80.0, 0),
+            (LAKE, '2025-06'): (925.0, 0.0, 1),
+            (HILL, '2025-07'): (1185.0, 0.0, 2),
+        }
+        assert backfill(db) == maintained
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched tenant lookup in db.tenants.get_tenants_for_owner
+"""
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+
+from app.config import database
+from app.config.local_supabase import LocalClientPool, LocalDatabase, LocalQuery, use_local_pool
+from app.config.query_trace import begin_request_trace
+from app.db import tenants as tenants_db
+
+OWNER_ID = "123e4567-e89b-12d3-a456-426614174000"
+OTHER_OWNER_ID = "123e4567-e89b-12d3-a456-426614174001"
+
+
+def portfolio(num_properties: int, tenants_per_property: int = 2):
+    """An owner with the given number of properties, plus one property of another owner"""
+    properties = [{"id": f"p{i}", "owner_id": OWNER_ID} for i in range(num_properties)]
+    properties.append({"id": "p-other", "owner_id": OTHER_OWNER_ID})
+    tenants, links = [], []
+    for prop in properties:
+        for j in range(tenants_per_property):
+            tenant_id = f"t-{prop['id']}-{j}"
+            tenants.append({"id": tenant_id, "name": tenant_id, "status": "active" if j % 2 == 0 else "inactive",
+                            "created_at": f"2024-01-{j + 1:02d}"})
+            links.append({"id": f"l-{tenant_id}", "property_id": prop["id"], "tenant_id": tenant_id})
+    # A tenant linked twice is listed once
+    links.append({"id": "l-repeat", "property_id": properties[0]["id"], "tenant_id": f"t-{properties[0]['id']}-0"})
+    db = LocalDatabase()
+    db.load({"properties": properties, "tenants": tenants, "property_tenants": links})
+    return db
+
+
+@pytest.fixture
+def local_db():
+    def load(num_properties: int, tenants_per_property: int = 2):
+        stack.enter_context(use_local_pool(LocalClientPool(portfolio(num_properties, tenants_per_property))))
+        # tenants_db binds the client at import; point it at the local pool
+        stack.enter_context(patch.object(tenants_db, "supabase_client", database.supabase_client))
+    with ExitStack() as stack:
+        yield load
+
+
+class TestGetTenantsForOwner:
+    """Test that the owner tenant listing is one server-side joined query"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("num_properties", [1, 10, 500])
+    async def test_single_query_without_id_lists(self, local_db, num_properties):
+        local_db(num_properties)
+        trace = begin_request_trace("tenants-for-owner")
+        tenants, total = await tenants_db.get_tenants_for_owner(OWNER_ID, skip=0, limit=25)
+
+        assert trace.count == 1
+        [query] = trace.queries
+        assert query.table == "tenants"
+        assert total == num_properties * 2
+        assert len(tenants) == min(25, num_properties * 2)
+        assert all(not tenant["id"].startswith("t-p-other") for tenant in tenants)
+        assert all("property_tenants" not in tenant for tenant in tenants)
+
+    @pytest.mark.asyncio
+    async def test_filters_sorting_and_pagination(self, local_db):
+        local_db(5, tenants_per_property=4)
+        tenants, total = await tenants_db.get_tenants_for_owner(
+            OWNER_ID, status="active", skip=2, limit=3, sort_by="name", sort_order="asc"
+        )
+        active = sorted(f"t-p{i}-{j}" for i in range(5) for j in (0, 2))
+        assert total == len(active)
+        assert [tenant["name"] for tenant in tenants] == active[2:5]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort_by", ["no_such_column", "name,id", None])
+    async def test_unknown_sort_fields_fall_back_to_created_at(self, local_db, sort_by):
+        local_db(3)
+        with patch.object(LocalQuery, "order", autospec=True, side_effect=LocalQuery.order) as order:
+            tenants, total = await tenants_db.get_tenants_for_owner(OWNER_ID, sort_by=sort_by)
+        assert order.call_args.args[1] == "created_at"
+        assert total == 6 and len(tenants) == 6
+
+    @pytest.mark.asyncio
+    async def test_specific_property(self, local_db):
+        local_db(3)
+        tenants, total = await tenants_db.get_tenants_for_owner(OWNER_ID, property_id="p1")
+        assert total == 2
+        assert sorted(tenant["id"] for tenant in tenants) == ["t-p1-0", "t-p1-1"]
+
+    @pytest.mark.asyncio
+    async def test_property_not_owned_returns_empty(self, local_db):
+        local_db(3)
+        result = await tenants_db.get_tenants_for_owner(OWNER_ID, property_id="p-other")
+        assert result == ([], 0)
@@ -0,0 +1,183 @@
+-- Monthly Financial Rollups
+-- One row per owner, property and month with the revenue collected and the
+-- maintenance costs booked in that month. Row triggers on payment_history,
+-- payment_tracking and maintenance_requests apply each change as a delta, so
+-- dashboards and reports read a handful of rows per month instead of scanning
+-- every payment the owner has ever received.
+--
+-- Bucketing (kept in line with Backend/app/db/dashboard.py and /reports):
+--   * payment_history:      paid rows, rent_amount + maintenance_amount, by payment_date
+--   * payment_tracking:     paid rows, total_amount, by payment_date
+--   * maintenance_requests: completed rows, estimated_cost, by created_at
+-- Payments carry no property_id; they are attributed to the tenant's
+-- property_tenants link covering the payment date (else the latest link).
+
+-- ==============================================================================
+-- PART 1: ROLLUP TABLE
+-- ==============================================================================
+
+CREATE TABLE IF NOT EXISTS public.monthly_financial_rollups (
+    owner_id UUID NOT NULL,
+    property_id UUID NOT NULL REFERENCES public.properties(id) ON DELETE CASCADE,
+    month DATE NOT NULL,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    maintenance_costs DECIMAL(14,2) NOT NULL DEFAULT 0,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    -- Owner first: readers fetch a contiguous range of months for one owner
+    PRIMARY KEY (owner_id, month, property_id)
+);
+
+ALTER TABLE public.monthly_financial_rollups ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Owners can view their rollups" ON public.monthly_financial_rollups;
+CREATE POLICY "Owners can view their rollups"
+    ON public.monthly_financial_rollups FOR SELECT
+    TO authenticated
+    USING (owner_id = auth.uid());
+
+-- ==============================================================================
+-- PART 2: DELTA FUNCTIONS
+-- ==============================================================================
+
+-- Property a tenant's payment belongs to
+CREATE OR REPLACE FUNCTION rollup_property_for_tenant(p_tenant_id UUID, p_day DATE)
+RETURNS UUID AS $$
+    SELECT pt.property_id
+    FROM public.property_tenants pt
+    WHERE pt.tenant_id = p_tenant_id
+    ORDER BY (pt.start_date <= p_day AND (pt.end_date IS NULL OR pt.end_date >= p_day)) DESC,
+             pt.start_date DESC NULLS LAST
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+-- Add (or with negative amounts, remove) a change to a property's month
+CREATE OR REPLACE FUNCTION add_to_monthly_rollup(
+    p_property_id UUID,
+    p_day DATE,
+    p_revenue NUMERIC,
+    p_maintenance_costs NUMERIC,
+    p_payments INTEGER
+) RETURNS VOID AS $$
+DECLARE
+    v_owner_id UUID;
+BEGIN
+    IF p_property_id IS NULL OR p_day IS NULL THEN
+        RETURN;
+    END IF;
+
+    SELECT owner_id INTO v_owner_id FROM public.properties WHERE id = p_property_id;
+    IF v_owner_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO public.monthly_financial_rollups AS r
+        (owner_id, property_id, month, revenue, maintenance_costs, payment_count)
+    VALUES
+        (v_owner_id, p_property_id, date_trunc('month', p_day)::DATE, p_revenue, p_maintenance_costs, p_payments)
+    ON CONFLICT (owner_id, month, property_id) DO UPDATE
+    SET revenue = r.revenue + EXCLUDED.revenue,
+        maintenance_costs = r.maintenance_costs + EXCLUDED.maintenance_costs,
+        payment_count = r.payment_count + EXCLUDED.payment_count,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- ==============================================================================
+-- PART 3: TRIGGERS
+-- ==============================================================================
+
+CREATE OR REPLACE FUNCTION rollup_payment_history_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.payment_status = 'paid' THEN
+        PERFORM add_to_monthly_rollup(
+            rollup_property_for_tenant(OLD.tenant_id, OLD.payment_date), OLD.payment_date,
+            -(COALESCE(OLD.rent_amount, 0) + COALESCE(OLD.maintenance_amount, 0)), 0, -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.payment_status = 'paid' THEN
+        PERFORM add_to_monthly_rollup(
+            rollup_property_for_tenant(NEW.tenant_id, NEW.payment_date), NEW.payment_date,
+            COALESCE(NEW.rent_amount, 0) + COALESCE(NEW.maintenance_amount, 0), 0, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_payment_tracking_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.payment_status = 'paid' THEN
+        PERFORM add_to_monthly_rollup(
+            rollup_property_for_tenant(OLD.tenant_id, OLD.payment_date), OLD.payment_date,
+            -COALESCE(OLD.total_amount, 0), 0, -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.payment_status = 'paid' THEN
+        PERFORM add_to_monthly_rollup(
+            rollup_property_for_tenant(NEW.tenant_id, NEW.payment_date), NEW.payment_date,
+            COALESCE(NEW.total_amount, 0), 0, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_maintenance_request_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'completed' THEN
+        PERFORM add_to_monthly_rollup(OLD.property_id, OLD.created_at::DATE, 0, -COALESCE(OLD.estimated_cost, 0), 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'completed' THEN
+        PERFORM add_to_monthly_rollup(NEW.property_id, NEW.created_at::DATE, 0, COALESCE(NEW.estimated_cost, 0), 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rollup_payment_history ON public.payment_history;
+CREATE TRIGGER rollup_payment_history
+    AFTER INSERT OR UPDATE OR DELETE ON public.payment_history
+    FOR EACH ROW EXECUTE FUNCTION rollup_payment_history_change();
+
+DROP TRIGGER IF EXISTS rollup_payment_tracking ON public.payment_tracking;
+CREATE TRIGGER rollup_payment_tracking
+    AFTER INSERT OR UPDATE OR DELETE ON public.payment_tracking
+    FOR EACH ROW EXECUTE FUNCTION rollup_payment_tracking_change();
+
+DROP TRIGGER IF EXISTS rollup_maintenance_requests ON public.maintenance_requests;
+CREATE TRIGGER rollup_maintenance_requests
+    AFTER INSERT OR UPDATE OR DELETE ON public.maintenance_requests
+    FOR EACH ROW EXECUTE FUNCTION rollup_maintenance_request_change();
+
+-- ==============================================================================
+-- PART 4: BACKFILL
+-- ==============================================================================
+
+TRUNCATE public.monthly_financial_rollups;
+
+INSERT INTO public.monthly_financial_rollups (owner_id, property_id, month, revenue, maintenance_costs, payment_count)
+SELECT p.owner_id, c.property_id, c.month, SUM(c.revenue), SUM(c.maintenance_costs), SUM(c.payments)::INTEGER
+FROM (
+    SELECT rollup_property_for_tenant(ph.tenant_id, ph.payment_date) AS property_id,
+           date_trunc('month', ph.payment_date)::DATE AS month,
+           COALESCE(ph.rent_amount, 0) + COALESCE(ph.maintenance_amount, 0) AS revenue,
+           0 AS maintenance_costs, 1 AS payments
+    FROM public.payment_history ph
+    WHERE ph.payment_status = 'paid' AND ph.payment_date IS NOT NULL
+    UNION ALL
+    SELECT rollup_property_for_tenant(t.tenant_id, t.payment_date),
+           date_trunc('month', t.payment_date)::DATE,
+           COALESCE(t.total_amount, 0), 0, 1
+    FROM public.payment_tracking t
+    WHERE t.payment_status = 'paid'
+    UNION ALL
+    SELECT m.property_id, date_trunc('month', m.created_at)::DATE, 0, COALESCE(m.estimated_cost, 0), 0
+    FROM public.maintenance_requests m
+    WHERE m.status = 'completed'
+) c
+JOIN public.properties p ON p.id = c.property_id
+GROUP BY p.owner_id, c.property_id, c.month;
@@ -2,6 +2,7 @@
 """
 Test script to verify Redis caching and performance monitoring is working
 """
+import os
 import requests
 import time
 import json
@@ -9,6 +10,8 @@ import json
 def test_redis_performance():
     """Test Redis caching and performance monitoring"""
     base_url = "http://localhost:8000"
+    # Performance endpoints are disabled unless the server has PERFORMANCE_API_TOKEN set
+    perf_headers = {"X-Performance-Token": os.getenv("PERFORMANCE_API_TOKEN", "")}
     
     print("🚀 Testing Redis Performance Optimization")
     print("=" * 50)
@@ -31,7 +34,7 @@ def test_redis_performance():
     # Test 2: Performance summary
     print("\n2. Testing performance monitoring...")
     try:
-        response = requests.get(f"{base_url}/api/v1/performance/summary", timeout=10)
+        response = requests.get(f"{base_url}/api/v1/performance/summary", headers=perf_headers, timeout=10)
         if response.status_code == 200:
             data = response.json()
             print("✅ Performance monitoring is working!")
@@ -68,7 +71,7 @@ def test_redis_performance():
     # Test 4: Cache keys
     print("\n4. Testing cache management...")
     try:
-        response = requests.get(f"{base_url}/api/v1/performance/cache-keys", timeout=10)
+        response = requests.get(f"{base_url}/api/v1/performance/cache-keys", headers=perf_headers, timeout=10)
         if response.status_code == 200:
             data = response.json()
             print("✅ Cache management is working!")